@@ -202,6 +202,15 @@ class ModelRouter:
             "request_stats": dict(self._request_stats),
         }
     
+    @staticmethod
+    def _record_metrics(capability: str, provider: str | None, seconds: float, outcome: str) -> None:
+        """记录 Prometheus 指标（失败不影响请求）"""
+        try:
+            from ..services.system.metrics_exporter import record_llm_request
+            record_llm_request(capability, provider or "unknown", seconds, outcome)
+        except Exception:
+            pass
+    
     def _log_diagnostics(self, event: str, capability: str, extra: str = ""):
         """输出诊断日志到终端（更清晰的格式）"""
         # 计算使用率
@@ -518,6 +527,7 @@ class ModelRouter:
         
         self._log_diagnostics("排队", capability, f"请求#{request_id}")
 
+        metrics_provider = req.get("lb_provider_id") or req["meta"].get("provider")
         last_error = "unknown error"
         for attempt in range(self.max_retries):
             async with self._semaphore:
@@ -568,6 +578,7 @@ class ModelRouter:
                     lb_provider_id = req.get("lb_provider_id")
                     if lb_provider_id:
                         self._record_provider_latency(lb_provider_id, process_time)
+                    self._record_metrics(capability, metrics_provider, process_time, "success")
                     
                     self._log_diagnostics("✅ 成功", capability, f"请求#{request_id} 处理耗时:{process_time:.2f}s")
                     
@@ -596,6 +607,7 @@ class ModelRouter:
                     logger.error("=" * 60)
                     
                     self._active_requests -= 1
+                    self._record_metrics(capability, metrics_provider, process_time, "timeout")
                     self._log_diagnostics("⏱️ 超时", capability, f"请求#{request_id}")
                     
                     # 【修复】连续多次超时后重置客户端，清理可能的问题连接
@@ -607,15 +619,22 @@ class ModelRouter:
                     last_error = str(exc)
                     self._active_requests -= 1
                     self._request_stats[capability]["error"] += 1
+                    self._record_metrics(capability, metrics_provider, time.time() - process_start, "error")
                     self._log_diagnostics("❌ HTTP错误", capability, f"请求#{request_id} {exc}")
                 except Exception as e:
                     last_error = str(e)
                     self._active_requests -= 1
                     self._request_stats[capability]["error"] += 1
+                    self._record_metrics(capability, metrics_provider, time.time() - process_start, "error")
                     self._log_diagnostics("❌ 异常", capability, f"请求#{request_id} {e}")
                     
             if attempt < self.max_retries - 1:
                 self._queued_requests += 1  # 重试时重新排队
+                try:
+                    from ..services.system.metrics_exporter import record_llm_retry
+                    record_llm_retry(capability)
+                except Exception:
+                    pass
                 # 【优化】429 Rate Limit 需要更长的退避时间
                 sleep_time = min(2.0, 0.5 * (attempt + 1))
                 if "429" in last_error:
@@ -1138,7 +1157,9 @@ class ModelRouter:
         actual_model = body.get("model") if isinstance(body, dict) else "N/A"
         logger.info(f"[acall_capability] {capability} -> {debug_url} (type={provider_type}, model={actual_model}, timeout={timeout_value}s)")
         
+        metrics_provider = lb_provider.provider_id if lb_provider else config.provider
         async with self._semaphore:
+            request_start = time.time()
             try:
                 async with httpx.AsyncClient(timeout=timeout_value, http2=False) as client:
                     response = await client.post(url, json=body, headers=headers)
@@ -1147,13 +1168,16 @@ class ModelRouter:
                     
                     # 调试日志：打印响应结构
                     logger.debug(f"[acall_capability] {capability} 响应 keys: {list(data.keys()) if isinstance(data, dict) else type(data)}")
+                self._record_metrics(capability, metrics_provider, time.time() - request_start, "success")
                     
             except httpx.TimeoutException:
+                self._record_metrics(capability, metrics_provider, time.time() - request_start, "timeout")
                 logger.error(f"[acall_capability] {capability} 超时 ({timeout_value}s)")
                 raise RuntimeError(
                     f"Async capability {capability} timed out after {timeout_value}s"
                 ) from None
             except httpx.HTTPStatusError as e:
+                self._record_metrics(capability, metrics_provider, time.time() - request_start, "error")
                 # 【诊断】打印请求体帮助调试 400 错误
                 import json as json_module
                 body_preview = json_module.dumps(body, ensure_ascii=False, default=str)[:500] if body else "None"
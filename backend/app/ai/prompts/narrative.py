@@ -71,6 +71,32 @@ NARRATIVE_PROMPTS = {
         "3. 种群内部的基因微观变化趋势。"
         "使用学术且带有叙事感的语气，控制在2-3句；若涉及高纬度活动，请提及球面折返带来的影响。"
     ),
+    "critical_detail_batch": """你是重要物种的专属观察者，对本批次每个物种分别进行深入分析。
+
+**重要：必须返回纯JSON对象，不要使用markdown或其他格式。**
+
+【批次数据】
+{batch}
+
+【分析任务】
+为批次中的每个物种描述：
+1. 形态或生态位的重大适应性调整。
+2. 与捕食者/竞争者的具体博弈细节。
+3. 种群内部的基因微观变化趋势。
+使用学术且带有叙事感的语气，每个物种控制在2-3句；若涉及高纬度活动，请提及球面折返带来的影响。
+
+【输出格式】
+{{
+    "details": [
+        {{
+            "lineage_code": "与输入完全一致的物种代码",
+            "summary": "该物种的分析"
+        }}
+    ]
+}}
+
+每个输入物种必须对应一条 details，lineage_code 不得改写。
+""",
     
     # 【新增】植物专用批量分析Prompt
     "plant_focus_batch": """你是古植物学家，批量分析重点植物物种的适应策略与演化趋势。
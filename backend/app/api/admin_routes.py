@@ -13,7 +13,7 @@ from ..core.seed import A_SCENARIO, seed_defaults
 from ..core.config import get_settings
 from ..models.species import Species
 from ..models.environment import MapState
-from ..models.history import TurnLog
+from ..models.history import TurnLog, TurnPayload, TurnSpeciesStat
 from ..repositories.species_repository import species_repository
 from ..repositories.environment_repository import environment_repository
 
@@ -79,7 +79,9 @@ def reset_world(request: ResetRequest) -> dict:
     try:
         # 1. 重置数据库
         with session_scope() as session:
-            # 删除历史记录
+            # 删除历史记录（含拆分出的载荷与物种统计，否则新世界会读到旧回合的报告/序列）
+            session.exec(delete(TurnSpeciesStat))
+            session.exec(delete(TurnPayload))
             session.exec(delete(TurnLog))
             
             # 删除非初始物种
@@ -5,6 +5,8 @@
 - 导出功能
 - 系统日志
 - AI 诊断
+- 阶段诊断（耗时、内存剖析、采样折叠栈）
+- 启动诊断（首请求/首回合耗时、Taichi 预热）
 - 游戏状态
 - 任务控制
 """
@@ -15,11 +17,14 @@ import logging
 from pathlib import Path
 from typing import TYPE_CHECKING
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from fastapi.responses import PlainTextResponse
 
+from ..schemas.requests import StageProfilingRequest
 from ..schemas.responses import ExportRecord
 from .dependencies import get_container, get_history_repository, get_session
 from ..core.ai_router_config import configure_model_router
+from ..core.response_cache import BINARY_MEDIA_TYPE, get_response_cache
 from ..simulation.constants import get_time_config
 
 if TYPE_CHECKING:
@@ -99,6 +104,75 @@ def reset_ai_diagnostics(
     return {"success": True, "message": "AI 诊断统计已重置"}
 
 
+# ========== 阶段诊断 ==========
+
+@router.get("/system/stage-diagnostics", tags=["system"])
+def get_stage_diagnostics(
+    container: 'ServiceContainer' = Depends(get_container),
+) -> dict:
+    """获取最近一回合的阶段耗时与内存剖析数据"""
+    engine = container.simulation_engine
+    metrics = engine.get_pipeline_metrics()
+    
+    return {
+        "profiling": engine.get_profiling_options(),
+        "last_turn": metrics.to_dict() if metrics else None,
+        "slowest_stages": metrics.get_slowest_stages() if metrics else [],
+        "memory_table": metrics.get_memory_table() if metrics else "",
+    }
+
+
+@router.post("/system/stage-diagnostics/profiling", tags=["system"])
+def configure_stage_profiling(
+    request: StageProfilingRequest,
+    container: 'ServiceContainer' = Depends(get_container),
+) -> dict:
+    """开启/关闭逐阶段内存剖析，或指定采样剖析的回合"""
+    options = container.simulation_engine.configure_profiling(
+        memory=request.memory,
+        top_allocators=request.top_allocators,
+        profile_turn=request.profile_turn,
+        clear_profile_turn=request.clear_profile_turn,
+    )
+    return {"success": True, "profiling": options}
+
+
+@router.get("/system/stage-diagnostics/profile/{turn_index}", tags=["system"])
+def get_stage_profile(
+    turn_index: int,
+    container: 'ServiceContainer' = Depends(get_container),
+) -> PlainTextResponse:
+    """下载指定回合的折叠栈采样（可直接用于 flamegraph.pl / speedscope）"""
+    options = container.simulation_engine.get_profiling_options()
+    output_dir = options.get("profile_output_dir") or str(Path(container.settings.data_dir) / "profiles")
+    path = Path(output_dir) / f"turn_{turn_index:05d}.folded"
+    
+    if not path.exists():
+        raise HTTPException(status_code=404, detail=f"回合 {turn_index} 没有采样剖析数据")
+    
+    return PlainTextResponse(path.read_text(encoding="utf-8"))
+
+
+# ========== 启动诊断 ==========
+
+@router.get("/system/startup", tags=["system"])
+def get_startup_diagnostics() -> dict:
+    """启动耗时（首个请求 / 首个回合）与 Taichi 延迟初始化、预热、离线缓存状态"""
+    from ..core.startup import get_startup_timeline
+    from ..tensor.taichi_runtime import get_taichi_runtime
+
+    return {
+        "timeline": get_startup_timeline().report(),
+        "taichi": get_taichi_runtime().status(),
+    }
+
+
+@router.get("/system/response-cache", tags=["system"])
+def get_response_cache_stats() -> dict:
+    """只读接口响应缓存：世界版本、命中率、304 次数、预热次数"""
+    return get_response_cache().stats
+
+
 # ========== 游戏状态 ==========
 
 @router.get("/game/state", tags=["game"])
@@ -215,29 +289,55 @@ def get_task_diagnostics(
 
 # ========== 事件流 ==========
 
+SSE_KEEPALIVE_SECONDS = 15.0
+SSE_BATCH_WINDOW_SECONDS = 0.05
+SSE_MAX_BATCH = 200
+
+
+def _format_sse(event: dict) -> str:
+    """格式化单条 SSE 帧（带 id 以支持 Last-Event-ID 续传）"""
+    import json
+    
+    seq = event.get("seq")
+    prefix = f"id: {seq}\n" if seq is not None else ""
+    return f"{prefix}data: {json.dumps(event, ensure_ascii=False, default=str)}\n\n"
+
+
 @router.get("/events/stream")
 async def stream_simulation_events(
+    request: Request,
+    last_event_id: str | None = Header(default=None, alias="Last-Event-ID"),
     session: 'SimulationSessionManager' = Depends(get_session),
 ):
-    """Server-Sent Events 端点，实时推送演化事件"""
-    import asyncio
-    import json
+    """Server-Sent Events 端点，实时推送演化事件
+    
+    每个连接独立订阅事件总线，多个标签页互不抢占事件；
+    断线重连时浏览器自动携带 Last-Event-ID，从回放历史补发遗漏事件。
+    """
     from fastapi.responses import StreamingResponse
     
+    subscriber = session.event_bus.subscribe(last_event_id=last_event_id)
+    
     async def event_generator():
-        # 【修复】发送连接确认事件，让前端从 "连接中" 切换到 "已连接"
-        yield f"data: {json.dumps({'type': 'connected', 'message': '已连接到事件流'}, ensure_ascii=False)}\n\n"
-        
-        while True:
-            events = session.get_pending_events(max_count=10)
+        try:
+            # 【修复】发送连接确认事件，让前端从 "连接中" 切换到 "已连接"
+            yield "retry: 3000\n" + _format_sse({'type': 'connected', 'message': '已连接到事件流'})
             
-            if events:
-                for event in events:
-                    yield f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
-            else:
-                yield ": keepalive\n\n"
-            
-            await asyncio.sleep(0.5)
+            while True:
+                events = await subscriber.get_batch(
+                    max_items=SSE_MAX_BATCH,
+                    timeout=SSE_KEEPALIVE_SECONDS,
+                    batch_window=SSE_BATCH_WINDOW_SECONDS,
+                )
+                if await request.is_disconnected():
+                    break
+                if events:
+                    # 一批事件合并为一次写出
+                    yield "".join(_format_sse(event) for event in events)
+                else:
+                    yield ": keepalive\n\n"
+        finally:
+            subscriber.close()
     
     return StreamingResponse(
         event_generator(),
@@ -424,6 +524,7 @@ def fetch_models(
 
 @router.get("/map")
 def get_map_overview(
+    request: Request,
     limit_tiles: int = 0,
     limit_habitats: int = 0,
     view_mode: str = "terrain",
@@ -431,7 +532,7 @@ def get_map_overview(
     species_code: str | None = None,
     container: 'ServiceContainer' = Depends(get_container),
 ):
-    """获取地图概览
+    """获取地图概览（按世界版本缓存，支持 ETag）
     
     Args:
         limit_tiles: 限制返回的地块数量（0=不限制）
@@ -440,157 +541,222 @@ def get_map_overview(
         species_id: 可选，聚焦特定物种的分布（通过ID）
         species_code: 可选，聚焦特定物种的分布（通过lineage_code，兼容前端）
     """
-    from ..services.geo.map_coloring import ViewMode
     
-    map_manager = container.map_manager
-    species_repo = container.species_repository
+    def build():
+        map_manager = container.map_manager
+        species_repo = container.species_repository
+        
+        # 确保地图已初始化
+        map_manager.ensure_initialized()
+        
+        # 【v14】预初始化 embedding 相关服务
+        try:
+            from ..services.geo.suitability_service import get_suitability_service
+            from ..services.species.prey_affinity import get_prey_affinity_service
+            get_suitability_service(container.embedding_service)
+            get_prey_affinity_service(container.embedding_service)
+        except Exception:
+            pass  # 非阻塞，失败时回退到旧方法
+        
+        # 如果提供了 species_code，转换为 species_id
+        resolved_species_id = species_id
+        if species_code and not species_id:
+            species = species_repo.get_by_lineage(species_code)
+            if species:
+                resolved_species_id = species.id
+        
+        # 直接使用 map_manager 的 get_overview，它包含完整的颜色计算逻辑
+        return map_manager.get_overview(
+            tile_limit=limit_tiles if limit_tiles > 0 else None,
+            habitat_limit=limit_habitats if limit_habitats > 0 else None,
+            view_mode=view_mode,  # type: ignore
+            species_id=resolved_species_id,
+        )
     
-    # 确保地图已初始化
-    map_manager.ensure_initialized()
+    return get_response_cache().respond(request, build)
+
+
+def _map_layer_service(container: 'ServiceContainer'):
+    from ..services.geo.map_layers import get_map_layer_service
     
-    # 【v14】预初始化 embedding 相关服务
+    map_manager = container.map_manager
+    map_manager.ensure_initialized()
+    return get_map_layer_service(map_manager)
+
+
+def _frames_response(request: Request, frames):
+    """把帧生成器的输出作为二进制响应返回（按世界版本缓存，支持 ETag）"""
     try:
-        from ..services.geo.suitability_service import get_suitability_service
-        from ..services.species.prey_affinity import get_prey_affinity_service
-        get_suitability_service(container.embedding_service)
-        get_prey_affinity_service(container.embedding_service)
-    except Exception:
-        pass  # 非阻塞，失败时回退到旧方法
-    
-    # 如果提供了 species_code，转换为 species_id
-    resolved_species_id = species_id
-    if species_code and not species_id:
-        species = species_repo.get_by_lineage(species_code)
-        if species:
-            resolved_species_id = species.id
-    
-    # 直接使用 map_manager 的 get_overview，它包含完整的颜色计算逻辑
-    return map_manager.get_overview(
-        tile_limit=limit_tiles if limit_tiles > 0 else None,
-        habitat_limit=limit_habitats if limit_habitats > 0 else None,
-        view_mode=view_mode,  # type: ignore
-        species_id=resolved_species_id,
-    )
+        return get_response_cache().respond(request, lambda: b"".join(frames()), media_type=BINARY_MEDIA_TYPE)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]) if e.args else "未知图层")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/map/geometry")
+def get_map_geometry(
+    request: Request,
+    region: str | None = None,
+    lod: int = 1,
+    container: 'ServiceContainer' = Depends(get_container),
+):
+    """获取地图静态几何（二进制帧：tile_id / q / r 网格）
+    
+    地形不变时 ETag 不变，前端只需获取一次。帧格式见 services/geo/map_layers.py。
+    
+    Args:
+        region: 可选，x0,y0,x1,y1（半开区间）
+        lod: 行列抽样步长（1-16）
+    """
+    service = _map_layer_service(container)
+    return _frames_response(request, lambda: service.iter_geometry_frames(region, lod))
+
+
+@router.get("/map/layers")
+def get_map_layers(
+    request: Request,
+    names: str = "color:terrain",
+    region: str | None = None,
+    lod: int = 1,
+    container: 'ServiceContainer' = Depends(get_container),
+):
+    """获取地图图层（二进制帧，每个图层一帧，(H, W) 网格布局）
+    
+    Args:
+        names: 逗号分隔的图层名，如 color:climate,elevation,species:A1
+               （color:<视图模式> / elevation / temperature / humidity / resources / salinity /
+               is_lake / biodiversity / terrain_type / climate_zone / biome / cover /
+               species:<谱系代码> / suitability:<谱系代码>）
+        region: 可选，x0,y0,x1,y1（半开区间）
+        lod: 行列抽样步长（1-16）
+    """
+    layer_names = [name.strip() for name in names.split(",") if name.strip()]
+    if not layer_names:
+        raise HTTPException(status_code=400, detail="names 不能为空")
+    service = _map_layer_service(container)
+    return _frames_response(request, lambda: service.iter_layer_frames(layer_names, region, lod))
+
+
+# ========== 种群时间序列 ==========
+
+@router.get("/population/series")
+def get_population_series_frames(
+    request: Request,
+    codes: str | None = None,
+    field: str = "total",
+    window: int = 200,
+):
+    """获取种群时间序列（二进制帧，格式同地图图层）
+
+    返回两帧：turns (int32, 回合索引) 与 series (float32, (物种数, 回合数)，缺测为 NaN)，
+    series 帧头的 codes 给出行顺序。
+
+    Args:
+        codes: 可选，逗号分隔的谱系代码（默认全部物种）
+        field: total（总种群）/ tiles（占据地块数）/ peak（单地块峰值）
+        window: 最近的回合数
+    """
+    import numpy as np
+    from ..services.analytics.population_series import FIELDS, get_population_series
+    from ..services.geo.map_layers import encode_frame
+
+    if field not in FIELDS:
+        raise HTTPException(status_code=400, detail=f"未知字段: {field}")
+    if window < 1:
+        raise HTTPException(status_code=400, detail="window 必须为正数")
+    wanted = [c.strip() for c in codes.split(",") if c.strip()] if codes else None
+
+    def frames():
+        store = get_population_series()
+        all_codes, matrix = store.matrix(field, window)
+        turns = store.turns(window)
+        if wanted is not None:
+            row_of = {code: row for row, code in enumerate(all_codes)}
+            missing = [code for code in wanted if code not in row_of]
+            if missing:
+                raise KeyError(f"无种群记录: {', '.join(missing)}")
+            matrix = matrix[[row_of[code] for code in wanted]]
+            all_codes = wanted
+        yield encode_frame("turns", turns.astype(np.int32))
+        yield encode_frame("series", matrix.astype(np.float32), codes=all_codes, field=field)
+
+    return _frames_response(request, frames)
 
 
 # ========== 渲染数据 ==========
 
+def _terrain_metrics(container: 'ServiceContainer'):
+    """当前地图的地形指标（按地块写入日志的地图版本缓存，版本未变时不读取地块）"""
+    from ..services.geo.terrain_metrics import get_terrain_metrics_cache
+    
+    env_repo = container.environment_repository
+    map_state = env_repo.get_state()
+    sea_level = map_state.sea_level if map_state else 0.0
+    return get_terrain_metrics_cache().get_for_version(
+        env_repo.tile_changes.version, env_repo.list_tiles, sea_level=sea_level,
+    )
+
+
+def _float32_response(request: Request, container: 'ServiceContainer', metric: str):
+    """按地块 ID 顺序返回指定地形指标的 Float32Array（按世界版本缓存，支持 ETag）"""
+    
+    def build() -> bytes:
+        metrics = _terrain_metrics(container)
+        return metrics.per_tile(metric).tobytes() if metrics else b""
+    
+    return get_response_cache().respond(request, build, media_type=BINARY_MEDIA_TYPE)
+
+
 @router.get("/render/heightmap")
 def get_heightmap(
+    request: Request,
     container: 'ServiceContainer' = Depends(get_container),
 ):
     """获取高度图（二进制 Float32Array）
     
     返回所有地块的高度数据，按地块ID顺序排列
     """
-    import struct
-    from starlette.responses import Response
-    
-    env_repo = container.environment_repository
-    tiles = env_repo.list_tiles()
-    
-    if not tiles:
-        return Response(content=b"", media_type="application/octet-stream")
-    
-    # 按 ID 排序
-    tiles.sort(key=lambda t: t.id)
-    
-    # 打包为 Float32Array
-    data = struct.pack(f"{len(tiles)}f", *[t.elevation for t in tiles])
-    
-    return Response(
-        content=data,
-        media_type="application/octet-stream",
-        headers={"Content-Length": str(len(data))}
-    )
+    return _float32_response(request, container, "elevation")
 
 
 @router.get("/render/watermask")
 def get_watermask(
+    request: Request,
     container: 'ServiceContainer' = Depends(get_container),
 ):
     """获取水域遮罩（二进制 Float32Array）
     
     返回每个地块的水域深度，陆地为0，水域为正值
     """
-    import struct
-    from starlette.responses import Response
-    
-    env_repo = container.environment_repository
-    tiles = env_repo.list_tiles()
-    map_state = env_repo.get_state()
-    sea_level = map_state.sea_level if map_state else 0.0
-    
-    if not tiles:
-        return Response(content=b"", media_type="application/octet-stream")
-    
-    # 按 ID 排序
-    tiles.sort(key=lambda t: t.id)
-    
-    # 计算水深：海平面以下为正值，以上为0
-    water_depths = []
-    for t in tiles:
-        depth = max(0.0, sea_level - t.elevation)
-        water_depths.append(depth)
-    
-    data = struct.pack(f"{len(tiles)}f", *water_depths)
-    
-    return Response(
-        content=data,
-        media_type="application/octet-stream",
-        headers={"Content-Length": str(len(data))}
-    )
+    return _float32_response(request, container, "water_depth")
 
 
 @router.get("/render/erosionmap")
 def get_erosionmap(
+    request: Request,
     container: 'ServiceContainer' = Depends(get_container),
 ):
     """获取侵蚀图（二进制 Float32Array）
     
-    返回每个地块的侵蚀程度（基于相邻高度差计算）
+    返回每个地块的侵蚀程度（与六个邻居的平均高度差，2000m 归一化到 1）
     """
-    import struct
-    from starlette.responses import Response
-    
-    env_repo = container.environment_repository
-    tiles = env_repo.list_tiles()
-    
-    if not tiles:
-        return Response(content=b"", media_type="application/octet-stream")
-    
-    # 按 ID 排序并建立索引
-    tiles.sort(key=lambda t: t.id)
-    tile_map = {t.id: t for t in tiles}
-    
-    # 计算侵蚀值（基于与邻居的高度差）
-    erosion_values = []
-    for t in tiles:
-        if not t.neighbors:
-            erosion_values.append(0.0)
-            continue
-        
-        # 计算与所有邻居的平均高度差
-        height_diffs = []
-        for neighbor_id in t.neighbors:
-            neighbor = tile_map.get(neighbor_id)
-            if neighbor:
-                height_diffs.append(abs(t.elevation - neighbor.elevation))
-        
-        if height_diffs:
-            avg_diff = sum(height_diffs) / len(height_diffs)
-            # 归一化到 0-1 范围（假设最大高度差为 2000m）
-            erosion = min(1.0, avg_diff / 2000.0)
-        else:
-            erosion = 0.0
-        
-        erosion_values.append(erosion)
+    return _float32_response(request, container, "erosion")
+
+
+@router.get("/render/terrain/{metric}")
+def get_terrain_metric_map(
+    metric: str,
+    request: Request,
+    container: 'ServiceContainer' = Depends(get_container),
+):
+    """获取任意地形指标（二进制 Float32Array，按地块ID顺序）
     
-    data = struct.pack(f"{len(tiles)}f", *erosion_values)
+    metric: elevation / water_depth / slope / relief / erosion / curvature / coast_distance
+    """
+    from ..services.geo.terrain_metrics import TERRAIN_METRIC_NAMES
     
-    return Response(
-        content=data,
-        media_type="application/octet-stream",
-        headers={"Content-Length": str(len(data))}
-    )
+    if metric not in TERRAIN_METRIC_NAMES:
+        raise HTTPException(status_code=404, detail=f"未知地形指标: {metric}")
+    return _float32_response(request, container, metric)
 
@@ -13,13 +13,14 @@ from __future__ import annotations
 import logging
 from typing import TYPE_CHECKING
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 
 from ..schemas.responses import (
     EcosystemHealthResponse,
     ExtinctionRiskItem,
     TrophicDistributionItem,
 )
+from ..core.response_cache import get_response_cache
 from .dependencies import get_container, get_species_repository
 
 if TYPE_CHECKING:
@@ -34,145 +35,160 @@ router = APIRouter(prefix="", tags=["ecosystem"])
 
 @router.get("/ecosystem/health", response_model=EcosystemHealthResponse, tags=["ecosystem"])
 def get_ecosystem_health(
+    request: Request,
     container: 'ServiceContainer' = Depends(get_container),
-) -> EcosystemHealthResponse:
-    """获取生态系统健康报告"""
-    from ..services.analytics.ecosystem_health import EcosystemHealthService
-    
-    species_repo = container.species_repository
-    all_species = species_repo.list_species()
-    
-    health_service = EcosystemHealthService()
-    report = health_service.analyze(all_species)
+):
+    """获取生态系统健康报告（按世界版本缓存，支持 ETag）"""
     
-    return EcosystemHealthResponse(
-        overall_health=report.get("overall_health", 0.5),
-        biodiversity_index=report.get("biodiversity_index", 0.0),
-        food_web_stability=report.get("food_web_stability", 0.5),
-        trophic_balance=report.get("trophic_balance", 0.5),
-        population_stability=report.get("population_stability", 0.5),
-        extinction_risk=report.get("extinction_risk", 0.0),
-        trophic_distribution=[
-            TrophicDistributionItem(**item)
-            for item in report.get("trophic_distribution", [])
-        ],
-        at_risk_species=[
-            ExtinctionRiskItem(**item)
-            for item in report.get("at_risk_species", [])
-        ],
-        recommendations=report.get("recommendations", []),
-    )
+    def build():
+        from ..services.analytics.ecosystem_health import EcosystemHealthService
+        
+        species_repo = container.species_repository
+        all_species = species_repo.list_species()
+        
+        health_service = EcosystemHealthService()
+        report = health_service.analyze(all_species)
+        
+        return EcosystemHealthResponse(
+            overall_health=report.get("overall_health", 0.5),
+            biodiversity_index=report.get("biodiversity_index", 0.0),
+            food_web_stability=report.get("food_web_stability", 0.5),
+            trophic_balance=report.get("trophic_balance", 0.5),
+            population_stability=report.get("population_stability", 0.5),
+            extinction_risk=report.get("extinction_risk", 0.0),
+            trophic_distribution=[
+                TrophicDistributionItem(**item)
+                for item in report.get("trophic_distribution", [])
+            ],
+            at_risk_species=[
+                ExtinctionRiskItem(**item)
+                for item in report.get("at_risk_species", [])
+            ],
+            recommendations=report.get("recommendations", []),
+        )
+    
+    return get_response_cache().respond(request, build)
 
 
 # ========== 食物网 ==========
 
 @router.get("/ecosystem/food-web", tags=["ecosystem"])
 def get_food_web(
+    request: Request,
     max_nodes: int = Query(500, ge=1, le=1000, description="最大节点数"),
     include_extinct: bool = Query(False, description="是否包含已灭绝物种"),
     container: 'ServiceContainer' = Depends(get_container),
 ):
-    """获取食物网数据"""
-    species_repo = container.species_repository
-    all_species = species_repo.list_species()
-    
-    if not include_extinct:
-        all_species = [sp for sp in all_species if sp.status == "alive"]
-    
-    if len(all_species) > max_nodes:
-        # 按种群数量排序，保留最大的
-        all_species = sorted(
-            all_species,
-            key=lambda sp: sp.morphology_stats.get("population", 0) or 0,
-            reverse=True
-        )[:max_nodes]
-    
-    # 构建物种映射
-    species_map = {sp.lineage_code: sp for sp in all_species}
-    alive_codes = set(species_map.keys())
+    """获取食物网数据（按世界版本缓存，支持 ETag）"""
     
-    # 构建节点列表
-    nodes = []
-    prey_counts = {}  # 统计每个物种被多少物种捕食
-    
-    for sp in all_species:
-        prey_codes = sp.prey_species or []
-        valid_prey = [c for c in prey_codes if c in alive_codes]
+    def build():
+        species_repo = container.species_repository
+        all_species = species_repo.list_species()
         
-        # 统计捕食者数量
-        for prey_code in valid_prey:
-            prey_counts[prey_code] = prey_counts.get(prey_code, 0) + 1
-    
-    for sp in all_species:
-        nodes.append({
-            "id": sp.lineage_code,
-            "name": sp.common_name,
-            "trophic_level": sp.trophic_level or 1.0,
-            "population": int(sp.morphology_stats.get("population", 0) or 0),
-            "diet_type": getattr(sp, 'diet_type', '') or '',
-            "habitat_type": getattr(sp, 'habitat_type', '') or '',
-            "prey_count": len([c for c in (sp.prey_species or []) if c in alive_codes]),
-            "predator_count": prey_counts.get(sp.lineage_code, 0),
-        })
-    
-    # 构建链接列表
-    links = []
-    for sp in all_species:
-        prey_codes = sp.prey_species or []
-        prey_prefs = sp.prey_preferences or {}
+        if not include_extinct:
+            all_species = [sp for sp in all_species if sp.status == "alive"]
         
-        for prey_code in prey_codes:
-            if prey_code in alive_codes:
-                prey_sp = species_map[prey_code]
-                links.append({
-                    "source": prey_code,  # 猎物
-                    "target": sp.lineage_code,  # 捕食者
-                    "value": prey_prefs.get(prey_code, 1.0 / max(len(prey_codes), 1)),
-                    "predator_name": sp.common_name,
-                    "prey_name": prey_sp.common_name,
-                })
-    
-    # 识别关键物种（被3+物种依赖）
-    keystone_species = [code for code, count in prey_counts.items() if count >= 3]
-    
-    # 按营养级分组
-    trophic_levels = {}
-    for sp in all_species:
-        level = int(sp.trophic_level or 1)
-        if level not in trophic_levels:
-            trophic_levels[level] = []
-        trophic_levels[level].append(sp.lineage_code)
-    
-    return {
-        "nodes": nodes,
-        "links": links,
-        "keystone_species": keystone_species,
-        "trophic_levels": trophic_levels,
-        "total_species": len(nodes),
-        "total_links": len(links),
-    }
+        if len(all_species) > max_nodes:
+            # 按种群数量排序，保留最大的
+            all_species = sorted(
+                all_species,
+                key=lambda sp: sp.morphology_stats.get("population", 0) or 0,
+                reverse=True
+            )[:max_nodes]
+        
+        # 构建物种映射
+        species_map = {sp.lineage_code: sp for sp in all_species}
+        alive_codes = set(species_map.keys())
+        
+        # 构建节点列表
+        nodes = []
+        prey_counts = {}  # 统计每个物种被多少物种捕食
+        
+        for sp in all_species:
+            prey_codes = sp.prey_species or []
+            valid_prey = [c for c in prey_codes if c in alive_codes]
+            
+            # 统计捕食者数量
+            for prey_code in valid_prey:
+                prey_counts[prey_code] = prey_counts.get(prey_code, 0) + 1
+        
+        for sp in all_species:
+            nodes.append({
+                "id": sp.lineage_code,
+                "name": sp.common_name,
+                "trophic_level": sp.trophic_level or 1.0,
+                "population": int(sp.morphology_stats.get("population", 0) or 0),
+                "diet_type": getattr(sp, 'diet_type', '') or '',
+                "habitat_type": getattr(sp, 'habitat_type', '') or '',
+                "prey_count": len([c for c in (sp.prey_species or []) if c in alive_codes]),
+                "predator_count": prey_counts.get(sp.lineage_code, 0),
+            })
+        
+        # 构建链接列表
+        links = []
+        for sp in all_species:
+            prey_codes = sp.prey_species or []
+            prey_prefs = sp.prey_preferences or {}
+            
+            for prey_code in prey_codes:
+                if prey_code in alive_codes:
+                    prey_sp = species_map[prey_code]
+                    links.append({
+                        "source": prey_code,  # 猎物
+                        "target": sp.lineage_code,  # 捕食者
+                        "value": prey_prefs.get(prey_code, 1.0 / max(len(prey_codes), 1)),
+                        "predator_name": sp.common_name,
+                        "prey_name": prey_sp.common_name,
+                    })
+        
+        # 识别关键物种（被3+物种依赖）
+        keystone_species = [code for code, count in prey_counts.items() if count >= 3]
+        
+        # 按营养级分组
+        trophic_levels = {}
+        for sp in all_species:
+            level = int(sp.trophic_level or 1)
+            if level not in trophic_levels:
+                trophic_levels[level] = []
+            trophic_levels[level].append(sp.lineage_code)
+        
+        return {
+            "nodes": nodes,
+            "links": links,
+            "keystone_species": keystone_species,
+            "trophic_levels": trophic_levels,
+            "total_species": len(nodes),
+            "total_links": len(links),
+        }
+    
+    return get_response_cache().respond(request, build)
 
 
 @router.get("/ecosystem/food-web/summary", tags=["ecosystem"])
 def get_food_web_summary(
+    request: Request,
     container: 'ServiceContainer' = Depends(get_container),
 ):
-    """获取食物网简版摘要（用于仪表盘）"""
-    from ..services.species.food_web_manager import FoodWebManager
+    """获取食物网简版摘要（用于仪表盘）（按世界版本缓存，支持 ETag）"""
     
-    species_repo = container.species_repository
-    all_species = [sp for sp in species_repo.list_species() if sp.status == "alive"]
-    
-    food_web_manager = FoodWebManager()
-    analysis = food_web_manager.analyze_food_web(all_species)
-    
-    return {
-        "total_species": analysis.total_species,
-        "total_links": analysis.total_links,
-        "health_score": analysis.health_score,
-        "keystone_count": len(analysis.keystone_species),
-        "warnings_count": len(analysis.bottleneck_warnings),
-    }
+    def build():
+        from ..services.species.food_web_manager import FoodWebManager
+        
+        species_repo = container.species_repository
+        all_species = [sp for sp in species_repo.list_species() if sp.status == "alive"]
+        
+        food_web_manager = FoodWebManager()
+        analysis = food_web_manager.analyze_food_web(all_species)
+        
+        return {
+            "total_species": analysis.total_species,
+            "total_links": analysis.total_links,
+            "health_score": analysis.health_score,
+            "keystone_count": len(analysis.keystone_species),
+            "warnings_count": len(analysis.bottleneck_warnings),
+        }
+    
+    return get_response_cache().respond(request, build)
 
 
 @router.get("/ecosystem/food-web/cache-stats", tags=["ecosystem"])
@@ -189,30 +205,35 @@ def get_food_web_cache_stats(
 
 @router.get("/ecosystem/food-web/analysis", tags=["ecosystem"])
 def get_food_web_analysis(
+    request: Request,
     container: 'ServiceContainer' = Depends(get_container),
 ):
-    """获取食物网分析报告"""
-    from ..services.species.food_web_manager import FoodWebManager
-    
-    species_repo = container.species_repository
-    all_species = [sp for sp in species_repo.list_species() if sp.status == "alive"]
-    
-    food_web_manager = FoodWebManager()
-    analysis = food_web_manager.analyze_food_web(all_species)
+    """获取食物网分析报告（按世界版本缓存，支持 ETag）"""
     
-    # 转换为字典格式返回
-    return {
-        "total_species": analysis.total_species,
-        "total_links": analysis.total_links,
-        "orphaned_consumers": analysis.orphaned_consumers,
-        "starving_species": analysis.starving_species,
-        "keystone_species": analysis.keystone_species,
-        "isolated_species": analysis.isolated_species,
-        "avg_prey_per_consumer": analysis.avg_prey_per_consumer,
-        "food_web_density": analysis.food_web_density,
-        "bottleneck_warnings": analysis.bottleneck_warnings,
-        "health_score": analysis.health_score,
-    }
+    def build():
+        from ..services.species.food_web_manager import FoodWebManager
+        
+        species_repo = container.species_repository
+        all_species = [sp for sp in species_repo.list_species() if sp.status == "alive"]
+        
+        food_web_manager = FoodWebManager()
+        analysis = food_web_manager.analyze_food_web(all_species)
+        
+        # 转换为字典格式返回
+        return {
+            "total_species": analysis.total_species,
+            "total_links": analysis.total_links,
+            "orphaned_consumers": analysis.orphaned_consumers,
+            "starving_species": analysis.starving_species,
+            "keystone_species": analysis.keystone_species,
+            "isolated_species": analysis.isolated_species,
+            "avg_prey_per_consumer": analysis.avg_prey_per_consumer,
+            "food_web_density": analysis.food_web_density,
+            "bottleneck_warnings": analysis.bottleneck_warnings,
+            "health_score": analysis.health_score,
+        }
+    
+    return get_response_cache().respond(request, build)
 
 
 @router.post("/ecosystem/food-web/repair", tags=["ecosystem"])
@@ -14,6 +14,7 @@ from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from pydantic import BaseModel, Field
 
+from ..core.response_cache import get_response_cache
 from .dependencies import get_container
 
 logger = logging.getLogger(__name__)
@@ -522,93 +523,104 @@ async def get_species_hints(request: HintsRequest, container = Depends(get_conta
 # ==================== 统计 API ====================
 
 @router.get("/stats", response_model=EmbeddingStatsResponse)
-async def get_embedding_stats(container = Depends(get_container)) -> EmbeddingStatsResponse:
-    """获取 Embedding 系统统计信息"""
-    try:
-        embedding_service = container.embedding_service
-        
-        cache_stats = {}
-        if embedding_service:
-            cache_stats = embedding_service.get_cache_stats()
-        
-        services = _get_services_from_container(container)
-        encyclopedia = services.get("encyclopedia")
-        
-        index_stats = {}
-        if encyclopedia:
-            index_stats = encyclopedia.get_index_stats()
-        
-        return EmbeddingStatsResponse(
-            cache_stats=cache_stats,
-            index_stats=index_stats
-        )
-    except Exception as e:
-        logger.error(f"获取统计失败: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+async def get_embedding_stats(request: Request, container = Depends(get_container)):
+    """获取 Embedding 系统统计信息（按世界版本缓存，支持 ETag）"""
+    
+    def build() -> EmbeddingStatsResponse:
+        try:
+            embedding_service = container.embedding_service
+            
+            cache_stats = {}
+            if embedding_service:
+                cache_stats = embedding_service.get_cache_stats()
+            
+            services = _get_services_from_container(container)
+            encyclopedia = services.get("encyclopedia")
+            
+            index_stats = {}
+            if encyclopedia:
+                index_stats = encyclopedia.get_index_stats()
+            
+            return EmbeddingStatsResponse(
+                cache_stats=cache_stats,
+                index_stats=index_stats
+            )
+        except Exception as e:
+            logger.error(f"获取统计失败: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+    
+    return get_response_cache().respond(request, build)
 
 
 # ==================== 叙事 API ====================
 
 @router.get("/narrative/turn/{turn_index}")
-async def get_turn_narrative(turn_index: int, container = Depends(get_container)) -> dict[str, Any]:
-    """获取指定回合的叙事"""
+async def get_turn_narrative(turn_index: int, request: Request, container = Depends(get_container)):
+    """获取指定回合的叙事（按世界版本缓存，支持 ETag）"""
     services = _get_services_from_container(container)
     narrative = services.get("narrative")
     
     if not narrative:
         raise HTTPException(status_code=503, detail="叙事服务不可用")
     
-    try:
-        result = await narrative.generate_turn_narrative(turn_index)
-        
-        return {
-            "success": True,
-            "turn_index": turn_index,
-            "narrative": result.narrative,
-            "key_events": [
-                {"title": e.title, "description": e.description}
-                for e in result.key_events
-            ],
-            "related_species": result.related_species,
-            "novelty_info": result.novelty_info
-        }
-    except Exception as e:
-        logger.error(f"生成叙事失败: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    async def build() -> dict[str, Any]:
+        try:
+            result = await narrative.generate_turn_narrative(turn_index)
+            
+            return {
+                "success": True,
+                "turn_index": turn_index,
+                "narrative": result.narrative,
+                "key_events": [
+                    {"title": e.title, "description": e.description}
+                    for e in result.key_events
+                ],
+                "related_species": result.related_species,
+                "novelty_info": result.novelty_info
+            }
+        except Exception as e:
+            logger.error(f"生成叙事失败: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+    
+    return await get_response_cache().respond_async(request, build)
 
 
 @router.get("/narrative/eras")
 async def get_evolution_eras(
+    request: Request,
     start_turn: int = Query(0, description="开始回合"),
     end_turn: int | None = Query(None, description="结束回合"),
     container = Depends(get_container)
-) -> dict[str, Any]:
-    """获取演化时代划分"""
+):
+    """获取演化时代划分（按世界版本缓存，支持 ETag）"""
     services = _get_services_from_container(container)
     narrative = services.get("narrative")
     
     if not narrative:
         raise HTTPException(status_code=503, detail="叙事服务不可用")
     
-    try:
-        eras = narrative.identify_eras(start_turn, end_turn)
-        
-        return {
-            "success": True,
-            "eras": [
-                {
-                    "name": era.name,
-                    "start_turn": era.start_turn,
-                    "end_turn": era.end_turn,
-                    "event_count": len(era.key_events),
-                    "summary": era.summary
-                }
-                for era in eras
-            ]
-        }
-    except Exception as e:
-        logger.error(f"获取时代失败: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    def build() -> dict[str, Any]:
+        try:
+            eras = narrative.identify_eras(start_turn, end_turn)
+            
+            return {
+                "success": True,
+                "eras": [
+                    {
+                        "name": era.name,
+                        "start_turn": era.start_turn,
+                        "end_turn": era.end_turn,
+                        "event_count": len(era.key_events),
+                        "summary": era.summary
+                    }
+                    for era in eras
+                ]
+            }
+        except Exception as e:
+            logger.error(f"获取时代失败: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+    
+    return get_response_cache().respond(request, build)
 
 
 @router.get("/narrative/species/{species_code}/biography")
@@ -738,8 +750,8 @@ def _check_index_not_empty(plugin, plugin_name: str):
 
 
 @router.get("/plugins/status")
-async def get_plugins_status() -> dict[str, Any]:
-    """获取所有插件状态"""
+async def get_plugins_status(request: Request):
+    """获取所有插件状态（按世界版本缓存，支持 ETag）"""
     manager = _get_plugin_manager()
     if not manager:
         return {
@@ -749,11 +761,11 @@ async def get_plugins_status() -> dict[str, Any]:
             "plugins": []
         }
     
-    return {
+    return get_response_cache().respond(request, lambda: {
         "success": True,
         "plugins": manager.list_plugins(),
         "stats": manager.get_all_stats(),
-    }
+    })
 
 
 # ==================== 行为策略插件 API ====================
@@ -138,6 +138,7 @@ from ..services.species.species_generator import SpeciesGenerator
 from ..services.analytics.ecosystem_health import EcosystemHealthService
 from ..services.species.predation import PredationService
 from ..services.analytics.embedding_integration import EmbeddingIntegrationService
+from ..services.analytics.population_series import get_population_series
 from ..simulation.engine import SimulationEngine
 from ..simulation.environment import EnvironmentSystem
 from ..simulation.species import MortalityEngine
@@ -205,6 +206,11 @@ model_router = ModelRouter(
             extra_body={"response_format": {"type": "json_object"}}
         ),
         "critical_detail": ModelConfig(provider="local", model="critical-template"),
+        "critical_detail_batch": ModelConfig(
+            provider="local",
+            model="critical-template",
+            extra_body={"response_format": {"type": "json_object"}}
+        ),
         
         # ========== 物种分化能力（需要 LLM）==========
         "speciation": ModelConfig(
@@ -279,8 +285,10 @@ tiering_service = SpeciesTieringService(
         background_threshold=settings.background_population_threshold,
     )
 )
-focus_processor = FocusBatchProcessor(model_router, settings.focus_batch_size)
-critical_analyzer = CriticalAnalyzer(model_router)
+focus_processor = FocusBatchProcessor(
+    model_router, settings.focus_batch_size, token_budget=settings.narrative_batch_token_budget
+)
+critical_analyzer = CriticalAnalyzer(model_router, token_budget=settings.narrative_batch_token_budget)
 pressure_escalation = PressureEscalationService(
     window=settings.minor_pressure_window,
     threshold=settings.escalation_threshold,
@@ -928,9 +936,7 @@ def get_lineage_tree(
     # 只在需要时加载遗传距离数据
     genus_distances = {}
     if include_genetic_distances:
-        all_genera = genus_repository.list_all()
-        for genus in all_genera:
-            genus_distances[genus.code] = genus.genetic_distances
+        genus_distances = genus_repository.get_distance_matrices()
     
     # 计算后代数量（内存计算，O(N)）
     descendant_map: dict[str, int] = {}
@@ -962,11 +968,7 @@ def get_lineage_tree(
         # 遗传距离（按需加载）
         genetic_distances_to_siblings = {}
         if include_genetic_distances and species.genus_code and species.genus_code in genus_distances:
-            for key, distance in genus_distances[species.genus_code].items():
-                if species.lineage_code in key:
-                    other_code = key.replace(f"{species.lineage_code}-", "").replace(f"-{species.lineage_code}", "")
-                    if other_code != species.lineage_code:
-                        genetic_distances_to_siblings[other_code] = distance
+            genetic_distances_to_siblings = genus_distances[species.genus_code].siblings(species.lineage_code)
         
         # 获取营养级
         trophic_level = getattr(species, 'trophic_level', 1.0)
@@ -1199,6 +1201,7 @@ async def create_save(request: CreateSaveRequest) -> dict:
         divine_progression_service.reset()
         achievement_service.reset()
         game_hints_service.clear_cooldown()
+        get_population_series().clear()
         logger.debug(f"[存档API] 游戏服务状态已重置")
         
         # 设置当前存档名称（用于自动保存）
@@ -1211,7 +1214,7 @@ async def create_save(request: CreateSaveRequest) -> dict:
         from ..core.database import session_scope
         from ..models.species import Species
         from ..models.environment import MapTile, MapState, HabitatPopulation
-        from ..models.history import TurnLog
+        from ..models.history import TurnLog, TurnPayload, TurnSpeciesStat
         from ..models.genus import Genus
         
         with session_scope() as session:
@@ -1226,8 +1229,9 @@ async def create_save(request: CreateSaveRequest) -> dict:
             for hab in session.exec(select(HabitatPopulation)).all():
                 session.delete(hab)
             # 删除历史记录
-            for log in session.exec(select(TurnLog)).all():
-                session.delete(log)
+            for model in (TurnSpeciesStat, TurnPayload, TurnLog):
+                for row in session.exec(select(model)).all():
+                    session.delete(row)
             # 删除所有属数据
             for genus in session.exec(select(Genus)).all():
                 session.delete(genus)
@@ -307,9 +307,6 @@ async def run_turns(
         
         session.set_running(True)
         
-        # 清空事件队列中的旧事件
-        session.get_pending_events(max_count=9999)
-        
         session.push_event("start", f"开始推演 {command.rounds} 回合", "系统")
         
         # 处理压力队列
@@ -432,6 +429,67 @@ def list_history(
     return [TurnReport.model_validate(log.record_data) for log in logs]
 
 
+def _split_csv(value: str | None) -> list[str] | None:
+    return [v.strip() for v in value.split(",") if v.strip()] if value else None
+
+
+@router.get("/history/turns")
+def query_history_turns(
+    start: int | None = None,
+    end: int | None = None,
+    fields: str | None = None,
+    limit: int | None = Query(default=None, ge=1),
+    history_repo = Depends(get_history_repository),
+) -> dict:
+    """按回合区间查询回合摘要列（不加载叙事与完整报告）
+
+    Args:
+        start / end: 回合区间（闭区间，可省略）
+        fields: 逗号分隔的摘要列，如 species_count,total_population（默认全部）
+    """
+    try:
+        turns = history_repo.query_turns(start, end, _split_csv(fields), limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"turns": turns}
+
+
+@router.get("/history/species")
+def query_history_species(
+    codes: str,
+    start: int | None = None,
+    end: int | None = None,
+    fields: str = "population",
+    history_repo = Depends(get_history_repository),
+) -> dict:
+    """物种在回合区间内的统计序列，如"物种 X 在第 200–800 回合的种群"
+
+    Args:
+        codes: 逗号分隔的谱系代码
+        fields: 逗号分隔的统计列（population / deaths / births / death_rate / ...）
+    """
+    lineage_codes = _split_csv(codes)
+    if not lineage_codes:
+        raise HTTPException(status_code=400, detail="codes 不能为空")
+    try:
+        series = history_repo.species_series(lineage_codes, start, end, _split_csv(fields) or ["population"])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"series": series}
+
+
+@router.get("/history/{turn_index}/report", response_model=TurnReport)
+def get_history_report(
+    turn_index: int,
+    history_repo = Depends(get_history_repository),
+) -> TurnReport:
+    """单个回合的完整报告（按需解压）"""
+    record = history_repo.get_report(turn_index)
+    if not record:
+        raise HTTPException(status_code=404, detail=f"回合 {turn_index} 没有历史记录")
+    return TurnReport.model_validate(record)
+
+
 @router.get("/saves/list")
 def list_saves(container: 'ServiceContainer' = Depends(get_container)) -> list[dict]:
     """列出所有存档"""
@@ -457,6 +515,7 @@ async def create_save(
     from ..services.system.divine_energy import energy_service
     from ..services.system.divine_progression import divine_progression_service
     from ..services.analytics.achievements import achievement_service
+    from ..services.analytics.population_series import get_population_series
     from ..services.analytics.game_hints import game_hints_service
     from ..services.analytics.embedding_integration import EmbeddingIntegrationService
     from ..services.species.habitat_manager import habitat_manager
@@ -464,7 +523,7 @@ async def create_save(
     from ..core.database import session_scope
     from ..models.species import Species, PopulationSnapshot
     from ..models.environment import MapTile, MapState, HabitatPopulation
-    from ..models.history import TurnLog
+    from ..models.history import TurnLog, TurnPayload, TurnSpeciesStat
     from ..models.genus import Genus
     
     try:
@@ -483,10 +542,12 @@ async def create_save(
         # 繁荣生态剧本从150回合开始，其他剧本从0开始
         initial_turn = 150 if request.scenario == "繁荣生态" else 0
         engine.turn_counter = initial_turn
+        engine.tensor_state_manager.reset()
         energy_service.reset()
         divine_progression_service.reset()
         achievement_service.reset()
         game_hints_service.clear_cooldown()
+        get_population_series().clear()
         
         session.set_save_name(request.save_name)
         session.reset_autosave_counter()
@@ -502,8 +563,9 @@ async def create_save(
                 db_session.delete(state)
             for hab in db_session.exec(select(HabitatPopulation)).all():
                 db_session.delete(hab)
-            for log in db_session.exec(select(TurnLog)).all():
-                db_session.delete(log)
+            for model in (TurnSpeciesStat, TurnPayload, TurnLog):
+                for row in db_session.exec(select(model)).all():
+                    db_session.delete(row)
             for genus in db_session.exec(select(Genus)).all():
                 db_session.delete(genus)
         
@@ -747,6 +809,7 @@ async def load_game(
         
         # 恢复回合计数器
         engine.turn_counter = result.get("turn_index", 0)
+        engine.tensor_state_manager.reset()
         
         # 设置会话状态
         session.set_save_name(request.save_name)
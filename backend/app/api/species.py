@@ -41,6 +41,7 @@ from ..schemas.responses import (
     SpeciesList,
     SpeciesListItem,
 )
+from ..core.response_cache import get_response_cache
 from .dependencies import (
     get_container,
     get_embedding_service,
@@ -139,10 +140,11 @@ def _infer_ecological_role(species) -> str:
         return "carnivore"
 
 
-def _build_lineage_tree(all_species: list) -> LineageTree:
+def _build_lineage_tree(all_species: list, genus_matrices: dict | None = None) -> LineageTree:
     """构建系谱树
     
     返回的 LineageNode 需要包含前端期望的所有字段
+    genus_matrices: 属编码 → 遗传距离矩阵；提供时填充每个物种与同属物种的距离
     """
     
     # 预计算每个物种的后代数量
@@ -196,7 +198,11 @@ def _build_lineage_tree(all_species: list) -> LineageTree:
             genus_code=sp.genus_code or "",
             hybrid_parent_codes=sp.hybrid_parent_codes or [],
             hybrid_fertility=sp.hybrid_fertility or 1.0,
-            genetic_distances={},  # 按需计算
+            genetic_distances=(
+                genus_matrices[sp.genus_code].siblings(sp.lineage_code)
+                if genus_matrices and sp.genus_code in genus_matrices
+                else {}
+            ),
         ))
     
     return LineageTree(
@@ -205,16 +211,8 @@ def _build_lineage_tree(all_species: list) -> LineageTree:
     )
 
 
-# ========== 路由端点 ==========
-
-@router.get("/species/list")
-def list_all_species(
-    species_repo = Depends(get_species_repository)
-) -> dict:
-    """获取所有物种的简要列表
-    
-    返回格式兼容前端 {species: [...], total, alive}
-    """
+def _build_species_list(species_repo) -> dict:
+    """物种简要列表（兼容前端 {species: [...], total, alive}）"""
     all_species = species_repo.list_species()
     items = [
         {
@@ -237,6 +235,20 @@ def list_all_species(
     }
 
 
+# ========== 路由端点 ==========
+
+@router.get("/species/list")
+def list_all_species(
+    request: Request,
+    species_repo = Depends(get_species_repository)
+):
+    """获取所有物种的简要列表（按世界版本缓存，支持 ETag）
+    
+    返回格式兼容前端 {species: [...], total, alive}
+    """
+    return get_response_cache().respond(request, lambda: _build_species_list(species_repo))
+
+
 @router.get("/species/{lineage_code}", response_model=SpeciesDetail)
 def get_species_detail(
     lineage_code: str,
@@ -305,11 +317,18 @@ def update_watchlist(
 @router.get("/lineage")
 def get_lineage_tree(
     request: Request,
+    include_genetic_distances: bool = Query(False, description="是否附带同属遗传距离"),
     species_repo = Depends(get_species_repository),
+    genus_repo = Depends(get_genus_repository),
 ) -> LineageTree:
-    """获取完整系谱树"""
-    all_species = species_repo.list_species()
-    return _build_lineage_tree(all_species)
+    """获取完整系谱树（按世界版本缓存，支持 ETag）"""
+    
+    def build() -> LineageTree:
+        all_species = species_repo.list_species()
+        genus_matrices = genus_repo.get_distance_matrices() if include_genetic_distances else None
+        return _build_lineage_tree(all_species, genus_matrices)
+    
+    return get_response_cache().respond(request, build)
 
 
 @router.post("/species/generate", response_model=SpeciesDetail)
@@ -0,0 +1,58 @@
+"""
+重置世界测试
+
+验证重置后回合历史的摘要、载荷与物种统计一并清空，不会读到上一个世界的报告。
+"""
+
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from ...models import environment, genus, history, species  # noqa: F401
+from ...models.history import TurnLog, TurnPayload, TurnSpeciesStat
+from ...repositories import history_repository as history_module
+from ...repositories.history_repository import HistoryRepository
+from .. import admin_routes
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{(tmp_path / 'world.db').as_posix()}")
+    SQLModel.metadata.create_all(engine)
+
+    @contextmanager
+    def scope():
+        session = Session(engine, expire_on_commit=False)
+        try:
+            yield session
+            session.commit()
+        finally:
+            session.close()
+
+    for module in (admin_routes, history_module):
+        monkeypatch.setattr(module, "session_scope", scope)
+    monkeypatch.setattr(history_module, "read_session_scope", scope)
+    dirs = SimpleNamespace(**{
+        name: str(tmp_path / name) for name in ("saves_dir", "exports_dir", "reports_dir")
+    })
+    monkeypatch.setattr(admin_routes, "get_settings", lambda: dirs)
+    return engine
+
+
+def test_reset_clears_payloads_and_species_stats(engine):
+    repo = HistoryRepository()
+    repo.log_turn(TurnLog(
+        turn_index=0, pressures_summary="旧世界", narrative="旧叙事",
+        record_data={"turn_index": 0, "species": [{"lineage_code": "A1", "population": 10}]},
+    ))
+    assert repo.get_report(0) is not None
+
+    admin_routes.reset_world(admin_routes.ResetRequest(keep_saves=True, keep_map=True))
+
+    assert repo.get_report(0) is None
+    assert repo.list_turns() == []
+    with Session(engine) as session:
+        for table in (TurnLog, TurnPayload, TurnSpeciesStat):
+            assert session.exec(select(table)).all() == []
@@ -0,0 +1,129 @@
+"""
+事件总线测试 - 多订阅者广播、丢弃策略、心跳合并与断线续传
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from ...core.event_bus import EventBus
+
+
+def _event(event_type: str, message: str = "") -> dict:
+    return {"type": event_type, "message": message}
+
+
+class TestEventBus:
+    """EventBus 同步行为"""
+
+    def test_each_subscriber_receives_every_event(self):
+        bus = EventBus()
+        tab_a = bus.subscribe(bind_loop=False)
+        tab_b = bus.subscribe(bind_loop=False)
+
+        for i in range(3):
+            bus.publish(_event("info", str(i)))
+
+        assert [e["message"] for e in tab_a.drain()] == ["0", "1", "2"]
+        assert [e["message"] for e in tab_b.drain()] == ["0", "1", "2"]
+        assert [e["seq"] for e in tab_b.drain()] == []
+
+    def test_full_buffer_drops_oldest_and_reports(self):
+        bus = EventBus(subscriber_capacity=2)
+        sub = bus.subscribe(bind_loop=False)
+
+        for i in range(5):
+            bus.publish(_event("info", str(i)))
+
+        events = sub.drain()
+        assert events[0]["type"] == "events_dropped"
+        assert events[0]["count"] == 3
+        assert [e["message"] for e in events[1:]] == ["3", "4"]
+
+    def test_heartbeats_coalesce_to_latest(self):
+        bus = EventBus()
+        sub = bus.subscribe(bind_loop=False)
+
+        bus.publish(_event("info", "start"))
+        for i in range(10):
+            bus.publish(_event("ai_parallel_heartbeat", f"{i}/10"))
+        bus.publish(_event("info", "end"))
+
+        events = sub.drain()
+        assert [e["message"] for e in events] == ["start", "9/10", "end"]
+        assert sub.coalesced == 9
+
+    def test_resume_from_last_event_id(self):
+        bus = EventBus()
+        seqs = [bus.publish(_event("info", str(i))) for i in range(5)]
+
+        sub = bus.subscribe(last_event_id=str(seqs[2]), bind_loop=False)
+        assert [e["message"] for e in sub.drain()] == ["3", "4"]
+
+    def test_resume_beyond_history_reports_gap(self):
+        bus = EventBus(history_size=2)
+        for i in range(5):
+            bus.publish(_event("info", str(i)))
+
+        events = bus.subscribe(last_event_id="1", bind_loop=False).drain()
+        assert events[0]["type"] == "events_dropped"
+        assert [e["message"] for e in events[1:]] == ["3", "4"]
+
+    def test_unsubscribe_stops_delivery(self):
+        bus = EventBus()
+        sub = bus.subscribe(bind_loop=False)
+        sub.close()
+        bus.publish(_event("info"))
+        assert sub.drain() == []
+        assert bus.stats()["subscribers"] == []
+
+
+class TestEventBusAsync:
+    """事件驱动唤醒"""
+
+    @pytest.mark.asyncio
+    async def test_get_batch_wakes_on_publish_from_thread(self):
+        bus = EventBus()
+        sub = bus.subscribe()
+
+        timer = threading.Timer(0.05, lambda: bus.publish(_event("speciation", "new")))
+        timer.start()
+        events = await sub.get_batch(timeout=2.0)
+        timer.join()
+
+        assert [e["message"] for e in events] == ["new"]
+
+    @pytest.mark.asyncio
+    async def test_get_batch_times_out_empty(self):
+        sub = EventBus().subscribe()
+        assert await sub.get_batch(timeout=0.01) == []
+
+    @pytest.mark.asyncio
+    async def test_batch_window_groups_burst(self):
+        bus = EventBus()
+        sub = bus.subscribe()
+
+        async def burst():
+            for i in range(5):
+                bus.publish(_event("info", str(i)))
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(burst())
+        events = await sub.get_batch(timeout=1.0, batch_window=0.05)
+        await task
+        assert len(events) == 5
+
+
+def test_session_push_event_uses_bus():
+    from ...core.session import SimulationSessionManager
+
+    session = SimulationSessionManager()
+    sse = session.event_bus.subscribe(bind_loop=False)
+
+    session.push_event("speciation", "新物种", "演化")
+
+    assert session.get_pending_events()[0]["type"] == "species_created"
+    # SSE 订阅者独立于轮询接口
+    assert sse.drain()[0]["message"] == "新物种"
+    assert session.peek_events(1)[0]["seq"] == 1
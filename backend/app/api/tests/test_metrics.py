@@ -0,0 +1,100 @@
+"""
+Metrics 导出测试 - 验证 Prometheus 文本格式与 /metrics 端点
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from ...services.system import metrics_exporter
+from ...services.system.metrics_exporter import (
+    MetricsRegistry,
+    record_llm_request,
+    record_llm_retry,
+    record_turn,
+    reset_metrics_registry,
+)
+from ...simulation.context import SimulationContext
+from ...simulation.pipeline import PipelineMetrics, StageMetrics
+
+
+@pytest.fixture
+def registry():
+    yield reset_metrics_registry()
+    reset_metrics_registry()
+
+
+class TestMetricsRegistry:
+    """指标类型与文本格式"""
+
+    def test_histogram_cumulative_buckets(self):
+        reg = MetricsRegistry(prefix="t")
+        hist = reg.histogram("latency_seconds", "延迟", ("stage",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 3.0):
+            hist.observe(value, stage="A")
+
+        text = reg.render()
+        assert 't_latency_seconds_bucket{stage="A",le="0.1"} 1' in text
+        assert 't_latency_seconds_bucket{stage="A",le="1"} 3' in text
+        assert 't_latency_seconds_bucket{stage="A",le="+Inf"} 4' in text
+        assert 't_latency_seconds_count{stage="A"} 4' in text
+        assert "# TYPE t_latency_seconds histogram" in text
+
+    def test_counter_and_label_escaping(self):
+        reg = MetricsRegistry(prefix="t")
+        reg.counter("errors", "错误", ("msg",)).inc(msg='a"b')
+        assert 't_errors_total{msg="a\\"b"} 1' in reg.render()
+
+    def test_failing_collector_is_isolated(self):
+        reg = MetricsRegistry(prefix="t")
+
+        def broken(_):
+            raise RuntimeError("boom")
+
+        reg.add_collector(broken)
+        reg.add_collector(lambda r: r.gauge("ok", "正常").set(1), key="ok")
+        assert "t_ok 1" in reg.render()
+
+
+class TestRecorders:
+    """推送型记录函数"""
+
+    def test_record_turn(self, registry):
+        metrics = PipelineMetrics(
+            turn_index=3,
+            total_duration_ms=1500.0,
+            stage_metrics=[
+                StageMetrics(stage_name="死亡率", duration_ms=20.0),
+                StageMetrics(stage_name="分化", duration_ms=5.0, success=False),
+            ],
+        )
+        record_turn(metrics, SimulationContext(turn_index=3))
+
+        text = registry.render(collect=False)
+        assert 'clade_stage_duration_seconds_count{stage="死亡率"} 1' in text
+        assert 'clade_stage_failures_total{stage="分化"} 1' in text
+        assert "clade_turn_duration_seconds_sum 1.5" in text
+        assert "clade_turns_total 1" in text
+        assert "clade_turn_index 3" in text
+
+    def test_record_llm(self, registry):
+        record_llm_request("speciation", "openai", 2.5, "success")
+        record_llm_request("speciation", "openai", 60.0, "timeout")
+        record_llm_retry("speciation")
+
+        text = registry.render(collect=False)
+        assert 'clade_llm_request_duration_seconds_count{capability="speciation",provider="openai"} 1' in text
+        assert 'clade_llm_timeouts_total{capability="speciation",provider="openai"} 1' in text
+        assert 'clade_llm_retries_total{capability="speciation"} 1' in text
+
+
+def test_metrics_endpoint(registry):
+    from ...main import app
+
+    record_llm_request("narrative", "local", 0.3, "success")
+    registry.add_collector(metrics_exporter.collect_cache_metrics)
+
+    response = TestClient(app).get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "clade_llm_requests_total" in response.text
+    assert 'clade_cache_entries{cache="food_web"}' in response.text
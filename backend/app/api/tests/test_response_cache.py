@@ -0,0 +1,121 @@
+"""
+响应缓存测试 - 世界版本失效、ETag/304、后台预热与修改型请求推进版本
+"""
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from ...core.response_cache import (
+    BINARY_MEDIA_TYPE,
+    ResponseCache,
+    WorldVersion,
+    get_world_version,
+)
+
+
+def _make_app(cache: ResponseCache, state: dict) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/things")
+    def things(request: Request, limit: int = 10):
+        def build():
+            state["builds"] += 1
+            return {"items": state["items"][:limit]}
+
+        return cache.respond(request, build)
+
+    @app.get("/api/blob")
+    def blob(request: Request):
+        return cache.respond(request, lambda: bytes(state["items"]), media_type=BINARY_MEDIA_TYPE)
+
+    return app
+
+
+class TestResponseCache:
+    """按世界版本缓存"""
+
+    def setup_method(self):
+        self.world = WorldVersion()
+        self.cache = ResponseCache(self.world, prewarm_top=0)
+        self.state = {"builds": 0, "items": [1, 2, 3]}
+        self.client = TestClient(_make_app(self.cache, self.state))
+
+    def test_reuses_response_until_world_changes(self):
+        first = self.client.get("/api/things")
+        second = self.client.get("/api/things")
+        assert first.json() == {"items": [1, 2, 3]}
+        assert second.content == first.content
+        assert self.state["builds"] == 1
+
+        # 不同参数是不同的条目
+        assert self.client.get("/api/things", params={"limit": 1}).json() == {"items": [1]}
+        assert self.state["builds"] == 2
+
+        self.state["items"].append(4)
+        self.world.bump("turn")
+        assert self.client.get("/api/things").json() == {"items": [1, 2, 3, 4]}
+        assert self.state["builds"] == 3
+
+    def test_etag_and_not_modified(self):
+        first = self.client.get("/api/things")
+        etag = first.headers["etag"]
+
+        cached = self.client.get("/api/things", headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.content == b""
+
+        # 版本变化但内容相同：ETag 不变，仍然 304
+        self.world.bump("unrelated")
+        assert self.client.get("/api/things", headers={"If-None-Match": etag}).status_code == 304
+
+        self.state["items"].append(4)
+        self.world.bump("turn")
+        changed = self.client.get("/api/things", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["etag"] != etag
+        assert self.cache.stats["not_modified"] == 2
+
+    def test_binary_response(self):
+        response = self.client.get("/api/blob")
+        assert response.headers["content-type"] == BINARY_MEDIA_TYPE
+        assert response.content == bytes([1, 2, 3])
+
+    def test_prewarm_rebuilds_hot_entries(self):
+        self.client.get("/api/things")
+        self.client.get("/api/things")
+        self.world.bump("turn")
+
+        assert self.cache.prewarm(limit=4) == 1
+        builds = self.state["builds"]
+        self.client.get("/api/things")
+        assert self.state["builds"] == builds  # 预热后的首次请求直接命中
+
+
+def test_mutating_requests_bump_world_version():
+    from ...main import WorldVersionMiddleware
+
+    app = FastAPI()
+    app.add_middleware(WorldVersionMiddleware)
+
+    @app.post("/api/divine/bless")
+    def bless():
+        return {"ok": True}
+
+    @app.post("/api/niche/compare")
+    def compare():
+        return {"ok": True}
+
+    @app.get("/api/map")
+    def overview():
+        return {}
+
+    client = TestClient(app)
+    world = get_world_version()
+    before = world.value
+
+    client.get("/api/map")
+    client.post("/api/niche/compare")
+    assert world.value == before
+
+    client.post("/api/divine/bless")
+    assert world.value == before + 1
@@ -42,6 +42,7 @@ class Settings(BaseSettings):
     critical_species_limit: int = 3
     focus_batch_size: int = 4  # 小批量，降低单次延迟
     focus_batch_limit: int = 3
+    narrative_batch_token_budget: int = 3000  # 单个叙事 Prompt 中物种数据的 token 预算
     use_report_v2: bool = Field(default=True, alias="USE_REPORT_V2")  # 使用并行化报告生成器
     minor_pressure_window: int = 10
     escalation_threshold: int = 80
@@ -50,6 +51,7 @@ class Settings(BaseSettings):
     ai_api_key: str | None = Field(default=None, alias="AI_API_KEY")
     ai_request_timeout: int = Field(default=60, alias="AI_TIMEOUT")
     allow_fake_embeddings: bool = Field(default=False, alias="ALLOW_FAKE_EMBEDDINGS")  # 默认禁用假向量，保证精度
+    vector_store_storage: str = Field(default="mmap", alias="VECTOR_STORE_STORAGE")  # memory | mmap（内存映射向量区）
     ai_concurrency_limit: int = Field(default=15, alias="AI_CONCURRENCY_LIMIT")
     ui_config_path: str = Field(default=str(PROJECT_ROOT / "data/settings.json"))
     
@@ -123,6 +125,31 @@ class Settings(BaseSettings):
         default=str(PROJECT_ROOT / "backend" / "app" / "config" / "tensor_balance.yaml"),
         alias="TENSOR_BALANCE_PATH",
     )
+    
+    # Taichi 启动模式
+    # True: 启动时不初始化 Taichi，首个张量阶段再初始化（只读 API/CLI 不付 JIT 代价）
+    # False: 启动时同步初始化并预编译全部内核（旧行为）
+    taichi_lazy_init: bool = Field(default=True, alias="TAICHI_LAZY_INIT")
+    # 延迟模式下，启动后在事件循环空闲时后台预热内核
+    taichi_warmup: bool = Field(default=True, alias="TAICHI_WARMUP")
+    taichi_cache_dir: str = Field(default=str(PROJECT_ROOT / "data/cache/taichi"), alias="TAICHI_CACHE_DIR")
+
+    # 只读 API 响应缓存（按世界版本失效）
+    response_cache_max_entries: int = Field(default=256, alias="RESPONSE_CACHE_MAX_ENTRIES")
+    # 世界版本变化后后台预热的热门响应数（0 = 不预热）
+    response_cache_prewarm: int = Field(default=8, alias="RESPONSE_CACHE_PREWARM")
+
+    # ========== SQLite 调优 ==========
+    # WAL 日志：读写互不阻塞（关闭后回退到 DELETE 日志 + synchronous=FULL）
+    sqlite_wal: bool = Field(default=True, alias="SQLITE_WAL")
+    sqlite_cache_size_mb: int = Field(default=64, alias="SQLITE_CACHE_SIZE_MB")
+    sqlite_mmap_size_mb: int = Field(default=256, alias="SQLITE_MMAP_SIZE_MB")
+    sqlite_busy_timeout_ms: int = Field(default=5000, alias="SQLITE_BUSY_TIMEOUT_MS")
+    # 只读连接池大小（0 = 读写共用写引擎）
+    sqlite_read_pool_size: int = Field(default=4, alias="SQLITE_READ_POOL_SIZE")
+
+    # 种群时间序列环形缓冲保留的回合数（每物种一行，超出后覆盖最旧回合）
+    population_series_capacity: int = Field(default=2048, alias="POPULATION_SERIES_CAPACITY")
 
     model_config = {
         "env_file": str(PROJECT_ROOT / ".env"),
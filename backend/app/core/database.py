@@ -1,20 +1,108 @@
-﻿from __future__ import annotations
+﻿"""
+数据库连接层（SQLite）
 
+- 写引擎：WAL 日志 + synchronous=NORMAL + 大页缓存/mmap/内存临时表，回合写入时
+  API 读取不再被阻塞（WAL 下读写互不阻塞）
+- 只读引擎：独立连接池（PRAGMA query_only），仓储的纯读取方法通过
+  read_session_scope() 使用，不占用写连接
+- bulk_save()：按主键分组的 executemany 批量写入（已有主键走 INSERT … ON CONFLICT
+  DO UPDATE，新对象走 INSERT … RETURNING 回填主键），替代逐对象 session.merge
+
+内存库（批量模拟/测试）所有线程共享同一连接，读写使用同一个引擎。
+性能对比：python -m app.simulation.db_benchmark
+"""
+
+from __future__ import annotations
+
+import logging
 from contextlib import contextmanager
 from pathlib import Path
+from typing import Any, Iterable, Sequence
 
+from sqlalchemy import event, insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
 from sqlmodel import Session, SQLModel, create_engine
 
-from .config import get_settings
+from .config import Settings, get_settings
+
+logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
+# 每条 executemany 的行数（SQLite 单语句变量数上限 32766，按行执行不受其限制，这里只控制内存）
+BULK_CHUNK_SIZE = 2000
+
 # 确保数据库目录存在
 db_path = settings.database_url.replace("sqlite:///", "")
 if db_path and not db_path.startswith(":memory:"):
     Path(db_path).parent.mkdir(parents=True, exist_ok=True)
 
-engine = create_engine(settings.database_url, echo=False, connect_args={"check_same_thread": False})
+
+# ==================== SQLite 调优 ====================
+
+def sqlite_pragmas(config: Settings, in_memory: bool = False, read_only: bool = False) -> list[tuple[str, Any]]:
+    """连接建立时执行的 PRAGMA 列表"""
+    pragmas: list[tuple[str, Any]] = [
+        ("cache_size", -config.sqlite_cache_size_mb * 1024),  # 负数单位为 KiB
+        ("temp_store", "MEMORY"),
+        ("busy_timeout", config.sqlite_busy_timeout_ms),
+    ]
+    if not in_memory:
+        if config.sqlite_wal and not read_only:
+            pragmas.append(("journal_mode", "WAL"))  # 持久化在库文件中，读连接无需设置
+        pragmas.append(("synchronous", "NORMAL" if config.sqlite_wal else "FULL"))
+        pragmas.append(("mmap_size", config.sqlite_mmap_size_mb * 1024 * 1024))
+    if read_only:
+        pragmas.append(("query_only", "ON"))
+    return pragmas
+
+
+def configure_sqlite_engine(target: Engine, pragmas: Sequence[tuple[str, Any]]) -> Engine:
+    """为引擎的每个新连接执行 PRAGMA"""
+
+    @event.listens_for(target, "connect")
+    def _apply_pragmas(dbapi_connection, _connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                try:
+                    cursor.execute(f"PRAGMA {name}={value}")
+                except Exception as e:
+                    logger.warning(f"[DB] PRAGMA {name}={value} 失败: {e}")
+        finally:
+            cursor.close()
+
+    return target
+
+
+def _create_engines(config: Settings) -> tuple[Engine, Engine]:
+    """创建 (写引擎, 只读引擎)"""
+    url = config.database_url
+    connect_args = {"check_same_thread": False}
+    if ":memory:" in url:
+        # 内存库（批量模拟/测试）：所有线程共享同一连接，否则每个连接都是一个空库
+        from sqlalchemy.pool import StaticPool
+        writer = create_engine(url, echo=False, connect_args=connect_args, poolclass=StaticPool)
+        configure_sqlite_engine(writer, sqlite_pragmas(config, in_memory=True))
+        return writer, writer
+
+    writer = create_engine(url, echo=False, connect_args=connect_args)
+    configure_sqlite_engine(writer, sqlite_pragmas(config))
+    if config.sqlite_read_pool_size <= 0:
+        return writer, writer
+    reader = create_engine(
+        url,
+        echo=False,
+        connect_args=connect_args,
+        pool_size=config.sqlite_read_pool_size,
+        max_overflow=config.sqlite_read_pool_size,
+    )
+    configure_sqlite_engine(reader, sqlite_pragmas(config, read_only=True))
+    return writer, reader
+
+
+engine, read_engine = _create_engines(settings)
 
 
 def init_db() -> None:
@@ -23,6 +111,8 @@ def init_db() -> None:
     from ..models import environment, species, genus, history  # noqa: F401
     SQLModel.metadata.create_all(engine)
     _migrate_species_table()
+    _migrate_genus_table()
+    _migrate_turn_logs_table()
 
 
 @contextmanager
@@ -40,6 +130,68 @@ def session_scope() -> Session:
         session.close()
 
 
+@contextmanager
+def read_session_scope() -> Session:
+    """只读会话（独立连接池，不提交；用于仓储的纯查询方法）"""
+
+    session = Session(read_engine, expire_on_commit=False)
+    try:
+        yield session
+    finally:
+        session.close()  # 连接归还时由连接池回滚；close 不会让已加载对象过期
+
+
+# ==================== 批量写入 ====================
+
+def _row(obj: SQLModel, columns: Sequence[str]) -> dict[str, Any]:
+    return {name: getattr(obj, name) for name in columns}
+
+
+def bulk_save(session: Session, objects: Iterable[SQLModel], chunk_size: int = BULK_CHUNK_SIZE) -> int:
+    """批量插入/更新同一模型的对象（executemany），返回写入行数
+
+    - 有主键：INSERT … ON CONFLICT(主键) DO UPDATE（行不存在时插入）
+    - 无主键：INSERT … RETURNING，按参数顺序把新主键回填到对象上
+    对象保持游离状态，不会加入 session；非 SQLite 方言退回逐个 merge。
+    """
+    objects = list(objects)
+    if not objects:
+        return 0
+    model = type(objects[0])
+    table = model.__table__
+    (pk,) = table.primary_key.columns
+    columns = [c.key for c in table.columns]
+
+    if session.get_bind().dialect.name != "sqlite":
+        for obj in objects:
+            session.merge(obj)
+        return len(objects)
+
+    session.flush()
+    existing = [obj for obj in objects if getattr(obj, pk.key) is not None]
+    new = [obj for obj in objects if getattr(obj, pk.key) is None]
+
+    if existing:
+        stmt = sqlite_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[pk],
+            set_={c.key: stmt.excluded[c.key] for c in table.columns if c is not pk},
+        )
+        for i in range(0, len(existing), chunk_size):
+            session.execute(stmt, [_row(obj, columns) for obj in existing[i:i + chunk_size]])
+
+    if new:
+        insert_columns = [name for name in columns if name != pk.key]
+        stmt = insert(table).returning(pk, sort_by_parameter_order=True)
+        for i in range(0, len(new), chunk_size):
+            chunk = new[i:i + chunk_size]
+            ids = session.execute(stmt, [_row(obj, insert_columns) for obj in chunk]).scalars().all()
+            for obj, new_id in zip(chunk, ids):
+                setattr(obj, pk.key, new_id)
+
+    return len(objects)
+
+
 def _migrate_species_table() -> None:
     """
     轻量级迁移：为 species 表添加新字段（兼容旧存档）
@@ -92,3 +244,53 @@ def _migrate_species_table() -> None:
         import logging
 
         logging.getLogger(__name__).warning("[DB] species 表迁移失败，可能缺少新字段")
+
+
+def _migrate_genus_table() -> None:
+    """轻量级迁移：为 genus 表添加 distance_matrix（压缩遗传距离矩阵，BLOB）"""
+    try:
+        with engine.connect() as conn:
+            result = conn.exec_driver_sql("PRAGMA table_info(genus)")
+            existing = {row[1] for row in result.fetchall()}
+            if existing and "distance_matrix" not in existing:
+                conn.exec_driver_sql("ALTER TABLE genus ADD COLUMN distance_matrix BLOB")
+                conn.commit()
+    except Exception:
+        import logging
+
+        logging.getLogger(__name__).warning("[DB] genus 表迁移失败，可能缺少 distance_matrix 字段")
+
+
+# turn_logs 标量摘要列（旧库缺失时补齐）
+_TURN_LOG_SUMMARY_COLUMNS = {
+    "species_count": "INTEGER DEFAULT 0",
+    "alive_count": "INTEGER DEFAULT 0",
+    "extinct_count": "INTEGER DEFAULT 0",
+    "total_population": "INTEGER DEFAULT 0",
+    "total_deaths": "INTEGER DEFAULT 0",
+    "total_births": "INTEGER DEFAULT 0",
+    "branching_count": "INTEGER DEFAULT 0",
+    "migration_count": "INTEGER DEFAULT 0",
+    "major_event_count": "INTEGER DEFAULT 0",
+    "sea_level": "REAL DEFAULT 0.0",
+    "global_temperature": "REAL DEFAULT 15.0",
+    "tectonic_stage": "VARCHAR DEFAULT ''",
+}
+
+
+def _migrate_turn_logs_table() -> None:
+    """轻量级迁移：为 turn_logs 表添加标量摘要列（旧记录的摘要为默认值，报告仍内联在 record_data）"""
+    try:
+        with engine.connect() as conn:
+            result = conn.exec_driver_sql("PRAGMA table_info(turn_logs)")
+            existing = {row[1] for row in result.fetchall()}
+            if not existing:
+                return
+            for column, ddl in _TURN_LOG_SUMMARY_COLUMNS.items():
+                if column not in existing:
+                    conn.exec_driver_sql(f"ALTER TABLE turn_logs ADD COLUMN {column} {ddl}")
+            conn.commit()
+    except Exception:
+        import logging
+
+        logging.getLogger(__name__).warning("[DB] turn_logs 表迁移失败，可能缺少摘要字段")
@@ -0,0 +1,283 @@
+"""
+事件总线 - 进程内异步广播（SSE 推送）
+
+替代单消费者 Queue：
+- 每个订阅者（浏览器标签页）拥有独立的有界环形缓冲，互不抢占事件
+- 缓冲满时丢弃最旧事件，并在下次投递时补发一条 events_dropped 提示
+- 每个事件分配递增序号，配合 SSE `id:` 字段支持 Last-Event-ID 断线续传
+- 高频事件（如 ai_parallel_heartbeat）在订阅者缓冲内合并，只保留最新一条
+- 投递由 asyncio.Event 唤醒，不再轮询
+
+约束：
+- 仅支持单 Worker（与 SimulationSessionManager 一致）
+- publish 可在任意线程调用；唤醒通过 loop.call_soon_threadsafe 投递到订阅者所在事件循环
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Iterable
+
+logger = logging.getLogger(__name__)
+
+# 默认合并的高频事件类型（同类未投递事件只保留最新一条）
+DEFAULT_COALESCE_TYPES = frozenset({"ai_parallel_heartbeat", "ai_progress", "heartbeat"})
+
+
+class EventSubscriber:
+    """单个订阅者的有界缓冲
+
+    由 EventBus.subscribe() 创建；get_batch() 只能在创建它的事件循环中等待。
+    """
+
+    def __init__(
+        self,
+        bus: "EventBus",
+        subscriber_id: int,
+        capacity: int,
+        coalesce_types: frozenset[str],
+        loop: asyncio.AbstractEventLoop | None,
+    ) -> None:
+        self.bus = bus
+        self.subscriber_id = subscriber_id
+        self.capacity = capacity
+        self.coalesce_types = coalesce_types
+        self.dropped = 0
+        self.coalesced = 0
+        self.delivered = 0
+        self.created_at = time.time()
+        self._buffer: deque[dict[str, Any]] = deque()
+        # 合并类型 -> 缓冲中尚未投递的同类事件
+        self._pending_coalesce: dict[str, dict[str, Any]] = {}
+        self._pending_dropped = 0
+        self._loop = loop
+        self._wakeup = asyncio.Event() if loop is not None else None
+        self.closed = False
+
+    # ---------- 生产端（持有 bus 锁） ----------
+
+    def _offer(self, event: dict[str, Any]) -> None:
+        event_type = event.get("type", "")
+        if event_type in self.coalesce_types:
+            pending = self._pending_coalesce.get(event_type)
+            if pending is not None:
+                # 原地更新，保持其在缓冲中的位置
+                pending.clear()
+                pending.update(event)
+                self.coalesced += 1
+                return
+            event = dict(event)
+            self._pending_coalesce[event_type] = event
+
+        if len(self._buffer) >= self.capacity:
+            old = self._buffer.popleft()
+            old_type = old.get("type", "")
+            if self._pending_coalesce.get(old_type) is old:
+                del self._pending_coalesce[old_type]
+            self.dropped += 1
+            self._pending_dropped += 1
+        self._buffer.append(event)
+
+    def _notify(self) -> None:
+        if self._wakeup is None or self._loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._wakeup.set()
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    # ---------- 消费端 ----------
+
+    def drain(self, max_items: int | None = None) -> list[dict[str, Any]]:
+        """取出缓冲中的事件（非阻塞）"""
+        with self.bus._lock:
+            events: list[dict[str, Any]] = []
+            if self._pending_dropped:
+                events.append({
+                    "type": "events_dropped",
+                    "message": f"事件过多，已丢弃 {self._pending_dropped} 条",
+                    "category": "系统",
+                    "count": self._pending_dropped,
+                    "timestamp": time.time(),
+                })
+                self._pending_dropped = 0
+            limit = len(events) + (len(self._buffer) if max_items is None else max_items)
+            while self._buffer and len(events) < limit:
+                event = self._buffer.popleft()
+                event_type = event.get("type", "")
+                if self._pending_coalesce.get(event_type) is event:
+                    del self._pending_coalesce[event_type]
+                events.append(event)
+            if self._wakeup is not None and not self._buffer:
+                self._wakeup.clear()
+            self.delivered += len(events)
+            return events
+
+    async def get_batch(
+        self,
+        max_items: int = 100,
+        timeout: float | None = None,
+        batch_window: float = 0.0,
+    ) -> list[dict[str, Any]]:
+        """等待并取出一批事件
+
+        Args:
+            max_items: 单批最大事件数
+            timeout: 最长等待秒数，超时返回空列表（用于发送 keepalive）
+            batch_window: 被唤醒后再等待的秒数，用于把突发事件合并为一次写出
+        """
+        if self._wakeup is None:
+            raise RuntimeError("订阅者未绑定事件循环，只能使用 drain()")
+        if not self._buffer and not self._pending_dropped:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+            if batch_window > 0:
+                await asyncio.sleep(batch_window)
+        return self.drain(max_items)
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def close(self) -> None:
+        self.bus.unsubscribe(self)
+
+
+class EventBus:
+    """进程内广播事件总线"""
+
+    def __init__(
+        self,
+        history_size: int = 500,
+        subscriber_capacity: int = 1000,
+        coalesce_types: Iterable[str] = DEFAULT_COALESCE_TYPES,
+    ) -> None:
+        self.subscriber_capacity = subscriber_capacity
+        self.coalesce_types = frozenset(coalesce_types)
+        self._history: deque[dict[str, Any]] = deque(maxlen=history_size)
+        self._subscribers: dict[int, EventSubscriber] = {}
+        self._ids = itertools.count(1)
+        self._seq = 0
+        # 已从回放历史中淘汰的最大序号（续传早于此序号即存在缺口）
+        self._evicted_seq = 0
+        self._published = 0
+        self._lock = threading.RLock()
+
+    @property
+    def last_sequence(self) -> int:
+        return self._seq
+
+    def publish(self, event: dict[str, Any]) -> int:
+        """发布事件到所有订阅者，返回分配的序号（线程安全）"""
+        with self._lock:
+            self._seq += 1
+            self._published += 1
+            event = {**event, "seq": self._seq}
+            # 合并类型不进入回放历史，避免续传时重放大量心跳
+            if event.get("type") not in self.coalesce_types:
+                if len(self._history) == self._history.maxlen:
+                    self._evicted_seq = self._history[0]["seq"]
+                self._history.append(event)
+            subscribers = list(self._subscribers.values())
+            for sub in subscribers:
+                sub._offer(event)
+        for sub in subscribers:
+            sub._notify()
+        return event["seq"]
+
+    def subscribe(
+        self,
+        last_event_id: int | str | None = None,
+        capacity: int | None = None,
+        bind_loop: bool = True,
+    ) -> EventSubscriber:
+        """创建订阅者
+
+        Args:
+            last_event_id: 客户端已收到的最后序号；若提供则从回放历史补发之后的事件
+            capacity: 缓冲容量（默认 subscriber_capacity）
+            bind_loop: 绑定当前事件循环以支持 get_batch()；同步轮询场景传 False
+        """
+        loop = None
+        if bind_loop:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+
+        with self._lock:
+            sub = EventSubscriber(
+                self,
+                next(self._ids),
+                capacity or self.subscriber_capacity,
+                self.coalesce_types,
+                loop,
+            )
+            resume_from = _parse_event_id(last_event_id)
+            # 序号大于当前值说明服务已重启，旧序号无效
+            if resume_from is not None and resume_from <= self._seq:
+                if resume_from < self._evicted_seq:
+                    # 历史已被覆盖，提示客户端存在缺口
+                    sub._pending_dropped += self._evicted_seq - resume_from
+                for event in self._history:
+                    if event["seq"] > resume_from:
+                        sub._offer(event)
+            self._subscribers[sub.subscriber_id] = sub
+        if len(sub) or sub._pending_dropped:
+            sub._notify()
+        logger.debug(f"[事件总线] 订阅者 #{sub.subscriber_id} 已连接（续传自 {resume_from}）")
+        return sub
+
+    def unsubscribe(self, sub: EventSubscriber) -> None:
+        with self._lock:
+            self._subscribers.pop(sub.subscriber_id, None)
+            sub.closed = True
+        logger.debug(f"[事件总线] 订阅者 #{sub.subscriber_id} 已断开")
+
+    def recent(self, max_count: int = 10) -> list[dict[str, Any]]:
+        """返回回放历史中最近的事件"""
+        with self._lock:
+            return list(self._history)[-max_count:] if max_count > 0 else []
+
+    def clear_history(self) -> None:
+        """清空回放历史（新游戏时调用；不影响在线订阅者）"""
+        with self._lock:
+            self._history.clear()
+            self._evicted_seq = self._seq
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "last_seq": self._seq,
+                "published": self._published,
+                "history": len(self._history),
+                "subscribers": [
+                    {
+                        "id": s.subscriber_id,
+                        "buffered": len(s),
+                        "delivered": s.delivered,
+                        "dropped": s.dropped,
+                        "coalesced": s.coalesced,
+                    }
+                    for s in self._subscribers.values()
+                ],
+            }
+
+
+def _parse_event_id(value: int | str | None) -> int | None:
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
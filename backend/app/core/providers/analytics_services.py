@@ -68,7 +68,11 @@ class AnalyticsServiceProvider:
         from ...services.analytics.focus_processor import FocusBatchProcessor
         return self._get_or_override(
             'focus_processor',
-            lambda: FocusBatchProcessor(self.model_router, self.settings.focus_batch_size)
+            lambda: FocusBatchProcessor(
+                self.model_router,
+                self.settings.focus_batch_size,
+                token_budget=self.settings.narrative_batch_token_budget,
+            )
         )
     
     @cached_property
@@ -76,7 +80,9 @@ class AnalyticsServiceProvider:
         from ...services.analytics.critical_analyzer import CriticalAnalyzer
         return self._get_or_override(
             'critical_analyzer',
-            lambda: CriticalAnalyzer(self.model_router)
+            lambda: CriticalAnalyzer(
+                self.model_router, token_budget=self.settings.narrative_batch_token_budget
+            )
         )
     
     @cached_property
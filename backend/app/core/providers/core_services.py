@@ -104,6 +104,7 @@ class CoreServiceProvider:
                 allow_fake_embeddings=self.settings.allow_fake_embeddings,
                 max_parallel_requests=concurrency_limit,
                 enable_concurrency=concurrency_enabled,
+                vector_storage=self.settings.vector_store_storage,
             )
 
         return self._get_or_override('embedding_service', create_embedding_service)
@@ -125,6 +126,11 @@ class CoreServiceProvider:
                         extra_body={"response_format": {"type": "json_object"}}
                     ),
                     "critical_detail": ModelConfig(provider="local", model="critical-template"),
+                    "critical_detail_batch": ModelConfig(
+                        provider="local",
+                        model="critical-template",
+                        extra_body={"response_format": {"type": "json_object"}}
+                    ),
                     
                     # Speciation capabilities (requires LLM)
                     "speciation": ModelConfig(
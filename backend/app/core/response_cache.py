@@ -0,0 +1,361 @@
+"""
+响应缓存 - 按世界版本缓存只读 API 响应
+
+世界状态只在回合结束或玩家操作（神力、干预、读档等）时变化，前端却在持续轮询
+/map、/species/list、/ecosystem/*、/render/* 等接口。这里用一个单调递增的
+世界版本号代替按时间过期：
+
+- WorldVersion: 流水线每回合结束、修改型请求成功后 bump()
+- ResponseCache: 以 (路径, 查询参数) 为键保存序列化后的响应体，条目记录生成时的
+  世界版本；版本未变直接返回缓存字节，变了才重新计算
+- 强 ETag = 响应体哈希：If-None-Match 命中返回 304；版本号变化但内容相同
+  （如与地形无关的回合）时 ETag 不变，客户端仍然得到 304
+- 版本变化后在后台线程预先重算命中最多的若干条目，回合结束后的第一次轮询即可命中
+
+约束：仅支持单 Worker（与 SimulationSessionManager 一致）。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+JSON_MEDIA_TYPE = "application/json"
+BINARY_MEDIA_TYPE = "application/octet-stream"
+
+CacheKey = tuple[str, tuple[tuple[str, str], ...]]
+
+
+# ==================== 世界版本 ====================
+
+class WorldVersion:
+    """单调递增的世界版本号（线程安全）"""
+
+    def __init__(self) -> None:
+        self._value = 0
+        self._lock = threading.Lock()
+        self._listeners: list[Callable[[int, str], None]] = []
+        self.last_reason = "startup"
+        self.updated_at = time.time()
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    def bump(self, reason: str = "") -> int:
+        """世界状态已改变：版本号 +1 并通知监听者"""
+        with self._lock:
+            self._value += 1
+            version = self._value
+            self.last_reason = reason
+            self.updated_at = time.time()
+            listeners = list(self._listeners)
+        logger.debug(f"[世界版本] v{version} ({reason})")
+        for listener in listeners:
+            try:
+                listener(version, reason)
+            except Exception as e:
+                logger.warning(f"[世界版本] 监听者执行失败: {e}")
+        return version
+
+    def add_listener(self, listener: Callable[[int, str], None]) -> None:
+        with self._lock:
+            self._listeners.append(listener)
+
+
+# ==================== 响应缓存 ====================
+
+@dataclass
+class CachedResponse:
+    """一条已序列化的响应"""
+    body: bytes
+    media_type: str
+    etag: str
+    version: int
+    builder: Callable[[], Any] | None = field(default=None, repr=False)  # 同步构建函数（用于预热）
+    hits: int = 0
+    build_ms: float = 0.0
+
+
+def _encode(value: Any, media_type: str) -> bytes:
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value)
+    if isinstance(value, Response):
+        return bytes(value.body)
+    if media_type != JSON_MEDIA_TYPE:
+        raise TypeError(f"非 JSON 响应必须返回 bytes，而不是 {type(value).__name__}")
+    # 与 FastAPI 默认 JSONResponse 完全相同的编码
+    return JSONResponse(content=jsonable_encoder(value)).body
+
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def request_cache_key(request: Request) -> CacheKey:
+    """缓存键：路径 + 排序后的查询参数"""
+    return request.url.path, tuple(sorted(request.query_params.multi_items()))
+
+
+class ResponseCache:
+    """按世界版本失效的响应缓存（LRU）"""
+
+    def __init__(self, world: WorldVersion, max_entries: int = 256, prewarm_top: int = 8) -> None:
+        self.world = world
+        self.max_entries = max_entries
+        self.prewarm_top = prewarm_top
+        self._entries: OrderedDict[CacheKey, CachedResponse] = OrderedDict()
+        self._lock = threading.Lock()
+        self._prewarm_thread: threading.Thread | None = None
+        self._prewarm_pending = False
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.prewarmed = 0
+
+    # ---------- 查找与构建 ----------
+
+    def _lookup(self, key: CacheKey, version: int) -> CachedResponse | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.version != version:
+                return None
+            entry.hits += 1
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry
+
+    def _store(
+        self,
+        key: CacheKey,
+        value: Any,
+        media_type: str,
+        version: int,
+        builder: Callable[[], Any] | None,
+        build_ms: float,
+    ) -> CachedResponse:
+        body = _encode(value, media_type)
+        entry = CachedResponse(
+            body=body,
+            media_type=media_type,
+            etag=_etag(body),
+            version=version,
+            builder=builder,
+            build_ms=build_ms,
+        )
+        with self._lock:
+            previous = self._entries.get(key)
+            if previous is not None:
+                entry.hits = previous.hits
+            # 构建期间世界已变化：结果仍可返回给本次请求，但不覆盖更新的条目
+            if self.world.value == version:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def get_or_build(
+        self,
+        key: CacheKey,
+        builder: Callable[[], Any],
+        media_type: str = JSON_MEDIA_TYPE,
+    ) -> CachedResponse:
+        """返回当前世界版本的缓存响应，不存在时调用 builder 生成"""
+        version = self.world.value
+        entry = self._lookup(key, version)
+        if entry is not None:
+            return entry
+        self.misses += 1
+        start = time.perf_counter()
+        value = builder()
+        return self._store(key, value, media_type, version, builder, (time.perf_counter() - start) * 1000)
+
+    async def get_or_build_async(
+        self,
+        key: CacheKey,
+        builder: Callable[[], Awaitable[Any]],
+        media_type: str = JSON_MEDIA_TYPE,
+    ) -> CachedResponse:
+        """异步版本（builder 为协程函数，不参与后台预热）"""
+        version = self.world.value
+        entry = self._lookup(key, version)
+        if entry is not None:
+            return entry
+        self.misses += 1
+        start = time.perf_counter()
+        value = await builder()
+        return self._store(key, value, media_type, version, None, (time.perf_counter() - start) * 1000)
+
+    # ---------- HTTP ----------
+
+    def to_response(self, request: Request, entry: CachedResponse) -> Response:
+        """生成带 ETag 的响应；If-None-Match 命中时返回 304"""
+        headers = {
+            "ETag": entry.etag,
+            "Cache-Control": "no-cache",  # 允许缓存，但每次都要用 ETag 重新验证
+            "X-World-Version": str(entry.version),
+        }
+        if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type=entry.media_type, headers=headers)
+
+    def respond(
+        self,
+        request: Request,
+        builder: Callable[[], Any],
+        media_type: str = JSON_MEDIA_TYPE,
+    ) -> Response:
+        """同步端点使用：按请求路径+参数缓存 builder 的结果"""
+        entry = self.get_or_build(request_cache_key(request), builder, media_type)
+        return self.to_response(request, entry)
+
+    async def respond_async(
+        self,
+        request: Request,
+        builder: Callable[[], Awaitable[Any]],
+        media_type: str = JSON_MEDIA_TYPE,
+    ) -> Response:
+        """异步端点使用"""
+        entry = await self.get_or_build_async(request_cache_key(request), builder, media_type)
+        return self.to_response(request, entry)
+
+    # ---------- 预热 ----------
+
+    def prewarm(self, limit: int | None = None) -> int:
+        """为当前世界版本重算命中最多的过期条目（默认 prewarm_top 个），返回重算数量"""
+        limit = self.prewarm_top if limit is None else limit
+        version = self.world.value
+        with self._lock:
+            stale = [
+                (key, entry) for key, entry in self._entries.items()
+                if entry.version != version and entry.builder is not None and entry.hits > 0
+            ]
+        stale.sort(key=lambda item: item[1].hits, reverse=True)
+
+        rebuilt = 0
+        for key, entry in stale[:limit]:
+            if self.world.value != version:
+                break  # 又有新版本，交给下一轮
+            try:
+                start = time.perf_counter()
+                value = entry.builder()
+                self._store(key, value, entry.media_type, version, entry.builder,
+                            (time.perf_counter() - start) * 1000)
+                rebuilt += 1
+            except Exception as e:
+                logger.debug(f"[响应缓存] 预热 {key[0]} 失败: {e}")
+        self.prewarmed += rebuilt
+        if rebuilt:
+            logger.debug(f"[响应缓存] v{version} 预热 {rebuilt} 个响应")
+        return rebuilt
+
+    def schedule_prewarm(self) -> None:
+        """在后台线程预热（合并连续的多次 bump）"""
+        if self.prewarm_top <= 0:
+            return
+        with self._lock:
+            if self._prewarm_thread is not None:
+                self._prewarm_pending = True
+                return
+            self._prewarm_thread = threading.Thread(
+                target=self._prewarm_loop, name="response-cache-prewarm", daemon=True
+            )
+            thread = self._prewarm_thread
+        thread.start()
+
+    def _prewarm_loop(self) -> None:
+        while True:
+            try:
+                self.prewarm()
+            except Exception as e:
+                logger.warning(f"[响应缓存] 预热失败: {e}")
+            with self._lock:
+                if not self._prewarm_pending:
+                    self._prewarm_thread = None
+                    return
+                self._prewarm_pending = False
+
+    # ---------- 管理 ----------
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            entries = len(self._entries)
+            current = sum(1 for e in self._entries.values() if e.version == self.world.value)
+            size = sum(len(e.body) for e in self._entries.values())
+        lookups = self.hits + self.misses
+        return {
+            "world_version": self.world.value,
+            "last_reason": self.world.last_reason,
+            "entries": entries,
+            "current_entries": current,
+            "bytes": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "not_modified": self.not_modified,
+            "prewarmed": self.prewarmed,
+        }
+
+
+# ==================== 全局实例 ====================
+
+_world_version: WorldVersion | None = None
+_response_cache: ResponseCache | None = None
+
+
+def get_world_version() -> WorldVersion:
+    """获取全局世界版本"""
+    global _world_version
+    if _world_version is None:
+        _world_version = WorldVersion()
+    return _world_version
+
+
+def bump_world_version(reason: str = "") -> int:
+    """标记世界状态已改变（回合结束、神力操作、读档等）"""
+    return get_world_version().bump(reason)
+
+
+def get_response_cache() -> ResponseCache:
+    """获取全局响应缓存（世界版本变化后自动后台预热）"""
+    global _response_cache
+    if _response_cache is None:
+        from .config import get_settings
+
+        settings = get_settings()
+        world = get_world_version()
+        _response_cache = ResponseCache(
+            world,
+            max_entries=settings.response_cache_max_entries,
+            prewarm_top=settings.response_cache_prewarm,
+        )
+        world.add_listener(lambda version, reason: _response_cache.schedule_prewarm())
+    return _response_cache
@@ -6,13 +6,13 @@
 - current_save_name: 当前存档名称
 - autosave_counter: 自动保存计数器
 - pressure_queue: 压力队列
-- simulation_events: 事件队列（用于 SSE 推送）
+- event_bus: 事件广播总线（用于 SSE 推送，支持多订阅者与断线续传）
 - backend_session_id: 后端会话 ID
 
 架构：
 - 会话在 app lifespan 中实例化并存储到 app.state
 - 路由通过 Depends(get_session) 从 api.dependencies 访问
-- 使用进程内 Queue/RLock 进行状态同步
+- 使用进程内 EventBus/RLock 进行状态同步
 
 约束：
 - 仅支持单 Worker：状态是进程本地的，不会持久化
@@ -33,10 +33,11 @@ from __future__ import annotations
 import logging
 import uuid
 from contextlib import contextmanager
-from queue import Queue
 from threading import RLock
 from typing import TYPE_CHECKING, Any, Generator
 
+from .event_bus import EventBus, EventSubscriber
+
 if TYPE_CHECKING:
     from ..schemas.requests import PressureConfig
 
@@ -55,7 +56,8 @@ class SimulationSessionManager:
         _current_save_name: 当前存档名称
         _autosave_counter: 自动保存回合计数
         _pressure_queue: 压力配置队列
-        _events: 事件队列（用于 SSE）
+        _event_bus: 事件广播总线（用于 SSE）
+        _poll_subscriber: 供 get_pending_events() 轮询使用的内置订阅者
         _session_id: 后端会话 ID
         _lock: 状态锁
     """
@@ -65,7 +67,8 @@ class SimulationSessionManager:
         self._current_save_name: str | None = None
         self._autosave_counter: int = 0
         self._pressure_queue: list[list[Any]] = []
-        self._events: Queue = Queue()
+        self._event_bus = EventBus()
+        self._poll_subscriber: EventSubscriber = self._event_bus.subscribe(bind_loop=False)
         self._session_id: str = ""
         self._lock = RLock()
         
@@ -194,9 +197,9 @@ class SimulationSessionManager:
     # ========== 事件队列 ==========
     
     @property
-    def events(self) -> Queue:
-        """获取事件队列"""
-        return self._events
+    def event_bus(self) -> EventBus:
+        """获取事件广播总线（SSE 端点通过 subscribe() 订阅）"""
+        return self._event_bus
     
     # 事件类型映射：后端类型 -> 前端期望类型
     _EVENT_TYPE_MAP = {
@@ -229,7 +232,7 @@ class SimulationSessionManager:
             event_type: 事件类型 (info/warn/error/success/speciation/extinction等)
             message: 事件消息
             category: 事件分类
-            force: 是否强制推送（绕过队列满检查）
+            force: 保留参数（各订阅者缓冲有界且丢弃最旧事件，不再需要绕过检查）
             **extra: 额外数据
             
         Note:
@@ -243,10 +246,6 @@ class SimulationSessionManager:
         """
         import time
         
-        # 防止队列无限膨胀
-        if not force and self._events.qsize() > 1000:
-            return
-        
         # 映射事件类型为前端期望的格式
         mapped_type = self._EVENT_TYPE_MAP.get(event_type, event_type)
         
@@ -260,17 +259,14 @@ class SimulationSessionManager:
             **extra
         }
         
-        self._events.put(event)
+        self._event_bus.publish(event)
     
     def get_pending_events(self, max_count: int = 100) -> list[dict]:
-        """获取待处理的事件（非阻塞）"""
-        events = []
-        while not self._events.empty() and len(events) < max_count:
-            try:
-                events.append(self._events.get_nowait())
-            except:
-                break
-        return events
+        """获取内置轮询订阅者中待处理的事件（非阻塞）
+        
+        SSE 端点使用独立订阅者，不受此方法影响。
+        """
+        return self._poll_subscriber.drain(max_count)
     
     # ========== AI 任务状态 ==========
     
@@ -330,12 +326,9 @@ class SimulationSessionManager:
             self._skip_ai_step = False
             self._current_ai_step = ""
             
-            # 清空事件队列
-            while not self._events.empty():
-                try:
-                    self._events.get_nowait()
-                except:
-                    break
+            # 清空轮询缓冲与回放历史（在线 SSE 订阅者不受影响）
+            self._poll_subscriber.drain()
+            self._event_bus.clear_history()
             
             logger.info("[会话] 状态已重置")
     
@@ -348,7 +341,8 @@ class SimulationSessionManager:
                 "current_save": self._current_save_name,
                 "autosave_counter": self._autosave_counter,
                 "queue_size": len(self._pressure_queue),
-                "events_pending": self._events.qsize(),
+                "events_pending": len(self._poll_subscriber),
+                "event_subscribers": len(self._event_bus.stats()["subscribers"]),
                 "abort_requested": self._abort_requested,
                 "skip_ai_step": self._skip_ai_step,
                 "current_ai_step": self._current_ai_step,
@@ -367,16 +361,11 @@ class SimulationSessionManager:
     
     def get_events_count(self) -> int:
         """获取待处理事件数量（只读）"""
-        return self._events.qsize()
+        return len(self._poll_subscriber)
     
     def peek_events(self, max_count: int = 10) -> list[dict]:
-        """查看事件但不移除（只读）
-        
-        注意：由于 Queue 不支持 peek，这里返回的是近似值
-        """
-        # Queue 不支持 peek，返回空列表
-        # 实际实现中可以考虑使用 deque 替代
-        return []
+        """查看最近发布的事件但不移除（只读）"""
+        return self._event_bus.recent(max_count)
     
     def can_start_simulation(self) -> tuple[bool, str]:
         """检查是否可以开始模拟
@@ -0,0 +1,92 @@
+"""
+启动时间线 - 记录进程启动到首个请求 / 首个回合的耗时
+
+用于对比延迟初始化前后的启动体验：
+- app_ready: lifespan 启动完成（可以接受请求）
+- first_request: 第一个业务请求完成
+- taichi_initialized / taichi_warmed: Taichi 运行时初始化与内核预热完成
+- first_turn: 第一个回合完成
+
+每个事件只记录首次发生的时间，后续 mark() 忽略。
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+def _process_start_time() -> float:
+    """进程启动时间（墙钟）；无法读取时退化为本模块导入时间"""
+    try:
+        with open(f"/proc/{os.getpid()}/stat", "rb") as f:
+            fields = f.read().rsplit(b")", 1)[1].split()
+        start_ticks = int(fields[19])
+        with open("/proc/uptime", "rb") as f:
+            uptime = float(f.read().split()[0])
+        ticks_per_second = os.sysconf("SC_CLK_TCK")
+        return time.time() - uptime + start_ticks / ticks_per_second
+    except (OSError, ValueError, IndexError, AttributeError):
+        return time.time()
+
+
+class StartupTimeline:
+    """启动事件时间线"""
+
+    def __init__(self, process_start: float | None = None) -> None:
+        self.process_start = process_start if process_start is not None else _process_start_time()
+        self._events: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, event: str) -> bool:
+        """记录事件首次发生时间，返回是否为首次"""
+        with self._lock:
+            if event in self._events:
+                return False
+            self._events[event] = time.time()
+        logger.info(f"[启动] {event}: 距进程启动 {self.elapsed(event):.2f}s")
+        return True
+
+    def has(self, event: str) -> bool:
+        return event in self._events
+
+    def elapsed(self, event: str) -> float | None:
+        """事件距进程启动的秒数"""
+        ts = self._events.get(event)
+        return None if ts is None else max(0.0, ts - self.process_start)
+
+    def report(self) -> dict[str, Any]:
+        with self._lock:
+            events = dict(self._events)
+        return {
+            "process_start": self.process_start,
+            "events": {
+                name: round(max(0.0, ts - self.process_start), 3)
+                for name, ts in sorted(events.items(), key=lambda kv: kv[1])
+            },
+            "time_to_first_request": self.elapsed("first_request"),
+            "time_to_first_turn": self.elapsed("first_turn"),
+        }
+
+
+_timeline: StartupTimeline | None = None
+
+
+def get_startup_timeline() -> StartupTimeline:
+    """获取进程级启动时间线"""
+    global _timeline
+    if _timeline is None:
+        _timeline = StartupTimeline()
+    return _timeline
+
+
+def reset_startup_timeline() -> StartupTimeline:
+    """重置启动时间线（测试用）"""
+    global _timeline
+    _timeline = StartupTimeline()
+    return _timeline
@@ -32,6 +32,13 @@ from starlette.middleware.base import BaseHTTPMiddleware
 
 from .core.config import get_settings, setup_logging
 from .core.database import init_db
+from .core.response_cache import bump_world_version
+from .core.startup import get_startup_timeline
+from .services.system.metrics_exporter import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    get_metrics_registry,
+    install_default_collectors,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -45,6 +52,7 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
         "/api/hints",
         "/api/health",
         "/health",
+        "/metrics",
     }
     
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
@@ -72,6 +80,8 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
         if path in self.IGNORED_PATHS and status_code < 400:
             return response
         
+        get_startup_timeline().mark("first_request")
+        
         # 结构化日志
         log_extra = {
             "method": method,
@@ -95,6 +105,43 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
         return response
 
 
+class WorldVersionMiddleware(BaseHTTPMiddleware):
+    """修改型请求成功后推进世界版本，使只读接口的响应缓存失效"""
+    
+    MUTATING_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+    
+    # 不修改世界状态的 POST（查询、诊断、配置测试）
+    READ_ONLY_PATHS = {
+        "/api/niche/compare",
+        "/api/energy/calculate",
+        "/api/config/test-api",
+        "/api/config/fetch-models",
+        "/api/saves/save",
+        "/api/tasks/abort",
+        "/api/tasks/skip-ai-step",
+        "/api/system/ai-diagnostics/reset",
+        "/api/system/stage-diagnostics/profiling",
+        "/api/embedding/search",
+        "/api/embedding/qa",
+        "/api/embedding/explain/species",
+        "/api/embedding/compare/species",
+        "/api/embedding/hints",
+        "/api/embedding/evolution/predict",
+    }
+    
+    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        response = await call_next(request)
+        path = request.url.path
+        if (
+            request.method in self.MUTATING_METHODS
+            and response.status_code < 400
+            and path.startswith("/api/")
+            and path not in self.READ_ONLY_PATHS
+        ):
+            bump_world_version(f"{request.method} {path}")
+        return response
+
+
 def _disable_windows_quickedit() -> None:
     """禁用 Windows 控制台的快速编辑模式
     
@@ -173,11 +220,24 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     app.state.container = container
     app.state.session = session
     
+    # 注册 /metrics 拉取型收集器
+    install_default_collectors(container)
+    
+    # Taichi：延迟模式下只在事件循环空闲时后台预热，不阻塞启动
+    from .tensor.taichi_runtime import get_taichi_runtime
+    taichi_runtime = get_taichi_runtime()
+    if not settings.taichi_lazy_init:
+        taichi_runtime.warmup()
+    elif settings.taichi_warmup:
+        taichi_runtime.schedule_warmup()
+    
     logger.info("[启动] 服务容器初始化完成")
+    get_startup_timeline().mark("app_ready")
     
     yield  # 应用在此运行
     
     # 关闭时清理（如需要）
+    await taichi_runtime.cancel_warmup()
     logger.info("[关闭] 应用正在关闭")
 
 
@@ -186,6 +246,8 @@ app = FastAPI(title=settings.app_name, lifespan=lifespan)
 
 # 添加请求日志中间件
 app.add_middleware(RequestLoggingMiddleware)
+# 修改型请求推进世界版本（响应缓存失效）
+app.add_middleware(WorldVersionMiddleware)
 
 
 @app.get("/health", tags=["system"])
@@ -194,6 +256,12 @@ def healthcheck() -> dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/metrics", tags=["system"], include_in_schema=False)
+def metrics() -> Response:
+    """Prometheus 抓取端点（回合/阶段/AI/缓存指标）"""
+    return Response(get_metrics_registry().render(), media_type=METRICS_CONTENT_TYPE)
+
+
 @app.get("/api/health", tags=["system"])
 def api_healthcheck(request: Request) -> dict[str, str]:
     """API 健康检查（带会话信息）
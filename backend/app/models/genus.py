@@ -1,9 +1,185 @@
 """属模型：管理同属物种的遗传关系"""
 from __future__ import annotations
 
+import json
+import struct
+from typing import Iterator, Mapping
+
+import numpy as np
+from sqlalchemy import LargeBinary
 from sqlmodel import Column, Field, JSON, SQLModel
 
 
+class GeneticDistanceMatrix:
+    """属内遗传距离矩阵
+
+    压缩下三角存储：第 i 行保存与 0..i-1 号物种的距离，依次拼接成一维
+    float32 数组，(i, j) (i > j) 位于 i*(i-1)/2 + j。新物种（分化）只在末尾追加
+    一行，已有数据不移动。未计算的距离为 NaN。
+
+    - get(a, b): O(1) 查询
+    - row(code): 与所有物种的距离（“X 的姊妹种”）
+    - to_bytes()/from_bytes(): 紧凑二进制（编码表 + float32 数组）
+    """
+
+    _MAGIC = b"GDM1"
+    _HEADER = struct.Struct("<4sII")  # magic, 物种数, 编码表字节数
+
+    def __init__(self, codes: list[str] | None = None, values: np.ndarray | None = None):
+        self.codes: list[str] = []
+        self._index: dict[str, int] = {}
+        self._buf = np.full(16, np.nan, dtype=np.float32)
+        self._size = 0
+        if codes:
+            self.add_codes(codes)
+        if values is not None:
+            values = np.asarray(values, dtype=np.float32)
+            if values.size != self._size:
+                raise ValueError(f"距离数组长度 {values.size} 与物种数 {len(self.codes)} 不匹配")
+            self._buf[:self._size] = values
+
+    # ---------- 结构 ----------
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __contains__(self, code: object) -> bool:
+        return code in self._index
+
+    @property
+    def values(self) -> np.ndarray:
+        """压缩下三角数组（只读视图）"""
+        view = self._buf[:self._size]
+        view.flags.writeable = False
+        return view
+
+    def index(self, code: str) -> int | None:
+        return self._index.get(code)
+
+    def add_code(self, code: str) -> int:
+        """追加一个物种（新行/新列），已存在时返回原下标"""
+        idx = self._index.get(code)
+        if idx is not None:
+            return idx
+        idx = len(self.codes)
+        needed = self._size + idx
+        if needed > self._buf.size:
+            grown = np.full(max(needed, self._buf.size * 2), np.nan, dtype=np.float32)
+            grown[:self._size] = self._buf[:self._size]
+            self._buf = grown
+        self._size = needed
+        self.codes.append(code)
+        self._index[code] = idx
+        return idx
+
+    def add_codes(self, codes: list[str]) -> None:
+        for code in codes:
+            self.add_code(code)
+
+    @staticmethod
+    def _offset(i: int, j: int) -> int:
+        if i < j:
+            i, j = j, i
+        return i * (i - 1) // 2 + j
+
+    # ---------- 读写 ----------
+
+    def get(self, code_a: str, code_b: str, default: float | None = None) -> float | None:
+        """两物种间距离；同一物种为 0，未知返回 default"""
+        i, j = self._index.get(code_a), self._index.get(code_b)
+        if i is None or j is None:
+            return default
+        if i == j:
+            return 0.0
+        value = self._buf[self._offset(i, j)]
+        return default if np.isnan(value) else float(value)
+
+    def set(self, code_a: str, code_b: str, distance: float) -> None:
+        if code_a == code_b:
+            return
+        i, j = self.add_code(code_a), self.add_code(code_b)
+        self._buf[self._offset(i, j)] = distance
+
+    def set_row(self, code: str, distances: Mapping[str, float]) -> None:
+        """批量写入 code 与其他物种的距离（分化时新物种的一整行）"""
+        i = self.add_code(code)
+        others = np.array([self.add_code(c) for c in distances if c != code], dtype=np.int64)
+        if not others.size:
+            return
+        vals = np.array([d for c, d in distances.items() if c != code], dtype=np.float32)
+        hi, lo = np.maximum(others, i), np.minimum(others, i)
+        self._buf[hi * (hi - 1) // 2 + lo] = vals
+
+    def row(self, code: str) -> np.ndarray:
+        """与所有物种的距离 (n,)，自身为 0，未知为 NaN"""
+        i = self._index.get(code)
+        if i is None:
+            return np.full(len(self.codes), np.nan, dtype=np.float32)
+        n = len(self.codes)
+        out = np.empty(n, dtype=np.float32)
+        start = i * (i - 1) // 2
+        out[:i] = self._buf[start:start + i]
+        out[i] = 0.0
+        js = np.arange(i + 1, n)
+        out[i + 1:] = self._buf[js * (js - 1) // 2 + i]
+        return out
+
+    def siblings(self, code: str) -> dict[str, float]:
+        """code 与同属其他物种的已知距离"""
+        if code not in self._index:
+            return {}
+        row = self.row(code)
+        i = self._index[code]
+        known = np.flatnonzero(~np.isnan(row))
+        return {self.codes[j]: float(row[j]) for j in known if j != i}
+
+    def pairs(self) -> Iterator[tuple[str, str, float]]:
+        """遍历所有已知距离 (code_a, code_b, distance)"""
+        n = len(self.codes)
+        values = self._buf[:self._size]
+        rows = np.repeat(np.arange(n), np.arange(n))
+        cols = np.arange(self._size) - rows * (rows - 1) // 2
+        for k in np.flatnonzero(~np.isnan(values)):
+            yield self.codes[rows[k]], self.codes[cols[k]], float(values[k])
+
+    # ---------- 序列化 ----------
+
+    def to_bytes(self) -> bytes:
+        codes = json.dumps(self.codes, ensure_ascii=False).encode("utf-8")
+        header = self._HEADER.pack(self._MAGIC, len(self.codes), len(codes))
+        return header + codes + self._buf[:self._size].astype("<f4").tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "GeneticDistanceMatrix":
+        magic, n, codes_len = cls._HEADER.unpack_from(data)
+        if magic != cls._MAGIC:
+            raise ValueError("不是遗传距离矩阵数据")
+        start = cls._HEADER.size
+        codes = json.loads(data[start:start + codes_len].decode("utf-8"))
+        values = np.frombuffer(data, dtype="<f4", offset=start + codes_len, count=n * (n - 1) // 2)
+        if len(codes) != n:
+            raise ValueError("遗传距离矩阵编码表损坏")
+        return cls(codes, values)
+
+    @classmethod
+    def from_legacy(cls, distances: Mapping[str, float]) -> "GeneticDistanceMatrix":
+        """从旧版 {"codeA-codeB": 距离} 字典转换（无法唯一拆分的键会被忽略）"""
+        matrix = cls()
+        for key, distance in distances.items():
+            parts = key.split("-")
+            if len(parts) == 2 and all(parts):
+                matrix.set(parts[0], parts[1], distance)
+        return matrix
+
+    def to_legacy(self) -> dict[str, float]:
+        """导出为旧版字典格式（键按编码排序）"""
+        out = {}
+        for a, b, d in self.pairs():
+            key = f"{a}-{b}" if a < b else f"{b}-{a}"
+            out[key] = d
+        return out
+
+
 class Genus(SQLModel, table=True):
     """属：记录同属物种间的遗传距离矩阵和共享基因库"""
     __tablename__ = "genus"
@@ -13,10 +189,22 @@ class Genus(SQLModel, table=True):
     name_latin: str
     name_common: str
     
+    # 旧版 "codeA-codeB" 字典，仅用于读取旧存档；新数据写入 distance_matrix
     genetic_distances: dict[str, float] = Field(default={}, sa_column=Column(JSON))
+    distance_matrix: bytes | None = Field(default=None, sa_column=Column(LargeBinary))
     
     gene_library: dict = Field(default={}, sa_column=Column(JSON))
     
     created_turn: int = 0
     updated_turn: int = 0
-
+    
+    def load_distance_matrix(self) -> GeneticDistanceMatrix:
+        """读取遗传距离矩阵（兼容旧版字典）"""
+        if self.distance_matrix:
+            return GeneticDistanceMatrix.from_bytes(self.distance_matrix)
+        return GeneticDistanceMatrix.from_legacy(self.genetic_distances or {})
+    
+    def store_distance_matrix(self, matrix: GeneticDistanceMatrix) -> None:
+        """写回遗传距离矩阵（整列赋值，旧版字典清空）"""
+        self.distance_matrix = matrix.to_bytes()
+        self.genetic_distances = {}
@@ -3,10 +3,17 @@
 from datetime import datetime
 from typing import Any
 
+from sqlalchemy import Index, LargeBinary
 from sqlmodel import Column, Field, JSON, SQLModel
 
 
 class TurnLog(SQLModel, table=True):
+    """回合记录
+
+    标量摘要为独立列（可按回合区间、按列投影查询）；完整报告与叙事压缩后
+    存放在 TurnPayload 中，按需加载。旧记录的 record_data 仍内联在本表。
+    """
+
     __tablename__ = "turn_logs"
 
     id: int | None = Field(default=None, primary_key=True)
@@ -15,3 +22,51 @@ class TurnLog(SQLModel, table=True):
     narrative: str
     record_data: dict[str, Any] = Field(sa_column=Column(JSON))
     created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    # 标量摘要（由 HistoryRepository.log_turn 从报告中提取）
+    species_count: int = 0
+    alive_count: int = 0
+    extinct_count: int = 0
+    total_population: int = 0
+    total_deaths: int = 0
+    total_births: int = 0
+    branching_count: int = 0
+    migration_count: int = 0
+    major_event_count: int = 0
+    sea_level: float = 0.0
+    global_temperature: float = 15.0
+    tectonic_stage: str = ""
+
+
+class TurnPayload(SQLModel, table=True):
+    """回合报告与叙事的压缩载荷（zlib 压缩的 JSON）"""
+
+    __tablename__ = "turn_payloads"
+
+    id: int | None = Field(default=None, primary_key=True)
+    turn_log_id: int = Field(foreign_key="turn_logs.id", index=True)
+    turn_index: int = Field(index=True)
+    codec: str = "zlib-json"
+    raw_size: int = 0
+    data: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+
+
+class TurnSpeciesStat(SQLModel, table=True):
+    """每回合每物种的标量统计（物种时间序列查询用）"""
+
+    __tablename__ = "turn_species_stats"
+    __table_args__ = (Index("ix_turn_species_stats_code_turn", "lineage_code", "turn_index"),)
+
+    id: int | None = Field(default=None, primary_key=True)
+    turn_log_id: int = Field(foreign_key="turn_logs.id", index=True)
+    turn_index: int = Field(index=True)
+    lineage_code: str
+    population: int = 0
+    population_share: float = 0.0
+    deaths: int = 0
+    births: int = 0
+    death_rate: float = 0.0
+    trophic_level: float | None = None
+    total_tiles: int = 0
+    status: str = ""
+    tier: str | None = None
@@ -7,6 +7,8 @@ from typing import Generator
 
 from pathlib import Path
 
+from collections import deque
+
 from sqlalchemy import text, Index
 from sqlalchemy.exc import OperationalError
 
@@ -14,7 +16,7 @@ logger = logging.getLogger(__name__)
 from sqlalchemy.sql import func
 from sqlmodel import select
 
-from ..core.database import session_scope
+from ..core.database import bulk_save, read_session_scope, session_scope
 from ..models.environment import (
     EnvironmentEvent,
     HabitatPopulation,
@@ -24,6 +26,53 @@ from ..models.environment import (
 from ..models.config import UIConfig, ProviderConfig
 
 
+class TileChangeLog:
+    """地块写入日志：单调递增的地图版本 + 每个版本写入的地块 id
+
+    所有地块写入都经过 EnvironmentRepository，这里记录写入了哪些地块，
+    供张量状态、地形指标等缓存按版本取增量，而不必每回合遍历/指纹化全部地块。
+    插入新地块、清空地图等结构性变化记为全量失效（None）。
+    """
+
+    def __init__(self, history: int = 256) -> None:
+        self.version = 0
+        self._entries: deque[tuple[int, frozenset[int] | None]] = deque(maxlen=history)
+
+    def record(self, tile_ids: Iterable[int]) -> int:
+        ids = frozenset(tile_ids)
+        if ids:
+            self.version += 1
+            self._entries.append((self.version, ids))
+        return self.version
+
+    def invalidate(self) -> int:
+        """结构性变化：之前的所有版本都需要全量重建"""
+        self.version += 1
+        self._entries.append((self.version, None))
+        return self.version
+
+    def changes_since(self, version: int | None) -> set[int] | None:
+        """version 之后写入过的地块 id；无法给出增量时返回 None（需要全量重建）"""
+        if version is None or version > self.version:
+            return None
+        if version == self.version:
+            return set()
+        if not self._entries or self._entries[0][0] > version + 1:
+            return None  # 历史已被截断
+        changed: set[int] = set()
+        for entry_version, ids in self._entries:
+            if entry_version <= version:
+                continue
+            if ids is None:
+                return None
+            changed |= ids
+        return changed
+
+
+# 进程内共享：容器实例与模块级单例写入同一份日志
+tile_changes = TileChangeLog()
+
+
 class EnvironmentRepository:
     """环境数据仓储
     
@@ -34,13 +83,20 @@ class EnvironmentRepository:
     4. 数据库索引优化（ensure_indexes）- 查询加速
     5. 分块迭代器（iter_habitats_chunked）- 降低内存峰值
     """
+    tile_changes = tile_changes
+
     def upsert_tiles(self, tiles: Iterable[MapTile]) -> None:
+        tiles = list(tiles)
+        inserted = any(tile.id is None for tile in tiles)
         with session_scope() as session:
-            for tile in tiles:
-                session.merge(tile)
+            bulk_save(session, tiles)
+        if inserted:
+            self.tile_changes.invalidate()
+        else:
+            self.tile_changes.record(tile.id for tile in tiles)
 
     def list_tiles(self, limit: int | None = None) -> list[MapTile]:
-        with session_scope() as session:
+        with read_session_scope() as session:
             stmt = select(MapTile)
             if limit:
                 stmt = stmt.limit(limit)
@@ -54,7 +110,7 @@ class EnvironmentRepository:
             return event
 
     def get_state(self) -> MapState | None:
-        with session_scope() as session:
+        with read_session_scope() as session:
             return session.exec(select(MapState)).first()
 
     def save_state(self, state: MapState) -> MapState:
@@ -73,6 +129,7 @@ class EnvironmentRepository:
             # 再删除主表
             session.exec(text("DELETE FROM map_tiles"))
             session.exec(text("DELETE FROM map_state"))
+        self.tile_changes.invalidate()
 
     def ensure_tile_columns(self) -> None:
         with session_scope() as session:
@@ -126,10 +183,11 @@ class EnvironmentRepository:
         return config
 
     def list_habitats(self) -> list[HabitatPopulation]:
-        with session_scope() as session:
+        with read_session_scope() as session:
             return list(session.exec(select(HabitatPopulation)))
 
     def write_habitats(self, habitats: Iterable[HabitatPopulation]) -> None:
+        habitats = list(habitats)
         with session_scope() as session:
             for habitat in habitats:
                 # 容错：确保类型合法，避免 sqlite "type 'set' is not supported"
@@ -173,12 +231,12 @@ class EnvironmentRepository:
                         f"species_id={habitat.species_id}, tile_id={habitat.tile_id}, "
                         f"原类型={original_type}, 原值={repr(original_value)[:100]}, 修正为={ti}"
                     )
-                
-                try:
-                    session.add(habitat)
-                except Exception as e:
-                    logger.error(f"[环境仓储] 写入栖息地失败: {e} | habitat={habitat}")
-                    raise
+            
+            try:
+                bulk_save(session, habitats)
+            except Exception as e:
+                logger.error(f"[环境仓储] 写入 {len(habitats)} 条栖息地失败: {e}")
+                raise
 
     def latest_habitats(
         self,
@@ -197,7 +255,7 @@ class EnvironmentRepository:
         Returns:
             list[HabitatPopulation]: 栖息地记录列表
         """
-        with session_scope() as session:
+        with read_session_scope() as session:
             if not per_species_latest:
                 # 旧逻辑：只取全局 max_turn
                 max_turn = session.exec(select(func.max(HabitatPopulation.turn_index))).one()
@@ -254,7 +312,7 @@ class EnvironmentRepository:
         Returns:
             set[int]: 有栖息地记录的物种ID集合
         """
-        with session_scope() as session:
+        with read_session_scope() as session:
             if current_turn_only:
                 # 旧逻辑：只看全局 max_turn
                 max_turn = session.exec(select(func.max(HabitatPopulation.turn_index))).one()
@@ -278,7 +336,7 @@ class EnvironmentRepository:
         Returns:
             list[HabitatPopulation]: 该物种的栖息地记录列表
         """
-        with session_scope() as session:
+        with read_session_scope() as session:
             if latest_only:
                 # 【改进】取该物种自己的最新 turn_index，而非全局 max_turn
                 species_max_turn = session.exec(
@@ -301,7 +359,7 @@ class EnvironmentRepository:
         
         用于批量处理物种迁移时的坐标查找
         """
-        with session_scope() as session:
+        with read_session_scope() as session:
             # 只查询需要的列
             stmt = select(MapTile.id, MapTile.x, MapTile.y)
             results = session.exec(stmt).all()
@@ -317,7 +375,7 @@ class EnvironmentRepository:
         Returns:
             最新回合的所有栖息地记录
         """
-        with session_scope() as session:
+        with read_session_scope() as session:
             max_turn = session.exec(
                 select(func.max(HabitatPopulation.turn_index))
             ).one()
@@ -611,15 +669,15 @@ class EnvironmentRepository:
         with session_scope() as session:
             for i in range(0, len(tiles_data), chunk_size):
                 chunk = tiles_data[i:i + chunk_size]
-                
-                for tile_data in chunk:
-                    # 使用 merge 实现 upsert
-                    tile = MapTile(**tile_data)
-                    session.merge(tile)
-                    total += 1
-                
+                # INSERT … ON CONFLICT DO UPDATE（executemany）
+                total += bulk_save(session, [MapTile(**tile_data) for tile_data in chunk])
                 session.commit()
         
+        if any(tile_data.get("id") is None for tile_data in tiles_data):
+            self.tile_changes.invalidate()
+        else:
+            self.tile_changes.record(tile_data["id"] for tile_data in tiles_data)
+        
         elapsed = time.time() - start_time
         logger.info(
             f"[环境仓储] 批量更新 {total} 个地块，"
@@ -6,7 +6,7 @@ from typing import Sequence
 from sqlmodel import Session, select
 
 from ..core.database import session_scope
-from ..models.genus import Genus
+from ..models.genus import Genus, GeneticDistanceMatrix
 
 
 class GenusRepository:
@@ -35,6 +35,7 @@ class GenusRepository:
                 existing.name_latin = genus.name_latin
                 existing.name_common = genus.name_common
                 existing.genetic_distances = genus.genetic_distances
+                existing.distance_matrix = genus.distance_matrix
                 existing.updated_turn = genus.updated_turn
                 session.add(existing)
                 session.commit()
@@ -47,11 +48,41 @@ class GenusRepository:
                 return genus
     
     def update_distances(self, code: str, distances: dict[str, float], turn: int):
-        """更新属的遗传距离矩阵"""
+        """更新属的遗传距离（兼容旧版 "codeA-codeB" 键）"""
+        legacy = GeneticDistanceMatrix.from_legacy(distances)
+        
+        def apply(matrix: GeneticDistanceMatrix) -> None:
+            for code_a, code_b, distance in legacy.pairs():
+                matrix.set(code_a, code_b, distance)
+        
+        self._modify_matrix(code, apply, turn)
+    
+    def update_distance_row(
+        self,
+        code: str,
+        lineage_code: str,
+        distances: dict[str, float],
+        turn: int,
+    ) -> None:
+        """写入某物种与同属其他物种的距离（分化时追加新行/新列）"""
+        self._modify_matrix(code, lambda matrix: matrix.set_row(lineage_code, distances), turn)
+    
+    def get_distance_matrix(self, code: str) -> GeneticDistanceMatrix | None:
+        """读取单个属的遗传距离矩阵"""
+        genus = self.get_by_code(code)
+        return genus.load_distance_matrix() if genus else None
+    
+    def get_distance_matrices(self) -> dict[str, GeneticDistanceMatrix]:
+        """读取所有属的遗传距离矩阵（属编码 → 矩阵）"""
+        return {genus.code: genus.load_distance_matrix() for genus in self.list_all()}
+    
+    def _modify_matrix(self, code: str, apply, turn: int) -> None:
         with session_scope() as session:
             genus = session.exec(select(Genus).where(Genus.code == code)).first()
             if genus:
-                genus.genetic_distances.update(distances)
+                matrix = genus.load_distance_matrix()
+                apply(matrix)
+                genus.store_distance_matrix(matrix)
                 genus.updated_turn = turn
                 session.add(genus)
                 session.commit()
@@ -1,32 +1,269 @@
-﻿from __future__ import annotations
+from __future__ import annotations
+
+import json
+import logging
+import zlib
+from typing import Any, Iterable, Sequence
 
 from sqlmodel import select
-from sqlalchemy import text
+from sqlalchemy import insert, text
+
+
+from ..core.database import read_session_scope, session_scope
+from ..models.history import TurnLog, TurnPayload, TurnSpeciesStat
+
+logger = logging.getLogger(__name__)
+
+# 可按列投影的回合摘要字段
+TURN_SUMMARY_FIELDS = (
+    "turn_index", "created_at", "pressures_summary",
+    "species_count", "alive_count", "extinct_count",
+    "total_population", "total_deaths", "total_births",
+    "branching_count", "migration_count", "major_event_count",
+    "sea_level", "global_temperature", "tectonic_stage",
+)
+
+# 可按列投影的物种统计字段
+SPECIES_STAT_FIELDS = (
+    "population", "population_share", "deaths", "births", "death_rate",
+    "trophic_level", "total_tiles", "status", "tier",
+)
+
+_PAYLOAD_CODEC = "zlib-json"
+_COMPRESSION_LEVEL = 6
+
+
+def _compress(payload: dict[str, Any]) -> tuple[bytes, int]:
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return zlib.compress(raw, _COMPRESSION_LEVEL), len(raw)
+
+
+def _decompress(payload: TurnPayload) -> dict[str, Any]:
+    if payload.codec != _PAYLOAD_CODEC:
+        raise ValueError(f"未知的回合载荷编码: {payload.codec}")
+    return json.loads(zlib.decompress(payload.data).decode("utf-8"))
+
+
+def _summarize(record: dict[str, Any]) -> dict[str, Any]:
+    """从回合报告中提取标量摘要列"""
+    species = record.get("species") or []
+    return {
+        "species_count": len(species),
+        "alive_count": sum(1 for s in species if s.get("status") == "alive"),
+        "extinct_count": sum(1 for s in species if s.get("status") == "extinct"),
+        "total_population": sum(int(s.get("population") or 0) for s in species),
+        "total_deaths": sum(int(s.get("deaths") or 0) for s in species),
+        "total_births": sum(int(s.get("births") or 0) for s in species),
+        "branching_count": len(record.get("branching_events") or []),
+        "migration_count": len(record.get("migration_events") or []),
+        "major_event_count": len(record.get("major_events") or []),
+        "sea_level": float(record.get("sea_level") or 0.0),
+        "global_temperature": float(record.get("global_temperature", 15.0) or 0.0),
+        "tectonic_stage": record.get("tectonic_stage") or "",
+    }
 
 
-from ..core.database import session_scope
-from ..models.history import TurnLog
+def _species_rows(turn_log_id: int, turn_index: int, record: dict[str, Any]) -> list[dict[str, Any]]:
+    rows = []
+    for s in record.get("species") or []:
+        code = s.get("lineage_code")
+        if not code:
+            continue
+        rows.append({
+            "turn_log_id": turn_log_id,
+            "turn_index": turn_index,
+            "lineage_code": code,
+            "population": int(s.get("population") or 0),
+            "population_share": float(s.get("population_share") or 0.0),
+            "deaths": int(s.get("deaths") or 0),
+            "births": int(s.get("births") or 0),
+            "death_rate": float(s.get("death_rate") or 0.0),
+            "trophic_level": s.get("trophic_level"),
+            "total_tiles": int(s.get("total_tiles") or 0),
+            "status": s.get("status") or "",
+            "tier": s.get("tier"),
+        })
+    return rows
+
+
+def _check_fields(fields: Iterable[str], allowed: Sequence[str]) -> list[str]:
+    fields = list(fields)
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        raise ValueError(f"未知字段: {', '.join(unknown)}（可选: {', '.join(allowed)}）")
+    return fields
 
 
 class HistoryRepository:
+    """回合历史
+
+    turn_logs 只保存标量摘要列；完整报告与叙事 zlib 压缩后存入 turn_payloads，
+    每物种统计存入 turn_species_stats（lineage_code + turn_index 联合索引）：
+    - list_turns(): 最近 N 回合，只解压这 N 条载荷（与旧接口返回值一致）
+    - query_turns(): 回合区间 + 摘要列投影，不读载荷
+    - species_series(): 物种在回合区间内的统计序列，不读载荷
+    - get_report(): 单回合完整报告
+    旧版本写入的记录（报告内联在 record_data）首次查询时自动拆分。
+    """
+
+    def __init__(self) -> None:
+        self._legacy_checked = False
+
     def log_turn(self, turn: TurnLog) -> TurnLog:
+        record = turn.record_data or {}
+        summary = _summarize(record)
+        data, raw_size = _compress({"narrative": turn.narrative, "record_data": record})
         with session_scope() as session:
-            session.add(turn)
+            row = TurnLog(
+                turn_index=turn.turn_index,
+                pressures_summary=turn.pressures_summary,
+                narrative="",
+                record_data={},
+                created_at=turn.created_at,
+                **summary,
+            )
+            session.add(row)
             session.flush()
-            session.refresh(turn)
-            return turn
+            session.add(TurnPayload(
+                turn_log_id=row.id, turn_index=row.turn_index,
+                codec=_PAYLOAD_CODEC, raw_size=raw_size, data=data,
+            ))
+            stats = _species_rows(row.id, row.turn_index, record)
+            if stats:
+                session.execute(insert(TurnSpeciesStat), stats)
+            turn.id = row.id
+        for key, value in summary.items():
+            setattr(turn, key, value)
+        return turn
 
-    def list_turns(self, limit: int = 50) -> list[TurnLog]:
+    def _compact_legacy(self) -> None:
+        """把旧记录（record_data 内联、无载荷）拆分为摘要列 + 压缩载荷 + 物种统计"""
+        if self._legacy_checked:
+            return
         with session_scope() as session:
-            result = session.exec(
-                select(TurnLog).order_by(TurnLog.turn_index.desc()).limit(limit)
-            )
-            return list(result)
+            legacy = session.exec(
+                select(TurnLog).where(TurnLog.id.not_in(select(TurnPayload.turn_log_id)))
+            ).all()
+            for log in legacy:
+                record = log.record_data or {}
+                data, raw_size = _compress({"narrative": log.narrative, "record_data": record})
+                session.add(TurnPayload(
+                    turn_log_id=log.id, turn_index=log.turn_index,
+                    codec=_PAYLOAD_CODEC, raw_size=raw_size, data=data,
+                ))
+                stats = _species_rows(log.id, log.turn_index, record)
+                if stats:
+                    session.execute(insert(TurnSpeciesStat), stats)
+                for key, value in _summarize(record).items():
+                    setattr(log, key, value)
+                log.narrative = ""
+                log.record_data = {}
+                session.add(log)
+        if legacy:
+            logger.info(f"[历史记录] 已拆分 {len(legacy)} 条旧回合记录")
+        self._legacy_checked = True
+
+    def list_turns(self, limit: int = 50) -> list[TurnLog]:
+        """最近 limit 个回合（倒序），record_data / narrative 已从载荷恢复"""
+        self._compact_legacy()
+        with read_session_scope() as session:
+            logs = list(session.exec(
+                select(TurnLog).order_by(TurnLog.turn_index.desc(), TurnLog.id.desc()).limit(limit)
+            ))
+            payloads = {
+                p.turn_log_id: p
+                for p in session.exec(select(TurnPayload).where(TurnPayload.turn_log_id.in_([log.id for log in logs])))
+            } if logs else {}
+        for log in logs:
+            payload = payloads.get(log.id)
+            if payload is not None:
+                content = _decompress(payload)
+                log.narrative = content.get("narrative", "")
+                log.record_data = content.get("record_data", {})
+        return logs
+
+    def query_turns(
+        self,
+        start: int | None = None,
+        end: int | None = None,
+        fields: Iterable[str] | None = None,
+        limit: int | None = None,
+        descending: bool = False,
+    ) -> list[dict[str, Any]]:
+        """按回合区间 [start, end] 查询摘要列（fields 为空时返回全部摘要列）"""
+        fields = _check_fields(fields or TURN_SUMMARY_FIELDS, TURN_SUMMARY_FIELDS)
+        if "turn_index" not in fields:
+            fields.insert(0, "turn_index")
+        self._compact_legacy()
+        stmt = select(*(getattr(TurnLog, f) for f in fields))
+        if start is not None:
+            stmt = stmt.where(TurnLog.turn_index >= start)
+        if end is not None:
+            stmt = stmt.where(TurnLog.turn_index <= end)
+        order = TurnLog.turn_index.desc() if descending else TurnLog.turn_index
+        stmt = stmt.order_by(order, TurnLog.id)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        with read_session_scope() as session:
+            return [dict(zip(fields, row)) for row in session.execute(stmt)]
+
+    def species_series(
+        self,
+        lineage_codes: Iterable[str],
+        start: int | None = None,
+        end: int | None = None,
+        fields: Iterable[str] = ("population",),
+    ) -> dict[str, dict[str, list[Any]]]:
+        """物种统计序列 {code: {"turn_index": [...], field: [...]}}（同一回合多条记录取最后写入的）"""
+        codes = list(dict.fromkeys(lineage_codes))
+        fields = _check_fields(fields, SPECIES_STAT_FIELDS)
+        result: dict[str, dict[str, list[Any]]] = {
+            code: {"turn_index": [], **{f: [] for f in fields}} for code in codes
+        }
+        if not codes:
+            return result
+        self._compact_legacy()
+        stmt = select(
+            TurnSpeciesStat.lineage_code, TurnSpeciesStat.turn_index,
+            *(getattr(TurnSpeciesStat, f) for f in fields),
+        ).where(TurnSpeciesStat.lineage_code.in_(codes))
+        if start is not None:
+            stmt = stmt.where(TurnSpeciesStat.turn_index >= start)
+        if end is not None:
+            stmt = stmt.where(TurnSpeciesStat.turn_index <= end)
+        stmt = stmt.order_by(TurnSpeciesStat.lineage_code, TurnSpeciesStat.turn_index, TurnSpeciesStat.turn_log_id)
+        with read_session_scope() as session:
+            rows = session.execute(stmt).all()
+        for code, turn_index, *values in rows:
+            series = result[code]
+            if series["turn_index"] and series["turn_index"][-1] == turn_index:
+                for f, v in zip(fields, values):
+                    series[f][-1] = v
+                continue
+            series["turn_index"].append(turn_index)
+            for f, v in zip(fields, values):
+                series[f].append(v)
+        return result
+
+    def get_report(self, turn_index: int) -> dict[str, Any] | None:
+        """单回合完整报告（该回合最后写入的一条）"""
+        self._compact_legacy()
+        with read_session_scope() as session:
+            payload = session.exec(
+                select(TurnPayload)
+                .where(TurnPayload.turn_index == turn_index)
+                .order_by(TurnPayload.turn_log_id.desc())
+                .limit(1)
+            ).first()
+        return _decompress(payload).get("record_data") if payload is not None else None
 
     def clear_state(self) -> None:
         """清除所有历史记录（用于读档前）"""
         with session_scope() as session:
+            session.exec(text("DELETE FROM turn_species_stats"))
+            session.exec(text("DELETE FROM turn_payloads"))
             session.exec(text("DELETE FROM turn_logs"))
+        self._legacy_checked = True
 
 
 
@@ -1,15 +1,111 @@
 ﻿from __future__ import annotations
 
-from collections.abc import Iterable
-from typing import Optional
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from typing import Any, ContextManager, Optional
 
-from sqlmodel import select, func
-from sqlalchemy import text
+from sqlmodel import Session, select, func
+from sqlalchemy import bindparam, text, update
 
 
-from ..core.database import session_scope
+from ..core.database import bulk_save, read_session_scope, session_scope
 from ..models.species import LineageEvent, PopulationSnapshot, Species
 
+logger = logging.getLogger(__name__)
+
+
+class SpeciesUnitOfWork:
+    """回合内的物种写回单元
+
+    回合期间 upsert 已有物种时只登记对象（同一 id 以最后一次登记的对象为准），
+    不再逐个 merge/flush/refresh。flush() 时：
+    - 一次查询读出这些物种的库内值，逐列比较找出真正变化的物种与字段
+    - 所有变化行用一条 executemany UPDATE 写回（SET 变化字段的并集）
+    - 库中已不存在的行（如被清档）按 bulk_save 重新插入
+    """
+
+    def __init__(self, session_factory: Callable[[], ContextManager[Session]] = session_scope) -> None:
+        self._session_factory = session_factory
+        self._pending: dict[int, Species] = {}
+        self._lock = threading.Lock()
+        self.last_flush: dict[str, Any] = {}
+
+    def register(self, species: Species) -> None:
+        with self._lock:
+            self._pending[species.id] = species
+
+    def has_pending(self, predicate: Callable[[Species], bool] | None = None) -> bool:
+        with self._lock:
+            if predicate is None:
+                return bool(self._pending)
+            return any(predicate(sp) for sp in self._pending.values())
+
+    def discard(self) -> None:
+        with self._lock:
+            self._pending.clear()
+
+    def flush(self) -> dict[str, Any]:
+        """写回所有登记的物种，返回统计 {registered, updated, inserted, columns, elapsed_ms}"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return {"registered": 0, "updated": 0, "inserted": 0, "columns": [], "elapsed_ms": 0.0}
+
+        start = time.perf_counter()
+        table = Species.__table__
+        columns = [c.key for c in table.columns if c.key != "id"]
+        with self._session_factory() as session:
+            stored = {
+                row.id: row
+                for row in session.exec(select(Species).where(Species.id.in_(list(pending))))
+            }
+            session.expunge_all()
+
+            changed: dict[int, set[str]] = {}
+            missing: list[Species] = []
+            for species_id, species in pending.items():
+                row = stored.get(species_id)
+                if row is None:
+                    missing.append(species)
+                    continue
+                diff = {name for name in columns if getattr(species, name) != getattr(row, name)}
+                if diff:
+                    changed[species_id] = diff
+
+            dirty_columns = sorted(set().union(*changed.values())) if changed else []
+            if changed:
+                stmt = (
+                    update(table)
+                    .where(table.c.id == bindparam("_id"))
+                    .values({name: bindparam(f"_v_{name}") for name in dirty_columns})
+                )
+                session.execute(stmt, [
+                    {"_id": species_id, **{f"_v_{name}": getattr(pending[species_id], name) for name in dirty_columns}}
+                    for species_id in changed
+                ])
+            if missing:
+                bulk_save(session, missing)
+
+        self.last_flush = {
+            "registered": len(pending),
+            "updated": len(changed),
+            "inserted": len(missing),
+            "columns": dirty_columns,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+        logger.debug(
+            f"[物种写回] 登记 {len(pending)}，更新 {len(changed)}（字段 {dirty_columns}），"
+            f"补插 {len(missing)}，耗时 {self.last_flush['elapsed_ms']}ms"
+        )
+        return self.last_flush
+
+
+# 当前回合的写回单元（所有 SpeciesRepository 实例共享；仅支持单 Worker）
+_unit_of_work: SpeciesUnitOfWork | None = None
+
 
 class SpeciesRepository:
     """Data access helpers for species and populations."""
@@ -28,7 +124,8 @@ class SpeciesRepository:
             limit: 可选，返回数量限制
             offset: 分页偏移量
         """
-        with session_scope() as session:
+        self._autoflush()
+        with read_session_scope() as session:
             query = select(Species)
             
             if status:
@@ -44,7 +141,8 @@ class SpeciesRepository:
     
     def count_species(self, status: Optional[str] = None, prefix: Optional[str] = None) -> int:
         """获取物种总数（用于分页）"""
-        with session_scope() as session:
+        self._autoflush()
+        with read_session_scope() as session:
             query = select(func.count(Species.id))
             if status:
                 query = query.where(Species.status == status)
@@ -62,7 +160,7 @@ class SpeciesRepository:
         if not species_ids:
             return {}
         
-        with session_scope() as session:
+        with read_session_scope() as session:
             # 单次查询获取所有物种的峰值人口和最后回合
             query = (
                 select(
@@ -89,7 +187,8 @@ class SpeciesRepository:
         return self.list_species()
 
     def get_by_lineage(self, lineage_code: str) -> Species | None:
-        with session_scope() as session:
+        self._autoflush(lambda sp: sp.lineage_code == lineage_code)
+        with read_session_scope() as session:
             return session.exec(
                 select(Species).where(Species.lineage_code == lineage_code)
             ).first()
@@ -99,12 +198,59 @@ class SpeciesRepository:
         return self.get_by_lineage(code)
 
     def upsert(self, species: Species) -> Species:
+        uow = _unit_of_work
+        if uow is not None and species.id is not None:
+            # 回合内：只登记，回合结束时批量写回
+            uow.register(species)
+            return species
         with session_scope() as session:
             merged = session.merge(species)
             session.flush()
             session.refresh(merged)
             return merged
 
+    def upsert_many(self, species_list: Iterable[Species]) -> list[Species]:
+        """批量写入物种（executemany），新物种的 id 会回填到对象上"""
+        species_list = list(species_list)
+        new_species = species_list
+        uow = _unit_of_work
+        if uow is not None:
+            for species in species_list:
+                if species.id is not None:
+                    uow.register(species)
+            new_species = [sp for sp in species_list if sp.id is None]
+        with session_scope() as session:
+            bulk_save(session, new_species)
+        return species_list
+
+    # ==================== 回合写回单元 ====================
+
+    @contextmanager
+    def unit_of_work(self) -> Iterator[SpeciesUnitOfWork]:
+        """回合范围：期间对已有物种的 upsert 延迟到退出时一次写回（可嵌套，外层负责写回）"""
+        global _unit_of_work
+        if _unit_of_work is not None:
+            yield _unit_of_work
+            return
+        uow = SpeciesUnitOfWork()
+        _unit_of_work = uow
+        try:
+            yield uow
+        finally:
+            _unit_of_work = None
+            uow.flush()
+
+    def flush_pending(self) -> dict[str, Any]:
+        """立即写回当前回合已登记的物种"""
+        uow = _unit_of_work
+        return uow.flush() if uow is not None else {}
+
+    def _autoflush(self, predicate: Callable[[Species], bool] | None = None) -> None:
+        """查询前写回会影响结果的登记对象，保证回合内读到最新数据"""
+        uow = _unit_of_work
+        if uow is not None and uow.has_pending(predicate):
+            uow.flush()
+
     def add_population_snapshots(
         self, snapshots: Iterable[PopulationSnapshot]
     ) -> None:
@@ -118,6 +264,8 @@ class SpeciesRepository:
 
     def clear_state(self) -> None:
         """清除所有物种相关数据（用于读档/重置）"""
+        if _unit_of_work is not None:
+            _unit_of_work.discard()
         with session_scope() as session:
             session.exec(text("DELETE FROM population_snapshots"))
             session.exec(text("DELETE FROM lineage_events"))
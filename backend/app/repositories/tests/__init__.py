@@ -0,0 +1 @@
+"""仓储层测试"""
@@ -0,0 +1,67 @@
+"""
+环境仓储批量写入测试
+
+验证批量地块写入会推进地块写入日志版本，批量栖息地写入不触碰地块日志。
+"""
+
+from contextlib import contextmanager
+
+import pytest
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from ...models import environment, genus, history, species  # noqa: F401
+from ...models.environment import HabitatPopulation
+from .. import environment_repository as module
+from ..environment_repository import EnvironmentRepository
+
+
+def _tile(tile_id: int) -> dict:
+    return {
+        "id": tile_id, "x": tile_id, "y": 0, "biome": "平原", "elevation": 100.0,
+        "cover": "草地", "temperature": 15.0, "humidity": 0.5, "resources": 100.0,
+    }
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{(tmp_path / 'env.db').as_posix()}")
+    SQLModel.metadata.create_all(engine)
+
+    @contextmanager
+    def scope():
+        session = Session(engine, expire_on_commit=False)
+        try:
+            yield session
+            session.commit()
+        finally:
+            session.close()
+
+    monkeypatch.setattr(module, "session_scope", scope)
+    monkeypatch.setattr(module, "read_session_scope", scope)
+    repository = EnvironmentRepository()
+    repository.engine = engine
+    return repository
+
+
+def test_upsert_tiles_bulk_records_tile_changes(repo):
+    version = repo.tile_changes.version
+    assert repo.upsert_tiles_bulk([_tile(1), _tile(2)]) == 2
+    assert repo.tile_changes.version > version
+
+    version = repo.tile_changes.version
+    repo.upsert_tiles_bulk([{**_tile(1), "temperature": 30.0}])
+    assert repo.tile_changes.version > version
+    assert {tile.id: tile.temperature for tile in repo.list_tiles()} == {1: 30.0, 2: 15.0}
+
+
+def test_write_habitats_bulk_leaves_tile_log_alone(repo):
+    repo.upsert_tiles_bulk([_tile(1), _tile(2)])
+    version = repo.tile_changes.version
+    habitats = [
+        {"tile_id": tile_id, "species_id": 1, "population": 100, "suitability": 0.5, "turn_index": 0}
+        for tile_id in (1, 2)
+    ]
+    assert repo.write_habitats_bulk(habitats) == 2
+    assert repo.tile_changes.version == version
+    with Session(repo.engine) as session:
+        assert len(session.exec(select(HabitatPopulation)).all()) == 2
@@ -0,0 +1,116 @@
+"""
+回合历史仓储测试
+
+验证摘要列 / 压缩载荷 / 物种统计的拆分写入、区间与投影查询不读载荷、
+list_turns 与旧接口返回值一致，以及旧记录的自动拆分。
+"""
+
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from ...models import environment, genus, history, species  # noqa: F401
+from ...models.history import TurnLog, TurnPayload, TurnSpeciesStat
+from .. import history_repository as module
+from ..history_repository import HistoryRepository
+
+
+def _record(turn: int) -> dict:
+    return {
+        "turn_index": turn,
+        "pressures_summary": f"压力 {turn}",
+        "narrative": "很长的叙事" * 50,
+        "species": [
+            {"lineage_code": "A1", "population": 1000 + turn, "deaths": 10, "births": 20, "status": "alive"},
+            {"lineage_code": "B1", "population": 50, "deaths": 50, "status": "extinct" if turn > 2 else "alive"},
+        ],
+        "branching_events": [{"x": 1}] if turn == 1 else [],
+        "sea_level": 1.5,
+    }
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{(tmp_path / 'h.db').as_posix()}")
+    SQLModel.metadata.create_all(engine)
+    statements: list[str] = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _record_sql(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    @contextmanager
+    def scope():
+        session = Session(engine, expire_on_commit=False)
+        try:
+            yield session
+            session.commit()
+        finally:
+            session.close()
+
+    monkeypatch.setattr(module, "session_scope", scope)
+    monkeypatch.setattr(module, "read_session_scope", scope)
+    repository = HistoryRepository()
+    repository.engine = engine
+    repository.statements = statements
+    return repository
+
+
+def _log(repo, turn: int) -> TurnLog:
+    record = _record(turn)
+    return repo.log_turn(TurnLog(
+        turn_index=turn, pressures_summary=record["pressures_summary"],
+        narrative=record["narrative"], record_data=record,
+    ))
+
+
+def test_split_write_and_list_turns(repo):
+    for turn in range(5):
+        _log(repo, turn)
+
+    with Session(repo.engine) as session:
+        row = session.exec(select(TurnLog).where(TurnLog.turn_index == 3)).one()
+        payload = session.exec(select(TurnPayload).where(TurnPayload.turn_log_id == row.id)).one()
+        assert row.record_data == {} and row.narrative == ""
+        assert row.alive_count == 1 and row.extinct_count == 1 and row.total_population == 1053
+        assert len(payload.data) < payload.raw_size
+        assert len(session.exec(select(TurnSpeciesStat)).all()) == 10
+
+    logs = repo.list_turns(limit=2)
+    assert [log.turn_index for log in logs] == [4, 3]
+    assert logs[0].record_data == _record(4) and logs[0].narrative == _record(4)["narrative"]
+    assert repo.get_report(1)["branching_events"] == [{"x": 1}]
+    assert repo.get_report(99) is None
+
+
+def test_range_and_projection_queries_skip_payloads(repo):
+    for turn in range(10):
+        _log(repo, turn)
+    repo.list_turns(limit=1)  # 旧记录检查只做一次
+    repo.statements.clear()
+
+    turns = repo.query_turns(3, 5, ["total_population"])
+    assert turns == [{"turn_index": t, "total_population": 1050 + t} for t in range(3, 6)]
+    series = repo.species_series(["A1", "Z9"], start=7, fields=["population", "deaths"])
+    assert series["A1"] == {"turn_index": [7, 8, 9], "population": [1007, 1008, 1009], "deaths": [10, 10, 10]}
+    assert series["Z9"]["turn_index"] == []
+    assert not any("turn_payloads" in s for s in repo.statements)
+
+    with pytest.raises(ValueError):
+        repo.query_turns(fields=["narrative"])
+    with pytest.raises(ValueError):
+        repo.species_series(["A1"], fields=["abstract_traits"])
+
+
+def test_legacy_rows_are_compacted(repo):
+    with Session(repo.engine) as session:
+        record = _record(7)
+        session.add(TurnLog(turn_index=7, pressures_summary="旧", narrative="旧叙事", record_data=record))
+        session.commit()
+
+    assert repo.query_turns(fields=["species_count"]) == [{"turn_index": 7, "species_count": 2}]
+    assert repo.species_series(["A1"])["A1"]["population"] == [1007]
+    (log,) = repo.list_turns()
+    assert log.narrative == "旧叙事" and log.record_data == record
@@ -168,3 +168,13 @@ class ActivateDormantGeneRequest(BaseModel):
     """激活休眠基因请求"""
     gene_type: Literal["trait", "organ"] = Field(description="基因类型: trait(特质) 或 organ(器官)")
     name: str = Field(min_length=1, max_length=50, description="要激活的基因名称")
+
+
+# ========== 系统诊断请求 ==========
+
+class StageProfilingRequest(BaseModel):
+    """阶段剖析配置请求"""
+    memory: bool | None = Field(default=None, description="开启/关闭逐阶段内存剖析（不传则保持不变）")
+    top_allocators: int | None = Field(default=None, ge=0, le=50, description="每阶段记录的分配热点数")
+    profile_turn: int | None = Field(default=None, ge=0, description="对指定回合做采样剖析（折叠栈）")
+    clear_profile_turn: bool = Field(default=False, description="取消已设置的采样回合")
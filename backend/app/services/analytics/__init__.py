@@ -14,6 +14,7 @@ from .report_builder_v2 import ReportBuilderV2
 # 新增服务
 from .ecosystem_metrics import EcosystemMetricsService, get_ecosystem_metrics_service
 from .population_snapshot import PopulationSnapshotService, create_population_snapshot_service
+from .population_series import PopulationSeriesStore, get_population_series
 from .turn_report import TurnReportService, create_turn_report_service
 
 __all__ = [
@@ -60,6 +61,8 @@ __all__ = [
     # 种群快照
     "PopulationSnapshotService",
     "create_population_snapshot_service",
+    "PopulationSeriesStore",
+    "get_population_series",
     # 回合报告
     "TurnReportService",
     "create_turn_report_service",
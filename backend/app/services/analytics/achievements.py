@@ -18,6 +18,8 @@ from enum import Enum
 from pathlib import Path
 from typing import TYPE_CHECKING, Sequence
 
+from .species_ledger import SpeciesLedger
+
 if TYPE_CHECKING:
     from ...models.species import Species
     from ...schemas.responses import TurnReport
@@ -307,6 +309,7 @@ class AchievementService:
     """成就服务
     
     跟踪玩家进度并解锁成就。
+    物种相关统计由 SpeciesLedger 按回合增量维护；进度有变化时才写盘。
     """
     
     def __init__(self, data_dir: Path | str | None = None):
@@ -320,6 +323,11 @@ class AchievementService:
         self._min_species_count: int = 999
         self._exploration_flags: set[str] = set()
         
+        # 增量物种账本：只对新生/灭绝/变化的物种更新聚合
+        self._ledger = SpeciesLedger()
+        # 进度有变化才写盘
+        self._dirty = False
+        
         # 加载进度
         self._load_progress()
     
@@ -352,7 +360,9 @@ class AchievementService:
                 logger.warning(f"[成就] 加载进度失败: {e}")
     
     def _save_progress(self) -> None:
-        """保存成就进度"""
+        """保存成就进度（无变化时跳过写盘）"""
+        if not self._dirty:
+            return
         progress_file = self._get_progress_file()
         progress_file.parent.mkdir(parents=True, exist_ok=True)
         
@@ -374,6 +384,7 @@ class AchievementService:
         
         with open(progress_file, "w", encoding="utf-8") as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
+        self._dirty = False
     
     def _get_progress(self, achievement_id: str) -> AchievementProgress:
         """获取成就进度（不存在则创建）"""
@@ -401,6 +412,7 @@ class AchievementService:
             timestamp=progress.unlock_time,
         )
         self._pending_unlocks.append(event)
+        self._dirty = True
         self._save_progress()
         
         logger.info(f"[成就] 解锁: {achievement.name} ({achievement.icon})")
@@ -417,12 +429,13 @@ class AchievementService:
         if progress.unlocked:
             return None
         
-        progress.current_value = max(progress.current_value, value)
+        if value <= progress.current_value:
+            return None
+        progress.current_value = value
+        self._dirty = True
         
         if progress.current_value >= achievement.target_value:
             return self._unlock(achievement_id, turn_index)
-        
-        self._save_progress()
         return None
     
     def check_after_turn(
@@ -444,8 +457,9 @@ class AchievementService:
         self._pending_unlocks.clear()
         turn_index = report.turn_index
         
-        alive_species = [sp for sp in all_species if sp.status == "alive"]
-        alive_count = len(alive_species)
+        delta = self._ledger.sync(all_species)
+        ledger = self._ledger
+        alive_count = len(ledger)
         
         # === 回合相关 ===
         
@@ -469,67 +483,51 @@ class AchievementService:
             self._unlock("first_speciation", turn_index)
         
         # 杂交物种
-        for sp in alive_species:
-            if sp.hybrid_parent_codes:
-                self._unlock("hybrid_creator", turn_index)
-                break
+        if ledger.hybrid_count > 0:
+            self._unlock("hybrid_creator", turn_index)
         
         # 顶级捕食者
-        for sp in alive_species:
-            if sp.trophic_level >= 5.0:
-                self._unlock("apex_predator", turn_index)
-                break
+        if ledger.apex_count > 0:
+            self._unlock("apex_predator", turn_index)
         
-        # 种群数量
-        for sp in alive_species:
-            pop = sp.morphology_stats.get("population", 0) or 0
-            self._update_progress("population_million", pop, turn_index)
-            self._update_progress("population_billion", pop, turn_index)
+        # 种群数量（进度取历史最大值，只需检查本回合新生/变化的物种）
+        if delta:
+            _, max_pop = ledger.max_population()
+            self._update_progress("population_million", max_pop, turn_index)
+            self._update_progress("population_billion", max_pop, turn_index)
         
         # 活化石
-        for sp in alive_species:
-            age = turn_index - (sp.created_turn or 0)
-            self._update_progress("ancient_species", age, turn_index)
+        oldest = ledger.oldest_created_turn()
+        if oldest is not None:
+            self._update_progress("ancient_species", turn_index - oldest, turn_index)
         
         # === 生态系统相关 ===
         
         # 完整食物链
-        trophic_levels = set()
-        for sp in alive_species:
-            level = int(sp.trophic_level)
-            if 1 <= level <= 4:
-                trophic_levels.add(level)
-        if len(trophic_levels) >= 4:
+        if all(ledger.trophic_members.get(level) for level in range(1, 5)):
             self._unlock("all_trophic_levels", turn_index)
         
         # 食物网
-        total_links = sum(len(sp.prey_species or []) for sp in alive_species)
-        self._update_progress("food_web_10", total_links, turn_index)
-        self._update_progress("food_web_30", total_links, turn_index)
-        
-        # 关键物种
-        prey_count: dict[str, int] = {}
-        for sp in alive_species:
-            for prey_code in (sp.prey_species or []):
-                prey_count[prey_code] = prey_count.get(prey_code, 0) + 1
-        max_dependents = max(prey_count.values()) if prey_count else 0
+        self._update_progress("food_web_10", ledger.total_links, turn_index)
+        self._update_progress("food_web_30", ledger.total_links, turn_index)
+        
+        # 关键物种（只检查被依赖数发生变化的猎物）
+        max_dependents = max((ledger.dependents.get(code, 0) for code in delta.touched_prey), default=0)
         self._update_progress("keystone_species", max_dependents, turn_index)
         
         # 生态霸主
-        if alive_species:
-            total_pop = sum(sp.morphology_stats.get("population", 0) or 0 for sp in alive_species)
-            if total_pop > 0:
-                for sp in alive_species:
-                    pop = sp.morphology_stats.get("population", 0) or 0
-                    if pop / total_pop > 0.5:
-                        self._unlock("domination", turn_index)
-                        break
+        if ledger.total_population > 0:
+            _, max_pop = ledger.max_population()
+            if max_pop / ledger.total_population > 0.5:
+                self._unlock("domination", turn_index)
         
         # === 灾难相关 ===
         
         # 记录使用的压力
-        for kind in pressure_kinds:
-            self._used_pressure_kinds.add(kind)
+        new_kinds = set(pressure_kinds) - self._used_pressure_kinds
+        if new_kinds:
+            self._used_pressure_kinds |= new_kinds
+            self._dirty = True
         self._update_progress("pressure_master", len(self._used_pressure_kinds), turn_index)
         
         # 灭绝统计
@@ -541,17 +539,20 @@ class AchievementService:
             if alive_count > 0:
                 self._unlock("survivor", turn_index)
         
-        # 连续无灭绝
-        if extinctions_this_turn == 0:
-            self._consecutive_no_extinction += 1
-        else:
-            self._consecutive_no_extinction = 0
+        # 连续无灭绝（计数封顶于目标值，达成后不再变化也就不再写盘）
+        target = ACHIEVEMENTS["no_extinction_10"].target_value
+        streak = min(self._consecutive_no_extinction + 1, target) if extinctions_this_turn == 0 else 0
+        if streak != self._consecutive_no_extinction:
+            self._consecutive_no_extinction = streak
+            self._dirty = True
         self._update_progress("no_extinction_10", self._consecutive_no_extinction, turn_index)
         
         # 浴火重生
         if self._min_species_count <= 1 and alive_count >= 10:
             self._unlock("phoenix", turn_index)
-        self._min_species_count = min(self._min_species_count, alive_count)
+        if alive_count < self._min_species_count:
+            self._min_species_count = alive_count
+            self._dirty = True
         
         self._save_progress()
         return self._pending_unlocks.copy()
@@ -567,8 +568,12 @@ class AchievementService:
             feature: 功能名称 (genealogy, foodweb, niche)
             turn_index: 当前回合
         """
-        self._exploration_flags.add(feature)
-        return self._update_progress("explorer", len(self._exploration_flags), turn_index)
+        if feature not in self._exploration_flags:
+            self._exploration_flags.add(feature)
+            self._dirty = True
+        event = self._update_progress("explorer", len(self._exploration_flags), turn_index)
+        self._save_progress()
+        return event
     
     def record_ecosystem_health(self, grade: str, turn_index: int) -> AchievementUnlockEvent | None:
         """记录生态系统健康评级"""
@@ -615,6 +620,8 @@ class AchievementService:
         self._used_pressure_kinds.clear()
         self._min_species_count = 999
         self._exploration_flags.clear()
+        self._ledger.clear()
+        self._dirty = False
         
         progress_file = self._get_progress_file()
         if progress_file.exists():
@@ -1,31 +1,49 @@
 from __future__ import annotations
 
-import asyncio
 import logging
 
 from typing import Callable
 
-from ...ai.model_router import ModelRouter, staggered_gather
+from ...ai.model_router import ModelRouter
 from ...simulation.species import MortalityResult
+from .prompt_batcher import DEFAULT_MAX_ITEMS, DEFAULT_TOKEN_BUDGET, PromptBatcher
 
 logger = logging.getLogger(__name__)
 
 
 class CriticalAnalyzer:
-    """针对玩家关注的物种（Critical 层）逐个调用 AI 模型补充细化叙事。
+    """针对玩家关注的物种（Critical 层）调用 AI 模型补充细化叙事。
     
     这是最高级别的 AI 处理，为每个 critical 物种提供详细的个性化分析。
     通常 critical 层最多包含3个玩家主动标记的物种。
     
-    【优化】使用间隔并行执行，兼顾效率和稳定性。
+    【优化】按 token 预算把多个物种打包进一次 critical_detail_batch 调用，
+    按 lineage_code 拆分响应；缺失的物种再用 critical_detail 单独重试。
     """
 
-    def __init__(self, router: ModelRouter) -> None:
+    def __init__(
+        self,
+        router: ModelRouter,
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+        max_items: int = DEFAULT_MAX_ITEMS,
+    ) -> None:
         self.router = router
+        self.batcher = PromptBatcher(
+            router,
+            "critical_detail_batch",
+            retry_capability="critical_detail",
+            retry_payload=lambda entry: entry,
+            token_budget=token_budget,
+            max_items=max_items,
+            timeout=90,
+            retry_timeout=60,
+            interval=0.5,
+            task_name="Critical分析",
+        )
 
-    async def _process_item(self, item: MortalityResult) -> dict:
-        """处理单个物种（带超时保护）"""
-        payload = {
+    @staticmethod
+    def _entry(item: MortalityResult) -> dict:
+        return {
             "lineage_code": item.species.lineage_code,
             "population": item.survivors,
             "deaths": item.deaths,
@@ -35,60 +53,25 @@ class CriticalAnalyzer:
                 "saturation": item.resource_pressure,
             },
         }
-        
-        # 【优化】使用带心跳的调用
-        from ...ai.streaming_helper import invoke_with_heartbeat
-        
-        try:
-            response = await invoke_with_heartbeat(
-                router=self.router,
-                capability="critical_detail",
-                payload=payload,
-                task_name=f"Critical分析[{item.species.common_name[:8]}]",
-                timeout=60,
-                heartbeat_interval=2.0,
-            )
-            return response
-        except asyncio.TimeoutError:
-            logger.error(f"[Critical] {item.species.common_name} AI调用超时")
-            return {"error": "timeout", "content": {"summary": "分析超时，请稍后重试"}}
 
     async def enhance_async(
         self, 
         results: list[MortalityResult],
         event_callback: Callable[[str, str, str], None] | None = None
     ) -> None:
-        """为 critical 层物种的死亡率结果添加 AI 生成的详细叙事（间隔并行执行）。"""
+        """为 critical 层物种的死亡率结果添加 AI 生成的详细叙事（多物种批量调用）。"""
         if not results:
             return
         
-        logger.info(f"[Critical增润] 开始处理 {len(results)} 个物种（间隔并行）")
-        
-        # 【优化】间隔并行执行，每1秒启动一个，最多同时2个
-        coroutines = [self._process_item(item) for item in results]
-        responses = await staggered_gather(
-            coroutines,
-            interval=0.5,  # 【提升】间隔从 1.0 缩短到 0.5
-            max_concurrent=10,  # 【提升】并发从 2 提升到 10
-            task_name="Critical分析",
-            event_callback=event_callback  # 【新增】传递心跳回调
+        logger.info(f"[Critical增润] 开始处理 {len(results)} 个物种（批量Prompt）")
+        summaries = await self.batcher.run(
+            [self._entry(item) for item in results],
+            event_callback=event_callback,
         )
         
         # 处理结果
-        for idx, (item, response) in enumerate(zip(results, responses)):
-            if isinstance(response, Exception):
-                logger.warning(f"[Critical增润] {item.species.common_name} 处理失败: {response}")
-                item.notes.append("重要物种细化完成")
-                continue
-            
-            # 从响应中提取 content
-            content = response.get("content") if isinstance(response, dict) else None
-            if isinstance(content, dict):
-                summary = content.get("summary") or content.get("text") or "重要物种细化完成"
-            elif isinstance(content, str):
-                summary = content
-            else:
-                summary = "重要物种细化完成"
+        for item, summary in zip(results, summaries):
+            summary = summary or "重要物种细化完成"
             item.notes.append(str(summary))
             
             # 持久化高光时刻到物种历史
@@ -15,8 +15,11 @@ import logging
 import random
 from dataclasses import dataclass, field
 from enum import Enum
+from itertools import islice
 from typing import TYPE_CHECKING, Sequence
 
+from .species_ledger import SpeciesDelta, SpeciesLedger
+
 if TYPE_CHECKING:
     from ...models.species import Species
     from ...schemas.responses import TurnReport
@@ -68,6 +71,8 @@ class GameHintsService:
     """智能游戏提示服务
     
     分析游戏状态并生成有用的提示。
+    物种状态通过 SpeciesLedger 增量维护：濒危、分化条件、食物来源等逐物种判断
+    只对新生/灭绝/变化的物种重新评估，分组类判断直接读取账本聚合。
     """
     
     # 优先级权重（用于排序）
@@ -86,6 +91,11 @@ class GameHintsService:
         self.max_hints = max_hints
         self._last_hints: list[GameHint] = []
         self._hint_cooldown: dict[str, int] = {}  # 提示冷却（避免重复）
+        self._ledger = SpeciesLedger()
+        # 逐物种判断的结果（随增量更新）
+        self._endangered: set[str] = set()
+        self._ripe: set[str] = set()  # 种群庞大且承压，可能分化
+        self._food_alerts: dict[str, list[str]] = {}  # 捕食者 -> 存活猎物（0 或 1 个）
     
     def generate_hints(
         self,
@@ -97,7 +107,7 @@ class GameHintsService:
         """生成游戏提示
         
         Args:
-            all_species: 所有物种
+            all_species: 所有物种（与上次调用比对，只对增量重新评估）
             current_turn: 当前回合
             recent_report: 最近的回合报告
             previous_report: 上一回合报告（用于比较）
@@ -106,7 +116,7 @@ class GameHintsService:
             提示列表（按优先级排序）
         """
         hints: list[GameHint] = []
-        alive_species = [sp for sp in all_species if getattr(sp, "status", None) == "alive"]
+        self._apply_delta(self._ledger.sync(all_species))
         
         # 更新冷却
         expired_keys = [k for k, v in self._hint_cooldown.items() if v <= current_turn]
@@ -115,12 +125,12 @@ class GameHintsService:
         
         # === 分阶段生成，防御性捕获单个阶段的异常，避免整个接口 500 ===
         generators = [
-            ("endangered", self._check_endangered_species, (alive_species, current_turn)),
-            ("ecosystem", self._check_ecosystem_balance, (alive_species, current_turn)),
-            ("evolution", self._check_evolution_opportunities, (alive_species, current_turn, recent_report)),
-            ("competition", self._check_competition, (alive_species, current_turn)),
-            ("food_chain", self._check_food_chain, (alive_species, current_turn)),
-            ("biodiversity", self._check_biodiversity, (alive_species, current_turn, recent_report, previous_report)),
+            ("endangered", self._check_endangered_species, (current_turn,)),
+            ("ecosystem", self._check_ecosystem_balance, (current_turn,)),
+            ("evolution", self._check_evolution_opportunities, (current_turn, recent_report)),
+            ("competition", self._check_competition, (current_turn,)),
+            ("food_chain", self._check_food_chain, (current_turn,)),
+            ("biodiversity", self._check_biodiversity, (current_turn, recent_report, previous_report)),
         ]
         for name, fn, args in generators:
             try:
@@ -151,30 +161,31 @@ class GameHintsService:
         species_key = "_".join(sorted(hint.related_species[:2])) if hint.related_species else ""
         return f"{hint.hint_type.value}:{hint.title}:{species_key}"
     
-    def _get_population(self, sp: "Species") -> int:
-        """安全获取种群数量，避免脏数据导致异常"""
-        stats = getattr(sp, "morphology_stats", None) or {}
-        try:
-            return int(stats.get("population", 0) or 0)
-        except Exception as exc:  # 防御性兜底，避免提示接口 500
-            logger.warning(f"[提示] population 数据异常: {exc}")
-            return 0
-
-    def _get_trophic_level(self, sp: "Species") -> float:
-        """安全获取营养级，缺失时回退为生产者"""
-        try:
-            level = getattr(sp, "trophic_level", None)
-            return float(level) if level is not None else 1.0
-        except Exception as exc:
-            logger.warning(f"[提示] trophic_level 数据异常: {exc}")
-            return 1.0
+    def _apply_delta(self, delta: SpeciesDelta) -> None:
+        """按增量更新逐物种判断结果"""
+        ledger = self._ledger
+        for code in delta.extinct:
+            self._endangered.discard(code)
+            self._ripe.discard(code)
+            self._food_alerts.pop(code, None)
+        for code in delta.updated:
+            record = ledger.records[code]
+            _toggle(self._endangered, code, record.population < 1000)
+            _toggle(self._ripe, code, record.population > 100000 and record.stress_count > 3)
+        for code in ledger.affected_predators(delta):
+            record = ledger.records[code]
+            alive_prey = ledger.alive_prey(record) if record.trophic_level >= 2 else []
+            if record.trophic_level >= 2 and record.prey and len(alive_prey) <= 1:
+                self._food_alerts[code] = alive_prey
+            else:
+                self._food_alerts.pop(code, None)
 
-    def _check_endangered_species(self, alive_species: Sequence["Species"], turn: int) -> list[GameHint]:
+    def _check_endangered_species(self, turn: int) -> list[GameHint]:
         """检查濒危物种"""
         hints = []
         
-        for sp in alive_species:
-            pop = self._get_population(sp)
+        for sp in self._ledger.ordered(self._endangered):
+            pop = sp.population
             
             # 极度濒危（<100）
             if pop < 100 and pop > 0:
@@ -182,9 +193,9 @@ class GameHintsService:
                     hint_type=HintType.WARNING,
                     priority=HintPriority.CRITICAL,
                     title="物种濒临灭绝",
-                    message=f"{sp.common_name}（{sp.lineage_code}）种群仅剩 {pop:,} 个体，随时可能灭绝！",
+                    message=f"{sp.name}（{sp.code}）种群仅剩 {pop:,} 个体，随时可能灭绝！",
                     icon="🆘",
-                    related_species=[sp.lineage_code],
+                    related_species=[sp.code],
                     suggested_actions=[
                         "考虑使用「保护」干预降低死亡率",
                         "减少对该栖息地的环境压力",
@@ -197,9 +208,9 @@ class GameHintsService:
                     hint_type=HintType.WARNING,
                     priority=HintPriority.HIGH,
                     title="物种数量告急",
-                    message=f"{sp.common_name} 种群下降至 {pop:,}，需要关注。",
+                    message=f"{sp.name} 种群下降至 {pop:,}，需要关注。",
                     icon="⚠️",
-                    related_species=[sp.lineage_code],
+                    related_species=[sp.code],
                     suggested_actions=[
                         "观察种群趋势",
                         "检查生态位竞争情况"
@@ -208,16 +219,17 @@ class GameHintsService:
         
         return hints
     
-    def _check_ecosystem_balance(self, alive_species: Sequence["Species"], turn: int) -> list[GameHint]:
+    def _check_ecosystem_balance(self, turn: int) -> list[GameHint]:
         """检查生态系统平衡"""
         hints = []
+        ledger = self._ledger
         
-        if len(alive_species) < 3:
+        if len(ledger) < 3:
             hints.append(GameHint(
                 hint_type=HintType.ECOSYSTEM,
                 priority=HintPriority.HIGH,
                 title="生态系统脆弱",
-                message=f"当前仅有 {len(alive_species)} 个存活物种，生态系统极不稳定。",
+                message=f"当前仅有 {len(ledger)} 个存活物种，生态系统极不稳定。",
                 icon="🏜️",
                 suggested_actions=[
                     "考虑引入新物种丰富生态系统",
@@ -228,9 +240,8 @@ class GameHintsService:
         
         # 统计营养级分布
         trophic_counts = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-        for sp in alive_species:
-            level = min(5, max(1, int(self._get_trophic_level(sp))))
-            trophic_counts[level] += 1
+        for level, members in ledger.trophic_members.items():
+            trophic_counts[min(5, max(1, level))] += len(members)
         
         # 检查生产者不足
         if trophic_counts[1] == 0:
@@ -256,14 +267,8 @@ class GameHintsService:
             ))
         
         # 检查消费者过多
-        producers_pop = sum(
-            self._get_population(sp)
-            for sp in alive_species if self._get_trophic_level(sp) < 2
-        )
-        consumers_pop = sum(
-            self._get_population(sp)
-            for sp in alive_species if self._get_trophic_level(sp) >= 2
-        )
+        producers_pop = ledger.producer_population
+        consumers_pop = ledger.consumer_population
         
         if producers_pop > 0 and consumers_pop / producers_pop > 0.5:
             hints.append(GameHint(
@@ -282,41 +287,26 @@ class GameHintsService:
     
     def _check_evolution_opportunities(
         self, 
-        alive_species: Sequence["Species"], 
         turn: int,
         recent_report: "TurnReport | None"
     ) -> list[GameHint]:
         """检查演化机会"""
         hints = []
         
-        for sp in alive_species:
-            pop = self._get_population(sp)
-            
-            # 高种群 + 压力可能触发分化
-            if pop > 100000:
-                stress = sp.stress_exposure or {}
-                # stress_exposure 结构: {pressure_type: {"count": int, "max_death_rate": float}}
-                # 提取所有压力类型的暴露次数求和
-                total_stress = 0
-                for v in stress.values():
-                    if isinstance(v, dict):
-                        total_stress += v.get("count", 0)
-                    elif isinstance(v, (int, float)):
-                        total_stress += v  # 兼容旧数据格式
-                
-                if total_stress > 3:
-                    hints.append(GameHint(
-                        hint_type=HintType.EVOLUTION,
-                        priority=HintPriority.MEDIUM,
-                        title="分化条件成熟",
-                        message=f"{sp.common_name} 种群庞大且承受环境压力，可能即将分化出新物种。",
-                        icon="🧬",
-                        related_species=[sp.lineage_code],
-                        suggested_actions=[
-                            "继续施加压力促进分化",
-                            "观察下一回合的演化事件"
-                        ],
-                    ))
+        # 高种群 + 压力可能触发分化（stress_exposure 各压力类型暴露次数之和 > 3）
+        for sp in self._ledger.ordered(self._ripe):
+            hints.append(GameHint(
+                hint_type=HintType.EVOLUTION,
+                priority=HintPriority.MEDIUM,
+                title="分化条件成熟",
+                message=f"{sp.name} 种群庞大且承受环境压力，可能即将分化出新物种。",
+                icon="🧬",
+                related_species=[sp.code],
+                suggested_actions=[
+                    "继续施加压力促进分化",
+                    "观察下一回合的演化事件"
+                ],
+            ))
         
         # 最近有分化事件
         if recent_report and recent_report.branching_events:
@@ -345,30 +335,23 @@ class GameHintsService:
         
         return hints
     
-    def _check_competition(self, alive_species: Sequence["Species"], turn: int) -> list[GameHint]:
-        """检查竞争情况"""
+    def _check_competition(self, turn: int) -> list[GameHint]:
+        """检查竞争情况（直接读取账本中的营养级/栖息地分组）"""
         hints = []
-        
-        # 按营养级分组
-        by_trophic: dict[int, list["Species"]] = {}
-        for sp in alive_species:
-            level = int(self._get_trophic_level(sp))
-            if level not in by_trophic:
-                by_trophic[level] = []
-            by_trophic[level].append(sp)
+        ledger = self._ledger
         
         # 检查同营养级竞争
-        for level, species_list in by_trophic.items():
-            if len(species_list) >= 3:
+        for level, members in ledger.trophic_members.items():
+            if len(members) >= 3:
                 # 同营养级物种过多
-                names = [sp.common_name for sp in species_list[:3]]
+                leaders = [ledger.records[code] for code in islice(members, 3)]
                 hints.append(GameHint(
                     hint_type=HintType.COMPETITION,
                     priority=HintPriority.MEDIUM,
                     title=f"T{level} 竞争激烈",
-                    message=f"{', '.join(names)} 等 {len(species_list)} 个物种在同一营养级竞争资源。",
+                    message=f"{', '.join(sp.name for sp in leaders)} 等 {len(members)} 个物种在同一营养级竞争资源。",
                     icon="🥊",
-                    related_species=[sp.lineage_code for sp in species_list[:3]],
+                    related_species=[sp.code for sp in leaders],
                     suggested_actions=[
                         "施加压力可能淘汰弱势物种",
                         "观察生态位分化是否发生"
@@ -376,66 +359,53 @@ class GameHintsService:
                 ))
         
         # 检查同栖息地竞争
-        by_habitat: dict[str, list["Species"]] = {}
-        for sp in alive_species:
-            habitat = sp.habitat_type or "unknown"
-            if habitat not in by_habitat:
-                by_habitat[habitat] = []
-            by_habitat[habitat].append(sp)
-        
-        for habitat, species_list in by_habitat.items():
-            if len(species_list) >= 5:
+        for habitat, members in ledger.habitat_members.items():
+            if len(members) >= 5:
                 hints.append(GameHint(
                     hint_type=HintType.COMPETITION,
                     priority=HintPriority.LOW,
                     title=f"{habitat} 栖息地拥挤",
-                    message=f"{len(species_list)} 个物种聚集在 {habitat} 栖息地，可能存在资源竞争。",
+                    message=f"{len(members)} 个物种聚集在 {habitat} 栖息地，可能存在资源竞争。",
                     icon="🏠",
-                    related_species=[sp.lineage_code for sp in species_list[:2]],
+                    related_species=list(islice(members, 2)),
                     suggested_actions=["考虑引导物种向其他栖息地迁徙"],
                 ))
         
         return hints
     
-    def _check_food_chain(self, alive_species: Sequence["Species"], turn: int) -> list[GameHint]:
-        """检查食物链问题"""
+    def _check_food_chain(self, turn: int) -> list[GameHint]:
+        """检查食物链问题（猎物存活数随增量维护）"""
         hints = []
+        ledger = self._ledger
         
-        # 统计猎物关系
-        species_map = {sp.lineage_code: sp for sp in alive_species}
-        
-        for sp in alive_species:
-            if self._get_trophic_level(sp) < 2:
-                continue  # 生产者不需要猎物
-            
-            prey_codes = sp.prey_species or []
-            alive_prey = [code for code in prey_codes if code in species_map]
+        for sp in ledger.ordered(self._food_alerts):
+            alive_prey = self._food_alerts[sp.code]
             
             # 猎物全部灭绝
-            if prey_codes and not alive_prey:
+            if not alive_prey:
                 hints.append(GameHint(
                     hint_type=HintType.WARNING,
                     priority=HintPriority.CRITICAL,
                     title="食物来源断绝",
-                    message=f"{sp.common_name} 的所有猎物已灭绝，它将面临饥荒！",
+                    message=f"{sp.name} 的所有猎物已灭绝，它将面临饥荒！",
                     icon="🍽️",
-                    related_species=[sp.lineage_code],
+                    related_species=[sp.code],
                     suggested_actions=[
                         "引入新的猎物物种",
                         "期待该物种适应新食物来源"
                     ],
                 ))
             # 猎物稀少
-            elif prey_codes and len(alive_prey) == 1:
-                prey_sp = species_map.get(alive_prey[0])
-                prey_name = prey_sp.common_name if prey_sp else alive_prey[0]
+            else:
+                prey_sp = ledger.records.get(alive_prey[0])
+                prey_name = prey_sp.name if prey_sp else alive_prey[0]
                 hints.append(GameHint(
                     hint_type=HintType.WARNING,
                     priority=HintPriority.HIGH,
                     title="食物来源单一",
-                    message=f"{sp.common_name} 仅依赖 {prey_name} 为食，食物链非常脆弱。",
+                    message=f"{sp.name} 仅依赖 {prey_name} 为食，食物链非常脆弱。",
                     icon="🔗",
-                    related_species=[sp.lineage_code, alive_prey[0]],
+                    related_species=[sp.code, alive_prey[0]],
                     suggested_actions=["保护猎物物种", "观察是否发展出替代食物来源"],
                 ))
         
@@ -443,7 +413,6 @@ class GameHintsService:
     
     def _check_biodiversity(
         self,
-        alive_species: Sequence["Species"],
         turn: int,
         recent_report: "TurnReport | None",
         previous_report: "TurnReport | None",
@@ -451,7 +420,7 @@ class GameHintsService:
         """检查多样性变化"""
         hints = []
         
-        current_count = len(alive_species)
+        current_count = len(self._ledger)
         
         # 与上一回合比较
         if recent_report and previous_report:
@@ -505,7 +474,7 @@ class GameHintsService:
                 ))
         
         # 空白生态位提示
-        trophic_levels = set(int(sp.trophic_level) for sp in alive_species)
+        trophic_levels = set(self._ledger.trophic_members)
         missing_levels = [i for i in range(1, 5) if i not in trophic_levels]
         
         if missing_levels and current_count >= 3:
@@ -531,6 +500,17 @@ class GameHintsService:
         """清除提示冷却（新存档时调用）"""
         self._hint_cooldown.clear()
         self._last_hints.clear()
+        self._ledger.clear()
+        self._endangered.clear()
+        self._ripe.clear()
+        self._food_alerts.clear()
+
+
+def _toggle(flags: set[str], code: str, on: bool) -> None:
+    if on:
+        flags.add(code)
+    else:
+        flags.discard(code)
 
 
 # 模块级单例
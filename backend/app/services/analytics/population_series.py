@@ -0,0 +1,349 @@
+"""
+Population Series Store - 种群时间序列存储
+
+每个物种占一行，按回合追加：
+- total: 物种总种群（float64）
+- tiles: 有种群的地块数（float32）
+- peak:  单地块最大种群（float32）
+缺测（物种尚未出现/本回合未记录）为 NaN。
+
+存储为"镜像环形缓冲"：容量 C 的缓冲实际长度 2C，每回合同时写入
+slot 与 slot + C，最近 n 回合（n ≤ C）始终是一段连续切片，
+趋势分析、灭绝检查、图表都可以直接拿零拷贝视图。追加为每回合一次列写入。
+
+持久化：指定目录时各字段为 np.memmap（.npy），元数据（谱系代码 → 行号、
+已写入回合数）写入 meta.json；存档时复制到存档目录下的 population_series/，
+读档时复制回工作目录再映射，运行中的追加不会修改存档文件。
+行数扩容时写入新一代文件（文件名带代号），旧视图在原映射上仍然有效。
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import shutil
+import threading
+from pathlib import Path
+from typing import Iterable, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FIELDS: dict[str, type] = {"total": np.float64, "tiles": np.float32, "peak": np.float32}
+
+SAVE_SUBDIR = "population_series"
+_META_FILE = "meta.json"
+_FORMAT_VERSION = 1
+_INITIAL_ROWS = 64
+
+
+class PopulationSeriesStore:
+    """种群时间序列（镜像环形缓冲，线程安全）"""
+
+    def __init__(self, directory: str | Path | None = None, capacity: int = 2048):
+        if capacity < 2:
+            raise ValueError(f"capacity 至少为 2: {capacity}")
+        self.directory = Path(directory) if directory is not None else None
+        self.capacity = capacity
+        self._lock = threading.RLock()
+        self._generation = 0
+        if self.directory is not None and (self.directory / _META_FILE).exists():
+            try:
+                self._open(self.directory, copy=False)
+                return
+            except Exception as e:
+                logger.warning(f"[种群序列] 工作文件无法读取，重新初始化: {e}")
+        self._reset(_INITIAL_ROWS)
+
+    # ========== 存储分配 ==========
+
+    def _path(self, name: str, generation: int | None = None) -> Path:
+        generation = self._generation if generation is None else generation
+        return self.directory / f"{name}-{generation}.npy"
+
+    def _allocate(self, name: str, shape: tuple[int, ...], dtype, fill) -> np.ndarray:
+        if self.directory is None:
+            return np.full(shape, fill, dtype=dtype)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        array = np.lib.format.open_memmap(self._path(name), mode="w+", dtype=dtype, shape=shape)
+        array[...] = fill
+        return array
+
+    def _remove_generation(self, generation: int) -> None:
+        """删除旧一代文件（仍被映射时删除可能失败，忽略即可）"""
+        if self.directory is None:
+            return
+        for name in (*FIELDS, "turns"):
+            try:
+                self._path(name, generation).unlink(missing_ok=True)
+            except OSError:
+                pass
+
+    def _reset(self, rows: int) -> None:
+        old_generation = self._generation
+        self._generation += 1
+        self.codes: list[str] = []
+        self._row_of: dict[str, int] = {}
+        self.count = 0  # 累计写入的回合数（可超过容量）
+        width = 2 * self.capacity
+        self._data = {name: self._allocate(name, (rows, width), dtype, np.nan) for name, dtype in FIELDS.items()}
+        self._turns = self._allocate("turns", (width,), np.int64, -1)
+        self._write_meta()
+        self._remove_generation(old_generation)
+
+    def _grow_rows(self, rows: int) -> None:
+        old_rows = self._turns_rows()
+        new_rows = max(rows, old_rows * 2)
+        old_generation = self._generation
+        self._generation += 1
+        width = 2 * self.capacity
+        for name, dtype in FIELDS.items():
+            grown = self._allocate(name, (new_rows, width), dtype, np.nan)
+            grown[:old_rows] = self._data[name]
+            self._data[name] = grown
+        turns = self._allocate("turns", (width,), np.int64, -1)
+        turns[:] = self._turns
+        self._turns = turns
+        self._write_meta()
+        self._remove_generation(old_generation)
+
+    def _turns_rows(self) -> int:
+        return self._data["total"].shape[0]
+
+    # ========== 元数据与持久化 ==========
+
+    def _meta(self, generation: int) -> dict:
+        return {
+            "version": _FORMAT_VERSION,
+            "capacity": self.capacity,
+            "count": self.count,
+            "rows": self._turns_rows(),
+            "generation": generation,
+            "codes": self.codes,
+        }
+
+    def _write_meta(self) -> None:
+        if self.directory is None:
+            return
+        path = self.directory / _META_FILE
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._meta(self._generation), ensure_ascii=False), encoding="utf-8")
+        tmp.replace(path)
+
+    def _open(self, source: Path, copy: bool) -> None:
+        """从目录打开序列（copy=True 时先复制到工作目录/内存，不修改源文件）"""
+        meta = json.loads((source / _META_FILE).read_text(encoding="utf-8"))
+        if meta.get("version") != _FORMAT_VERSION:
+            raise ValueError(f"不支持的种群序列版本: {meta.get('version')}")
+        source_generation = meta["generation"]
+        old_generation = self._generation
+        if copy:
+            self._generation = max(self._generation, source_generation) + 1
+        else:
+            self._generation = source_generation
+
+        arrays = {}
+        for name in (*FIELDS, "turns"):
+            src = source / f"{name}-{source_generation}.npy"
+            if self.directory is None:
+                arrays[name] = np.load(src)
+                continue
+            if copy:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(src, self._path(name))
+            arrays[name] = np.load(self._path(name), mmap_mode="r+")
+
+        self.capacity = int(meta["capacity"])
+        self.count = int(meta["count"])
+        self.codes = list(meta["codes"])
+        self._row_of = {code: row for row, code in enumerate(self.codes)}
+        self._turns = arrays.pop("turns")
+        self._data = arrays
+        if copy:
+            self._write_meta()
+            if old_generation != self._generation:
+                self._remove_generation(old_generation)
+
+    def flush(self) -> None:
+        """把映射写回磁盘"""
+        with self._lock:
+            for array in (*self._data.values(), self._turns):
+                if isinstance(array, np.memmap):
+                    array.flush()
+            self._write_meta()
+
+    def save_to(self, save_dir: str | Path) -> Path:
+        """把当前序列复制到存档目录（save_dir/population_series/）"""
+        target = Path(save_dir) / SAVE_SUBDIR
+        with self._lock:
+            self.flush()
+            if target.exists():
+                shutil.rmtree(target)
+            target.mkdir(parents=True)
+            for name in (*FIELDS, "turns"):
+                array = self._turns if name == "turns" else self._data[name]
+                path = target / f"{name}-0.npy"
+                if isinstance(array, np.memmap):
+                    shutil.copyfile(array.filename, path)
+                else:
+                    np.save(path, array)
+            (target / _META_FILE).write_text(json.dumps(self._meta(0), ensure_ascii=False), encoding="utf-8")
+        return target
+
+    def load_from(self, save_dir: str | Path) -> bool:
+        """从存档目录恢复序列；存档中没有时清空并返回 False"""
+        source = Path(save_dir) / SAVE_SUBDIR
+        with self._lock:
+            if not (source / _META_FILE).exists():
+                self._reset(_INITIAL_ROWS)
+                return False
+            try:
+                self._open(source, copy=True)
+            except Exception as e:
+                logger.warning(f"[种群序列] 读取存档序列失败，已清空: {e}")
+                self._reset(_INITIAL_ROWS)
+                return False
+        logger.info(f"[种群序列] 已恢复 {len(self.codes)} 个物种、{self.recorded_turns} 回合")
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._reset(_INITIAL_ROWS)
+
+    # ========== 写入 ==========
+
+    def _ensure_rows(self, codes: Sequence[str]) -> np.ndarray:
+        row_of = self._row_of
+        for code in codes:
+            if code not in row_of:
+                row_of[code] = len(self.codes)
+                self.codes.append(code)
+        if len(self.codes) > self._turns_rows():
+            self._grow_rows(len(self.codes))
+        return np.fromiter((row_of[c] for c in codes), dtype=np.int64, count=len(codes))
+
+    def append(
+        self,
+        turn_index: int,
+        codes: Sequence[str],
+        totals: Iterable[float],
+        tiles: Iterable[float] | None = None,
+        peaks: Iterable[float] | None = None,
+    ) -> None:
+        """追加一个回合（同一回合重复写入时覆盖该回合）
+
+        未出现在 codes 中的物种本回合记为 NaN。
+        """
+        values = {"total": totals, "tiles": tiles, "peak": peaks}
+        with self._lock:
+            rows = self._ensure_rows(list(codes))
+            C = self.capacity
+            last = (self.count - 1) % C
+            if self.count and self._turns[last] == turn_index:
+                slot = last
+            else:
+                slot = self.count % C
+                self.count += 1
+            for name, array in self._data.items():
+                column = np.full(array.shape[0], np.nan, dtype=array.dtype)
+                if values[name] is not None:
+                    column[rows] = np.fromiter(values[name], dtype=array.dtype, count=len(rows))
+                array[:, slot] = column
+                array[:, slot + C] = column
+            self._turns[slot] = self._turns[slot + C] = turn_index
+            self._write_meta()
+
+    # ========== 读取（零拷贝视图，只读） ==========
+
+    @property
+    def recorded_turns(self) -> int:
+        """缓冲中可读的回合数"""
+        return min(self.count, self.capacity)
+
+    def _span(self, window: int | None) -> tuple[int, int]:
+        n = self.recorded_turns if window is None else max(0, min(window, self.recorded_turns))
+        end = (self.count - 1) % self.capacity + self.capacity + 1 if self.count else 0
+        return end - n, end
+
+    @staticmethod
+    def _readonly(view: np.ndarray) -> np.ndarray:
+        view = np.asarray(view)
+        view.flags.writeable = False
+        return view
+
+    def turns(self, window: int | None = None) -> np.ndarray:
+        """最近 window 回合的回合索引（旧 → 新）"""
+        start, end = self._span(window)
+        return self._readonly(self._turns[start:end])
+
+    def series(self, lineage_code: str, field: str = "total", window: int | None = None) -> np.ndarray:
+        """单个物种最近 window 回合的序列（与 turns() 对齐，缺测为 NaN）"""
+        row = self._row_of.get(lineage_code)
+        if row is None:
+            raise KeyError(lineage_code)
+        start, end = self._span(window)
+        return self._readonly(self._data[field][row, start:end])
+
+    def matrix(self, field: str = "total", window: int | None = None) -> tuple[list[str], np.ndarray]:
+        """全部物种最近 window 回合的矩阵 (物种数, 回合数)，行顺序与返回的代码一致"""
+        start, end = self._span(window)
+        codes = list(self.codes)
+        return codes, self._readonly(self._data[field][:len(codes), start:end])
+
+    def __contains__(self, lineage_code: str) -> bool:
+        return lineage_code in self._row_of
+
+    def history(self, lineage_code: str, window: int | None = None) -> np.ndarray:
+        """物种有记录的最近 window 个总种群值（跳过缺测，旧 → 新）"""
+        if lineage_code not in self._row_of:
+            return np.empty(0, dtype=np.float64)
+        if window is not None:
+            recent = self.series(lineage_code, window=window)
+            if not np.isnan(recent).any():
+                return recent
+        values = self.series(lineage_code)
+        values = values[~np.isnan(values)]
+        return values if window is None else values[-window:]
+
+    def trend(self, lineage_code: str, window: int = 10) -> float:
+        """最近 window 个记录的增长率（正=增长，负=下降）"""
+        recent = self.history(lineage_code, window)
+        if len(recent) < 2:
+            return 0.0
+        return float((recent[-1] - recent[0]) / max(recent[0], 1))
+
+    def is_declining(self, lineage_code: str, window: int = 5) -> bool:
+        """最近 window 个记录是否严格持续下降"""
+        recent = self.history(lineage_code, window)
+        return len(recent) >= 2 and bool(np.all(np.diff(recent) < 0))
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "species": len(self.codes),
+            "rows": self._turns_rows(),
+            "capacity": self.capacity,
+            "recorded_turns": self.recorded_turns,
+            "total_turns": self.count,
+            "memory_mapped": self.directory is not None,
+        }
+
+
+_population_series: PopulationSeriesStore | None = None
+_series_lock = threading.Lock()
+
+
+def get_population_series() -> PopulationSeriesStore:
+    """获取全局种群时间序列（工作文件位于 cache_dir/population_series）"""
+    global _population_series
+    if _population_series is None:
+        with _series_lock:
+            if _population_series is None:
+                from ...core.config import get_settings
+                settings = get_settings()
+                _population_series = PopulationSeriesStore(
+                    Path(settings.cache_dir) / "population_series",
+                    capacity=settings.population_series_capacity,
+                )
+    return _population_series
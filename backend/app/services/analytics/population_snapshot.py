@@ -2,6 +2,7 @@
 Population Snapshot Service - 种群快照服务
 
 保存和管理种群历史数据快照。
+种群历史存放在 PopulationSeriesStore（环形缓冲 + 内存映射文件）中。
 """
 
 from __future__ import annotations
@@ -9,78 +10,75 @@ from __future__ import annotations
 import logging
 from typing import Any, Dict, List, TYPE_CHECKING
 
+import numpy as np
+
+from .population_series import PopulationSeriesStore, get_population_series
+
 if TYPE_CHECKING:
     from ...repositories.species_repository import SpeciesRepository
     from ...models.species import Species
+    from ...tensor.state import TensorState
 
 logger = logging.getLogger(__name__)
 
 
-# 全局缓存：存储种群历史 {lineage_code: [population_history]}
-_population_history_cache: Dict[str, List[int]] = {}
-
-
-def get_population_history_cache() -> Dict[str, List[int]]:
-    """获取种群历史缓存"""
-    return _population_history_cache
-
-
-def clear_population_history_cache() -> None:
-    """清空种群历史缓存"""
-    _population_history_cache.clear()
-
-
 class PopulationSnapshotService:
     """种群快照服务
     
     保存每回合的种群数据快照。
-    使用内部缓存存储种群历史，避免修改 Species 模型。
+    种群历史写入 PopulationSeriesStore，避免修改 Species 模型。
     """
     
     def __init__(
         self,
         species_repository: "SpeciesRepository",
+        series: PopulationSeriesStore | None = None,
     ):
         self.species_repository = species_repository
+        self.series = series or get_population_series()
     
     def save_snapshots(
         self,
         species_list: List["Species"],
         turn_index: int,
+        tensor_state: "TensorState | None" = None,
     ) -> None:
         """保存种群快照
         
         Args:
             species_list: 物种列表
             turn_index: 回合索引
+            tensor_state: 可选，张量状态（提供时同时记录地块聚合：占据地块数、单地块峰值）
         """
-        for species in species_list:
-            lineage_code = species.lineage_code
-            
-            # 使用缓存存储种群历史
-            if lineage_code not in _population_history_cache:
-                _population_history_cache[lineage_code] = []
-            
-            history = _population_history_cache[lineage_code]
-            current_pop = species.morphology_stats.get("population", 0) or 0
-            history.append(current_pop)
-            
-            # 只保留最近 100 回合的历史
-            if len(history) > 100:
-                _population_history_cache[lineage_code] = history[-100:]
+        codes = [sp.lineage_code for sp in species_list]
+        totals = [(sp.morphology_stats or {}).get("population", 0) or 0 for sp in species_list]
+        tiles = peaks = None
         
+        pop = getattr(tensor_state, "pop", None)
+        species_map = getattr(tensor_state, "species_map", None) or {}
+        if pop is not None and species_map and len(pop):
+            flat = pop.reshape(pop.shape[0], -1)
+            occupied = (flat > 0).sum(axis=1)
+            peak = flat.max(axis=1)
+            index = np.array([species_map.get(code, -1) for code in codes], dtype=np.int64)
+            valid = (index >= 0) & (index < flat.shape[0])
+            tiles = np.where(valid, occupied[np.maximum(index, 0)], np.nan)
+            peaks = np.where(valid, peak[np.maximum(index, 0)], np.nan)
+        
+        self.series.append(turn_index, codes, totals, tiles, peaks)
         logger.debug(f"[快照] 回合 {turn_index}: 保存了 {len(species_list)} 个物种的快照")
     
-    def get_population_history(self, lineage_code: str) -> List[int]:
+    def get_population_history(self, lineage_code: str, window: int | None = None) -> np.ndarray:
         """获取物种的种群历史
         
         Args:
             lineage_code: 物种谱系代码
+            window: 只取最近的 window 个记录（None 为缓冲中的全部）
             
         Returns:
-            种群历史列表
+            种群历史数组（旧 → 新，跳过未记录的回合）
         """
-        return _population_history_cache.get(lineage_code, [])
+        return self.series.history(lineage_code, window)
     
     def get_population_trend(
         self,
@@ -96,17 +94,7 @@ class PopulationSnapshotService:
         Returns:
             趋势值（正=增长，负=下降）
         """
-        history = _population_history_cache.get(species.lineage_code, [])
-        if not history or len(history) < 2:
-            return 0.0
-        
-        recent = history[-window:]
-        if len(recent) < 2:
-            return 0.0
-        
-        # 计算平均增长率
-        growth_rate = (recent[-1] - recent[0]) / max(recent[0], 1)
-        return growth_rate
+        return self.series.trend(species.lineage_code, window)
     
     def get_species_snapshots(
         self,
@@ -0,0 +1,275 @@
+"""多物种叙事批处理引擎
+
+CriticalAnalyzer 与 FocusBatchProcessor 共用：
+- 按 token 预算（而非固定条数）把物种打包进同一个 Prompt
+- 从一次结构化响应中按 lineage_code 拆出各物种的段落
+- 只对缺失/失败的物种回退为单物种重试
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Sequence
+
+from ...ai.model_router import staggered_gather
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOKEN_BUDGET = 3000
+DEFAULT_MAX_ITEMS = 16
+
+_CJK_RE = re.compile(r"[\u3000-\u303f\u3400-\u4dbf\u4e00-\u9fff\uff00-\uffef]")
+_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$")
+# 响应中可能承载物种列表的键
+_LIST_KEYS = ("details", "results", "species", "items")
+_SUMMARY_KEYS = ("summary", "text", "analysis")
+
+
+def estimate_tokens(value: Any) -> int:
+    """粗略估算 token 数：中日韩字符约 1 token/字，其余约 4 字符/token"""
+    text = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def pack_batches(
+    costs: Sequence[int],
+    token_budget: int,
+    max_items: int,
+) -> list[list[int]]:
+    """按顺序把条目下标装入批次，每批 token 之和不超过预算、条数不超过 max_items
+
+    单个条目超过预算时独占一批。
+    """
+    batches: list[list[int]] = []
+    current: list[int] = []
+    used = 0
+    for idx, cost in enumerate(costs):
+        if current and (used + cost > token_budget or len(current) >= max_items):
+            batches.append(current)
+            current, used = [], 0
+        current.append(idx)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _summary_of(value: Any) -> str | None:
+    if isinstance(value, str):
+        return value.strip() or None
+    if isinstance(value, dict):
+        for key in _SUMMARY_KEYS:
+            text = value.get(key)
+            if isinstance(text, str) and text.strip():
+                return text.strip()
+    return None
+
+
+def parse_sections(content: Any) -> dict[str, str]:
+    """从结构化响应中提取 {lineage_code: summary}
+
+    兼容：JSON 数组、{"details": [...]}、{code: summary | {...}}，以及带 markdown 代码块的字符串。
+    """
+    if isinstance(content, str):
+        cleaned = _FENCE_RE.sub("", content.strip())
+        try:
+            content = json.loads(cleaned)
+        except (json.JSONDecodeError, ValueError):
+            return {}
+
+    entries: Any = None
+    if isinstance(content, list):
+        entries = content
+    elif isinstance(content, dict):
+        for key in _LIST_KEYS:
+            if isinstance(content.get(key), list):
+                entries = content[key]
+                break
+        if entries is None:
+            if "lineage_code" in content:
+                entries = [content]
+            else:
+                sections = {}
+                for code, value in content.items():
+                    summary = _summary_of(value)
+                    if summary:
+                        sections[str(code)] = summary
+                return sections
+
+    sections: dict[str, str] = {}
+    for entry in entries or []:
+        if not isinstance(entry, dict):
+            continue
+        code = entry.get("lineage_code") or entry.get("code")
+        summary = _summary_of(entry)
+        if code and summary:
+            sections[str(code)] = summary
+    return sections
+
+
+@dataclass
+class BatchStats:
+    """最近一次 run() 的统计"""
+    items: int = 0
+    batches: int = 0
+    batched_hits: int = 0
+    retried: int = 0
+    failed: int = 0
+    estimated_tokens: list[int] = field(default_factory=list)
+
+
+class PromptBatcher:
+    """按 token 预算打包多物种 Prompt，并对失败条目做单物种重试
+
+    Args:
+        router: ModelRouter（只使用同步 invoke，经 invoke_with_heartbeat 放入线程池）
+        capability: 批量 capability，payload 形如 {"batch": [entry, ...]}
+        retry_capability: 单物种重试使用的 capability
+        retry_payload: 由单个 entry 构造重试 payload，默认 {"batch": [entry]}
+        token_budget: 每个 Prompt 中物种数据的 token 预算
+        max_items: 每个 Prompt 最多物种数
+    """
+
+    def __init__(
+        self,
+        router: Any,
+        capability: str,
+        *,
+        retry_capability: str | None = None,
+        retry_payload: Callable[[dict], dict] | None = None,
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+        max_items: int = DEFAULT_MAX_ITEMS,
+        timeout: float = 90.0,
+        retry_timeout: float = 60.0,
+        interval: float = 0.5,
+        max_concurrent: int = 10,
+        task_name: str = "叙事批次",
+    ) -> None:
+        self.router = router
+        self.capability = capability
+        self.retry_capability = retry_capability or capability
+        self.retry_payload = retry_payload or (lambda entry: {"batch": [entry]})
+        self.token_budget = max(1, int(token_budget))
+        self.max_items = max(1, int(max_items))
+        self.timeout = timeout
+        self.retry_timeout = retry_timeout
+        self.interval = interval
+        self.max_concurrent = max_concurrent
+        self.task_name = task_name
+        self.stats = BatchStats()
+
+    async def _invoke(self, capability: str, payload: dict, task_name: str, timeout: float) -> Any:
+        from ...ai.streaming_helper import invoke_with_heartbeat
+
+        return await invoke_with_heartbeat(
+            router=self.router,
+            capability=capability,
+            payload=payload,
+            task_name=task_name,
+            timeout=timeout,
+            heartbeat_interval=2.0,
+        )
+
+    async def _run_batch(self, entries: list[dict]) -> Any:
+        try:
+            return await self._invoke(
+                self.capability, {"batch": entries},
+                f"{self.task_name}[{len(entries)}物种]", self.timeout,
+            )
+        except asyncio.TimeoutError:
+            logger.error(f"[{self.task_name}] 批次AI调用超时 (包含{len(entries)}个物种)")
+            return None
+
+    async def _retry_single(self, entry: dict) -> str | None:
+        code = entry.get("lineage_code")
+        try:
+            response = await self._invoke(
+                self.retry_capability, self.retry_payload(entry),
+                f"{self.task_name}重试[{code}]", self.retry_timeout,
+            )
+        except asyncio.TimeoutError:
+            logger.error(f"[{self.task_name}] {code} 单物种重试超时")
+            return None
+        content = response.get("content") if isinstance(response, dict) else None
+        return parse_sections(content).get(code) or _summary_of(content)
+
+    async def run(
+        self,
+        entries: list[dict],
+        event_callback: Callable[[str, str, str], None] | None = None,
+    ) -> list[str | None]:
+        """返回与 entries 对齐的 summary 列表（失败为 None）
+
+        每个 entry 必须包含 lineage_code。批次响应中缺失的物种单独重试一次；
+        本地模板模式（响应不含 content）不重试。
+        """
+        self.stats = BatchStats(items=len(entries))
+        if not entries:
+            return []
+
+        costs = [estimate_tokens(entry) for entry in entries]
+        batches = pack_batches(costs, self.token_budget, self.max_items)
+        self.stats.batches = len(batches)
+        self.stats.estimated_tokens = [sum(costs[i] for i in batch) for batch in batches]
+        logger.info(
+            f"[{self.task_name}] {len(entries)} 个物种打包为 {len(batches)} 个Prompt"
+            f"（预算 {self.token_budget} tokens / 最多 {self.max_items} 物种）"
+        )
+
+        responses = await staggered_gather(
+            [self._run_batch([entries[i] for i in batch]) for batch in batches],
+            interval=self.interval,
+            max_concurrent=self.max_concurrent,
+            task_name=self.task_name,
+            task_timeout=self.timeout + 5,
+            event_callback=event_callback,
+        )
+
+        summaries: list[str | None] = [None] * len(entries)
+        retry: list[int] = []
+        for batch, response in zip(batches, responses):
+            if isinstance(response, Exception):
+                logger.warning(f"[{self.task_name}] 批次处理失败: {response}")
+                retry.extend(batch)
+                continue
+            if isinstance(response, dict) and "content" not in response and "error" not in response:
+                continue
+            content = response.get("content") if isinstance(response, dict) else None
+            sections = parse_sections(content)
+            if len(batch) == 1 and not sections:
+                summary = _summary_of(content)
+                if summary:
+                    sections = {entries[batch[0]].get("lineage_code"): summary}
+            for idx in batch:
+                summary = sections.get(entries[idx].get("lineage_code"))
+                if summary:
+                    summaries[idx] = summary
+                    self.stats.batched_hits += 1
+                else:
+                    retry.append(idx)
+
+        if retry:
+            self.stats.retried = len(retry)
+            logger.info(f"[{self.task_name}] {len(retry)} 个物种未在批次响应中找到，单独重试")
+            semaphore = asyncio.Semaphore(self.max_concurrent)
+
+            async def limited(entry: dict) -> str | None:
+                async with semaphore:
+                    return await self._retry_single(entry)
+
+            retried = await asyncio.gather(
+                *(limited(entries[idx]) for idx in retry),
+                return_exceptions=True,
+            )
+            for idx, summary in zip(retry, retried):
+                if isinstance(summary, Exception):
+                    logger.warning(f"[{self.task_name}] {entries[idx].get('lineage_code')} 重试失败: {summary}")
+                    continue
+                summaries[idx] = summary
+
+        self.stats.failed = sum(1 for s in summaries if s is None)
+        return summaries
@@ -1,10 +1,12 @@
 ﻿from __future__ import annotations
 
 import asyncio
-from typing import Sequence, Callable, Awaitable
+from typing import TYPE_CHECKING, Sequence, Callable, Awaitable
 
 from ...schemas.responses import SpeciesSnapshot
-from ...simulation.environment import ParsedPressure
+
+if TYPE_CHECKING:
+    from ...simulation.environment import ParsedPressure
 
 
 import logging
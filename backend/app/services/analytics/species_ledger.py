@@ -0,0 +1,252 @@
+"""物种增量账本
+
+AchievementService / GameHintsService 共用：把每回合的物种列表与上一次快照比对，
+得到增量（新生、灭绝、变化、食物网变动），并据此维护营养级/栖息地分组、
+种群总量、捕食依赖等运行聚合，避免每回合对全部存活物种重新分组扫描。
+"""
+from __future__ import annotations
+
+import heapq
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Iterable, Sequence
+
+if TYPE_CHECKING:
+    from ...models.species import Species
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SpeciesRecord:
+    """账本中单个存活物种的快照（只保留分析需要的字段）"""
+    code: str
+    name: str
+    population: int
+    trophic_level: float
+    habitat: str
+    prey: tuple[str, ...]
+    hybrid: bool
+    created_turn: int
+    stress_count: int
+
+    @property
+    def level(self) -> int:
+        return int(self.trophic_level)
+
+
+@dataclass
+class SpeciesDelta:
+    """一次同步得到的增量"""
+    born: list[str] = field(default_factory=list)
+    extinct: list[str] = field(default_factory=list)
+    changed: list[str] = field(default_factory=list)
+    # 被依赖数（捕食者数量）发生变化的猎物代码
+    touched_prey: set[str] = field(default_factory=set)
+
+    @property
+    def updated(self) -> list[str]:
+        """需要重新评估的存活物种（新生 + 变化）"""
+        return self.born + self.changed
+
+    def __bool__(self) -> bool:
+        return bool(self.born or self.extinct or self.changed)
+
+
+def _safe_int(value: Any) -> int:
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _stress_count(stress: Any) -> int:
+    """stress_exposure: {pressure_type: {"count": int, ...}}，兼容旧的 {type: int}"""
+    total = 0
+    for v in (stress or {}).values():
+        if isinstance(v, dict):
+            total += _safe_int(v.get("count", 0))
+        elif isinstance(v, (int, float)):
+            total += int(v)
+    return total
+
+
+def make_record(sp: "Species") -> SpeciesRecord:
+    stats = getattr(sp, "morphology_stats", None) or {}
+    level = getattr(sp, "trophic_level", None)
+    try:
+        trophic = float(level) if level is not None else 1.0
+    except (TypeError, ValueError):
+        trophic = 1.0
+    return SpeciesRecord(
+        code=sp.lineage_code,
+        name=getattr(sp, "common_name", None) or sp.lineage_code,
+        population=_safe_int(stats.get("population", 0)),
+        trophic_level=trophic,
+        habitat=getattr(sp, "habitat_type", None) or "unknown",
+        prey=tuple(getattr(sp, "prey_species", None) or ()),
+        hybrid=bool(getattr(sp, "hybrid_parent_codes", None)),
+        created_turn=_safe_int(getattr(sp, "created_turn", 0)),
+        stress_count=_stress_count(getattr(sp, "stress_exposure", None)),
+    )
+
+
+class SpeciesLedger:
+    """存活物种的增量账本与运行聚合
+
+    sync() 比对快照后只对新生/灭绝/变化的物种增减聚合；
+    records 与各分组保持物种首次出现的顺序（新物种追加在末尾）。
+    """
+
+    def __init__(self) -> None:
+        self.clear()
+
+    def clear(self) -> None:
+        self.records: dict[str, SpeciesRecord] = {}
+        self.total_population = 0
+        self.producer_population = 0  # 营养级 < 2
+        self.total_links = 0
+        self.hybrid_count = 0
+        self.apex_count = 0  # 营养级 >= 5
+        self.trophic_members: dict[int, dict[str, None]] = {}
+        self.habitat_members: dict[str, dict[str, None]] = {}
+        self.dependents: Counter[str] = Counter()  # 猎物代码 -> 存活捕食者数
+        self.predators_of: dict[str, set[str]] = {}
+        self.created_turns: Counter[int] = Counter()
+        self._pop_heap: list[tuple[int, str]] = []
+        self._seq: dict[str, int] = {}  # 首次出现顺序
+        self._next_seq = 0
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    # ==================== 同步 ====================
+
+    def sync(self, all_species: Sequence["Species"]) -> SpeciesDelta:
+        """与当前物种列表比对并更新聚合"""
+        delta = SpeciesDelta()
+        seen: set[str] = set()
+        for sp in all_species:
+            if getattr(sp, "status", None) != "alive":
+                continue
+            try:
+                record = make_record(sp)
+            except Exception as e:  # 防御性兜底，脏数据不应打断整体统计
+                logger.warning(f"[物种账本] 跳过异常物种 {getattr(sp, 'lineage_code', '?')}: {e}")
+                continue
+            seen.add(record.code)
+            old = self.records.get(record.code)
+            if old is None:
+                self._add(record, delta)
+                delta.born.append(record.code)
+            elif old != record:
+                # 分组键不变时保留组内位置
+                regroup = (old.level != record.level, old.habitat != record.habitat)
+                self._remove(old, delta, regroup)
+                self._add(record, delta, regroup)
+                delta.changed.append(record.code)
+        for code in [c for c in self.records if c not in seen]:
+            self._remove(self.records.pop(code), delta)
+            self._seq.pop(code, None)
+            delta.extinct.append(code)
+        if len(self._pop_heap) > 4 * len(self.records) + 64:
+            self._pop_heap = [(-r.population, r.code) for r in self.records.values()]
+            heapq.heapify(self._pop_heap)
+        return delta
+
+    def _add(
+        self, r: SpeciesRecord, delta: SpeciesDelta, regroup: tuple[bool, bool] = (True, True)
+    ) -> None:
+        if r.code not in self._seq:
+            self._seq[r.code] = self._next_seq
+            self._next_seq += 1
+        self.records[r.code] = r
+        self.total_population += r.population
+        if r.trophic_level < 2:
+            self.producer_population += r.population
+        self.total_links += len(r.prey)
+        self.hybrid_count += r.hybrid
+        self.apex_count += r.trophic_level >= 5.0
+        if regroup[0]:
+            self.trophic_members.setdefault(r.level, {})[r.code] = None
+        if regroup[1]:
+            self.habitat_members.setdefault(r.habitat, {})[r.code] = None
+        for prey in r.prey:
+            self.dependents[prey] += 1
+            self.predators_of.setdefault(prey, set()).add(r.code)
+            delta.touched_prey.add(prey)
+        self.created_turns[r.created_turn] += 1
+        heapq.heappush(self._pop_heap, (-r.population, r.code))
+
+    def _remove(
+        self, r: SpeciesRecord, delta: SpeciesDelta, regroup: tuple[bool, bool] = (True, True)
+    ) -> None:
+        self.total_population -= r.population
+        if r.trophic_level < 2:
+            self.producer_population -= r.population
+        self.total_links -= len(r.prey)
+        self.hybrid_count -= r.hybrid
+        self.apex_count -= r.trophic_level >= 5.0
+        if regroup[0]:
+            _discard(self.trophic_members, r.level, r.code)
+        if regroup[1]:
+            _discard(self.habitat_members, r.habitat, r.code)
+        for prey in r.prey:
+            self.dependents[prey] -= 1
+            if self.dependents[prey] <= 0:
+                del self.dependents[prey]
+            predators = self.predators_of.get(prey)
+            if predators is not None:
+                predators.discard(r.code)
+                if not predators:
+                    del self.predators_of[prey]
+            delta.touched_prey.add(prey)
+        self.created_turns[r.created_turn] -= 1
+        if self.created_turns[r.created_turn] <= 0:
+            del self.created_turns[r.created_turn]
+
+    # ==================== 查询 ====================
+
+    @property
+    def consumer_population(self) -> int:
+        return self.total_population - self.producer_population
+
+    def max_population(self) -> tuple[str | None, int]:
+        """种群最大的存活物种（堆顶惰性剔除过期条目）"""
+        heap = self._pop_heap
+        while heap:
+            neg_pop, code = heap[0]
+            record = self.records.get(code)
+            if record is not None and record.population == -neg_pop:
+                return code, -neg_pop
+            heapq.heappop(heap)
+        return None, 0
+
+    def oldest_created_turn(self) -> int | None:
+        return min(self.created_turns) if self.created_turns else None
+
+    def alive_prey(self, record: SpeciesRecord) -> list[str]:
+        return [code for code in record.prey if code in self.records]
+
+    def affected_predators(self, delta: SpeciesDelta) -> set[str]:
+        """猎物存活状态或自身食谱变化的存活捕食者"""
+        affected = {code for code in delta.updated}
+        for code in delta.born + delta.extinct:
+            affected.update(self.predators_of.get(code, ()))
+        return {code for code in affected if code in self.records}
+
+    def ordered(self, codes: Iterable[str]) -> list[SpeciesRecord]:
+        """按物种首次出现顺序返回存活记录（只排序给定的代码）"""
+        alive = [code for code in set(codes) if code in self.records]
+        alive.sort(key=self._seq.__getitem__)
+        return [self.records[code] for code in alive]
+
+
+def _discard(groups: dict[Any, dict[str, None]], key: Any, code: str) -> None:
+    members = groups.get(key)
+    if members is None:
+        return
+    members.pop(code, None)
+    if not members:
+        del groups[key]
@@ -23,7 +23,6 @@ from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Any, Sequence
 
 import numpy as np
-from sklearn.cluster import AgglomerativeClustering, KMeans  # type: ignore
 
 if TYPE_CHECKING:
     from ...models.species import Species
@@ -250,6 +249,9 @@ class TaxonomyService:
         # 限制聚类数量不超过样本数
         n_clusters = min(n_clusters, len(vectors))
         
+        # sklearn 导入较慢（约 1s），仅在聚类时加载
+        from sklearn.cluster import KMeans  # type: ignore
+
         kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
         labels = kmeans.fit_predict(vectors)
         
@@ -361,6 +363,8 @@ class TaxonomyService:
             if n_clusters < 2:
                 return []
             
+            from sklearn.cluster import AgglomerativeClustering  # type: ignore
+
             clustering = AgglomerativeClustering(n_clusters=n_clusters)
             labels = clustering.fit_predict(vectors)
             
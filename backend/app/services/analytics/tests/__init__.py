@@ -0,0 +1 @@
+"""分析服务测试"""
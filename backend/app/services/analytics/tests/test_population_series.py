@@ -0,0 +1,106 @@
+"""
+种群时间序列测试
+
+验证环形缓冲回绕后视图仍为连续零拷贝切片、行扩容、
+内存映射文件的重开/存档往返，以及快照服务的地块聚合。
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from ..population_series import PopulationSeriesStore
+from ..population_snapshot import PopulationSnapshotService
+
+
+def _fill(store: PopulationSeriesStore, turns: range, codes=("A", "B")):
+    for t in turns:
+        store.append(t, list(codes), [t * 10 + i for i in range(len(codes))])
+
+
+class TestRingBuffer:
+    """环形缓冲"""
+
+    def test_wraparound_views_are_contiguous(self):
+        store = PopulationSeriesStore(capacity=8)
+        _fill(store, range(13))
+
+        assert store.recorded_turns == 8 and store.count == 13
+        np.testing.assert_array_equal(store.turns(), np.arange(5, 13))
+        series = store.series("A")
+        np.testing.assert_array_equal(series, np.arange(5, 13) * 10)
+        assert series.base is not None and not series.flags.writeable  # 视图，不是副本
+        np.testing.assert_array_equal(store.series("B", window=3), [101, 111, 121])
+
+        codes, matrix = store.matrix(window=2)
+        assert codes == ["A", "B"] and matrix.shape == (2, 2)
+
+    def test_new_species_rows_and_gaps(self):
+        store = PopulationSeriesStore(capacity=16)
+        _fill(store, range(3), codes=("A",))
+        codes = [f"S{i}" for i in range(100)]  # 触发行扩容
+        store.append(3, ["A", *codes], [5.0] + [1.0] * 100)
+
+        assert np.isnan(store.series("S7")[:3]).all() and store.series("S7")[3] == 1.0
+        np.testing.assert_array_equal(store.series("A"), [0, 10, 20, 5])
+        np.testing.assert_array_equal(store.history("S7"), [1.0])
+
+        # 同一回合重复写入：覆盖而不是追加
+        store.append(3, ["A"], [4.0])
+        assert store.count == 4 and store.series("A")[-1] == 4.0
+        assert np.isnan(store.series("S7")[-1])
+
+    def test_trend_and_decline(self):
+        store = PopulationSeriesStore(capacity=8)
+        for t, pop in enumerate([100, 90, 80, 85, 70, 60]):
+            store.append(t, ["A"], [pop])
+        assert store.is_declining("A", window=3)
+        assert not store.is_declining("A", window=4)
+        assert store.trend("A", window=2) == pytest.approx(-10 / 70)
+        assert not store.is_declining("missing") and store.trend("missing") == 0.0
+
+
+class TestPersistence:
+    """内存映射与存档"""
+
+    def test_reopen_and_save_round_trip(self, tmp_path):
+        work = tmp_path / "work"
+        store = PopulationSeriesStore(work, capacity=4)
+        _fill(store, range(6))
+        store.flush()
+
+        reopened = PopulationSeriesStore(work, capacity=99)  # 容量以文件为准
+        assert reopened.capacity == 4
+        np.testing.assert_array_equal(reopened.series("A"), [20, 30, 40, 50])
+
+        save_dir = tmp_path / "save"
+        store.save_to(save_dir)
+        store.append(6, ["C"], [1.0])  # 存档后的追加不影响存档文件
+
+        restored = PopulationSeriesStore(tmp_path / "other", capacity=4)
+        assert restored.load_from(save_dir)
+        assert "C" not in restored
+        np.testing.assert_array_equal(restored.turns(), [2, 3, 4, 5])
+        restored.append(6, ["A"], [1.0])
+        np.testing.assert_array_equal(restored.series("A"), [30, 40, 50, 1])
+
+        assert not restored.load_from(tmp_path / "no-save")
+        assert restored.count == 0 and restored.codes == []
+
+
+def test_snapshot_service_records_tile_aggregates():
+    store = PopulationSeriesStore(capacity=4)
+    service = PopulationSnapshotService(species_repository=None, series=store)
+    pop = np.zeros((2, 3, 3), dtype=np.float32)
+    pop[0, 0, :2] = [5, 7]
+    tensor_state = SimpleNamespace(pop=pop, species_map={"A": 0, "B": 1})
+    species = [
+        SimpleNamespace(lineage_code="A", morphology_stats={"population": 12}),
+        SimpleNamespace(lineage_code="C", morphology_stats={}),
+    ]
+    service.save_snapshots(species, 0, tensor_state)
+
+    assert store.series("A", "tiles")[-1] == 2 and store.series("A", "peak")[-1] == 7
+    assert store.series("C")[-1] == 0 and np.isnan(store.series("C", "tiles")[-1])
+    np.testing.assert_array_equal(service.get_population_history("A"), [12])
@@ -0,0 +1,76 @@
+"""多物种叙事批处理引擎测试"""
+from __future__ import annotations
+
+import asyncio
+
+from ..prompt_batcher import PromptBatcher, estimate_tokens, pack_batches, parse_sections
+
+
+class _Router:
+    """按 capability 记录调用；批量调用故意漏掉 drop 中的物种"""
+
+    def __init__(self, drop: set[str] = frozenset()) -> None:
+        self.drop = set(drop)
+        self.calls: list[tuple[str, dict]] = []
+
+    def invoke(self, capability: str, payload: dict) -> dict:
+        self.calls.append((capability, payload))
+        if capability == "single":
+            return {"content": {"summary": f"single {payload['lineage_code']}"}}
+        details = [
+            {"lineage_code": e["lineage_code"], "summary": f"batch {e['lineage_code']}"}
+            for e in reversed(payload["batch"])
+            if e["lineage_code"] not in self.drop
+        ]
+        return {"content": {"details": details}}
+
+
+def test_pack_batches_respects_budget_and_item_cap():
+    assert pack_batches([40, 40, 40, 40], token_budget=100, max_items=10) == [[0, 1], [2, 3]]
+    assert pack_batches([10] * 5, token_budget=1000, max_items=2) == [[0, 1], [2, 3], [4]]
+    # 超出预算的单个条目独占一批
+    assert pack_batches([500, 10], token_budget=100, max_items=10) == [[0], [1]]
+    assert estimate_tokens("演化生态") == 4
+    assert estimate_tokens("abcdefgh") == 2
+
+
+def test_parse_sections_formats():
+    assert parse_sections([{"lineage_code": "A1", "summary": "x"}]) == {"A1": "x"}
+    assert parse_sections({"A1": {"text": "y"}, "B2": "z"}) == {"A1": "y", "B2": "z"}
+    fenced = '```json\n{"details": [{"lineage_code": "C3", "summary": "w"}]}\n```'
+    assert parse_sections(fenced) == {"C3": "w"}
+    assert parse_sections("不是 JSON") == {}
+
+
+def test_run_matches_by_code_and_retries_only_missing():
+    router = _Router(drop={"B2"})
+    batcher = PromptBatcher(
+        router, "batch",
+        retry_capability="single", retry_payload=lambda entry: entry,
+        token_budget=10_000, max_items=8, interval=0.0,
+    )
+    entries = [{"lineage_code": code} for code in ("A1", "B2", "C3")]
+
+    summaries = asyncio.run(batcher.run(entries))
+
+    # 响应顺序被打乱也按 lineage_code 对齐；只有 B2 单独重试
+    assert summaries == ["batch A1", "single B2", "batch C3"]
+    assert [cap for cap, _ in router.calls] == ["batch", "single"]
+    assert batcher.stats.batches == 1
+    assert batcher.stats.retried == 1
+    assert batcher.stats.failed == 0
+
+
+def test_local_template_response_is_not_retried():
+    class LocalRouter:
+        calls = 0
+
+        def invoke(self, capability, payload):
+            LocalRouter.calls += 1
+            return {"provider": "local", "model": "focus-template", "payload": payload}
+
+    batcher = PromptBatcher(LocalRouter(), "focus_batch", max_items=2, interval=0.0)
+    summaries = asyncio.run(batcher.run([{"lineage_code": c} for c in ("A", "B", "C")]))
+
+    assert summaries == [None, None, None]
+    assert LocalRouter.calls == 2
@@ -0,0 +1,93 @@
+"""
+物种增量账本测试
+
+验证增量同步后的聚合与全量重算一致，提示服务只对变化的物种重新评估，
+以及成就进度无变化时不写盘。
+"""
+
+from types import SimpleNamespace
+
+from ..achievements import AchievementService
+from ..game_hints import GameHintsService
+from ..species_ledger import SpeciesLedger
+
+
+def _sp(code, pop, level=1.0, prey=(), habitat="marine", status="alive", created=0):
+    return SimpleNamespace(
+        lineage_code=code, common_name=f"物种{code}", status=status,
+        morphology_stats={"population": pop}, trophic_level=level,
+        habitat_type=habitat, prey_species=list(prey), hybrid_parent_codes=[],
+        created_turn=created, stress_exposure={},
+    )
+
+
+def _world():
+    return [
+        _sp("A1", 5_000_000), _sp("A2", 800), _sp("A3", 300_000),
+        _sp("B1", 20_000, level=2.0, prey=["A1", "A2"]),
+        _sp("B2", 9_000, level=2.5, prey=["A3"]),
+        _sp("C1", 2_000, level=3.0, prey=["B1", "B2"], habitat="terrestrial"),
+    ]
+
+
+class TestSpeciesLedger:
+    """账本聚合"""
+
+    def test_delta_and_aggregates(self):
+        ledger = SpeciesLedger()
+        world = _world()
+        delta = ledger.sync(world)
+        assert len(delta.born) == 6 and not delta.extinct
+
+        # 无变化时增量为空
+        assert not ledger.sync(world)
+
+        world[0] = _sp("A1", 10)
+        world[2] = _sp("A3", 300_000, status="extinct")
+        delta = ledger.sync(world)
+        assert delta.changed == ["A1"] and delta.extinct == ["A3"]
+        assert ledger.dependents["A3"] == 1  # B2 仍以灭绝的 A3 为猎物
+
+        alive = [sp for sp in world if sp.status == "alive"]
+        assert ledger.total_population == sum(sp.morphology_stats["population"] for sp in alive)
+        assert ledger.total_links == sum(len(sp.prey_species) for sp in alive)
+        assert ledger.max_population() == ("B1", 20_000)
+        assert list(ledger.trophic_members[1]) == ["A1", "A2"]
+        assert ledger.predators_of["A3"] == {"B2"}
+
+
+class TestIncrementalHints:
+    """提示服务"""
+
+    def test_food_chain_follows_prey_extinction(self):
+        service = GameHintsService(max_hints=20)
+        world = _world()
+        service.generate_hints(world, 1)
+        assert set(service._food_alerts) == {"B2"}  # B2 只剩一个猎物
+
+        world[2] = _sp("A3", 0, status="extinct")
+        hints = service.generate_hints(world, 2)
+        assert service._food_alerts == {"B2": []}
+        assert any(h.title == "食物来源断绝" and h.related_species == ["B2"] for h in hints)
+        assert "A2" in service._endangered
+
+
+class TestAchievementPersistence:
+    """成就进度写盘"""
+
+    def test_progress_written_only_on_change(self, tmp_path, monkeypatch):
+        service = AchievementService(tmp_path)
+        service._consecutive_no_extinction = 10  # 连续无灭绝计数已封顶
+        report = SimpleNamespace(turn_index=0, branching_events=[], species=[])
+        service.check_after_turn(report, _world(), ["drought"])
+        assert (tmp_path / "achievements.json").exists()
+
+        # 相同状态再次检查：进度只增不减、账本增量为空，不再写盘
+        writes = []
+        monkeypatch.setattr("json.dump", lambda *a, **k: writes.append(a))
+        service.check_after_turn(report, _world(), ["drought"])
+        assert writes == []
+
+        # 新的压力类型属于进度变化，写盘一次
+        service.check_after_turn(report, _world(), ["flood"])
+        assert len(writes) == 1
@@ -24,6 +24,7 @@ from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Sequence
 
 import numpy as np
+from scipy import sparse
 
 if TYPE_CHECKING:
     from ...models.species import Species
@@ -34,6 +35,41 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
+# 垂直生态位分层（相邻下标为相邻层，陆地层与水体层之间不相邻）
+VERTICAL_LAYERS = (
+    "canopy", "understory", "ground", "subterranean",
+    "aquatic_surface", "aquatic_pelagic", "aquatic_benthic",
+)
+_ADJACENT_LAYERS = (
+    ("canopy", "understory"),
+    ("understory", "ground"),
+    ("ground", "subterranean"),
+    ("aquatic_surface", "aquatic_pelagic"),
+    ("aquatic_pelagic", "aquatic_benthic"),
+)
+
+# 捕食策略 / 猎物防御锚点
+PREDATOR_STRATEGY_ANCHORS = ("ambush_hunter", "pursuit_hunter", "pack_hunter")
+PREY_DEFENSE_ANCHORS = ("speed_defense", "armor_defense", "camouflage_defense")
+
+# 共生类型定义：(锚点A, 锚点B, 关系类型)
+MUTUALISM_PAIRS = (
+    ("pollinator", "flowering_plant", "pollination"),
+    ("seed_disperser", "fruit_plant", "seed_dispersal"),
+    ("mycorrhizal", "flowering_plant", "mycorrhizal"),
+    ("nitrogen_fixer", "flowering_plant", "nitrogen_fixation"),
+)
+
+
+def _ordered_pairs(idx_a: np.ndarray, idx_b: np.ndarray, rank: np.ndarray) -> list[tuple[int, int]]:
+    """候选集合的外积中 rank[i] < rank[j] 的 (i, j) 对（i 取自 idx_a，j 取自 idx_b）"""
+    if idx_a.size == 0 or idx_b.size == 0:
+        return []
+    mask = rank[idx_a][:, None] < rank[idx_b][None, :]
+    rows, cols = np.nonzero(mask)
+    return list(zip(idx_a[rows].tolist(), idx_b[cols].tolist()))
+
+
 # ============================================================================
 # 配置数据类
 # ============================================================================
@@ -161,7 +197,7 @@ class EcologicalRealismService:
         
         # 互利共生网络缓存
         self._mutualism_network: dict[str, list[MutualismLink]] = {}
-        self._mutualism_last_update: int = -1
+        self._mutualism_last_update: int = -1  # 最近一次发现共生关系的回合
         
         # 统计信息
         self._stats = {
@@ -445,6 +481,61 @@ class EcologicalRealismService:
         
         return max(0.0, min(1.0, efficiency))
     
+    def calculate_spatial_predation_matrix(
+        self,
+        species_list: Sequence['Species'],
+        predators: np.ndarray,
+        prey: np.ndarray,
+        incidence: 'sparse.spmatrix',
+    ) -> np.ndarray:
+        """批量计算捕食边的空间捕食效率（与 calculate_spatial_predation_efficiency 逐边一致）
+        
+        Args:
+            species_list: 物种列表（边的下标指向此列表）
+            predators: (E,) 捕食者下标
+            prey: (E,) 猎物下标
+            incidence: (S, T) 物种×地块 0/1 关联矩阵
+            
+        Returns:
+            (E,) float32 捕食效率 (0-1)
+        """
+        cfg = self._config
+        edge_count = len(predators)
+        self._stats["spatial_predation_calculations"] += edge_count
+        
+        if not cfg.enable_spatial_predation:
+            return np.ones(edge_count, dtype=np.float32)
+        if edge_count == 0:
+            return np.zeros(0, dtype=np.float32)
+        
+        incidence = sparse.csr_matrix(incidence, dtype=np.float32)
+        tile_counts = np.asarray(incidence.sum(axis=1), dtype=np.float64).ravel()
+        prey_tiles = tile_counts[prey]
+        overlap = np.asarray(
+            incidence[predators].multiply(incidence[prey]).sum(axis=1), dtype=np.float64
+        ).ravel()
+        overlap_ratio = np.divide(overlap, prey_tiles, out=np.zeros(edge_count), where=prey_tiles > 0)
+        
+        # 策略对抗：锚点相似度一次算出，再按边取行
+        scores = self._anchors.compute_similarity_matrix(
+            species_list, PREDATOR_STRATEGY_ANCHORS + PREY_DEFENSE_ANCHORS
+        ).astype(np.float64)
+        ambush, pursuit, pack = scores[predators, 0], scores[predators, 1], scores[predators, 2]
+        speed, armor, camouflage = scores[prey, 3], scores[prey, 4], scores[prey, 5]
+        strategy_modifier = np.select(
+            [ambush > 0.5, pursuit > 0.5, pack > 0.5],
+            [
+                1.0 - camouflage * 0.3 + speed * 0.2,
+                1.0 - speed * 0.4,
+                1.0 + armor * 0.2,
+            ],
+            default=1.0 - (speed + armor + camouflage) * 0.15,
+        )
+        
+        efficiency = np.clip(overlap_ratio ** cfg.overlap_efficiency_factor * strategy_modifier, 0.0, 1.0)
+        reachable = (tile_counts[predators] > 0) & (prey_tiles > 0) & (overlap_ratio >= cfg.min_overlap_for_predation)
+        return np.where(reachable, efficiency, 0.0).astype(np.float32)
+    
     # ========================================================================
     # 模块 5: 能量同化效率
     # ========================================================================
@@ -537,51 +628,49 @@ class EcologicalRealismService:
             return 1.0  # 默认完全重叠
         
         # 获取垂直生态位分布
-        layers = [
-            "canopy", "understory", "ground", "subterranean",
-            "aquatic_surface", "aquatic_pelagic", "aquatic_benthic"
-        ]
-        
-        profile_a = {layer: self._anchors.compute_similarity(species_a, layer) for layer in layers}
-        profile_b = {layer: self._anchors.compute_similarity(species_b, layer) for layer in layers}
+        profile_a = {layer: self._anchors.compute_similarity(species_a, layer) for layer in VERTICAL_LAYERS}
+        profile_b = {layer: self._anchors.compute_similarity(species_b, layer) for layer in VERTICAL_LAYERS}
         
         # 计算主要活动层
         dominant_a = max(profile_a.items(), key=lambda x: x[1])
         dominant_b = max(profile_b.items(), key=lambda x: x[1])
         
-        # 如果在同一层，完全竞争
-        if dominant_a[0] == dominant_b[0]:
-            return cfg.same_layer_competition
-        
-        # 检查是否相邻层
-        layer_adjacency = {
-            ("canopy", "understory"): True,
-            ("understory", "ground"): True,
-            ("ground", "subterranean"): True,
-            ("aquatic_surface", "aquatic_pelagic"): True,
-            ("aquatic_pelagic", "aquatic_benthic"): True,
-        }
-        
-        pair = (dominant_a[0], dominant_b[0])
-        reverse_pair = (dominant_b[0], dominant_a[0])
-        
-        if pair in layer_adjacency or reverse_pair in layer_adjacency:
-            return cfg.adjacent_layer_competition
-        
-        # 远层
-        return cfg.distant_layer_competition
+        table = self._layer_competition_table()
+        return float(table[VERTICAL_LAYERS.index(dominant_a[0]), VERTICAL_LAYERS.index(dominant_b[0])])
+    
+    def _layer_competition_table(self) -> np.ndarray:
+        """(L, L) 层间竞争系数：同层 / 相邻层 / 远层"""
+        cfg = self._config
+        n = len(VERTICAL_LAYERS)
+        table = np.full((n, n), cfg.distant_layer_competition, dtype=np.float64)
+        for a, b in _ADJACENT_LAYERS:
+            i, j = VERTICAL_LAYERS.index(a), VERTICAL_LAYERS.index(b)
+            table[i, j] = table[j, i] = cfg.adjacent_layer_competition
+        np.fill_diagonal(table, cfg.same_layer_competition)
+        return table
+    
+    def vertical_layer_indices(self, species_list: Sequence['Species']) -> np.ndarray:
+        """各物种主要活动层在 VERTICAL_LAYERS 中的下标 (S,)"""
+        if not species_list:
+            return np.zeros(0, dtype=np.int8)
+        profile = self._anchors.compute_similarity_matrix(species_list, VERTICAL_LAYERS)
+        return profile.argmax(axis=1).astype(np.int8)
+    
+    def vertical_competition_matrix(self, species_list: Sequence['Species']) -> np.ndarray:
+        """(S, S) 垂直生态位竞争系数矩阵（与 calculate_vertical_niche_overlap 逐对一致）"""
+        count = len(species_list)
+        if not self._config.enable_vertical_niche:
+            return np.ones((count, count), dtype=np.float32)
+        layers = self.vertical_layer_indices(species_list)
+        table = self._layer_competition_table().astype(np.float32)
+        return table[layers[:, None], layers[None, :]]
     
     def analyze_vertical_niche(
         self,
         species: 'Species',
     ) -> VerticalNicheResult:
         """分析物种的垂直生态位"""
-        layers = [
-            "canopy", "understory", "ground", "subterranean",
-            "aquatic_surface", "aquatic_pelagic", "aquatic_benthic"
-        ]
-        
-        profile = {layer: self._anchors.compute_similarity(species, layer) for layer in layers}
+        profile = {layer: self._anchors.compute_similarity(species, layer) for layer in VERTICAL_LAYERS}
         dominant = max(profile.items(), key=lambda x: x[1])
         
         return VerticalNicheResult(
@@ -695,6 +784,9 @@ class EcologicalRealismService:
         - 种子散布者-果实植物：扩散与食物交换
         - 菌根共生：营养物质交换
         
+        锚点相似度以 (物种 × 锚点) 矩阵一次算出，候选对由阈值掩码的外积得到，
+        因此每回合全量重算，不再复用旧回合的结果。
+        
         Args:
             species_list: 所有物种
             turn_index: 当前回合
@@ -707,60 +799,52 @@ class EcologicalRealismService:
         if not cfg.enable_mutualism:
             return []
         
-        # 每5回合更新一次
-        if turn_index - self._mutualism_last_update < 5:
-            all_links = []
-            for links in self._mutualism_network.values():
-                all_links.extend(links)
-            return all_links
-        
         alive_species = [sp for sp in species_list if sp.status == "alive"]
         new_links = []
         
-        # 共生类型定义
-        mutualism_pairs = [
-            ("pollinator", "flowering_plant", "pollination"),
-            ("seed_disperser", "fruit_plant", "seed_dispersal"),
-            ("mycorrhizal", "flowering_plant", "mycorrhizal"),
-            ("nitrogen_fixer", "flowering_plant", "nitrogen_fixation"),
-        ]
-        
-        for sp_a in alive_species:
-            for sp_b in alive_species:
-                if sp_a.lineage_code >= sp_b.lineage_code:
-                    continue  # 避免重复检测
+        if len(alive_species) >= 2:
+            # 一次性计算 (S, 锚点) 相似度矩阵，替代逐对逐锚点的标量余弦
+            anchor_names = list(dict.fromkeys(
+                name for anchor_a, anchor_b, _ in MUTUALISM_PAIRS for name in (anchor_a, anchor_b)
+            ))
+            column = {name: i for i, name in enumerate(anchor_names)}
+            scores = self._anchors.compute_similarity_matrix(alive_species, anchor_names)
+            above = scores > cfg.mutualism_threshold
+            
+            # 按 lineage_code 排名，只保留 code_a < code_b 的有序对（避免重复检测）
+            codes = np.array([sp.lineage_code for sp in alive_species], dtype=object)
+            rank = np.empty(len(codes), dtype=np.int64)
+            rank[np.argsort(codes, kind="stable")] = np.arange(len(codes))
+            
+            candidates = []  # (i, j, 关系序号, score_a, score_b)
+            for rel_idx, (anchor_a, anchor_b, _) in enumerate(MUTUALISM_PAIRS):
+                col_a, col_b = column[anchor_a], column[anchor_b]
+                is_a = above[:, col_a]
+                is_b = above[:, col_b]
+                
+                # 正向匹配：i 像 anchor_a、j 像 anchor_b
+                forward = _ordered_pairs(np.flatnonzero(is_a), np.flatnonzero(is_b), rank)
+                for i, j in forward:
+                    candidates.append((i, j, rel_idx, scores[i, col_a], scores[j, col_b]))
                 
-                for anchor_a, anchor_b, rel_type in mutualism_pairs:
-                    score_a = self._anchors.compute_similarity(sp_a, anchor_a)
-                    score_b = self._anchors.compute_similarity(sp_b, anchor_b)
-                    
-                    # 也检查反向
-                    score_a_rev = self._anchors.compute_similarity(sp_a, anchor_b)
-                    score_b_rev = self._anchors.compute_similarity(sp_b, anchor_a)
-                    
-                    # 正向匹配
-                    if score_a > cfg.mutualism_threshold and score_b > cfg.mutualism_threshold:
-                        strength = (score_a + score_b) / 2
-                        new_links.append(MutualismLink(
-                            species_a=sp_a.lineage_code,
-                            species_b=sp_b.lineage_code,
-                            relationship_type=rel_type,
-                            strength=strength,
-                            benefit_a=cfg.mutualism_benefit * score_b,
-                            benefit_b=cfg.mutualism_benefit * score_a,
-                        ))
-                    
-                    # 反向匹配
-                    elif score_a_rev > cfg.mutualism_threshold and score_b_rev > cfg.mutualism_threshold:
-                        strength = (score_a_rev + score_b_rev) / 2
-                        new_links.append(MutualismLink(
-                            species_a=sp_a.lineage_code,
-                            species_b=sp_b.lineage_code,
-                            relationship_type=rel_type,
-                            strength=strength,
-                            benefit_a=cfg.mutualism_benefit * score_b_rev,
-                            benefit_b=cfg.mutualism_benefit * score_a_rev,
-                        ))
+                # 反向匹配：i 像 anchor_b、j 像 anchor_a（正向已匹配的对不重复计）
+                for i, j in _ordered_pairs(np.flatnonzero(is_b), np.flatnonzero(is_a), rank):
+                    if is_a[i] and is_b[j]:
+                        continue
+                    candidates.append((i, j, rel_idx, scores[i, col_b], scores[j, col_a]))
+            
+            # 保持与物种列表顺序一致的输出
+            candidates.sort(key=lambda c: (c[0], c[1], c[2]))
+            for i, j, rel_idx, score_a, score_b in candidates:
+                score_a, score_b = float(score_a), float(score_b)
+                new_links.append(MutualismLink(
+                    species_a=alive_species[i].lineage_code,
+                    species_b=alive_species[j].lineage_code,
+                    relationship_type=MUTUALISM_PAIRS[rel_idx][2],
+                    strength=(score_a + score_b) / 2,
+                    benefit_a=cfg.mutualism_benefit * score_b,
+                    benefit_b=cfg.mutualism_benefit * score_a,
+                ))
         
         # 更新缓存
         self._mutualism_network.clear()
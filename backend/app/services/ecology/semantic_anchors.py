@@ -255,6 +255,13 @@ SEMANTIC_ANCHORS = {
 }
 
 
+def _normalize_rows(mat: np.ndarray) -> np.ndarray:
+    """按行单位化（零向量保持为零，与 _cosine_similarity 的 0.0 约定一致）"""
+    mat = np.asarray(mat, dtype=np.float32)
+    norms = np.linalg.norm(mat, axis=1, keepdims=True)
+    return np.divide(mat, norms, out=np.zeros_like(mat), where=norms >= 1e-8)
+
+
 class SemanticAnchorService:
     """语义锚点服务
     
@@ -457,11 +464,51 @@ class SemanticAnchorService:
         if anchor is None or anchor.vector is None:
             return {sp.lineage_code: 0.0 for sp in species_list}
         
-        results = {}
-        for species in species_list:
-            results[species.lineage_code] = self.compute_similarity(species, anchor_name)
+        column = self.compute_similarity_matrix(species_list, [anchor_name])[:, 0]
+        return {sp.lineage_code: float(v) for sp, v in zip(species_list, column)}
+    
+    def species_matrix(self, species_list: Sequence['Species']) -> np.ndarray:
+        """按顺序堆叠物种向量为 (S, D) 矩阵（缺失的向量先批量生成）"""
+        self.warmup_species_vectors(species_list)
+        if not species_list:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack([self._species_cache[sp.lineage_code] for sp in species_list])
+    
+    def compute_similarity_matrix(
+        self,
+        species_list: Sequence['Species'],
+        anchor_names: Sequence[str],
+    ) -> np.ndarray:
+        """一次矩阵乘法计算物种 × 锚点相似度
         
-        return results
+        Args:
+            species_list: 物种列表
+            anchor_names: 锚点名称列表
+            
+        Returns:
+            (S, A) float32 矩阵，取值 0-1（与 compute_similarity 一致：
+            未知或没有向量的锚点整列为 0.0）
+        """
+        self._stats["similarity_calls"] += len(species_list) * len(anchor_names)
+        if not species_list or not anchor_names:
+            return np.zeros((len(species_list), len(anchor_names)), dtype=np.float32)
+        
+        species_mat = _normalize_rows(self.species_matrix(species_list))
+        anchor_vecs = []
+        missing = np.zeros(len(anchor_names), dtype=bool)
+        for i, name in enumerate(anchor_names):
+            anchor = self._anchors.get(name)
+            if anchor is None or anchor.vector is None:
+                logger.warning(f"[语义锚点] 未找到锚点: {name}")
+                anchor_vecs.append(np.zeros(species_mat.shape[1], dtype=np.float32))
+                missing[i] = True
+            else:
+                anchor_vecs.append(anchor.vector)
+        anchor_mat = _normalize_rows(np.stack(anchor_vecs))
+        
+        similarity = ((species_mat @ anchor_mat.T + 1.0) / 2.0).astype(np.float32, copy=False)
+        similarity[:, missing] = 0.0
+        return similarity
     
     def compute_category_profile(
         self,
@@ -573,12 +620,3 @@ def get_semantic_anchor_service(
     
     return _semantic_anchor_service
 
-
-
-
-
-
-
-
-
-
@@ -61,6 +61,8 @@ class AncestryEmbeddingPlugin(EmbeddingPlugin):
     required_context_fields = {"all_species"}
     # 启用张量数据
     use_tensor_data = True
+    # 血统文本只取决于谱系编码与描述，按物种增量更新
+    incremental = True
     
     @property
     def name(self) -> str:
@@ -72,21 +74,28 @@ class AncestryEmbeddingPlugin(EmbeddingPlugin):
         self._trait_history: dict[str, dict[str, List[float]]] = {}
         self._tensor_speciation_signals: dict[str, dict] = {}  # 缓存张量分化信号
     
+    def species_signature(self, species: 'Species') -> str:
+        """血统文本依赖的字段：描述（祖先链由 lineage_code 推断）"""
+        return (getattr(species, 'description', '') or '')[:200]
+    
     def build_index(self, ctx: 'SimulationContext') -> int:
-        """构建血统向量索引"""
-        store = self._get_vector_store()
-        
+        """构建血统向量索引（特征历史每次都记录，只重新嵌入变化的物种）"""
         species_list = ctx.all_species or []
         if not species_list:
             return 0
         
+        changed = {sp.lineage_code for sp in self.changed_species(ctx)}
         texts = []
         ids = []
         metadata_list = []
         
         for sp in species_list:
+            if sp.lineage_code not in changed and sp.lineage_code in self._ancestry_cache:
+                self._update_trait_history(sp)
+                continue
             ancestry = self._compute_ancestry_vector(sp, ctx)
-            if ancestry and len(ancestry.vector) > 0:
+            if ancestry:
+                # 向量在嵌入后由 _on_vectors_upserted 填充
                 self._ancestry_cache[sp.lineage_code] = ancestry
                 
                 # 使用向量作为索引
@@ -100,16 +109,13 @@ class AncestryEmbeddingPlugin(EmbeddingPlugin):
         if not texts:
             return 0
         
-        vectors = self._embed_texts(texts)
-        if not vectors:
-            return 0
-        
-        # 同时更新 ancestry 向量
-        for i, code in enumerate(ids):
+        return self._upsert_vectors(ids, texts, metadata_list, total=len(species_list))
+    
+    def _on_vectors_upserted(self, ids: list[str], vectors: list[list[float]]) -> None:
+        """同时更新 ancestry 向量"""
+        for code, vector in zip(ids, vectors):
             if code in self._ancestry_cache:
-                self._ancestry_cache[code].vector = np.array(vectors[i])
-        
-        return store.add_batch(ids, vectors, metadata_list)
+                self._ancestry_cache[code].vector = np.array(vector)
     
     def _ancestry_to_text(self, ancestry: 'AncestryVector', species: 'Species') -> str:
         """将血统信息转换为文本"""
@@ -9,14 +9,16 @@
 """
 from __future__ import annotations
 
+import hashlib
 import logging
 import time
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, TYPE_CHECKING, Optional
+from typing import Any, Hashable, Sequence, TYPE_CHECKING, Optional
 
 if TYPE_CHECKING:
+    from ...models.species import Species
     from ..system.embedding import EmbeddingService
     from ...simulation.context import SimulationContext
     from .tensor_bridge import TensorEmbeddingBridge, TensorSpeciesDistribution
@@ -47,6 +49,10 @@ class PluginStats:
     index_size: int = 0
     degraded_mode: bool = False
     quality_warnings: list[str] = field(default_factory=list)
+    # 增量构建：最近一次重新嵌入/复用的条目数，及单条嵌入耗时的滑动平均
+    last_embedded: int = 0
+    last_reused: int = 0
+    embed_ms_per_item: float = 0.0
 
 
 class EmbeddingPlugin(ABC):
@@ -58,7 +64,7 @@ class EmbeddingPlugin(ABC):
     1. initialize() - 服务启动时调用
     2. on_turn_start(ctx) - 回合开始时调用
     3. on_turn_end(ctx) - 回合结束时调用
-    4. build_index(ctx) - 构建/更新向量索引
+    4. build_index(ctx) - 构建/更新向量索引（管理器可能在工作线程中并行调用）
     5. search(query) - 执行相似度搜索
     6. export_for_save() / import_from_save() - 存档支持
     
@@ -67,6 +73,11 @@ class EmbeddingPlugin(ABC):
     - 声明 optional_context_fields 指定可选但影响质量的字段
     - 如果必需字段缺失，插件应降级处理而非抛异常
     
+    增量构建:
+    - 声明 incremental = True 的插件只对自上次构建以来变化的条目重新嵌入
+    - 按物种生成向量的插件覆盖 species_signature()，用 changed_species() 取变化物种
+    - 其余插件把全部条目交给 _upsert_vectors()，按文本+元数据摘要跳过未变化的条目
+    
     张量集成:
     - 通过 tensor_bridge 访问张量数据（种群分布、分化信号）
     - 优先使用张量数据，避免重复计算
@@ -79,6 +90,8 @@ class EmbeddingPlugin(ABC):
     optional_context_fields: set[str] = set()
     # 子类可覆盖：是否使用张量数据
     use_tensor_data: bool = True
+    # 子类可覆盖：是否只对变化的条目增量更新索引
+    incremental: bool = False
     
     def __init__(
         self, 
@@ -96,6 +109,11 @@ class EmbeddingPlugin(ABC):
         
         # 张量桥接（在on_turn_end中初始化）
         self._tensor_bridge: Optional['TensorEmbeddingBridge'] = None
+        
+        # 增量构建：已写入索引的条目签名 {id: signature}，只对写入它们的向量存储有效
+        self._signatures: dict[str, Hashable] = {}
+        self._pending_signatures: dict[str, Hashable] = {}
+        self._signature_store: Any = None
     
     @property
     @abstractmethod
@@ -262,6 +280,96 @@ class EmbeddingPlugin(ABC):
         """
         pass
     
+    # ==================== 增量构建 ====================
+    
+    def species_signature(self, species: 'Species') -> Hashable:
+        """物种中影响本插件向量的字段签名（子类覆盖）
+        
+        签名不变的物种在下次构建时不重新生成文本、不重新嵌入。
+        默认使用 lineage_code，即每个物种只嵌入一次。
+        """
+        return species.lineage_code
+    
+    def changed_species(self, ctx: 'SimulationContext') -> list['Species']:
+        """自上次构建以来签名变化的物种（首次构建返回全部）
+        
+        新签名在 _upsert_vectors() 成功写入后才生效，嵌入失败的物种下回合会重试。
+        """
+        self._sync_signature_store()
+        changed = []
+        self._pending_signatures = {}
+        for sp in ctx.all_species or []:
+            signature = self.species_signature(sp)
+            if self._signatures.get(sp.lineage_code) != signature:
+                self._pending_signatures[sp.lineage_code] = signature
+                changed.append(sp)
+        return changed
+    
+    def _upsert_vectors(
+        self,
+        ids: Sequence[str],
+        texts: Sequence[str],
+        metadata_list: Sequence[dict],
+        total: int | None = None,
+    ) -> int:
+        """嵌入并写入变化的条目，返回写入数量
+        
+        ids 来自 changed_species() 时使用其挂起的签名；否则以文本+元数据摘要
+        作为签名，跳过与上次写入相同的条目。
+        
+        Args:
+            total: 本次构建覆盖的条目总数（用于统计复用数，默认 len(ids)）
+        """
+        self._sync_signature_store()
+        signatures: list[Hashable] = []
+        keep: list[int] = []
+        for i, (id, text, meta) in enumerate(zip(ids, texts, metadata_list)):
+            signature = self._pending_signatures.get(id)
+            if signature is None:
+                signature = _content_digest(text, meta)
+                if self._signatures.get(id) == signature:
+                    continue
+            signatures.append(signature)
+            keep.append(i)
+        
+        self._stats.last_reused = (len(ids) if total is None else total) - len(keep)
+        self._stats.last_embedded = 0
+        if not keep:
+            return 0
+        
+        start = time.perf_counter()
+        vectors = self._embed_texts([texts[i] for i in keep])
+        if not vectors:
+            return 0
+        per_item_ms = (time.perf_counter() - start) * 1000 / len(keep)
+        self._stats.embed_ms_per_item = round(
+            per_item_ms if not self._stats.embed_ms_per_item
+            else 0.8 * self._stats.embed_ms_per_item + 0.2 * per_item_ms,
+            4,
+        )
+        
+        store = self._get_vector_store()
+        kept_ids = [ids[i] for i in keep]
+        count = store.add_batch(kept_ids, vectors, [metadata_list[i] for i in keep])
+        self._signature_store = store
+        self._on_vectors_upserted(kept_ids, vectors)
+        for i, signature in zip(keep, signatures):
+            self._signatures[ids[i]] = signature
+        self._pending_signatures = {}
+        self._stats.last_embedded = count
+        return count
+    
+    def _sync_signature_store(self) -> None:
+        """向量存储被替换（切换存档）或清空后，已记录的签名不再对应任何向量，全部作废"""
+        store = self._get_vector_store(create=False)
+        if store is not self._signature_store or store is None or store.size == 0:
+            self._signatures = {}
+            self._signature_store = store
+    
+    def _on_vectors_upserted(self, ids: list[str], vectors: list[list[float]]) -> None:
+        """新嵌入的原始向量写入索引后的钩子（可选覆盖）"""
+        pass
+    
     def _build_index_fallback(self, ctx: 'SimulationContext') -> int:
         """降级的索引构建（当必需字段缺失时调用）
         
@@ -323,6 +431,9 @@ class EmbeddingPlugin(ABC):
             "index_size": current_index_size,
             "degraded_mode": self._stats.degraded_mode,
             "quality_warnings": self._stats.quality_warnings,
+            "incremental": self.incremental,
+            "last_embedded": self._stats.last_embedded,
+            "last_reused": self._stats.last_reused,
         }
     
     # ==================== 插件数据共享 ====================
@@ -349,9 +460,8 @@ class EmbeddingPlugin(ABC):
         """
         if not hasattr(ctx, 'plugin_data') or ctx.plugin_data is None:
             ctx.plugin_data = {}
-        if self.name not in ctx.plugin_data:
-            ctx.plugin_data[self.name] = {}
-        ctx.plugin_data[self.name][key] = value
+        # setdefault：插件可能在工作线程中并行写入
+        ctx.plugin_data.setdefault(self.name, {})[key] = value
     
     def get_other_plugin_data(
         self, 
@@ -465,3 +575,10 @@ class EmbeddingPlugin(ABC):
             return 0.0
         return self._tensor_bridge.get_species_divergence_score(lineage_code)
 
+
+def _content_digest(text: str, metadata: dict | None) -> str:
+    """条目内容摘要（文本 + 元数据），用于判断是否需要重新写入"""
+    h = hashlib.md5(text.encode("utf-8"))
+    if metadata:
+        h.update(repr(sorted(metadata.items())).encode("utf-8"))
+    return h.hexdigest()
@@ -64,6 +64,8 @@ class BehaviorStrategyPlugin(EmbeddingPlugin):
     
     # 声明依赖的 Context 字段
     required_context_fields = {"all_species"}
+    # 行为档案只取决于物种自身特征，按物种增量更新
+    incremental = True
     
     # 可选但影响质量的字段
     # 注意: reproduction_r 从 abstract_traits 推断，不是 Species 模型字段
@@ -230,10 +232,17 @@ class BehaviorStrategyPlugin(EmbeddingPlugin):
             social_behavior=social,
         )
     
+    def species_signature(self, species: 'Species') -> tuple:
+        """行为档案依赖的字段：名称、营养级、抽象特征"""
+        traits = getattr(species, 'abstract_traits', None) or {}
+        return (
+            getattr(species, 'common_name', species.lineage_code),
+            getattr(species, 'trophic_level', 2.0),
+            tuple(sorted(traits.items())),
+        )
+    
     def build_index(self, ctx: 'SimulationContext') -> int:
-        """构建行为策略向量索引"""
-        store = self._get_vector_store()
-        
+        """构建行为策略向量索引（只处理特征变化的物种）"""
         species_list = ctx.all_species or []
         if not species_list:
             return 0
@@ -242,7 +251,7 @@ class BehaviorStrategyPlugin(EmbeddingPlugin):
         ids = []
         metadata_list = []
         
-        for sp in species_list:
+        for sp in self.changed_species(ctx):
             profile = self.infer_behavior_profile(sp)
             self._profile_cache[sp.lineage_code] = profile
             
@@ -255,11 +264,7 @@ class BehaviorStrategyPlugin(EmbeddingPlugin):
                 "social": profile.social_behavior,
             })
         
-        vectors = self._embed_texts(texts)
-        if not vectors:
-            return 0
-        
-        return store.add_batch(ids, vectors, metadata_list)
+        return self._upsert_vectors(ids, texts, metadata_list, total=len(species_list))
     
     def _build_index_fallback(self, ctx: 'SimulationContext') -> int:
         """降级逻辑：无 all_species 时跳过"""
@@ -5,6 +5,8 @@
 - update_frequency: int - 更新频率
 - params: dict - 插件特定参数
 
+另读取 manager 段（并行构建线程数、单插件时间预算）。
+
 加载优先级（后者覆盖前者）：
 1. embedding_plugins.yaml 中的插件默认配置
 2. embedding_plugins.yaml 中的 mode_presets
@@ -221,6 +223,16 @@ def merge_configs(
     )
 
 
+def get_manager_options() -> dict[str, Any]:
+    """获取插件管理器配置（embedding_plugins.yaml 的 manager 段）
+    
+    - max_workers: 并行构建索引的工作线程数（<=1 时顺序执行）
+    - build_budget_s: 每个插件的索引构建时间预算（秒）
+    """
+    options = _get_plugin_base_config().get("manager", {})
+    return options if isinstance(options, dict) else {}
+
+
 def clear_config_cache() -> None:
     """清除配置缓存（测试用）"""
     global _config_cache, _cache_time
@@ -63,6 +63,8 @@ class EvolutionSpacePlugin(EmbeddingPlugin):
     """
     
     required_context_fields = {"all_species"}
+    # 只索引本回合新产生的演化事件
+    incremental = True
     
     # 预定义演化方向模板
     DIRECTION_TEMPLATES = {
@@ -87,6 +87,8 @@ class FoodWebEmbeddingPlugin(EmbeddingPlugin):
     
     # 优先使用 food_web_analysis，降级到 all_species
     required_context_fields = {"all_species"}
+    # 生态位置由全局网络决定，按位置文本摘要增量更新
+    incremental = True
     
     @property
     def name(self) -> str:
@@ -187,9 +189,7 @@ class FoodWebEmbeddingPlugin(EmbeddingPlugin):
         return positions
     
     def build_index(self, ctx: 'SimulationContext') -> int:
-        """构建生态网络向量索引"""
-        store = self._get_vector_store()
-        
+        """构建生态网络向量索引（只重新嵌入位置描述变化的物种）"""
         positions = self.build_ecological_positions(ctx)
         if not positions:
             return 0
@@ -209,11 +209,7 @@ class FoodWebEmbeddingPlugin(EmbeddingPlugin):
                 "competitor_count": len(pos.competitors),
             })
         
-        vectors = self._embed_texts(texts)
-        if not vectors:
-            return 0
-        
-        return store.add_batch(ids, vectors, metadata_list)
+        return self._upsert_vectors(ids, texts, metadata_list)
     
     def search(self, query: str, top_k: int = 10) -> list[dict[str, Any]]:
         """搜索生态位置相似的物种"""
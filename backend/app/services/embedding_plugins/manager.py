@@ -1,16 +1,29 @@
 """插件管理器
 
 统一管理所有 Embedding 插件的生命周期。
+回合结束时各插件的索引构建相互独立，在线程池中并行执行，
+并记录每回合的并行/增量节省耗时。工作线程读取的是提交前复制的 Context 快照，
+超出预算、转入后台的构建不会读到下一回合正在修改的物种对象。
 """
 from __future__ import annotations
 
+import copy
 import logging
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
 from .registry import PluginRegistry
 from .base import EmbeddingPlugin, PluginConfig
-from .config_loader import load_plugin_configs, merge_configs, get_default_plugin_config
+from .config_loader import (
+    load_plugin_configs,
+    merge_configs,
+    get_default_plugin_config,
+    get_manager_options,
+)
 
 if TYPE_CHECKING:
     from ..system.embedding import EmbeddingService
@@ -18,6 +31,66 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_BUILD_BUDGET_S = 30.0
+
+# 插件读取的容器字段：快照中复制容器本身（元素为本回合生成的新对象或字典）
+SNAPSHOT_CONTAINER_FIELDS = (
+    "all_tiles",
+    "all_habitats",
+    "pressures",
+    "major_events",
+    "combined_results",
+    "adaptation_events",
+    "branching_events",
+    "trophic_interactions",
+    "tensor_trigger_codes",
+)
+
+
+def _detach(obj: Any) -> Any:
+    """复制一个物种对象（ORM 对象会被下一回合原地修改）"""
+    model_copy = getattr(obj, "model_copy", None)
+    if callable(model_copy):
+        return model_copy(deep=True)
+    return copy.deepcopy(obj)
+
+
+def snapshot_context(ctx: 'SimulationContext') -> 'SimulationContext':
+    """供工作线程使用的 Context 快照
+    
+    物种逐个深复制，其余插件读取的列表/字典复制容器；plugin_data 仍与 ctx 共享，
+    插件写入的共享数据对后续阶段可见。
+    """
+    snapshot = copy.copy(ctx)
+    species = getattr(ctx, "all_species", None)
+    if species:
+        snapshot.all_species = [_detach(sp) for sp in species]
+    for name in SNAPSHOT_CONTAINER_FIELDS:
+        value = getattr(ctx, name, None)
+        if isinstance(value, (list, dict, set)):
+            setattr(snapshot, name, copy.copy(value))
+    return snapshot
+
+
+@dataclass
+class TurnBuildMetrics:
+    """单回合插件索引构建统计"""
+    turn: int
+    wall_ms: float = 0.0                # 实际耗时
+    serial_ms: float = 0.0              # 各插件耗时之和（顺序执行的耗时）
+    parallel_saved_ms: float = 0.0      # 并行节省 = serial_ms - wall_ms
+    incremental_saved_ms: float = 0.0   # 增量节省（复用条目数 × 单条嵌入耗时估计）
+    embedded: int = 0                   # 重新嵌入的条目数
+    reused: int = 0                     # 未变化而跳过的条目数
+    plugin_ms: dict[str, float] = field(default_factory=dict)
+    skipped: list[str] = field(default_factory=list)   # 上回合构建仍未完成而跳过
+    overrun: list[str] = field(default_factory=list)   # 超出时间预算
+
+    @property
+    def saved_ms(self) -> float:
+        return self.parallel_saved_ms + self.incremental_saved_ms
+
 
 class EmbeddingPluginManager:
     """Embedding 插件管理器
@@ -45,7 +118,9 @@ class EmbeddingPluginManager:
         embedding_service: 'EmbeddingService',
         mode: str = "full",
         config_path: Path | str | None = None,
-        only_configured: bool = False
+        only_configured: bool = False,
+        max_workers: int | None = None,
+        build_budget_s: float | None = None,
     ):
         """初始化插件管理器
         
@@ -56,6 +131,8 @@ class EmbeddingPluginManager:
             only_configured: 是否仅加载配置文件中明确列出的插件
                 - False (默认): 加载所有注册的插件，按配置过滤 enabled
                 - True: 仅加载配置文件中出现的插件
+            max_workers: 并行构建索引的线程数（默认读 embedding_plugins.yaml 的 manager 段）
+            build_budget_s: 单个插件的构建时间预算（秒）
         """
         self.embeddings = embedding_service
         self.mode = mode
@@ -66,6 +143,20 @@ class EmbeddingPluginManager:
         
         # 加载 YAML 配置
         self._load_yaml_configs(config_path)
+        
+        # 并行构建
+        options = get_manager_options()
+        self.max_workers = int(
+            max_workers if max_workers is not None
+            else options.get("max_workers", DEFAULT_MAX_WORKERS)
+        )
+        self.build_budget_s = float(
+            build_budget_s if build_budget_s is not None
+            else options.get("build_budget_s", DEFAULT_BUILD_BUDGET_S)
+        )
+        self._executor: ThreadPoolExecutor | None = None
+        self._inflight: dict[str, Future] = {}  # 超出预算、仍在后台运行的构建
+        self._metrics: deque[TurnBuildMetrics] = deque(maxlen=50)
     
     def _load_yaml_configs(self, config_path: Path | str | None = None) -> None:
         """加载 YAML 配置"""
@@ -92,6 +183,7 @@ class EmbeddingPluginManager:
             成功加载的插件数量
         """
         self._plugins = []
+        self._inflight.clear()
         
         # 获取要加载的插件名称
         if plugin_names:
@@ -157,12 +249,125 @@ class EmbeddingPluginManager:
                 logger.error(f"[{plugin.name}] on_turn_start 失败: {e}")
     
     def on_turn_end(self, ctx: 'SimulationContext') -> None:
-        """通知所有插件回合结束"""
+        """通知所有插件回合结束
+        
+        各插件的索引构建相互独立，在线程池中并行执行。超出时间预算的插件
+        不再等待（线程在后台继续完成），完成前跳过其后续回合的构建。
+        """
+        start = time.perf_counter()
+        metrics = TurnBuildMetrics(turn=ctx.turn_index)
+        
+        plugins = []
         for plugin in self._plugins:
-            try:
-                plugin.on_turn_end(ctx)
-            except Exception as e:
-                logger.error(f"[{plugin.name}] on_turn_end 失败: {e}")
+            running = self._inflight.get(plugin.name)
+            if running is not None and not running.done():
+                metrics.skipped.append(plugin.name)
+                continue
+            self._inflight.pop(plugin.name, None)
+            plugins.append(plugin)
+        
+        if self.max_workers <= 1 or len(plugins) <= 1:
+            for plugin in plugins:
+                metrics.plugin_ms[plugin.name] = self._run_turn_end(plugin, ctx)
+        else:
+            # 张量桥接是全局单例，先在主线程同步，避免各插件在工作线程中重复同步
+            self._prepare_tensor_bridge(plugins, ctx)
+            snapshot = snapshot_context(ctx)
+            executor = self._get_executor()
+            futures = {
+                plugin.name: (plugin, executor.submit(self._run_turn_end, plugin, snapshot))
+                for plugin in plugins
+            }
+            for name, (plugin, future) in futures.items():
+                deadline = start + self._plugin_budget(plugin)
+                try:
+                    metrics.plugin_ms[name] = future.result(
+                        timeout=max(0.0, deadline - time.perf_counter())
+                    )
+                except FutureTimeoutError:
+                    metrics.overrun.append(name)
+                    self._inflight[name] = future
+                    logger.warning(
+                        f"[{name}] 索引构建超出时间预算 {self._plugin_budget(plugin):.1f}s，"
+                        "转入后台完成"
+                    )
+        
+        metrics.wall_ms = round((time.perf_counter() - start) * 1000, 2)
+        self._record_metrics(metrics, plugins)
+    
+    def _run_turn_end(self, plugin: EmbeddingPlugin, ctx: 'SimulationContext') -> float:
+        """执行单个插件的回合结束钩子，返回耗时（毫秒）"""
+        start = time.perf_counter()
+        try:
+            plugin.on_turn_end(ctx)
+        except Exception as e:
+            logger.error(f"[{plugin.name}] on_turn_end 失败: {e}")
+        return round((time.perf_counter() - start) * 1000, 2)
+    
+    def _plugin_budget(self, plugin: EmbeddingPlugin) -> float:
+        """插件的构建时间预算（秒），可由 params.build_budget_s 覆盖"""
+        try:
+            return float(plugin.config.params.get("build_budget_s", self.build_budget_s))
+        except (TypeError, ValueError):
+            return self.build_budget_s
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="embedding-plugin",
+            )
+        return self._executor
+    
+    def _prepare_tensor_bridge(
+        self, plugins: list[EmbeddingPlugin], ctx: 'SimulationContext'
+    ) -> None:
+        if not any(p.use_tensor_data for p in plugins):
+            return
+        try:
+            from .tensor_bridge import get_tensor_bridge
+            bridge = get_tensor_bridge()
+            if not bridge.is_synced:
+                bridge.sync_from_context(ctx)
+        except Exception as e:
+            logger.debug(f"[PluginManager] 张量桥接同步失败: {e}")
+    
+    def _record_metrics(self, metrics: TurnBuildMetrics, plugins: list[EmbeddingPlugin]) -> None:
+        """汇总本回合的并行与增量节省"""
+        metrics.serial_ms = round(sum(metrics.plugin_ms.values()), 2)
+        metrics.parallel_saved_ms = round(max(0.0, metrics.serial_ms - metrics.wall_ms), 2)
+        incremental_saved = 0.0
+        for plugin in plugins:
+            # 只统计本回合实际构建了索引的插件（未到更新频率的插件沿用旧统计）
+            if plugin.name not in metrics.plugin_ms or plugin._last_update_turn != metrics.turn:
+                continue
+            stats = plugin._stats
+            metrics.embedded += stats.last_embedded
+            metrics.reused += stats.last_reused
+            incremental_saved += stats.last_reused * stats.embed_ms_per_item
+        metrics.incremental_saved_ms = round(incremental_saved, 2)
+        self._metrics.append(metrics)
+        
+        if metrics.plugin_ms:
+            logger.info(
+                f"[PluginManager] 回合 {metrics.turn} 索引构建 {metrics.wall_ms:.0f}ms "
+                f"(顺序 {metrics.serial_ms:.0f}ms)，嵌入 {metrics.embedded} 条 / 复用 {metrics.reused} 条，"
+                f"节省约 {metrics.saved_ms:.0f}ms"
+            )
+    
+    def get_build_metrics(self, last_n: int | None = None) -> list[dict[str, Any]]:
+        """最近若干回合的索引构建统计"""
+        items = list(self._metrics)
+        if last_n is not None:
+            items = items[-last_n:]
+        return [{**asdict(m), "saved_ms": round(m.saved_ms, 2)} for m in items]
+    
+    def shutdown(self) -> None:
+        """关闭构建线程池（不等待后台仍在运行的构建）"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._inflight.clear()
     
     def get_plugin(self, name: str) -> EmbeddingPlugin | None:
         """获取指定插件"""
@@ -181,6 +386,10 @@ class EmbeddingPluginManager:
             "manager": {
                 "loaded": self._loaded,
                 "plugin_count": len(self._plugins),
+                "max_workers": self.max_workers,
+                "build_budget_s": self.build_budget_s,
+                "last_turn": self.get_build_metrics(last_n=1)[0] if self._metrics else None,
+                "total_saved_ms": round(sum(m.saved_ms for m in self._metrics), 2),
             },
             "plugins": {
                 plugin.name: plugin.get_stats()
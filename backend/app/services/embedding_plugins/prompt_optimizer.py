@@ -66,6 +66,8 @@ class PromptOptimizerPlugin(EmbeddingPlugin):
     DEFAULT_MAX_SIMILAR = 3
     
     required_context_fields = {"all_species"}
+    # 只索引本回合的重大事件
+    incremental = True
     
     @property
     def name(self) -> str:
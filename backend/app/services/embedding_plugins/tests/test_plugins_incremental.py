@@ -0,0 +1,176 @@
+"""插件增量构建与并行调度测试
+
+- 签名未变化的物种/条目不重新嵌入
+- 管理器并行执行各插件的构建，超出时间预算的插件转入后台
+
+插件模块在测试内导入：模块导入时会注册插件，提前导入会影响 test_plugins 中的注册表测试。
+"""
+import threading
+import time
+
+from ..base import EmbeddingPlugin, PluginConfig
+from ..manager import EmbeddingPluginManager
+from .test_plugins import MockContext, MockEmbeddingService, MockMultiVectorStore, MockSpecies
+
+
+class CountingEmbeddingService(MockEmbeddingService):
+    """记录嵌入过的文本条数"""
+
+    def __init__(self, dimension: int = 64):
+        super().__init__(dimension)
+        self.embedded_texts = 0
+
+    def embed(self, texts):
+        self.embedded_texts += len(texts)
+        return super().embed(texts)
+
+
+def _world():
+    return [
+        MockSpecies(lineage_code="A"),
+        MockSpecies(lineage_code="A_B", prey_species=["A"], trophic_level=3.0),
+        MockSpecies(lineage_code="C", trophic_level=1.0),
+    ]
+
+
+class TestIncrementalBuild:
+    def test_behavior_only_reembeds_changed_species(self):
+        from ..behavior_strategy import BehaviorStrategyPlugin
+
+        service = CountingEmbeddingService()
+        plugin = BehaviorStrategyPlugin(service)
+        plugin.initialize()
+        ctx = MockContext(all_species=_world())
+
+        assert plugin.build_index(ctx) == 3
+        assert plugin.build_index(ctx) == 0
+        assert plugin._stats.last_reused == 3
+
+        ctx.all_species[1].abstract_traits = {**ctx.all_species[1].abstract_traits, "攻击性": 9}
+        assert plugin.build_index(ctx) == 1
+        assert service.embedded_texts == 4
+        assert plugin._get_vector_store().size == 3
+
+    def test_swapped_store_rebuilds_from_scratch(self):
+        from ..behavior_strategy import BehaviorStrategyPlugin
+
+        service = CountingEmbeddingService()
+        plugin = BehaviorStrategyPlugin(service)
+        plugin.initialize()
+        ctx = MockContext(all_species=_world())
+        assert plugin.build_index(ctx) == 3
+
+        # 切换存档时 EmbeddingService 换上新的空存储，旧签名不能再跳过嵌入
+        service._vector_stores = MockMultiVectorStore(service.dimension)
+        assert plugin.build_index(ctx) == 3
+        assert plugin._get_vector_store().size == 3
+        assert plugin.search("捕食", top_k=1)
+
+    def test_food_web_follows_network_changes(self):
+        from ..food_web_embedding import FoodWebEmbeddingPlugin
+
+        service = CountingEmbeddingService()
+        plugin = FoodWebEmbeddingPlugin(service)
+        plugin.initialize()
+        ctx = MockContext(all_species=_world())
+
+        assert plugin.build_index(ctx) == 3
+        assert plugin.build_index(ctx) == 0
+
+        # C 成为 A 的猎物：A 与 C 的位置描述都变化
+        ctx.all_species[0].prey_species = ["C"]
+        ctx.all_species[0].trophic_level = 2.5
+        assert plugin.build_index(ctx) == 2
+
+    def test_ancestry_keeps_trait_history_for_unchanged_species(self):
+        from ..ancestry_embedding import AncestryEmbeddingPlugin
+
+        plugin = AncestryEmbeddingPlugin(CountingEmbeddingService())
+        plugin.initialize()
+        ctx = MockContext(all_species=_world())
+
+        assert plugin.build_index(ctx) == 3
+        assert plugin.build_index(ctx) == 0
+        assert len(plugin._trait_history["A"]["攻击性"]) == 2
+        assert len(plugin._ancestry_cache["A_B"].vector) == 64
+
+
+class _SleepPlugin(EmbeddingPlugin):
+    """构建时休眠指定秒数的测试插件"""
+
+    use_tensor_data = False
+
+    def __init__(self, service, name: str, seconds: float, config: PluginConfig | None = None):
+        super().__init__(service, config)
+        self._name = name
+        self.seconds = seconds
+        self.threads: set[str] = set()
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    def build_index(self, ctx):
+        self.threads.add(threading.current_thread().name)
+        time.sleep(self.seconds)
+        self.seen_traits = [dict(sp.abstract_traits) for sp in ctx.all_species]
+        return 0
+
+    def search(self, query: str, top_k: int = 10):
+        return []
+
+
+class TestParallelManager:
+    def _manager(self, plugins, **kwargs):
+        manager = EmbeddingPluginManager(MockEmbeddingService(), **kwargs)
+        manager._plugins = plugins
+        for plugin in plugins:
+            plugin.initialize()
+        return manager
+
+    def test_plugins_build_concurrently(self):
+        service = MockEmbeddingService()
+        plugins = [_SleepPlugin(service, f"p{i}", 0.2) for i in range(3)]
+        manager = self._manager(plugins, max_workers=3, build_budget_s=5.0)
+        try:
+            manager.on_turn_end(MockContext(turn_index=0))
+        finally:
+            manager.shutdown()
+
+        metrics = manager.get_build_metrics()[-1]
+        assert metrics["wall_ms"] < 500
+        assert metrics["serial_ms"] >= 600
+        assert metrics["parallel_saved_ms"] > 0
+        assert all(p._stats.updates == 1 for p in plugins)
+        assert all(p.threads and next(iter(p.threads)).startswith("embedding-plugin") for p in plugins)
+
+    def test_overrun_plugin_is_skipped_until_finished(self):
+        service = MockEmbeddingService()
+        slow = _SleepPlugin(service, "slow", 0.5, PluginConfig(params={"build_budget_s": 0.05}))
+        fast = _SleepPlugin(service, "fast", 0.0)
+        manager = self._manager([slow, fast], max_workers=2, build_budget_s=5.0)
+        try:
+            manager.on_turn_end(MockContext(turn_index=0))
+            manager.on_turn_end(MockContext(turn_index=1))
+            first, second = manager.get_build_metrics()
+            assert first["overrun"] == ["slow"]
+            assert second["skipped"] == ["slow"]
+            assert fast._stats.updates == 2
+        finally:
+            manager.shutdown()
+
+    def test_overrun_build_reads_turn_snapshot(self):
+        service = MockEmbeddingService()
+        slow = _SleepPlugin(service, "slow", 0.3, PluginConfig(params={"build_budget_s": 0.01}))
+        fast = _SleepPlugin(service, "fast", 0.0)
+        manager = self._manager([slow, fast], max_workers=2, build_budget_s=5.0)
+        ctx = MockContext(turn_index=0, all_species=_world())
+        try:
+            manager.on_turn_end(ctx)
+            # 下一回合原地修改物种，后台构建仍读本回合的快照
+            ctx.all_species[0].abstract_traits["攻击性"] = 99
+            manager._inflight["slow"].result(timeout=5)
+        finally:
+            manager.shutdown()
+        assert slow.seen_traits[0]["攻击性"] == 5
+        assert fast.seen_traits[0]["攻击性"] == 5
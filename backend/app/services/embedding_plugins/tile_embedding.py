@@ -105,6 +105,8 @@ class TileBiomePlugin(EmbeddingPlugin):
     required_context_fields = {"all_tiles", "all_species"}
     # 启用张量数据
     use_tensor_data = True
+    # 地块变化慢，按档案文本摘要增量更新
+    incremental = True
     
     @property
     def name(self) -> str:
@@ -254,9 +256,7 @@ class TileBiomePlugin(EmbeddingPlugin):
         return profiles
     
     def build_index(self, ctx: 'SimulationContext') -> int:
-        """构建地块向量索引"""
-        store = self._get_vector_store()
-        
+        """构建地块向量索引（只重新嵌入档案变化的地块）"""
         profiles = self.build_tile_profiles(ctx)
         if not profiles:
             return 0
@@ -275,11 +275,7 @@ class TileBiomePlugin(EmbeddingPlugin):
                 "elevation": profile.elevation,
             })
         
-        vectors = self._embed_texts(texts)
-        if not vectors:
-            return 0
-        
-        return store.add_batch(ids, vectors, metadata_list)
+        return self._upsert_vectors(ids, texts, metadata_list)
     
     def _build_index_fallback(self, ctx: 'SimulationContext') -> int:
         """降级逻辑：无 all_tiles 时跳过"""
@@ -1,15 +1,18 @@
 """Geophysical service utilities."""
 
+from .terrain_metrics import (
+    TerrainMetrics,
+    TerrainMetricsCache,
+    get_terrain_metrics_cache,
+    hex_neighbor_stack,
+)
 from .vegetation_cover import VegetationCoverService, vegetation_cover_service
 
 __all__ = [
+    "TerrainMetrics",
+    "TerrainMetricsCache",
+    "get_terrain_metrics_cache",
+    "hex_neighbor_stack",
     "VegetationCoverService",
     "vegetation_cover_service",
 ]
-
-
-
-
-
-
-
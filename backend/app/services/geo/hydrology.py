@@ -1,88 +1,263 @@
+"""水文计算 - 洼地填充、D6 流向、汇流累积与流域划分
+
+全部在 (H, W) 六边形网格上以数组完成，可直接用于逻辑层 128×40 与
+物理层 2048×640（PHYSICS_RES）网格：
+
+1. 洼地填充：每个格子的填充高程 = 通往出水口（海洋/湖泊）的所有路径中
+   “路径最高点”的最小值，与 priority-flood 结果相同。这里用最小生成树求解：
+   边权为两端高程的较大值，树上到出水口的路径最大边即填充高程
+   （scipy 最小生成树 + BFS 前驱，再用指针跳跃求路径最大值）
+2. D6 流向：在填充面上取最陡下降邻居；平坦区/填平的洼地沿生成树父节点
+   流出，保证流向图无环且都能到达出水口
+3. 汇流累积：按拓扑顺序（入度为 0 的前沿逐层推进）用 NumPy 累加
+4. 流域：沿流向指针跳跃到终点，按出水口编号
+
+邻居模板使用 terrain_metrics 中共享的六边形邻接表。
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from .terrain_metrics import HEX_EVEN_COLUMN, HEX_ODD_COLUMN, hex_neighbor_indices, hex_neighbor_stack
+
+logger = logging.getLogger(__name__)
+
+# 形成河流的累积流量阈值（单位：湿度 × 格子数）
+RIVER_FLUX_THRESHOLD = 2.0
+
+
+@dataclass
+class HydrologyResult:
+    """一次水文计算的网格结果（扁平索引 = y * W + x）"""
+    width: int
+    height: int
+    elevation: np.ndarray     # (H, W) 原始高程，无效格子为 NaN
+    filled: np.ndarray        # (H, W) 填充后高程
+    flow_dir: np.ndarray      # (H, W) int8，D6 方向序号 0-5，出水口/封闭洼地为 -1
+    receivers: np.ndarray     # (H*W,) int64，下游格子；终点指向自身
+    accumulation: np.ndarray  # (H, W) 累积流量（含自身）
+    basins: np.ndarray        # (H, W) int32，流域编号，水域/无效格子为 -1
+    outlets: np.ndarray       # (H, W) bool，出水口（海洋/湖泊）
+    order: np.ndarray         # (n,) 上游→下游的拓扑顺序
+
+    @property
+    def fill_depth(self) -> np.ndarray:
+        """洼地被填充的深度（潜在湖泊）"""
+        return np.nan_to_num(self.filled - self.elevation)
+
+    def river_mask(self, threshold: float = RIVER_FLUX_THRESHOLD) -> np.ndarray:
+        return (self.accumulation > threshold) & ~self.outlets & (self.flow_dir >= 0)
+
+    @property
+    def basin_count(self) -> int:
+        return int(self.basins.max()) + 1 if self.basins.size and self.basins.max() >= 0 else 0
+
+
+def _fill_and_route(
+    elev: np.ndarray,
+    valid: np.ndarray,
+    outlets: np.ndarray,
+    neighbors: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """最小生成树洼地填充，返回 (填充高程, 生成树父节点)
+
+    父节点为 -1 表示出水口或无法到达任何出水口的格子。
+    """
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import breadth_first_order, minimum_spanning_tree
+
+    n = elev.size
+    flat = elev.ravel()
+    valid_flat = valid.ravel()
+    outlet_flat = outlets.ravel()
+    root = n
+    offset = float(flat[valid_flat].min()) - 1.0  # 边权必须为正（稀疏矩阵中 0 表示无边）
+
+    # 无向边：每条边只取一次（u < v）；出水口之间不连边，各自直接连到虚拟根
+    src = np.tile(np.arange(n), 6)
+    dst = neighbors.reshape(6, -1).ravel()
+    keep = (dst > src) & valid_flat[src]
+    src, dst = src[keep], dst[keep]
+    keep = valid_flat[dst] & ~(outlet_flat[src] & outlet_flat[dst])
+    src, dst = src[keep], dst[keep]
+    weight = np.maximum(flat[src], flat[dst]) - offset
+
+    outlet_idx = np.flatnonzero(outlet_flat & valid_flat)
+    rows = np.concatenate([src, outlet_idx])
+    cols = np.concatenate([dst, np.full(outlet_idx.size, root)])
+    data = np.concatenate([weight, flat[outlet_idx] - offset])
+
+    graph = coo_matrix((data, (rows, cols)), shape=(n + 1, n + 1)).tocsr()
+    mst = minimum_spanning_tree(graph)
+    _, pred = breadth_first_order(mst, root, directed=False, return_predecessors=True)
+    parent = pred[:n].astype(np.int64)
+    parent[(parent < 0) | (parent == root)] = -1
+
+    # 填充高程 = max(自身, 父节点填充高程)：指针跳跃求到根的路径最大值
+    filled = np.where(valid_flat, flat, np.nan)
+    up = np.where(parent >= 0, parent, np.arange(n))
+    while True:
+        nxt = up[up]
+        filled = np.fmax(filled, filled[up])
+        if np.array_equal(nxt, up):
+            break
+        up = nxt
+    return filled.reshape(elev.shape), parent
+
+
+def _accumulate(receivers: np.ndarray, weights: np.ndarray, active: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """按拓扑顺序累加上游流量，返回 (累积流量, 拓扑顺序)"""
+    n = receivers.size
+    idx = np.arange(n)
+    moving = active & (receivers != idx)
+    acc = np.where(active, weights, 0.0).astype(np.float64)
+    indeg = np.bincount(receivers[moving], minlength=n)
+
+    # slot[t] 记录 t 在本层 targets 中最后出现的位置，用于去重（比逐层 np.unique 省去排序）
+    slot = np.empty(n, dtype=np.int64)
+    frontier = np.flatnonzero(active & (indeg == 0))
+    order = []
+    while frontier.size:
+        order.append(frontier)
+        frontier = frontier[moving[frontier]]
+        if not frontier.size:
+            break
+        targets = receivers[frontier]
+        np.add.at(acc, targets, acc[frontier])
+        np.subtract.at(indeg, targets, 1)
+        targets = targets[indeg[targets] == 0]
+        slot[targets] = np.arange(targets.size)
+        frontier = targets[slot[targets] == np.arange(targets.size)]
+    order_arr = np.concatenate(order) if order else np.zeros(0, dtype=np.int64)
+    return acc, order_arr
+
+
+def analyze_grid(
+    elevation: np.ndarray,
+    humidity: np.ndarray | None = None,
+    sea_level: float = 0.0,
+    lakes: np.ndarray | None = None,
+    valid: np.ndarray | None = None,
+) -> HydrologyResult:
+    """对 (H, W) 高程网格做完整水文分析
+
+    Args:
+        elevation: 高程 (m)，无效格子可为 NaN
+        humidity: 每格产流量（默认 0.5）
+        sea_level: 低于海平面的格子为出水口
+        lakes: 额外的出水口（湖泊）掩码
+        valid: 有效格子掩码（默认为高程非 NaN 的格子）
+    """
+    elev = np.asarray(elevation, dtype=np.float64)
+    H, W = elev.shape
+    n = H * W
+    valid = ~np.isnan(elev) if valid is None else (np.asarray(valid, dtype=bool) & ~np.isnan(elev))
+    outlets = valid & (elev < sea_level)
+    if lakes is not None:
+        outlets |= valid & np.asarray(lakes, dtype=bool)
+    if not outlets.any() and valid.any():
+        # 没有海洋时以最低点为唯一出水口
+        lowest = np.nanargmin(np.where(valid, elev, np.nan))
+        outlets.flat[lowest] = True
+
+    neighbors = hex_neighbor_indices(H, W)  # (6, H, W)
+    filled, parent = _fill_and_route(elev, valid, outlets, neighbors)
+
+    # D6 最陡下降（填充面上严格更低的邻居）
+    nbr_filled = hex_neighbor_stack(filled)
+    drop = filled[None] - nbr_filled
+    drop = np.where(np.isnan(drop), -np.inf, drop)
+    best = drop.argmax(axis=0)
+    has_lower = np.take_along_axis(drop, best[None], axis=0)[0] > 0
+
+    idx = np.arange(n).reshape(H, W)
+    steepest = np.take_along_axis(neighbors, best[None], axis=0)[0]
+    parent_grid = parent.reshape(H, W)
+    parent_dir = (neighbors == parent_grid[None]).argmax(axis=0)
+    has_parent = parent_grid >= 0
+
+    moving = valid & ~outlets & (has_lower | has_parent)
+    receivers = np.where(has_lower, steepest, np.where(has_parent, parent_grid, idx))
+    receivers = np.where(moving, receivers, idx).ravel().astype(np.int64)
+    flow_dir = np.where(moving, np.where(has_lower, best, parent_dir), -1).astype(np.int8)
+
+    weights = np.full(n, 0.5) if humidity is None else np.asarray(humidity, dtype=np.float64).ravel()
+    acc, order = _accumulate(receivers, np.nan_to_num(weights), valid.ravel())
+
+    # 流域：指针跳跃到流向终点，按终点重新编号
+    terminal = receivers.copy()
+    while True:
+        nxt = terminal[terminal]
+        if np.array_equal(nxt, terminal):
+            break
+        terminal = nxt
+    land = (valid & ~outlets).ravel()
+    basins = np.full(n, -1, dtype=np.int32)
+    if land.any():
+        _, labels = np.unique(terminal[land], return_inverse=True)
+        basins[land] = labels.astype(np.int32)
+
+    return HydrologyResult(
+        width=W,
+        height=H,
+        elevation=np.where(valid, elev, np.nan),
+        filled=np.where(valid, filled, np.nan),
+        flow_dir=flow_dir,
+        receivers=receivers,
+        accumulation=acc.reshape(H, W),
+        basins=basins.reshape(H, W),
+        outlets=outlets,
+        order=order,
+    )
 
-from typing import Dict, List, Tuple, Any
 
 class HydrologyService:
-    def __init__(self, width: int, height: int):
+    """基于地块列表的水文服务（地块 ↔ 网格转换）"""
+
+    def __init__(self, width: int, height: int, sea_level: float = 0.0):
         self.width = width
         self.height = height
+        self.sea_level = sea_level
+
+    def analyze(self, tiles: List[Any]) -> Tuple[HydrologyResult, np.ndarray]:
+        """返回水文结果与 (H, W) 地块 ID 网格（无地块为 -1）"""
+        n = len(tiles)
+        xs = np.fromiter((t.x for t in tiles), dtype=np.int64, count=n)
+        ys = np.fromiter((t.y for t in tiles), dtype=np.int64, count=n)
+        elevation = np.full((self.height, self.width), np.nan)
+        humidity = np.zeros((self.height, self.width))
+        lakes = np.zeros((self.height, self.width), dtype=bool)
+        tile_ids = np.full((self.height, self.width), -1, dtype=np.int64)
+
+        elevation[ys, xs] = np.fromiter((t.elevation for t in tiles), dtype=np.float64, count=n)
+        humidity[ys, xs] = np.fromiter((getattr(t, "humidity", 0.5) for t in tiles), dtype=np.float64, count=n)
+        lakes[ys, xs] = np.fromiter((bool(getattr(t, "is_lake", False)) for t in tiles), dtype=bool, count=n)
+        tile_ids[ys, xs] = np.fromiter((getattr(t, "id", 0) or 0 for t in tiles), dtype=np.int64, count=n)
+
+        result = analyze_grid(elevation, humidity, sea_level=self.sea_level, lakes=lakes)
+        return result, tile_ids
 
-    def calculate_flow(self, tiles: List[Any]) -> Dict[int, dict]:
+    def calculate_flow(self, tiles: List[Any], threshold: float = RIVER_FLUX_THRESHOLD) -> Dict[int, dict]:
         """
-        Returns a dict: { tile_id: { 'next_tile_id': int, 'flow': float } }
+        Returns a dict: { tile_id: { 'target_id': int, 'flux': float } }
         """
-        tile_map = {(t.x, t.y): t for t in tiles}
-        flow_directions = {} 
-        
-        # 1. Calculate directions
-        for tile in tiles:
-            # Skip oceans/lakes for flow source, but they can be targets
-            # Actually, rivers flow INTO oceans.
-            if getattr(tile, 'is_lake', False) or tile.elevation < 0:
-                continue
-                
-            neighbors = self._get_hex_neighbors(tile.x, tile.y)
-            lowest_neighbor = None
-            min_elev = tile.elevation
-            
-            for nx, ny in neighbors:
-                # Handle wrapping for x
-                nx = nx % self.width
-                if 0 <= ny < self.height:
-                    neighbor = tile_map.get((nx, ny))
-                    if neighbor and neighbor.elevation < min_elev:
-                        min_elev = neighbor.elevation
-                        lowest_neighbor = neighbor
-            
-            if lowest_neighbor:
-                flow_directions[tile.id] = lowest_neighbor.id
-
-        # 2. Accumulate Flux
-        # Base flux = humidity * area (assume unit area)
-        flux = {t.id: getattr(t, 'humidity', 0.5) for t in tiles}
-        
-        # Sort by elevation desc
-        sorted_tiles = sorted(tiles, key=lambda t: t.elevation, reverse=True)
-        
-        river_network = {}
-        
-        for tile in sorted_tiles:
-            current_id = getattr(tile, 'id', 0)
-            current_flux = flux.get(current_id, 0)
-            
-            # If significant flow, record it
-            # Threshold 2.0 is arbitrary, tune based on humidity range (0-1) and map size
-            # If map is large, flux accumulates heavily.
-            if current_flux > 2.0 and current_id in flow_directions:
-                target_id = flow_directions[current_id]
-                river_network[current_id] = {
-                    "target_id": target_id,
-                    "flux": current_flux
-                }
-                
-                if target_id in flux:
-                    flux[target_id] += current_flux
-
-        return river_network
+        if not tiles:
+            return {}
+        result, tile_ids = self.analyze(tiles)
+        sources = np.flatnonzero(result.river_mask(threshold).ravel())
+        flat_ids = tile_ids.ravel()
+        targets = flat_ids[result.receivers[sources]]
+        flux = result.accumulation.ravel()[sources]
+        keep = targets >= 0
+        return {
+            int(src): {"target_id": int(dst), "flux": float(f)}
+            for src, dst, f in zip(flat_ids[sources][keep], targets[keep], flux[keep])
+        }
 
     def _get_hex_neighbors(self, x: int, y: int) -> List[Tuple[int, int]]:
-        # Logic matching MapStateManager._neighbor_ids (Column-based offset)
-        # Even-q or Odd-q? MapStateManager uses tile.x & 1.
-        # If x is odd, use odd_column offsets.
-        
-        # From MapStateManager:
-        # odd_column: (-1,0), (-1,-1), (0,-1), (1,0), (0,1), (-1,1)
-        # even_column: (-1,0), (0,-1), (1,-1), (1,0), (1,1), (0,1)
-        
-        even_column = [
-            (-1, 0), (0, -1), (1, -1),
-            (1, 0), (1, 1), (0, 1),
-        ]
-        odd_column = [
-            (-1, 0), (-1, -1), (0, -1),
-            (1, 0), (0, 1), (-1, 1),
-        ]
-        
-        if x & 1:
-            return [(x + dx, y + dy) for dx, dy in odd_column]
-        else:
-            return [(x + dx, y + dy) for dx, dy in even_column]
+        directions = HEX_ODD_COLUMN if (x & 1) else HEX_EVEN_COLUMN
+        return [(x + dx, y + dy) for dx, dy in directions]
@@ -0,0 +1,391 @@
+"""
+分层地图 - 静态几何 + 按视图模式的紧凑二进制图层
+
+/map 每次切换视图都返回完整的 MapOverview（每个地块一个对象、五套颜色字符串、
+全部栖息地及宜居度分解），体积为 MB 级。分层接口把它拆成：
+
+- 几何（一次性获取）：(H, W) 网格上的地块 ID、q/r 坐标，以及邻居模板说明
+- 图层（按需获取）：每个视图模式/字段一个 (H, W) 类型化数组
+  - color:<视图模式>   uint8 (H, W, 3) RGB
+  - 标量（海拔、温度…）float16
+  - 分类（地形类型、气候带…）uint8 + 调色板（名称表），超过 255 类时为 uint16；
+    类型最大值表示缺失地块（头部 missing 字段）
+  - species:<谱系代码>  float32 种群（float16 会溢出）
+  - suitability:<谱系代码> uint8，0-255 对应 0-1
+- 支持区域裁剪（x0,y0,x1,y1，半开区间）与 LOD（行列按步长抽样）
+
+二进制帧格式（可连续拼接，逐帧生成便于流式输出）：
+    <u32 小端 头部长度> <JSON 头部（空格补齐）> <数据（0 补齐）>
+头部与数据都按 8 字节对齐，前端可以直接在同一个 ArrayBuffer 上建类型化数组视图。
+JSON 头部：{name, dtype, shape, byte_length, region, lod, palette?, missing?, scale?}
+
+按世界版本（core.response_cache）缓存地块/栖息地快照，同一版本内切换视图不再查库。
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import struct
+import threading
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Sequence
+
+import numpy as np
+
+from ...core.response_cache import get_world_version
+from .map_coloring import map_coloring_service
+from .terrain_metrics import HEX_EVEN_COLUMN, HEX_ODD_COLUMN
+
+if TYPE_CHECKING:
+    from .map_manager import MapStateManager
+
+logger = logging.getLogger(__name__)
+
+FRAME_ALIGN = 8
+COLOR_MODES = ("terrain", "terrain_type", "elevation", "biodiversity", "climate")
+SCALAR_LAYERS = ("elevation", "temperature", "humidity", "resources", "salinity")
+CATEGORY_LAYERS = ("terrain_type", "climate_zone", "biome", "cover")
+MAX_LOD = 16
+
+
+# ==================== 帧编码 ====================
+
+def encode_frame(name: str, array: np.ndarray, **meta: Any) -> bytes:
+    """把一个数组编码为对齐的二进制帧"""
+    data = np.ascontiguousarray(array)
+    header = {
+        "name": name,
+        "dtype": data.dtype.name,
+        "shape": list(data.shape),
+        "byte_length": data.nbytes,
+        **meta,
+    }
+    raw = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    raw += b" " * (-(4 + len(raw)) % FRAME_ALIGN)
+    payload = data.tobytes()
+    payload += b"\0" * (-len(payload) % FRAME_ALIGN)
+    return struct.pack("<I", len(raw)) + raw + payload
+
+
+def _category_dtype(categories: int) -> type[np.unsignedinteger]:
+    """分类编码类型：最大值留作缺失地块，超过 255 类时改用 uint16"""
+    if categories < np.iinfo(np.uint8).max:
+        return np.uint8
+    if categories < np.iinfo(np.uint16).max:
+        return np.uint16
+    raise ValueError(f"分类数过多: {categories}")
+
+
+def decode_frames(buffer: bytes) -> list[tuple[dict[str, Any], np.ndarray]]:
+    """解析连续的帧（测试与调试用，前端有对应的 TS 实现）"""
+    frames = []
+    offset = 0
+    while offset < len(buffer):
+        (header_len,) = struct.unpack_from("<I", buffer, offset)
+        offset += 4
+        header = json.loads(buffer[offset:offset + header_len].decode("utf-8"))
+        offset += header_len
+        count = int(np.prod(header["shape"])) if header["shape"] else 1
+        array = np.frombuffer(buffer, dtype=header["dtype"], count=count, offset=offset)
+        frames.append((header, array.reshape(header["shape"])))
+        offset += header["byte_length"] + (-header["byte_length"] % FRAME_ALIGN)
+    return frames
+
+
+# ==================== 区域 / LOD ====================
+
+@dataclass(frozen=True)
+class MapRegion:
+    """网格区域（半开区间）与抽样步长"""
+    x0: int
+    y0: int
+    x1: int
+    y1: int
+    lod: int = 1
+
+    @classmethod
+    def parse(cls, width: int, height: int, region: str | None = None, lod: int = 1) -> "MapRegion":
+        """解析 "x0,y0,x1,y1"（缺省为整张地图），越界部分截断"""
+        if lod < 1 or lod > MAX_LOD:
+            raise ValueError(f"lod 必须在 1-{MAX_LOD} 之间")
+        if not region:
+            return cls(0, 0, width, height, lod)
+        try:
+            x0, y0, x1, y1 = (int(v) for v in region.split(","))
+        except ValueError:
+            raise ValueError("region 格式应为 x0,y0,x1,y1") from None
+        x0, x1 = max(0, x0), min(width, x1)
+        y0, y1 = max(0, y0), min(height, y1)
+        if x0 >= x1 or y0 >= y1:
+            raise ValueError("region 为空")
+        return cls(x0, y0, x1, y1, lod)
+
+    def slice(self, grid: np.ndarray) -> np.ndarray:
+        return grid[self.y0:self.y1:self.lod, self.x0:self.x1:self.lod]
+
+    def meta(self) -> dict[str, Any]:
+        return {"region": [self.x0, self.y0, self.x1, self.y1], "lod": self.lod}
+
+
+# ==================== 快照 ====================
+
+def _hex_to_rgb(colors: Sequence[str]) -> np.ndarray:
+    """["#rrggbb", ...] → uint8 (N, 3)"""
+    if not colors:
+        return np.zeros((0, 3), dtype=np.uint8)
+    raw = bytes.fromhex("".join(c[1:7] for c in colors))
+    return np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+
+
+@dataclass
+class MapSnapshot:
+    """一个世界版本的地块与栖息地数据（网格布局 (H, W)）"""
+    version: int
+    width: int
+    height: int
+    sea_level: float
+    turn_index: int
+    tiles: list[Any] = field(repr=False)
+    tile_y: np.ndarray = field(repr=False)           # (N,) 每个地块的网格坐标
+    tile_x: np.ndarray = field(repr=False)
+    tile_id: np.ndarray = field(repr=False)          # (H, W) int32，无地块为 -1
+    scalars: dict[str, np.ndarray] = field(repr=False)
+    categories: dict[str, tuple[np.ndarray, list[str]]] = field(repr=False)
+    species_count: np.ndarray = field(repr=False)    # (H, W) 每个地块的物种数
+    habitat_tile: np.ndarray = field(repr=False)     # (M,) 栖息地记录（按物种查询）
+    habitat_species: np.ndarray = field(repr=False)
+    habitat_population: np.ndarray = field(repr=False)
+    habitat_suitability: np.ndarray = field(repr=False)
+    lineage_to_species: dict[str, int] = field(repr=False)
+    _colors: dict[str, np.ndarray] = field(default_factory=dict, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def to_grid(self, values: np.ndarray, fill: Any = 0) -> np.ndarray:
+        """(N, ...) 按地块顺序的数据 → (H, W, ...) 网格"""
+        grid = np.full((self.height, self.width) + values.shape[1:], fill, dtype=values.dtype)
+        grid[self.tile_y, self.tile_x] = values
+        return grid
+
+    def color_grid(self, mode: str) -> np.ndarray:
+        """某视图模式的 RGB 网格（首次请求时计算）"""
+        with self._lock:
+            cached = self._colors.get(mode)
+        if cached is not None:
+            return cached
+        counts = self.species_count[self.tile_y, self.tile_x]
+        colors = [
+            map_coloring_service.get_color(tile, self.sea_level, mode, min(1.0, count / 10.0))  # type: ignore[arg-type]
+            for tile, count in zip(self.tiles, counts.tolist())
+        ]
+        grid = self.to_grid(_hex_to_rgb(colors))
+        with self._lock:
+            self._colors[mode] = grid
+        return grid
+
+
+def build_snapshot(
+    tiles: Sequence[Any],
+    habitats: Sequence[Any],
+    species: Iterable[Any],
+    width: int,
+    height: int,
+    sea_level: float = 0.0,
+    turn_index: int = 0,
+    version: int = 0,
+) -> MapSnapshot:
+    """由地块、栖息地、物种列表构建网格快照"""
+    tiles = [t for t in tiles if 0 <= t.x < width and 0 <= t.y < height]
+    n = len(tiles)
+    xs = np.fromiter((t.x for t in tiles), dtype=np.int64, count=n)
+    ys = np.fromiter((t.y for t in tiles), dtype=np.int64, count=n)
+    ids = np.fromiter((t.id or 0 for t in tiles), dtype=np.int64, count=n)
+
+    tile_id = np.full((height, width), -1, dtype=np.int32)
+    tile_id[ys, xs] = ids
+
+    def column(attr: str, default: float) -> np.ndarray:
+        return np.fromiter((getattr(t, attr, default) for t in tiles), dtype=np.float64, count=n)
+
+    elevation = column("elevation", 0.0) - sea_level
+    is_lake = np.fromiter((bool(getattr(t, "is_lake", False)) for t in tiles), dtype=bool, count=n)
+    scalar_values = {
+        "elevation": elevation,
+        "temperature": column("temperature", 15.0),
+        "humidity": column("humidity", 0.5),
+        "resources": column("resources", 0.0),
+        "salinity": column("salinity", 35.0),
+    }
+
+    # 分类字段（与 get_overview 相同的推断方式）
+    latitude = ys / (height - 1) if height > 1 else np.full(n, 0.5)
+    dist_from_equator = np.abs((1 - latitude) - 0.5) * 2
+    category_values = {
+        "terrain_type": [
+            map_coloring_service.classify_terrain_type(e, lake)
+            for e, lake in zip(elevation.tolist(), is_lake.tolist())
+        ],
+        "climate_zone": [
+            map_coloring_service.infer_climate_zone(d, max(0.0, e))
+            for d, e in zip(dist_from_equator.tolist(), elevation.tolist())
+        ],
+        "biome": [t.biome for t in tiles],
+        "cover": [t.cover for t in tiles],
+    }
+
+    m = len(habitats)
+    h_tile = np.fromiter((h.tile_id for h in habitats), dtype=np.int64, count=m)
+    h_species = np.fromiter((h.species_id for h in habitats), dtype=np.int64, count=m)
+    h_population = np.fromiter((h.population for h in habitats), dtype=np.float64, count=m)
+    h_suitability = np.fromiter((h.suitability for h in habitats), dtype=np.float64, count=m)
+
+    # 每个地块的物种数（生物多样性）
+    id_to_index = np.full(int(ids.max()) + 2 if n else 1, -1, dtype=np.int64)
+    id_to_index[ids] = np.arange(n)
+    valid = (h_tile >= 0) & (h_tile < id_to_index.size)
+    h_index = np.where(valid, id_to_index[np.clip(h_tile, 0, id_to_index.size - 1)], -1)
+    counts = np.bincount(h_index[h_index >= 0], minlength=n)[:n]
+
+    snapshot = MapSnapshot(
+        version=version,
+        width=width,
+        height=height,
+        sea_level=float(sea_level),
+        turn_index=int(turn_index),
+        tiles=tiles,
+        tile_y=ys,
+        tile_x=xs,
+        tile_id=tile_id,
+        scalars={},
+        categories={},
+        species_count=np.zeros((height, width), dtype=np.int64),
+        habitat_tile=h_index,
+        habitat_species=h_species,
+        habitat_population=h_population,
+        habitat_suitability=h_suitability,
+        lineage_to_species={sp.lineage_code: sp.id for sp in species if sp.id is not None},
+    )
+    snapshot.species_count = snapshot.to_grid(counts.astype(np.int64))
+    snapshot.scalars = {name: snapshot.to_grid(values) for name, values in scalar_values.items()}
+    snapshot.scalars["is_lake"] = snapshot.to_grid(is_lake.astype(np.float64))
+    for name, values in category_values.items():
+        palette, codes = np.unique(np.asarray([str(v) for v in values], dtype=str), return_inverse=True)
+        dtype = _category_dtype(palette.size)
+        snapshot.categories[name] = (snapshot.to_grid(codes.astype(dtype), fill=np.iinfo(dtype).max), palette.tolist())
+    return snapshot
+
+
+# ==================== 服务 ====================
+
+class MapLayerService:
+    """分层地图：几何 + 图层帧，快照按世界版本缓存"""
+
+    def __init__(self, map_manager: "MapStateManager") -> None:
+        self.map_manager = map_manager
+        self._snapshot: MapSnapshot | None = None
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> MapSnapshot:
+        version = get_world_version().value
+        with self._lock:
+            cached = self._snapshot
+        if cached is not None and cached.version == version:
+            return cached
+
+        from ...repositories.species_repository import species_repository
+
+        repo = self.map_manager.repo
+        map_state = repo.get_state()
+        snapshot = build_snapshot(
+            repo.list_tiles(),
+            repo.latest_habitats(),
+            species_repository.list_species(),
+            self.map_manager.width,
+            self.map_manager.height,
+            sea_level=map_state.sea_level if map_state else 0.0,
+            turn_index=map_state.turn_index if map_state else 0,
+            version=version,
+        )
+        with self._lock:
+            self._snapshot = snapshot
+        logger.debug(f"[分层地图] 快照 v{version}: {len(snapshot.tiles)} 地块, {snapshot.habitat_tile.size} 栖息地")
+        return snapshot
+
+    # ---------- 图层 ----------
+
+    def available_layers(self) -> list[str]:
+        return (
+            [f"color:{mode}" for mode in COLOR_MODES]
+            + list(SCALAR_LAYERS)
+            + ["is_lake", "biodiversity"]
+            + list(CATEGORY_LAYERS)
+            + ["species:<lineage_code>", "suitability:<lineage_code>"]
+        )
+
+    def layer(self, snapshot: MapSnapshot, name: str) -> tuple[np.ndarray, dict[str, Any]]:
+        """返回 (完整网格, 额外头部字段)，未知图层抛 KeyError"""
+        kind, _, arg = name.partition(":")
+        if kind == "color" and arg in COLOR_MODES:
+            return snapshot.color_grid(arg), {}
+        if name in SCALAR_LAYERS:
+            return snapshot.scalars[name].astype(np.float16), {}
+        if name == "is_lake":
+            return snapshot.scalars["is_lake"].astype(np.uint8), {}
+        if name == "biodiversity":
+            return np.minimum(snapshot.species_count, 255).astype(np.uint8), {}
+        if name in CATEGORY_LAYERS:
+            codes, palette = snapshot.categories[name]
+            return codes, {"palette": palette, "missing": int(np.iinfo(codes.dtype).max)}
+        if kind in ("species", "suitability") and arg:
+            species_id = snapshot.lineage_to_species.get(arg)
+            if species_id is None:
+                raise KeyError(f"未知物种: {arg}")
+            mask = (snapshot.habitat_species == species_id) & (snapshot.habitat_tile >= 0)
+            tiles = snapshot.habitat_tile[mask]
+            n = len(snapshot.tiles)
+            if kind == "species":
+                values = np.zeros(n, dtype=np.float32)
+                values[tiles] = snapshot.habitat_population[mask]
+                return snapshot.to_grid(values), {}
+            values = np.zeros(n, dtype=np.uint8)
+            values[tiles] = np.clip(np.round(snapshot.habitat_suitability[mask] * 255), 0, 255)
+            return snapshot.to_grid(values), {"scale": 1 / 255}
+        raise KeyError(f"未知图层: {name}")
+
+    def iter_layer_frames(self, names: Sequence[str], region: str | None = None, lod: int = 1) -> Iterator[bytes]:
+        """逐帧生成请求的图层（先校验全部名称与区域，出错时不产生任何输出）"""
+        snapshot = self.snapshot()
+        area = MapRegion.parse(snapshot.width, snapshot.height, region, lod)
+        layers = [(name, *self.layer(snapshot, name)) for name in names]
+        for name, grid, meta in layers:
+            yield encode_frame(name, area.slice(grid), **area.meta(), **meta)
+
+    def iter_geometry_frames(self, region: str | None = None, lod: int = 1) -> Iterator[bytes]:
+        """静态几何：地块 ID 与 q/r 网格；邻居模板写在第一帧头部"""
+        snapshot = self.snapshot()
+        area = MapRegion.parse(snapshot.width, snapshot.height, region, lod)
+        q = snapshot.to_grid(np.fromiter((t.q for t in snapshot.tiles), dtype=np.int16, count=len(snapshot.tiles)))
+        r = snapshot.to_grid(np.fromiter((t.r for t in snapshot.tiles), dtype=np.int16, count=len(snapshot.tiles)))
+        yield encode_frame(
+            "tile_id",
+            area.slice(snapshot.tile_id),
+            **area.meta(),
+            width=snapshot.width,
+            height=snapshot.height,
+            wrap_x=True,
+            neighbors={"even_column": HEX_EVEN_COLUMN, "odd_column": HEX_ODD_COLUMN},
+        )
+        yield encode_frame("q", area.slice(q), **area.meta())
+        yield encode_frame("r", area.slice(r), **area.meta())
+
+
+_services: dict[int, MapLayerService] = {}
+
+
+def get_map_layer_service(map_manager: "MapStateManager") -> MapLayerService:
+    """获取地图管理器对应的分层地图服务"""
+    service = _services.get(id(map_manager))
+    if service is None or service.map_manager is not map_manager:
+        service = MapLayerService(map_manager)
+        _services[id(map_manager)] = service
+    return service
@@ -7,6 +7,7 @@ import time
 from typing import Sequence
 
 import numpy as np
+from ...core.response_cache import bump_world_version
 from ...models.environment import HabitatPopulation, MapState, MapTile
 
 logger = logging.getLogger(__name__)
@@ -28,6 +29,7 @@ from .suitability import (
     get_habitat_type_mask,
     separate_producers_consumers,
 )
+from .terrain_metrics import hex_neighbor_stack
 
 
 class MapStateManager:
@@ -62,12 +64,14 @@ class MapStateManager:
             logger.debug(f"[地图管理器] 生成了 {len(generated)} 个地块，正在保存...")
             self.repo.upsert_tiles(generated)
             logger.debug(f"[地图管理器] 地块保存完成")
+            bump_world_version("map generated")
             
         logger.debug(f"[地图管理器] 检查地图状态...")
         if not self.repo.get_state():
             logger.debug(f"[地图管理器] 创建初始地图状态...")
             self.repo.save_state(MapState(stage_name="稳定期", stage_progress=0, stage_duration=0))
             logger.debug(f"[地图管理器] 地图状态创建完成")
+            bump_world_version("map state created")
         else:
             logger.debug(f"[地图管理器] 地图状态已存在")
 
@@ -776,7 +780,8 @@ class MapStateManager:
         
         all_species_list = species_repository.list_species()
         species_map = {sp.id: sp for sp in all_species_list}
-        tile_by_coords = {(tile.x, tile.y): tile.id or 0 for tile in tiles}
+        # 共享六边形邻接表：(6, H, W) 邻居地块 ID，缺失为 0
+        neighbor_grid = self._neighbor_id_grid(tiles)
         
         # 获取当前地图状态（海平面和温度）
         map_state = self.repo.get_state()
@@ -844,7 +849,7 @@ class MapStateManager:
                     temperature=tile.temperature,
                     humidity=tile.humidity,
                     resources=tile.resources,
-                    neighbors=self._neighbor_ids(tile, tile_by_coords),
+                    neighbors=[int(n) for n in neighbor_grid[:, tile.y, tile.x] if n],
                     elevation=relative_elev,
                     terrain_type=terrain_type,
                     climate_zone=climate_zone,
@@ -3295,33 +3300,9 @@ class MapStateManager:
             "prey_abundance": prey_abundance,
         }
 
-    def _neighbor_ids(self, tile: MapTile, coord_map: dict[tuple[int, int], int]) -> list[int]:
-        """Return neighbor ids treating the east/west boundary as wrapped."""
-        # Odd-q style directions so columns extend horizontally like the client-view
-        even_column = [
-            (-1, 0),
-            (0, -1),
-            (1, -1),
-            (1, 0),
-            (1, 1),
-            (0, 1),
-        ]
-        odd_column = [
-            (-1, 0),
-            (-1, -1),
-            (0, -1),
-            (1, 0),
-            (0, 1),
-            (-1, 1),
-        ]
-        directions = odd_column if (tile.x & 1) else even_column
-        ids: list[int] = []
-        for dx, dy in directions:
-            nx = (tile.x + dx) % self.width
-            ny = tile.y + dy
-            if ny < 0 or ny >= self.height:
-                continue
-            neighbor_id = coord_map.get((nx, ny))
-            if neighbor_id:
-                ids.append(neighbor_id)
-        return ids
\ No newline at end of file
+    def _neighbor_id_grid(self, tiles: Sequence[MapTile]) -> np.ndarray:
+        """各地块六个方向的邻居 ID (6, H, W)，东西方向环绕，越界或缺失为 0"""
+        id_grid = np.zeros((self.height, self.width), dtype=np.int64)
+        for tile in tiles:
+            id_grid[tile.y, tile.x] = tile.id or 0
+        return hex_neighbor_stack(id_grid, fill=0)
\ No newline at end of file
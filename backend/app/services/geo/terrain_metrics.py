@@ -0,0 +1,311 @@
+"""
+地形指标 - 基于六边形邻居模板的向量化地形计算
+
+把逐地块遍历邻居的 Python 循环改为 (H, W) 网格上的数组平移：
+- 邻居模板（按列奇偶的 offset 布局，东西方向环绕，南北边界截断）是全项目共享的
+  六边形邻接表，MapStateManager 生成地块邻居列表也用它
+- 每个方向一次 np.roll / 行平移，6 个方向得到 (6, H, W) 邻居栈
+- 坡度、起伏/侵蚀、曲率、离海岸距离一次算出，按地图版本缓存：渲染接口用
+  环境仓储地块写入日志的版本号作键，版本未变时连地块都不读取
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 六个邻居的方向顺序 (dx, dy)，偶数列 / 奇数列
+HEX_EVEN_COLUMN: tuple[tuple[int, int], ...] = (
+    (-1, 0), (0, -1), (1, -1),
+    (1, 0), (1, 1), (0, 1),
+)
+HEX_ODD_COLUMN: tuple[tuple[int, int], ...] = (
+    (-1, 0), (-1, -1), (0, -1),
+    (1, 0), (0, 1), (-1, 1),
+)
+
+# 侵蚀图归一化：平均高差 2000m 视为 1.0（与旧版渲染一致）
+EROSION_NORMALIZE_M = 2000.0
+
+TERRAIN_METRIC_NAMES = (
+    "elevation",
+    "water_depth",
+    "slope",
+    "relief",
+    "erosion",
+    "curvature",
+    "coast_distance",
+)
+
+
+# ==================== 邻居模板 ====================
+
+def shift_grid(grid: np.ndarray, dx: int, dy: int, fill: Any) -> np.ndarray:
+    """返回 out[y, x] = grid[y + dy, (x + dx) % W]，越过南北边界处填 fill"""
+    out = np.roll(grid, -dx, axis=-1) if dx else grid
+    if dy:
+        shifted = np.full_like(out, fill)
+        if dy > 0:
+            shifted[..., :-dy, :] = out[..., dy:, :]
+        else:
+            shifted[..., -dy:, :] = out[..., :dy, :]
+        out = shifted
+    return out
+
+
+def hex_neighbor_stack(grid: np.ndarray, fill: Any = np.nan) -> np.ndarray:
+    """六个方向的邻居值 (6, H, W)
+
+    第 k 层是每个格子第 k 个邻居的值；奇数列与偶数列使用不同偏移。
+    """
+    H, W = grid.shape[-2:]
+    odd = (np.arange(W) & 1).astype(bool)
+    layers = []
+    for (edx, edy), (odx, ody) in zip(HEX_EVEN_COLUMN, HEX_ODD_COLUMN):
+        even_vals = shift_grid(grid, edx, edy, fill)
+        if (edx, edy) == (odx, ody):
+            layers.append(even_vals)
+        else:
+            layers.append(np.where(odd, shift_grid(grid, odx, ody, fill), even_vals))
+    return np.stack(layers)
+
+
+def hex_neighbor_indices(height: int, width: int) -> np.ndarray:
+    """六个方向邻居的扁平索引 (6, H, W)，越界为 -1"""
+    flat = np.arange(height * width, dtype=np.int64).reshape(height, width)
+    return hex_neighbor_stack(flat, fill=-1)
+
+
+def hex_distance_from(sources: np.ndarray, valid: np.ndarray | None = None) -> np.ndarray:
+    """到最近 source 格子的六边形步数（多源 BFS，按层膨胀）
+
+    不可达的格子为 -1。valid 为 False 的格子既不传播也不计距离。
+    """
+    valid = np.ones_like(sources, dtype=bool) if valid is None else valid
+    reached = sources & valid
+    dist = np.where(reached, 0, -1).astype(np.int32)
+    step = 0
+    while True:
+        step += 1
+        grown = reached | hex_neighbor_stack(reached, fill=False).any(axis=0)
+        new = grown & valid & ~reached
+        if not new.any():
+            break
+        dist[new] = step
+        reached = reached | new
+    return dist
+
+
+# ==================== 指标 ====================
+
+@dataclass
+class TerrainMetrics:
+    """一个地图版本的地形指标网格（均为 (H, W) float32）"""
+    version: str
+    width: int
+    height: int
+    sea_level: float
+    elevation: np.ndarray
+    water_depth: np.ndarray
+    slope: np.ndarray           # 与邻居的最大高差 (m)
+    relief: np.ndarray          # 与邻居的平均高差 (m)
+    erosion: np.ndarray         # relief 归一化到 0-1
+    curvature: np.ndarray       # 邻居均值 - 自身高程：正为凹（谷地），负为凸（山脊）
+    coast_distance: np.ndarray  # 到最近异类地块（陆↔水）的步数，无海岸为 -1
+    tile_ids: np.ndarray = field(repr=False)  # 按 ID 升序
+    tile_x: np.ndarray = field(repr=False)
+    tile_y: np.ndarray = field(repr=False)
+
+    def grid(self, name: str) -> np.ndarray:
+        if name not in TERRAIN_METRIC_NAMES:
+            raise KeyError(f"未知地形指标: {name}")
+        return getattr(self, name)
+
+    def per_tile(self, name: str) -> np.ndarray:
+        """按地块 ID 顺序取值 (N,) float32"""
+        return np.ascontiguousarray(self.grid(name)[self.tile_y, self.tile_x], dtype=np.float32)
+
+    def summary(self) -> dict[str, Any]:
+        land = self.water_depth <= 0
+        return {
+            "version": self.version,
+            "width": self.width,
+            "height": self.height,
+            "tiles": int(self.tile_ids.size),
+            "mean_slope": float(self.slope[land].mean()) if land.any() else 0.0,
+            "max_relief": float(self.relief.max()) if self.relief.size else 0.0,
+            "max_coast_distance": int(self.coast_distance.max()) if self.coast_distance.size else -1,
+        }
+
+
+def _tile_columns(tiles: Sequence[Any]) -> dict[str, np.ndarray]:
+    n = len(tiles)
+    return {
+        "id": np.fromiter((t.id if t.id is not None else -1 for t in tiles), dtype=np.int64, count=n),
+        "x": np.fromiter((t.x for t in tiles), dtype=np.int64, count=n),
+        "y": np.fromiter((t.y for t in tiles), dtype=np.int64, count=n),
+        "elevation": np.fromiter((t.elevation for t in tiles), dtype=np.float64, count=n),
+    }
+
+
+def _grid_size(cols: dict[str, np.ndarray], width: int | None, height: int | None) -> tuple[int, int]:
+    W = int(width) if width else int(cols["x"].max()) + 1
+    H = int(height) if height else int(cols["y"].max()) + 1
+    return W, H
+
+
+def terrain_version(cols: dict[str, np.ndarray], sea_level: float, shape: tuple[int, int]) -> str:
+    """地图版本指纹：尺寸、坐标、高程、海平面"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.asarray(shape, dtype=np.int64).tobytes())
+    digest.update(np.float64(sea_level).tobytes())
+    for key in ("id", "x", "y", "elevation"):
+        digest.update(cols[key].tobytes())
+    return digest.hexdigest()
+
+
+def compute_terrain_metrics(
+    cols: dict[str, np.ndarray],
+    sea_level: float,
+    width: int,
+    height: int,
+    version: str = "",
+) -> TerrainMetrics:
+    """由地块列数据计算全部地形指标"""
+    elev = np.full((height, width), np.nan, dtype=np.float64)
+    elev[cols["y"], cols["x"]] = cols["elevation"]
+    present = ~np.isnan(elev)
+
+    neighbors = hex_neighbor_stack(elev)                    # (6, H, W)
+    diffs = np.abs(neighbors - elev)                        # NaN: 邻居缺失
+    has_neighbor = ~np.isnan(diffs)
+    count = has_neighbor.sum(axis=0)
+    safe = np.maximum(count, 1)
+
+    relief = np.where(count > 0, np.nansum(diffs, axis=0) / safe, 0.0)
+    slope = np.where(count > 0, np.max(np.where(has_neighbor, diffs, 0.0), axis=0), 0.0)
+    neighbor_mean = np.nansum(neighbors, axis=0) / safe
+    curvature = np.where(count > 0, neighbor_mean - np.nan_to_num(elev), 0.0)
+    erosion = np.minimum(1.0, relief / EROSION_NORMALIZE_M)
+    water_depth = np.where(present, np.maximum(0.0, sea_level - np.nan_to_num(elev)), 0.0)
+
+    water = present & (elev < sea_level)
+    land = present & ~water
+    to_water = hex_distance_from(water, present)
+    to_land = hex_distance_from(land, present)
+    coast = np.where(water, to_land, to_water)
+
+    order = np.argsort(cols["id"], kind="stable")
+
+    def _f32(a: np.ndarray) -> np.ndarray:
+        return np.where(present, a, 0.0).astype(np.float32)
+
+    return TerrainMetrics(
+        version=version,
+        width=width,
+        height=height,
+        sea_level=float(sea_level),
+        elevation=_f32(np.nan_to_num(elev)),
+        water_depth=_f32(water_depth),
+        slope=_f32(slope),
+        relief=_f32(relief),
+        erosion=_f32(erosion),
+        curvature=_f32(curvature),
+        coast_distance=np.where(present, coast, -1).astype(np.float32),
+        tile_ids=cols["id"][order],
+        tile_x=cols["x"][order],
+        tile_y=cols["y"][order],
+    )
+
+
+# ==================== 缓存 ====================
+
+class TerrainMetricsCache:
+    """按地图版本缓存地形指标（进程级）"""
+
+    def __init__(self) -> None:
+        self._metrics: TerrainMetrics | None = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self,
+        tiles: Sequence[Any],
+        sea_level: float = 0.0,
+        width: int | None = None,
+        height: int | None = None,
+    ) -> TerrainMetrics | None:
+        """返回给定地块的地形指标；按地块指纹判断是否复用"""
+        if not tiles:
+            return None
+        cols = _tile_columns(tiles)
+        W, H = _grid_size(cols, width, height)
+        version = terrain_version(cols, sea_level, (H, W))
+        cached = self._lookup(version)
+        if cached is not None:
+            return cached
+        return self._compute(cols, sea_level, W, H, version)
+
+    def get_for_version(
+        self,
+        map_version: int,
+        load_tiles: Callable[[], Sequence[Any]],
+        sea_level: float = 0.0,
+        width: int | None = None,
+        height: int | None = None,
+    ) -> TerrainMetrics | None:
+        """按地块写入日志的地图版本取指标
+
+        版本未变时不读取地块；只有版本或海平面变化时才调用 load_tiles 重新计算。
+        """
+        version = f"map-{int(map_version)}@{float(sea_level)!r}"
+        cached = self._lookup(version)
+        if cached is not None:
+            return cached
+        tiles = load_tiles()
+        if not tiles:
+            return None
+        cols = _tile_columns(tiles)
+        W, H = _grid_size(cols, width, height)
+        return self._compute(cols, sea_level, W, H, version)
+
+    def _lookup(self, version: str) -> TerrainMetrics | None:
+        with self._lock:
+            cached = self._metrics
+            if cached is not None and cached.version == version:
+                self.hits += 1
+                return cached
+        return None
+
+    def _compute(
+        self, cols: dict[str, np.ndarray], sea_level: float, W: int, H: int, version: str,
+    ) -> TerrainMetrics:
+        metrics = compute_terrain_metrics(cols, sea_level, W, H, version=version)
+        with self._lock:
+            self._metrics = metrics
+            self.misses += 1
+        logger.debug(f"[地形指标] 重新计算 {W}x{H}, 版本 {version[:16]}")
+        return metrics
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._metrics = None
+
+
+_cache: TerrainMetricsCache | None = None
+
+
+def get_terrain_metrics_cache() -> TerrainMetricsCache:
+    """获取全局地形指标缓存"""
+    global _cache
+    if _cache is None:
+        _cache = TerrainMetricsCache()
+    return _cache
@@ -0,0 +1 @@
+"""地理服务测试"""
@@ -0,0 +1,146 @@
+"""
+分层地图测试
+
+验证二进制帧往返、区域/LOD 裁剪，以及颜色/分类图层与逐地块着色结果一致。
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from ....models.environment import HabitatPopulation, MapTile
+from ..map_coloring import map_coloring_service
+from ..map_layers import MapRegion, MapLayerService, build_snapshot, decode_frames, encode_frame
+
+WIDTH, HEIGHT = 9, 5
+
+
+def _make_snapshot(sea_level: float = 0.0):
+    rng = np.random.default_rng(3)
+    tiles = []
+    tile_id = 1
+    for y in range(HEIGHT):
+        for x in range(WIDTH):
+            if (x, y) == (4, 2):
+                continue  # 缺失的地块
+            tiles.append(MapTile(
+                id=tile_id, x=x, y=y, q=x, r=y - x // 2,
+                biome="草原" if x % 2 else "森林", cover="草地",
+                elevation=float(rng.uniform(-4000, 3000)),
+                temperature=float(rng.uniform(-20, 35)),
+                humidity=float(rng.uniform(0, 1)),
+                resources=float(rng.uniform(0, 500)),
+                is_lake=(x, y) == (1, 1),
+            ))
+            tile_id += 1
+    rng.shuffle(tiles)
+    habitats = [
+        HabitatPopulation(tile_id=t.id, species_id=1, population=70_000 + t.id, suitability=0.5)
+        for t in tiles if t.x < 3
+    ] + [
+        HabitatPopulation(tile_id=t.id, species_id=2, population=10, suitability=1.0)
+        for t in tiles if t.y == 0
+    ]
+    species = [SimpleNamespace(id=1, lineage_code="A1"), SimpleNamespace(id=2, lineage_code="B1")]
+    return tiles, build_snapshot(tiles, habitats, species, WIDTH, HEIGHT, sea_level=sea_level)
+
+
+def _service():
+    return MapLayerService(SimpleNamespace())
+
+
+class TestFrames:
+    """帧编码"""
+
+    def test_round_trip_and_alignment(self):
+        a = np.arange(15, dtype=np.float16).reshape(3, 5)
+        b = np.arange(12, dtype=np.uint8).reshape(2, 2, 3)
+        buffer = encode_frame("a", a, lod=1) + encode_frame("b", b, palette=["x"])
+        assert len(buffer) % 8 == 0
+
+        (ha, da), (hb, db) = decode_frames(buffer)
+        assert ha["name"] == "a" and ha["dtype"] == "float16" and ha["lod"] == 1
+        assert hb["palette"] == ["x"]
+        np.testing.assert_array_equal(da, a)
+        np.testing.assert_array_equal(db, b)
+
+    def test_region_parse(self):
+        assert MapRegion.parse(10, 4, "-2,1,50,3", 2) == MapRegion(0, 1, 10, 3, 2)
+        with pytest.raises(ValueError):
+            MapRegion.parse(10, 4, "5,0,5,4")
+        with pytest.raises(ValueError):
+            MapRegion.parse(10, 4, lod=0)
+
+
+class TestLayers:
+    """图层内容"""
+
+    def test_color_layer_matches_per_tile_coloring(self):
+        tiles, snapshot = _make_snapshot(sea_level=100.0)
+        service = _service()
+        counts = {}
+        for t in tiles:
+            counts[t.id] = (t.x < 3) + (t.y == 0)
+        for mode in ("terrain", "climate", "biodiversity"):
+            grid, _ = service.layer(snapshot, f"color:{mode}")
+            for t in tiles:
+                expected = map_coloring_service.get_color(t, 100.0, mode, min(1.0, counts[t.id] / 10.0))
+                assert "#" + bytes(grid[t.y, t.x]).hex() == expected.lower()
+
+    def test_categories_and_scalars(self):
+        tiles, snapshot = _make_snapshot(sea_level=100.0)
+        service = _service()
+        codes, meta = service.layer(snapshot, "terrain_type")
+        elevation, _ = service.layer(snapshot, "elevation")
+        assert elevation.dtype == np.float16
+        assert codes.dtype == np.uint8
+        assert codes[2, 4] == meta["missing"] == 255  # 缺失地块
+        for t in tiles:
+            rel = t.elevation - 100.0
+            assert meta["palette"][codes[t.y, t.x]] == map_coloring_service.classify_terrain_type(rel, t.is_lake)
+            assert abs(float(elevation[t.y, t.x]) - rel) <= abs(rel) * 1e-3 + 1
+
+    def test_many_categories_use_uint16(self):
+        width = 300
+        tiles = [
+            MapTile(id=x + 1, x=x, y=0, q=x, r=0, biome=f"群系{x}", cover="草地", elevation=0.0)
+            for x in range(width - 1)  # 最后一格缺失
+        ]
+        snapshot = build_snapshot(tiles, [], [], width, 1)
+        codes, meta = _service().layer(snapshot, "biome")
+        assert codes.dtype == np.uint16 and len(meta["palette"]) == width - 1
+        assert codes[0, width - 1] == meta["missing"] == 65535
+        assert [meta["palette"][c] for c in codes[0, :-1]] == [t.biome for t in tiles]
+
+    def test_species_layers(self):
+        tiles, snapshot = _make_snapshot()
+        service = _service()
+        population, _ = service.layer(snapshot, "species:A1")
+        suitability, meta = service.layer(snapshot, "suitability:B1")
+        biodiversity, _ = service.layer(snapshot, "biodiversity")
+        assert population.dtype == np.float32
+        for t in tiles:
+            assert population[t.y, t.x] == (70_000 + t.id if t.x < 3 else 0)
+            assert suitability[t.y, t.x] == (255 if t.y == 0 else 0)
+            assert biodiversity[t.y, t.x] == (t.x < 3) + (t.y == 0)
+        assert meta["scale"] == pytest.approx(1 / 255)
+        with pytest.raises(KeyError):
+            service.layer(snapshot, "species:ZZ")
+        with pytest.raises(KeyError):
+            service.layer(snapshot, "color:nope")
+
+    def test_region_and_lod_frames(self):
+        _, snapshot = _make_snapshot()
+        service = _service()
+        service.snapshot = lambda: snapshot
+
+        (header, data), = decode_frames(b"".join(service.iter_layer_frames(["humidity"], "2,1,9,5", 2)))
+        full, _ = service.layer(snapshot, "humidity")
+        assert header["region"] == [2, 1, 9, 5] and header["lod"] == 2
+        np.testing.assert_array_equal(data, full[1:5:2, 2:9:2])
+
+        geometry = decode_frames(b"".join(service.iter_geometry_frames()))
+        assert [h["name"] for h, _ in geometry] == ["tile_id", "q", "r"]
+        assert geometry[0][0]["width"] == WIDTH
+        np.testing.assert_array_equal(geometry[0][1], snapshot.tile_id)
@@ -0,0 +1,147 @@
+"""
+地形指标测试
+
+以逐地块遍历邻居的旧实现为参照，验证向量化邻居模板与侵蚀值一致，
+以及按地图版本缓存。
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from ..terrain_metrics import (
+    HEX_EVEN_COLUMN,
+    HEX_ODD_COLUMN,
+    TerrainMetricsCache,
+    hex_neighbor_indices,
+)
+
+
+def _make_tiles(width: int = 12, height: int = 6, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    tiles = []
+    tile_id = 1
+    for y in range(height):
+        for x in range(width):
+            tiles.append(SimpleNamespace(id=tile_id, x=x, y=y, elevation=float(rng.uniform(-3000, 4000))))
+            tile_id += 1
+    rng.shuffle(tiles)  # 仓储返回顺序不保证按 ID
+    return tiles
+
+
+def _legacy_neighbor_coords(x: int, y: int, width: int, height: int):
+    directions = HEX_ODD_COLUMN if (x & 1) else HEX_EVEN_COLUMN
+    coords = []
+    for dx, dy in directions:
+        ny = y + dy
+        if 0 <= ny < height:
+            coords.append(((x + dx) % width, ny))
+    return coords
+
+
+def _legacy_erosion(tiles, width: int, height: int):
+    by_coord = {(t.x, t.y): t for t in tiles}
+    values = []
+    for t in sorted(tiles, key=lambda t: t.id):
+        diffs = [
+            abs(t.elevation - by_coord[c].elevation)
+            for c in _legacy_neighbor_coords(t.x, t.y, width, height)
+            if c in by_coord
+        ]
+        values.append(min(1.0, sum(diffs) / len(diffs) / 2000.0) if diffs else 0.0)
+    return np.array(values, dtype=np.float32)
+
+
+class TestHexStencil:
+    """邻居模板"""
+
+    def test_indices_match_per_tile_walk(self):
+        width, height = 10, 7
+        idx = hex_neighbor_indices(height, width)
+        for y in range(height):
+            for x in range(width):
+                directions = HEX_ODD_COLUMN if (x & 1) else HEX_EVEN_COLUMN
+                expected = [
+                    (y + dy) * width + (x + dx) % width if 0 <= y + dy < height else -1
+                    for dx, dy in directions
+                ]
+                assert list(idx[:, y, x]) == expected
+
+    def test_map_manager_neighbor_lists(self):
+        from ..map_manager import MapStateManager
+
+        width, height = 12, 6
+        tiles = _make_tiles(width, height)
+        by_coord = {(t.x, t.y): t.id for t in tiles}
+        grid = MapStateManager(width, height)._neighbor_id_grid(tiles)
+        for t in tiles:
+            expected = [by_coord[c] for c in _legacy_neighbor_coords(t.x, t.y, width, height)]
+            assert [int(n) for n in grid[:, t.y, t.x] if n] == expected
+
+
+class TestTerrainMetrics:
+    """指标计算与缓存"""
+
+    def test_erosion_matches_legacy(self):
+        tiles = _make_tiles()
+        metrics = TerrainMetricsCache().get(tiles, sea_level=0.0)
+        np.testing.assert_allclose(metrics.per_tile("erosion"), _legacy_erosion(tiles, 12, 6), rtol=1e-5)
+
+        ordered = sorted(tiles, key=lambda t: t.id)
+        np.testing.assert_array_equal(
+            metrics.per_tile("elevation"),
+            np.array([t.elevation for t in ordered], dtype=np.float32),
+        )
+        np.testing.assert_array_equal(
+            metrics.per_tile("water_depth"),
+            np.array([max(0.0, -t.elevation) for t in ordered], dtype=np.float32),
+        )
+
+    def test_coast_distance(self):
+        # 西半部为海，东半部为陆：距离按列递增（东西环绕处另有一条海岸）
+        tiles = [
+            SimpleNamespace(id=y * 8 + x + 1, x=x, y=y, elevation=-100.0 if x < 4 else 100.0)
+            for y in range(4)
+            for x in range(8)
+        ]
+        metrics = TerrainMetricsCache().get(tiles, sea_level=0.0)
+        coast = metrics.coast_distance
+        assert coast[:, 4].tolist() == [1.0] * 4
+        assert coast[:, 5].tolist() == [2.0] * 4
+        assert coast[:, 3].tolist() == [1.0] * 4
+        assert coast[:, 0].tolist() == [1.0] * 4  # 与 x=7 的陆地相邻
+
+    def test_cache_keyed_by_map_version(self):
+        tiles = _make_tiles()
+        cache = TerrainMetricsCache()
+        first = cache.get(tiles, sea_level=0.0)
+        assert cache.get(tiles, sea_level=0.0) is first
+        assert cache.hits == 1
+
+        tiles[0].elevation += 500.0
+        assert cache.get(tiles, sea_level=0.0) is not first
+        assert cache.get(tiles, sea_level=10.0).sea_level == 10.0
+        assert cache.misses == 3
+
+    def test_versioned_lookup_skips_tile_load(self):
+        tiles = _make_tiles()
+        loads = []
+
+        def load():
+            loads.append(1)
+            return tiles
+
+        cache = TerrainMetricsCache()
+        first = cache.get_for_version(3, load, sea_level=0.0)
+        assert cache.get_for_version(3, load, sea_level=0.0) is first
+        assert len(loads) == 1
+
+        assert cache.get_for_version(4, load, sea_level=0.0) is not first
+        assert cache.get_for_version(4, load, sea_level=5.0).sea_level == 5.0
+        assert len(loads) == 3 and cache.hits == 1
+
+    def test_unknown_metric(self):
+        metrics = TerrainMetricsCache().get(_make_tiles(), sea_level=0.0)
+        with pytest.raises(KeyError):
+            metrics.per_tile("nonexistent")
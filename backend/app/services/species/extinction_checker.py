@@ -271,25 +271,12 @@ class ExtinctionChecker:
         Returns:
             是否处于下降趋势
         """
-        # 使用种群历史缓存
-        from ..analytics.population_snapshot import get_population_history_cache
-        history_cache = get_population_history_cache()
+        from ..analytics.population_series import get_population_series
         
         lineage_code = getattr(species, 'lineage_code', None)
-        if not lineage_code or lineage_code not in history_cache:
+        if not lineage_code:
             return False
-        
-        history = history_cache[lineage_code]
-        if len(history) < 2:
-            return False
-        
-        # 检查最近几回合是否持续下降
-        recent = history[-history_window:]
-        for i in range(1, len(recent)):
-            if recent[i] >= recent[i - 1]:
-                return False
-        
-        return True
+        return get_population_series().is_declining(lineage_code, history_window)
     
     def get_extinction_risk(self, species: Any, population: int) -> dict:
         """获取物种的灭绝风险评估
@@ -135,6 +135,23 @@ class FoodWebCacheService:
         # 增量更新队列
         self._pending_additions: list[str] = []
         self._pending_removals: list[str] = []
+        
+        # 统计
+        self._cache_hits = 0
+        self._cache_misses = 0
+    
+    @property
+    def stats(self) -> dict:
+        """获取缓存统计"""
+        total = self._cache_hits + self._cache_misses
+        return {
+            "cache_hits": self._cache_hits,
+            "cache_misses": self._cache_misses,
+            "hit_rate": round(self._cache_hits / total, 3) if total > 0 else 0,
+            "nodes": self._cache.total_nodes if self._cache else 0,
+            "links": self._cache.total_links if self._cache else 0,
+            "turn_index": self._cache.turn_index if self._cache else None,
+        }
     
     @property
     def is_valid(self) -> bool:
@@ -397,6 +414,7 @@ class FoodWebCacheService:
         
         if not cache_hit or self._cache is None:
             # 缓存未命中，返回空响应
+            self._cache_misses += 1
             return PaginatedFoodWebResponse(
                 nodes=[],
                 links=[],
@@ -409,6 +427,8 @@ class FoodWebCacheService:
                 cache_age_seconds=0,
             )
         
+        self._cache_hits += 1
+        
         # 获取候选节点
         candidate_codes = self._get_candidate_nodes(options)
         
@@ -104,12 +104,12 @@ class GeneFlowService:
         
         # 构建栖息地缓存
         self._build_habitat_cache(species_list)
+        distances = genus.load_distance_matrix()
         
         for i, sp1 in enumerate(species_list):
             for sp2 in species_list[i+1:]:
                 # 1. 检查遗传距离（使用配置阈值）
-                distance_key = self._make_distance_key(sp1.lineage_code, sp2.lineage_code)
-                distance = genus.genetic_distances.get(distance_key, 0.5)
+                distance = distances.get(sp1.lineage_code, sp2.lineage_code, 0.5)
                 
                 if distance > distance_threshold:
                     continue
@@ -179,10 +179,3 @@ class GeneFlowService:
             # 钳制范围
             sp1.abstract_traits[trait_name] = max(0.0, min(15.0, sp1.abstract_traits[trait_name]))
             sp2.abstract_traits[trait_name] = max(0.0, min(15.0, sp2.abstract_traits[trait_name]))
-    
-    def _make_distance_key(self, code1: str, code2: str) -> str:
-        """生成距离键（保证顺序一致性）"""
-        if code1 < code2:
-            return f"{code1}-{code2}"
-        return f"{code2}-{code1}"
-
@@ -5768,16 +5768,12 @@ class SpeciationService:
                 continue
             
             distance = self.genetic_calculator.calculate_distance(offspring, sibling)
-            key = self._make_distance_key(offspring.lineage_code, sibling.lineage_code)
-            new_distances[key] = distance
+            new_distances[sibling.lineage_code] = distance
         
-        genus_repository.update_distances(parent.genus_code, new_distances, turn_index)
-    
-    def _make_distance_key(self, code1: str, code2: str) -> str:
-        """生成距离键"""
-        if code1 < code2:
-            return f"{code1}-{code2}"
-        return f"{code2}-{code1}"
+        # 新物种在距离矩阵中追加一行
+        genus_repository.update_distance_row(
+            parent.genus_code, offspring.lineage_code, new_distances, turn_index
+        )
     
     def _clamp_traits_to_limit(self, traits: dict, parent_traits: dict, trophic_level: float) -> dict:
         """智能钳制属性到营养级限制范围内
@@ -0,0 +1,56 @@
+"""测试属内遗传距离矩阵（压缩下三角存储）"""
+
+import numpy as np
+import pytest
+
+from app.models.genus import GeneticDistanceMatrix, Genus
+
+
+class TestGeneticDistanceMatrix:
+    """矩阵读写"""
+
+    def test_append_rows_and_lookup(self):
+        matrix = GeneticDistanceMatrix(["A1", "A1a"])
+        matrix.set("A1", "A1a", 0.2)
+        # 分化：新物种追加一行
+        matrix.set_row("A1b", {"A1": 0.3, "A1a": 0.4})
+
+        assert len(matrix) == 3
+        assert matrix.get("A1a", "A1") == pytest.approx(0.2)
+        assert matrix.get("A1", "A1b") == pytest.approx(0.3)
+        assert matrix.get("A1b", "A1a") == pytest.approx(0.4)
+        assert matrix.get("A1", "A1") == 0.0
+        assert matrix.get("A1", "Z9", 0.5) == 0.5
+        np.testing.assert_allclose(matrix.row("A1a"), [0.2, 0.0, 0.4])
+
+    def test_unknown_distance_and_siblings(self):
+        matrix = GeneticDistanceMatrix()
+        for i in range(40):  # 触发多次扩容
+            matrix.add_code(f"S{i}")
+        matrix.set("S3", "S30", 0.1)
+        matrix.set("S30", "S39", 0.7)
+
+        assert matrix.get("S3", "S4") is None
+        assert matrix.siblings("S30") == pytest.approx({"S3": 0.1, "S39": 0.7})
+        assert sorted((a, b) for a, b, _ in matrix.pairs()) == [("S30", "S3"), ("S39", "S30")]
+
+    def test_bytes_round_trip(self):
+        matrix = GeneticDistanceMatrix(["A1", "A1a", "A1b"])
+        matrix.set("A1", "A1b", 0.25)
+        restored = GeneticDistanceMatrix.from_bytes(matrix.to_bytes())
+
+        assert restored.codes == matrix.codes
+        np.testing.assert_array_equal(restored.values, matrix.values)
+        assert restored.get("A1b", "A1") == pytest.approx(0.25)
+
+    def test_legacy_dict_conversion(self):
+        legacy = {"A1-A1a": 0.2, "A1-A1b": 0.3, "A1a-A1b": 0.15}
+        matrix = GeneticDistanceMatrix.from_legacy(legacy)
+        assert matrix.to_legacy() == pytest.approx(legacy)
+
+        genus = Genus(code="G1", name_latin="Testus", name_common="测试属", genetic_distances=legacy)
+        assert genus.load_distance_matrix().get("A1b", "A1a") == pytest.approx(0.15)
+
+        genus.store_distance_matrix(matrix)
+        assert genus.genetic_distances == {}
+        assert genus.load_distance_matrix().get("A1", "A1a") == pytest.approx(0.2)
@@ -3,6 +3,7 @@
 from .embedding import EmbeddingService
 from .species_cache import SpeciesCacheManager, get_species_cache
 from .vector_store import VectorStore, MultiVectorStore, SearchResult
+from .metrics_exporter import MetricsRegistry, get_metrics_registry
 from .divine_energy import DivineEnergyService, EnergyState, ENERGY_COSTS
 from .divine_progression import (
     DivineProgressionService,
@@ -22,6 +23,8 @@ __all__ = [
     "VectorStore",
     "MultiVectorStore",
     "SearchResult",
+    "MetricsRegistry",
+    "get_metrics_registry",
     "DivineEnergyService",
     "EnergyState",
     "ENERGY_COSTS",
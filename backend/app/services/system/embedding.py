@@ -82,6 +82,7 @@ class EmbeddingService:
         allow_fake_embeddings: bool = True,
         max_parallel_requests: int = 1,
         enable_concurrency: bool = False,
+        vector_storage: str = "memory",
     ) -> None:
         self.provider = provider
         self.dimension = dimension
@@ -103,11 +104,15 @@ class EmbeddingService:
         # 内存缓存：text_hash -> vector（加速重复查询）
         self._memory_cache: dict[str, list[float]] = {}
         self._memory_cache_max_size = 10000  # 限制内存缓存大小
+        # 嵌入插件在工作线程中并行调用 embed()，淘汰与写入需要互斥
+        self._memory_cache_lock = threading.Lock()
         
         # 多索引向量存储
+        self._vector_storage = vector_storage
         self._vector_stores = MultiVectorStore(
             base_dir=self._cache_dir / "indexes",
-            dimension=dimension
+            dimension=dimension,
+            storage=vector_storage,
         )
         
         # 物种代码到描述的映射（用于增量更新检测）
@@ -168,9 +173,9 @@ class EmbeddingService:
         for idx, text in enumerate(texts):
             cache_key = self._make_cache_key(text)
             
-            # 检查内存缓存
-            if cache_key in self._memory_cache:
-                cached = self._memory_cache[cache_key]
+            # 检查内存缓存（get：其他线程可能同时淘汰该条目）
+            cached = self._memory_cache.get(cache_key)
+            if cached is not None:
                 if target_dimension is None:
                     target_dimension = len(cached)
                 vectors[idx] = cached
@@ -404,13 +409,14 @@ class EmbeddingService:
 
     def _update_memory_cache(self, key: str, vector: list[float]) -> None:
         """更新内存缓存（带 LRU 淘汰）"""
-        if len(self._memory_cache) >= self._memory_cache_max_size:
-            # 简单淘汰：删除最早添加的 10%
-            keys_to_remove = list(self._memory_cache.keys())[:self._memory_cache_max_size // 10]
-            for k in keys_to_remove:
-                del self._memory_cache[k]
-        
-        self._memory_cache[key] = vector
+        with self._memory_cache_lock:
+            if len(self._memory_cache) >= self._memory_cache_max_size:
+                # 简单淘汰：删除最早添加的 10%
+                keys_to_remove = list(self._memory_cache.keys())[:self._memory_cache_max_size // 10]
+                for k in keys_to_remove:
+                    self._memory_cache.pop(k, None)
+            
+            self._memory_cache[key] = vector
 
     # ==================== 磁盘缓存管理 ====================
 
@@ -997,8 +1003,9 @@ class EmbeddingService:
             cache_key = self._make_cache_key(desc)
             
             # 优先从内存缓存获取
-            if cache_key in self._memory_cache:
-                embeddings[cache_key] = self._memory_cache[cache_key]
+            cached = self._memory_cache.get(cache_key)
+            if cached is not None:
+                embeddings[cache_key] = cached
             else:
                 # 尝试从磁盘缓存加载
                 cached = self._load_from_disk_cache(cache_key)
@@ -1052,8 +1059,9 @@ class EmbeddingService:
 
     def clear_memory_cache(self) -> int:
         """清除内存缓存"""
-        count = len(self._memory_cache)
-        self._memory_cache.clear()
+        with self._memory_cache_lock:
+            count = len(self._memory_cache)
+            self._memory_cache.clear()
         return count
     
     def clear_all_indexes(self) -> dict[str, int]:
@@ -1078,7 +1086,8 @@ class EmbeddingService:
         self._species_text_hashes.clear()
         
         # 清空内存缓存
-        self._memory_cache.clear()
+        with self._memory_cache_lock:
+            self._memory_cache.clear()
         
         # 重置统计信息中的索引计数
         self._stats["species_indexed"] = 0
@@ -1120,7 +1129,8 @@ class EmbeddingService:
         # 注意：这里只改变向量索引目录，embedding缓存仍然共享
         self._vector_stores = MultiVectorStore(
             base_dir=new_index_dir,
-            dimension=self.dimension
+            dimension=self.dimension,
+            storage=self._vector_storage,
         )
         
         result = {
@@ -1160,7 +1170,17 @@ class EmbeddingService:
                 disk_files += 1
                 disk_size += f.stat().st_size
         
-        # 计算缓存命中率
+        return {
+            "cache_dir": str(self._cache_dir),
+            **self.get_memory_cache_stats(),
+            "disk_cache_files": disk_files,
+            "disk_cache_size_mb": round(disk_size / 1024 / 1024, 2),
+            "model_identifier": self.model_identifier,
+            "stats": self._stats.copy(),
+        }
+
+    def get_memory_cache_stats(self) -> dict[str, Any]:
+        """获取内存缓存统计（不扫描磁盘，可用于高频抓取）"""
         total_requests = (
             self._stats["cache_hits"] + 
             self._stats["api_calls"] + 
@@ -1169,16 +1189,10 @@ class EmbeddingService:
         cache_hit_rate = (
             self._stats["cache_hits"] / max(total_requests, 1)
         )
-        
         return {
-            "cache_dir": str(self._cache_dir),
             "memory_cache_count": len(self._memory_cache),
             "memory_cache_max": self._memory_cache_max_size,
-            "disk_cache_files": disk_files,
-            "disk_cache_size_mb": round(disk_size / 1024 / 1024, 2),
-            "model_identifier": self.model_identifier,
             "cache_hit_rate": round(cache_hit_rate, 4),
-            "stats": self._stats.copy(),
         }
 
     def get_index_stats(self) -> dict[str, Any]:
@@ -0,0 +1,444 @@
+"""
+Metrics Exporter - Prometheus/OpenMetrics 文本格式指标导出
+
+将分散在各处的运行指标汇总为可抓取的 /metrics 输出：
+- 直方图：阶段耗时、回合耗时、LLM 请求耗时（按能力/服务商）
+- 计数器：回合数、阶段失败、LLM 请求结果、重试与超时
+- 仪表：物种数量、张量尺寸、各缓存条目数与命中率、AI 并发队列
+
+设计要点：
+- 不依赖 prometheus_client，热路径只做一次字典查找和 bisect
+- 推送型指标（直方图/计数器）由引擎与 ModelRouter 在事件发生时记录
+- 拉取型指标（缓存、队列等仪表）仅在抓取时由收集器读取，平时零开销
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import threading
+from bisect import bisect_left
+from typing import TYPE_CHECKING, Any, Callable, Iterable
+
+if TYPE_CHECKING:
+    from ...core.container import ServiceContainer
+    from ...simulation.context import SimulationContext
+    from ...simulation.pipeline import PipelineMetrics
+
+logger = logging.getLogger(__name__)
+
+METRIC_PREFIX = "clade"
+
+# 阶段/回合耗时（秒）：阶段多在毫秒级，回合可达数分钟（含 AI）
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+TURN_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+LLM_BUCKETS = (0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+
+# ============================================================================
+# 指标类型
+# ============================================================================
+
+def _escape_label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape_label(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    """指标基类：按标签值元组保存样本"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: dict[tuple, Any] = {}
+
+    def _key(self, labels: dict[str, Any]) -> tuple:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} 需要标签 {self.labelnames}，收到 {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_sample(key, value))
+        return lines
+
+    def _render_sample(self, key: tuple, value: Any) -> list[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    """单调递增计数器"""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        if amount < 0:
+            raise ValueError("计数器只能递增")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _render_sample(self, key: tuple, value: Any) -> list[str]:
+        return [f"{self.name}_total{_format_labels(self.labelnames, key)} {_format_value(value)}"]
+
+
+class Gauge(_Metric):
+    """可增可减的瞬时值"""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def get(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+
+class Histogram(_Metric):
+    """固定桶直方图（累计桶在渲染时计算）"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = STAGE_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [各桶计数(含 +Inf), 总和, 总数]
+                state = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self._values[key] = state
+            state[0][idx] += 1
+            state[1] += value
+            state[2] += 1
+
+    def get_count(self, **labels: Any) -> int:
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def _render_sample(self, key: tuple, value: Any) -> list[str]:
+        counts, total, count = value
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+            cumulative += bucket_count
+            labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+# ============================================================================
+# 注册表
+# ============================================================================
+
+class MetricsRegistry:
+    """指标注册表
+
+    推送型指标通过 counter/gauge/histogram 获取（同名复用）；
+    拉取型指标通过 add_collector 注册回调，在 render() 时刷新。
+    """
+
+    def __init__(self, prefix: str = METRIC_PREFIX) -> None:
+        self.prefix = prefix
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: dict[str, Callable[["MetricsRegistry"], None]] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls: type, name: str, documentation: str, labelnames, **kwargs) -> Any:
+        full_name = f"{self.prefix}_{name}" if self.prefix else name
+        with self._lock:
+            metric = self._metrics.get(full_name)
+            if metric is None:
+                metric = cls(full_name, documentation, labelnames, **kwargs)
+                self._metrics[full_name] = metric
+            elif not isinstance(metric, cls):
+                raise ValueError(f"指标 {full_name} 已注册为 {metric.kind}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, tuple(labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, tuple(labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = STAGE_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, tuple(labelnames), buckets=buckets)
+
+    def add_collector(self, collector: Callable[["MetricsRegistry"], None], key: str | None = None) -> None:
+        """注册收集器；同 key 重复注册会替换旧的（应用重启 lifespan 时不重复）"""
+        self._collectors[key or collector.__name__] = collector
+
+    def collect(self) -> None:
+        """运行所有拉取型收集器（单个收集器失败不影响其他指标）"""
+        for collector in list(self._collectors.values()):
+            try:
+                collector(self)
+            except Exception as e:
+                logger.debug(f"[Metrics] 收集器 {getattr(collector, '__name__', collector)} 失败: {e}")
+
+    def render(self, collect: bool = True) -> str:
+        """输出 Prometheus 文本格式（text/plain; version=0.0.4）"""
+        if collect:
+            self.collect()
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines: list[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_registry: MetricsRegistry | None = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """获取全局指标注册表"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = MetricsRegistry()
+    return _registry
+
+
+def reset_metrics_registry() -> MetricsRegistry:
+    """重置全局注册表（测试用）"""
+    global _registry
+    with _registry_lock:
+        _registry = MetricsRegistry()
+    return _registry
+
+
+# ============================================================================
+# 推送型记录（由引擎/ModelRouter 调用）
+# ============================================================================
+
+def record_turn(metrics: "PipelineMetrics | None", ctx: "SimulationContext | None" = None) -> None:
+    """记录一个回合的阶段耗时、回合耗时与回合末状态"""
+    registry = get_metrics_registry()
+    try:
+        if metrics is not None:
+            stage_hist = registry.histogram(
+                "stage_duration_seconds", "流水线阶段耗时", ("stage",), STAGE_BUCKETS
+            )
+            stage_failures = registry.counter("stage_failures", "阶段失败次数", ("stage",))
+            for stage in metrics.stage_metrics:
+                stage_hist.observe(stage.duration_ms / 1000, stage=stage.stage_name)
+                if not stage.success:
+                    stage_failures.inc(stage=stage.stage_name)
+            registry.histogram(
+                "turn_duration_seconds", "回合总耗时", (), TURN_BUCKETS
+            ).observe(metrics.total_duration_ms / 1000)
+            registry.counter("turns", "已执行回合数").inc()
+
+        if ctx is not None:
+            registry.gauge("turn_index", "最近完成的回合序号").set(ctx.turn_index)
+            alive = ctx.get_alive_species_count() if ctx.all_species else 0
+            registry.gauge("species", "物种数量", ("status",)).set(alive, status="alive")
+            _record_tensor_state(registry, ctx)
+    except Exception as e:
+        logger.debug(f"[Metrics] 记录回合指标失败: {e}")
+
+
+def _record_tensor_state(registry: MetricsRegistry, ctx: "SimulationContext") -> None:
+    state = ctx.tensor_state
+    if state is not None:
+        dims = registry.gauge("tensor_dimension", "张量状态维度", ("tensor", "axis"))
+        nbytes = registry.gauge("tensor_bytes", "张量状态占用字节", ("tensor",))
+        for name in ("env", "pop", "species_params"):
+            arr = getattr(state, name, None)
+            shape = getattr(arr, "shape", None)
+            if shape is None:
+                continue
+            for axis, size in enumerate(shape):
+                dims.set(size, tensor=name, axis=axis)
+            nbytes.set(getattr(arr, "nbytes", 0), tensor=name)
+
+    tensor_metrics = ctx.tensor_metrics
+    if tensor_metrics is not None:
+        hist = registry.histogram(
+            "tensor_compute_seconds", "张量计算耗时", ("kind",), STAGE_BUCKETS
+        )
+        for kind in ("mortality", "speciation_detection", "tradeoff", "migration"):
+            ms = getattr(tensor_metrics, f"{kind}_time_ms", 0.0)
+            if ms:
+                hist.observe(ms / 1000, kind=kind)
+
+
+def record_llm_request(capability: str, provider: str, seconds: float, outcome: str) -> None:
+    """记录一次 LLM 请求尝试（outcome: success / timeout / error）"""
+    registry = get_metrics_registry()
+    provider = provider or "unknown"
+    if outcome == "success":
+        registry.histogram(
+            "llm_request_duration_seconds", "LLM 请求耗时", ("capability", "provider"), LLM_BUCKETS
+        ).observe(seconds, capability=capability, provider=provider)
+    elif outcome == "timeout":
+        registry.counter(
+            "llm_timeouts", "LLM 请求超时次数", ("capability", "provider")
+        ).inc(capability=capability, provider=provider)
+    registry.counter(
+        "llm_requests", "LLM 请求尝试次数", ("capability", "provider", "outcome")
+    ).inc(capability=capability, provider=provider, outcome=outcome)
+
+
+def record_llm_retry(capability: str) -> None:
+    """记录一次 LLM 重试"""
+    get_metrics_registry().counter(
+        "llm_retries", "LLM 请求重试次数", ("capability",)
+    ).inc(capability=capability)
+
+
+# ============================================================================
+# 拉取型收集器（抓取时读取）
+# ============================================================================
+
+def _set_cache(registry: MetricsRegistry, cache: str, entries: float | None = None,
+               hit_ratio: float | None = None, memory_bytes: float | None = None) -> None:
+    if entries is not None:
+        registry.gauge("cache_entries", "缓存条目数", ("cache",)).set(entries, cache=cache)
+    if hit_ratio is not None:
+        registry.gauge("cache_hit_ratio", "缓存命中率", ("cache",)).set(hit_ratio, cache=cache)
+    if memory_bytes is not None:
+        registry.gauge("cache_memory_bytes", "缓存内存占用", ("cache",)).set(memory_bytes, cache=cache)
+
+
+def collect_cache_metrics(registry: MetricsRegistry) -> None:
+    """读取模块级缓存单例（物种缓存、矩阵缓存、食物网缓存、API 响应缓存）"""
+    from ...core.response_cache import get_response_cache
+    from ..species.food_web_cache import get_food_web_cache
+    from ..species.matrix_cache import get_matrix_cache
+    from .species_cache import get_species_cache
+
+    species_stats = get_species_cache().get_stats()
+    _set_cache(registry, "species", entries=species_stats["total_cached"])
+    species_gauge = registry.gauge("species", "物种数量", ("status",))
+    if species_stats["total_cached"]:
+        species_gauge.set(species_stats["alive_count"], status="alive")
+        species_gauge.set(species_stats["extinct_count"], status="extinct")
+
+    matrix_stats = get_matrix_cache().stats
+    embedding_info = matrix_stats.get("embedding_cache") or {}
+    _set_cache(
+        registry, "matrix",
+        entries=embedding_info.get("size", 0),
+        hit_ratio=matrix_stats["hit_rate"],
+        memory_bytes=embedding_info.get("memory_mb", 0.0) * 1024 * 1024,
+    )
+
+    food_web_stats = get_food_web_cache().stats
+    _set_cache(registry, "food_web", entries=food_web_stats["nodes"], hit_ratio=food_web_stats["hit_rate"])
+
+    response_stats = get_response_cache().stats
+    _set_cache(
+        registry, "api_response",
+        entries=response_stats["entries"],
+        hit_ratio=response_stats["hit_rate"],
+        memory_bytes=response_stats["bytes"],
+    )
+    registry.gauge("world_version", "世界版本号（每回合/修改操作递增）").set(response_stats["world_version"])
+
+
+def collect_tensor_collector_metrics(registry: MetricsRegistry) -> None:
+    """读取全局 TensorMetricsCollector 的累计值"""
+    from ...tensor.metrics import get_global_collector
+
+    stats = get_global_collector().get_statistics()
+    registry.gauge("tensor_turns_tracked", "张量监控累计回合数").set(stats["total_turns"])
+    registry.gauge("tensor_triggers_cumulative", "张量分化触发累计数").set(stats["total_tensor_triggers"])
+    registry.gauge("tensor_ai_fallbacks_cumulative", "张量回退 AI 累计数").set(stats["total_ai_fallbacks"])
+
+
+def make_container_collector(container: "ServiceContainer") -> Callable[[MetricsRegistry], None]:
+    """创建读取服务容器内服务（ModelRouter、EmbeddingService）的收集器
+
+    只读取已实例化的服务，避免抓取触发服务构造。
+    """
+
+    def collect_container_metrics(registry: MetricsRegistry) -> None:
+        services = vars(container)
+
+        router = services.get("model_router")
+        if router is not None:
+            diag = router.get_diagnostics()
+            registry.gauge("llm_concurrency_limit", "LLM 并发上限").set(diag["concurrency_limit"])
+            registry.gauge("llm_active_requests", "LLM 活跃请求数").set(diag["active_requests"])
+            registry.gauge("llm_queued_requests", "LLM 排队请求数").set(diag["queued_requests"])
+
+        embedding = services.get("embedding_service")
+        if embedding is not None:
+            stats = embedding.get_memory_cache_stats()
+            _set_cache(
+                registry, "embedding",
+                entries=stats["memory_cache_count"],
+                hit_ratio=stats["cache_hit_rate"],
+            )
+
+    return collect_container_metrics
+
+
+def install_default_collectors(container: "ServiceContainer | None" = None) -> MetricsRegistry:
+    """为全局注册表安装默认收集器（应用启动时调用一次）"""
+    registry = get_metrics_registry()
+    registry.add_collector(collect_cache_metrics)
+    registry.add_collector(collect_tensor_collector_metrics)
+    if container is not None:
+        registry.add_collector(make_container_collector(container))
+    return registry
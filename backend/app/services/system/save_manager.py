@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import base64
 import gzip
 import json
 import logging
@@ -212,7 +213,7 @@ class SaveManager:
             "map_state": map_state.model_dump(mode="json") if map_state else None,
             "history_logs": [log.model_dump(mode="json") for log in history_logs],
             "history_count": len(history_logs),
-            "genus_list": [g.model_dump(mode="json") for g in genus_list],
+            "genus_list": [self._dump_genus(g) for g in genus_list],
         }
         
         logger.info(
@@ -316,6 +317,15 @@ class SaveManager:
             except Exception as e:
                 logger.info(f"[存档管理器] 保存神力进阶状态失败: {e}")
         
+        # ========== 保存种群时间序列 ==========
+        try:
+            from ..analytics.population_series import get_population_series
+            series = get_population_series()
+            series.save_to(save_dir)
+            logger.info(f"[存档管理器] 已保存种群时间序列: {len(series.codes)} 物种, {series.recorded_turns} 回合")
+        except Exception as e:
+            logger.info(f"[存档管理器] 保存种群时间序列失败: {e}")
+        
         # 更新元数据
         metadata = json.loads((save_dir / "metadata.json").read_text(encoding="utf-8"))
         metadata["last_saved"] = datetime.now().isoformat()
@@ -377,6 +387,24 @@ class SaveManager:
                     del data[field]
         
         return data
+
+    @staticmethod
+    def _dump_genus(genus: Genus) -> dict:
+        """属数据转 JSON（遗传距离矩阵为二进制，base64 编码）"""
+        data = genus.model_dump(mode="json", exclude={"distance_matrix"})
+        if genus.distance_matrix:
+            data["distance_matrix"] = base64.b64encode(genus.distance_matrix).decode("ascii")
+        return data
+
+    @staticmethod
+    def _load_genus(data: dict) -> Genus:
+        """从存档恢复属（旧存档只有 genetic_distances 字典，读取时自动兼容）"""
+        data = dict(data)
+        encoded = data.pop("distance_matrix", None)
+        genus = Genus(**data)
+        if encoded:
+            genus.distance_matrix = base64.b64decode(encoded)
+        return genus
     
     def _verify_save_integrity(
         self, 
@@ -567,7 +595,7 @@ class SaveManager:
         if save_data.get("genus_list"):
             logger.info(f"[存档管理器] 恢复 {len(save_data['genus_list'])} 个属...")
             for genus_data in save_data["genus_list"]:
-                genus = Genus(**genus_data)
+                genus = self._load_genus(genus_data)
                 genus_repository.upsert(genus)
         
         # ========== 恢复 Embedding 数据 ==========
@@ -681,6 +709,14 @@ class SaveManager:
         
         save_data["progression_loaded"] = progression_loaded
         
+        # ========== 恢复种群时间序列 ==========
+        try:
+            from ..analytics.population_series import get_population_series
+            save_data["population_series_loaded"] = get_population_series().load_from(save_dir)
+        except Exception as e:
+            logger.info(f"[存档管理器] 恢复种群时间序列失败: {e}")
+            save_data["population_series_loaded"] = False
+        
         # 设置成功标志
         save_data["success"] = True
         save_data["species_count"] = len(restored_species)
@@ -89,6 +89,10 @@ class SpeciesCacheManager:
         self._last_update_turn = turn_index
         self._update_count += 1
         
+        # 同步列式存储（张量阶段直接按列切片，不再逐对象展开 JSON 字段）
+        from ...tensor.species_frame import get_species_frame
+        get_species_frame().sync(species_list)
+        
         if updated > 0:
             logger.debug(f"[SpeciesCache] 更新 {updated} 个物种，总计 {len(self._cache)} 个")
         
@@ -132,6 +136,8 @@ class SpeciesCacheManager:
             sp = self._cache.pop(lineage_code)
             if sp.id and sp.id in self._id_to_code:
                 del self._id_to_code[sp.id]
+            from ...tensor.species_frame import get_species_frame
+            get_species_frame().drop(lineage_code)
             return True
         return False
     
@@ -140,6 +146,8 @@ class SpeciesCacheManager:
         self._cache.clear()
         self._id_to_code.clear()
         self._last_update_turn = -1
+        from ...tensor.species_frame import get_species_frame
+        get_species_frame().clear()
         logger.info("[SpeciesCache] 缓存已清空")
     
     def __len__(self) -> int:
@@ -13,6 +13,13 @@
 - 内存占用：约 4 bytes * dimension * n_vectors
 - 对于 10000 个 64 维向量约 2.5 MB
 
+【存储模式】
+- memory（默认）：向量保存在 Faiss 索引 / NumPy 矩阵中，save() 时整体写出
+- mmap：向量追加写入内存映射的 float32 向量区（VectorArena），
+  墓碑比例超过阈值时后台压缩；存档只写 ID 数组与元数据，启动时直接映射向量区。
+  启动时不读入向量只对 NumPy 后备路径成立：安装了 Faiss 时搜索仍走内存中的 Faiss
+  索引，加载时读取另存的 .faiss 文件（或从向量区重建），向量会完整读入内存
+
 【使用方式】
 ```python
 store = VectorStore(dimension=64, index_type="flat")
@@ -20,30 +27,159 @@ store.add("species_A1", vector_a1)
 store.add_batch(["A2", "A3"], [vec_a2, vec_a3])
 results = store.search(query_vec, top_k=10)
 store.save("vectors.index")
+
+# 内存映射模式
+store = VectorStore(dimension=64, storage="mmap", arena_dir="indexes/species.arena")
 ```
 """
 from __future__ import annotations
 
+import importlib.util
 import logging
+import os
 import pickle
+import shutil
+import threading
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Sequence
+from typing import Any, Iterator, Sequence
 
 import numpy as np
 
 logger = logging.getLogger(__name__)
 
-# 尝试导入 faiss，如果失败则使用纯 numpy 后备实现
-try:
-    import faiss
-    FAISS_AVAILABLE = True
-    logger.info("[VectorStore] Faiss 已加载")
-except ImportError:
-    FAISS_AVAILABLE = False
+# faiss 导入较慢，模块加载时只探测是否安装，首次建索引/读索引时才真正导入；
+# 未安装时使用纯 numpy 后备实现
+FAISS_AVAILABLE = importlib.util.find_spec("faiss") is not None
+faiss: Any = None
+
+if not FAISS_AVAILABLE:
     logger.warning("[VectorStore] Faiss 未安装，使用 NumPy 后备实现（性能较低）")
 
 
+def _load_faiss() -> Any:
+    """延迟导入 faiss（首次调用时加载）"""
+    global faiss
+    if faiss is None:
+        import faiss as _faiss
+
+        faiss = _faiss
+        logger.info("[VectorStore] Faiss 已加载")
+    return faiss
+
+
+# ==================== 内存映射向量区 ====================
+
+class VectorArena:
+    """追加写入的 float32 向量区（分段内存映射文件）
+    
+    行号即 VectorStore 的内部索引。向量按 segment_rows 行一段写入独立文件，
+    扩容只新建段文件，不改变已映射文件的大小（Windows 下已映射的文件不能截断或扩展）。
+    """
+    
+    def __init__(self, directory: str | Path, dimension: int, segment_rows: int = 4096):
+        """创建空向量区（清理目录中残留的段文件）"""
+        self.directory = Path(directory)
+        self.dimension = dimension
+        self.segment_rows = max(1, int(segment_rows))
+        self._segments: list[np.memmap] = []
+        self._rows = 0
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for stale in self.directory.glob("seg_*.f32"):
+            try:
+                stale.unlink()
+            except OSError:
+                pass
+    
+    @classmethod
+    def open(
+        cls, directory: str | Path, dimension: int, segment_rows: int, rows: int
+    ) -> 'VectorArena':
+        """映射已有向量区的前 rows 行（不读取向量数据）"""
+        arena = cls.__new__(cls)
+        arena.directory = Path(directory)
+        arena.dimension = dimension
+        arena.segment_rows = segment_rows
+        arena._rows = rows
+        n_segments = -(-rows // segment_rows)
+        arena._segments = [
+            np.memmap(arena._segment_path(i), dtype=np.float32, mode="r+",
+                      shape=(segment_rows, dimension))
+            for i in range(n_segments)
+        ]
+        return arena
+    
+    def _segment_path(self, index: int) -> Path:
+        return self.directory / f"seg_{index:05d}.f32"
+    
+    @property
+    def rows(self) -> int:
+        return self._rows
+    
+    @property
+    def nbytes(self) -> int:
+        return len(self._segments) * self.segment_rows * self.dimension * 4
+    
+    def append(self, vectors: np.ndarray) -> None:
+        """在末尾追加向量"""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dimension)
+        written = 0
+        while written < len(vectors):
+            segment, offset = divmod(self._rows, self.segment_rows)
+            if segment == len(self._segments):
+                self._segments.append(np.memmap(
+                    self._segment_path(segment), dtype=np.float32, mode="w+",
+                    shape=(self.segment_rows, self.dimension),
+                ))
+            n = min(self.segment_rows - offset, len(vectors) - written)
+            self._segments[segment][offset:offset + n] = vectors[written:written + n]
+            written += n
+            self._rows += n
+    
+    def blocks(self) -> Iterator[np.ndarray]:
+        """按段依次返回已写入的行（视图，不复制）"""
+        for i, segment in enumerate(self._segments):
+            n = min(self.segment_rows, self._rows - i * self.segment_rows)
+            if n <= 0:
+                break
+            yield segment[:n]
+    
+    def row(self, index: int) -> np.ndarray:
+        segment, offset = divmod(index, self.segment_rows)
+        return np.array(self._segments[segment][offset])
+    
+    def take(self, indices: np.ndarray) -> np.ndarray:
+        """按行号收集向量（复制）"""
+        indices = np.asarray(indices, dtype=np.int64)
+        out = np.empty((len(indices), self.dimension), dtype=np.float32)
+        segments, offsets = np.divmod(indices, self.segment_rows)
+        for segment in np.unique(segments):
+            mask = segments == segment
+            out[mask] = self._segments[int(segment)][offsets[mask]]
+        return out
+    
+    def to_array(self) -> np.ndarray:
+        if self._rows == 0:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        return np.concatenate(list(self.blocks()))
+    
+    def similarities(self, query: np.ndarray) -> np.ndarray:
+        """与查询向量的内积，形状 (rows,)"""
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        if self._rows == 0:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate([block @ query for block in self.blocks()])
+    
+    def flush(self) -> None:
+        for segment in self._segments:
+            segment.flush()
+    
+    def close(self) -> None:
+        """释放映射（文件保留）"""
+        self.flush()
+        self._segments = []
+
+
 @dataclass
 class SearchResult:
     """搜索结果"""
@@ -72,6 +208,12 @@ class VectorStore:
         metric: str = "cosine",
         nlist: int = 100,  # IVF 聚类数
         nprobe: int = 10,  # IVF 搜索时检查的聚类数
+        storage: str = "memory",
+        arena_dir: str | Path | None = None,
+        segment_rows: int = 4096,
+        compact_threshold: float = 0.3,
+        compact_min_rows: int = 256,
+        background_compact: bool = True,
     ):
         """初始化向量存储
         
@@ -81,12 +223,29 @@ class VectorStore:
             metric: 距离度量 ("cosine", "l2", "ip")
             nlist: IVF 索引的聚类数（仅 ivf 类型）
             nprobe: IVF 搜索时探测的聚类数（仅 ivf 类型）
+            storage: 存储模式 ("memory", "mmap")
+            arena_dir: mmap 模式的向量区目录（每次压缩生成一个新的 gen_* 子目录）
+            segment_rows: mmap 模式每个段文件的行数
+            compact_threshold: 墓碑比例超过该值时触发压缩（仅 mmap）
+            compact_min_rows: 向量区行数不足时不压缩
+            background_compact: 是否在后台线程中压缩
         """
+        if storage not in ("memory", "mmap"):
+            raise ValueError(f"不支持的存储模式: {storage}")
+        if storage == "mmap" and arena_dir is None:
+            raise ValueError("mmap 存储模式需要指定 arena_dir")
+        
         self.dimension = dimension
         self.index_type = index_type
         self.metric = metric
         self.nlist = nlist
         self.nprobe = nprobe
+        self.storage = storage
+        self.arena_dir = Path(arena_dir) if arena_dir is not None else None
+        self.segment_rows = segment_rows
+        self.compact_threshold = compact_threshold
+        self.compact_min_rows = compact_min_rows
+        self.background_compact = background_compact
         
         # ID 映射：内部索引 <-> 外部 ID
         self._id_to_idx: dict[str, int] = {}
@@ -104,7 +263,19 @@ class VectorStore:
         self._vectors: np.ndarray | None = None  # NumPy 后备存储
         self._is_trained = False
         
+        # mmap 模式：向量区与后台压缩
+        self._lock = threading.RLock()
+        self._arena: VectorArena | None = None
+        self._generation = 0
+        self._compactions = 0
+        self._compact_thread: threading.Thread | None = None
+        
         self._init_index()
+        if storage == "mmap":
+            self._arena = VectorArena(self._generation_dir(0), dimension, segment_rows)
+    
+    def _generation_dir(self, generation: int) -> Path:
+        return self.arena_dir / f"gen_{generation:04d}"
     
     def _init_index(self) -> None:
         """初始化 Faiss 索引"""
@@ -113,6 +284,7 @@ class VectorStore:
             self._vectors = np.zeros((0, self.dimension), dtype=np.float32)
             return
         
+        faiss = _load_faiss()
         # 根据度量类型选择基础索引
         if self.metric == "cosine":
             # 余弦相似度 = 归一化后的内积
@@ -210,82 +382,86 @@ class VectorStore:
         # 归一化
         vectors_array = self._normalize(vectors_array)
         
-        # 处理已存在的 ID
-        new_ids = []
-        new_vectors = []
-        new_metadata = []
-        
-        for i, id in enumerate(ids):
-            if id in self._id_to_idx:
-                if overwrite:
-                    # 标记旧向量为删除
-                    old_idx = self._id_to_idx[id]
-                    self._deleted.add(old_idx)
-                else:
-                    continue
+        with self._lock:
+            # 处理已存在的 ID（在锁内解析：后台压缩切换向量区时会重写 ID 映射与墓碑集合）
+            new_ids = []
+            new_vectors = []
+            new_metadata = []
             
-            new_ids.append(id)
-            new_vectors.append(vectors_array[i])
-            if metadata_list and i < len(metadata_list):
-                new_metadata.append(metadata_list[i])
-            else:
-                new_metadata.append({})
-        
-        if not new_ids:
-            return 0
-        
-        new_vectors_array = np.array(new_vectors, dtype=np.float32)
-        
-        # 添加到索引
-        if FAISS_AVAILABLE:
-            # 如果是 IVF 索引且未训练，需要先训练
-            if self.index_type == "ivf" and not self._is_trained:
-                if len(new_vectors_array) >= self.nlist:
-                    self._index.train(new_vectors_array)
-                    self._is_trained = True
+            for i, id in enumerate(ids):
+                if id in self._id_to_idx:
+                    if overwrite:
+                        # 标记旧向量为删除
+                        old_idx = self._id_to_idx[id]
+                        self._deleted.add(old_idx)
+                    else:
+                        continue
+                
+                new_ids.append(id)
+                new_vectors.append(vectors_array[i])
+                if metadata_list and i < len(metadata_list):
+                    new_metadata.append(metadata_list[i])
                 else:
-                    # 向量不足以训练，暂存
-                    if self._vectors is None:
-                        self._vectors = new_vectors_array
+                    new_metadata.append({})
+            
+            if not new_ids:
+                return 0
+            
+            new_vectors_array = np.array(new_vectors, dtype=np.float32)
+            
+            # mmap 模式：所有向量都追加到向量区（Faiss 索引另存一份用于搜索）
+            if self._arena is not None:
+                self._arena.append(new_vectors_array)
+            
+            # 添加到索引
+            if FAISS_AVAILABLE:
+                # 如果是 IVF 索引且未训练，需要先训练
+                if self.index_type == "ivf" and not self._is_trained:
+                    if len(new_vectors_array) >= self.nlist:
+                        self._index.train(new_vectors_array)
+                        self._is_trained = True
                     else:
-                        self._vectors = np.vstack([self._vectors, new_vectors_array])
-                    # 更新映射
-                    for j, id in enumerate(new_ids):
-                        idx = self._next_idx
-                        self._id_to_idx[id] = idx
-                        self._idx_to_id[idx] = id
-                        self._metadata[id] = new_metadata[j]
-                        self._next_idx += 1
-                    return len(new_ids)
+                        # 向量不足以训练，暂存（mmap 模式已在向量区中）
+                        if self._arena is None:
+                            if self._vectors is None:
+                                self._vectors = new_vectors_array
+                            else:
+                                self._vectors = np.vstack([self._vectors, new_vectors_array])
+                        self._register(new_ids, new_metadata)
+                        return len(new_ids)
+                
+                self._index.add(new_vectors_array)
+            elif self._arena is None:
+                # NumPy 后备
+                if self._vectors is None or len(self._vectors) == 0:
+                    self._vectors = new_vectors_array
+                else:
+                    self._vectors = np.vstack([self._vectors, new_vectors_array])
             
-            self._index.add(new_vectors_array)
-        else:
-            # NumPy 后备
-            if self._vectors is None or len(self._vectors) == 0:
-                self._vectors = new_vectors_array
-            else:
-                self._vectors = np.vstack([self._vectors, new_vectors_array])
+            self._register(new_ids, new_metadata)
         
-        # 更新映射
-        for j, id in enumerate(new_ids):
+        self._maybe_compact()
+        return len(new_ids)
+    
+    def _register(self, ids: list[str], metadata: list[dict]) -> None:
+        """为新追加的向量分配内部索引"""
+        for j, id in enumerate(ids):
             idx = self._next_idx
             self._id_to_idx[id] = idx
             self._idx_to_id[idx] = id
-            self._metadata[id] = new_metadata[j]
+            self._metadata[id] = metadata[j]
             self._next_idx += 1
-        
-        return len(new_ids)
     
     def remove(self, id: str) -> bool:
         """删除向量（软删除）
         
-        Note: 实际删除在 rebuild() 时执行
+        Note: 实际删除在 rebuild() 时执行；mmap 模式下墓碑比例超过阈值时自动压缩
         """
-        if id not in self._id_to_idx:
-            return False
-        
-        idx = self._id_to_idx[id]
-        self._deleted.add(idx)
+        with self._lock:
+            if id not in self._id_to_idx:
+                return False
+            self._deleted.add(self._id_to_idx[id])
+        self._maybe_compact()
         return True
     
     def remove_batch(self, ids: Sequence[str]) -> int:
@@ -298,12 +474,16 @@ class VectorStore:
     
     def get(self, id: str) -> np.ndarray | None:
         """获取向量"""
-        if id not in self._id_to_idx:
-            return None
-        
-        idx = self._id_to_idx[id]
-        if idx in self._deleted:
-            return None
+        with self._lock:
+            if id not in self._id_to_idx:
+                return None
+            
+            idx = self._id_to_idx[id]
+            if idx in self._deleted:
+                return None
+            
+            if self._arena is not None:
+                return self._arena.row(idx)
         
         if FAISS_AVAILABLE and self._index is not None:
             try:
@@ -350,6 +530,16 @@ class VectorStore:
         Returns:
             搜索结果列表，按相似度降序排列
         """
+        with self._lock:
+            return self._search(query, top_k, threshold, exclude_ids)
+    
+    def _search(
+        self,
+        query: np.ndarray | list[float],
+        top_k: int,
+        threshold: float,
+        exclude_ids: set[str] | None,
+    ) -> list[SearchResult]:
         if self.size == 0:
             return []
         
@@ -365,12 +555,17 @@ class VectorStore:
         query_array = self._normalize(query_array)
         
         # 扩大搜索范围以处理删除和排除
-        search_k = min(top_k * 3 + len(self._deleted) + (len(exclude_ids) if exclude_ids else 0), self.size)
+        search_k = min(top_k * 3 + len(self._deleted) + (len(exclude_ids) if exclude_ids else 0), self.total_size)
         
         if FAISS_AVAILABLE and self._index is not None and self._index.ntotal > 0:
             distances, indices = self._index.search(query_array, search_k)
             distances = distances[0]
             indices = indices[0]
+        elif self._arena is not None and self._arena.rows > 0:
+            # 向量区暴力搜索（逐段计算，不复制整个向量区）
+            similarities = self._arena.similarities(query_array)
+            indices = np.argsort(-similarities)[:search_k]
+            distances = similarities[indices]
         elif self._vectors is not None and len(self._vectors) > 0:
             # NumPy 后备：暴力搜索
             similarities = self._vectors @ query_array.T
@@ -473,13 +668,21 @@ class VectorStore:
     
     @property
     def size(self) -> int:
-        """有效向量数量（不含已删除）"""
-        return len(self._id_to_idx) - len(self._deleted)
+        """有效向量数量（不含已删除）
+        
+        每个内部索引要么是某个 ID 的当前向量，要么是被覆盖/删除的墓碑。
+        """
+        return self._next_idx - len(self._deleted)
     
     @property
     def total_size(self) -> int:
         """总向量数量（含已删除）"""
-        return len(self._id_to_idx)
+        return self._next_idx
+    
+    @property
+    def tombstone_ratio(self) -> float:
+        """已删除（含被覆盖）向量占比"""
+        return len(self._deleted) / self._next_idx if self._next_idx else 0.0
     
     def contains(self, id: str) -> bool:
         """检查 ID 是否存在"""
@@ -492,11 +695,15 @@ class VectorStore:
     def rebuild(self) -> None:
         """重建索引（清理已删除向量，优化空间）
         
-        当删除比例超过 30% 时建议调用
+        当删除比例超过 30% 时建议调用；mmap 模式下等价于同步压缩
         """
         if len(self._deleted) == 0:
             return
         
+        if self._arena is not None:
+            self.compact(background=False)
+            return
+        
         logger.info(f"[VectorStore] 开始重建索引，清理 {len(self._deleted)} 个已删除向量")
         
         # 收集有效向量
@@ -530,6 +737,130 @@ class VectorStore:
         
         logger.info(f"[VectorStore] 索引重建完成，当前 {self.size} 个向量")
     
+    # ==================== 向量区压缩（mmap 模式） ====================
+    
+    def _maybe_compact(self) -> None:
+        if (
+            self._arena is not None
+            and self._next_idx >= self.compact_min_rows
+            and self.tombstone_ratio > self.compact_threshold
+        ):
+            self.compact(background=self.background_compact)
+    
+    def compact(self, background: bool = False) -> bool:
+        """把存活向量复制到新一代向量区，回收墓碑行
+        
+        复制在锁外进行，期间的追加/删除在切换时合并。旧一代目录在下次 save()
+        写出新的头信息后才删除，保证崩溃时磁盘上的存档仍然完整。
+        
+        Returns:
+            是否启动了压缩（已有压缩在进行或非 mmap 模式时返回 False）
+        """
+        if self._arena is None:
+            return False
+        with self._lock:
+            if self._compact_thread is not None and self._compact_thread.is_alive():
+                return False
+            if background:
+                self._compact_thread = threading.Thread(
+                    target=self._compact, name="vector-compact", daemon=True
+                )
+                self._compact_thread.start()
+                return True
+        self._compact()
+        return True
+    
+    def wait_for_compaction(self, timeout: float | None = None) -> None:
+        thread = self._compact_thread
+        if thread is not None:
+            thread.join(timeout)
+    
+    def _compact(self) -> None:
+        try:
+            with self._lock:
+                rows = self._next_idx
+                deleted = np.fromiter(self._deleted, dtype=np.int64, count=len(self._deleted))
+                live = np.setdiff1d(np.arange(rows, dtype=np.int64), deleted, assume_unique=True)
+                source = self._arena
+                generation = self._generation + 1
+            
+            target = VectorArena(self._generation_dir(generation), self.dimension, self.segment_rows)
+            block = max(self.segment_rows, 4096)
+            for start in range(0, len(live), block):
+                target.append(source.take(live[start:start + block]))
+            
+            with self._lock:
+                self._swap_arena(target, generation, rows, live)
+            source.close()
+            logger.info(
+                f"[VectorStore] 向量区压缩完成：{rows} -> {self._next_idx} 行 (gen {generation})"
+            )
+        except Exception as e:
+            logger.error(f"[VectorStore] 向量区压缩失败: {e}")
+    
+    def _swap_arena(
+        self, target: VectorArena, generation: int, rows: int, live: np.ndarray
+    ) -> None:
+        """切换到压缩后的向量区（持锁调用），合并复制期间的追加与删除"""
+        # 复制期间追加且仍存活的行；追加后又被删除的行直接丢弃，
+        # 其 _idx_to_id 条目在下面因 remap 为 -1 一并移除
+        tail = np.array(
+            [i for i in range(rows, self._next_idx) if i not in self._deleted], dtype=np.int64
+        )
+        if len(tail):
+            target.append(self._arena.take(tail))
+        
+        remap = np.full(self._next_idx, -1, dtype=np.int64)
+        remap[live] = np.arange(len(live))
+        remap[tail] = np.arange(len(live), len(live) + len(tail))
+        
+        idx_to_id: dict[int, str] = {}
+        deleted: set[int] = set()
+        for old, id in self._idx_to_id.items():
+            new = int(remap[old])
+            if new < 0:
+                continue
+            idx_to_id[new] = id
+            if old in self._deleted:
+                deleted.add(new)  # 复制期间被删除
+        
+        self._idx_to_id = idx_to_id
+        self._id_to_idx = {id: idx for idx, id in sorted(idx_to_id.items())}
+        self._metadata = {id: meta for id, meta in self._metadata.items() if id in self._id_to_idx}
+        self._deleted = deleted
+        self._next_idx = target.rows
+        self._arena = target
+        self._generation = generation
+        self._compactions += 1
+        
+        if FAISS_AVAILABLE:
+            self._reindex_from_arena()
+    
+    def _reindex_from_arena(self) -> None:
+        """从向量区重建 Faiss 索引（持锁调用）"""
+        self._is_trained = False
+        self._init_index()
+        vectors = self._arena.to_array()
+        if len(vectors) == 0:
+            return
+        if self.index_type == "ivf":
+            if len(vectors) < self.nlist:
+                return  # 不足以训练，搜索走向量区暴力搜索
+            self._index.train(vectors)
+            self._is_trained = True
+        self._index.add(vectors)
+    
+    def _cleanup_generations(self) -> None:
+        """删除当前代以外的向量区目录（Windows 下仍被映射的目录留待下次清理）"""
+        if self.arena_dir is None or not self.arena_dir.exists():
+            return
+        if self._compact_thread is not None and self._compact_thread.is_alive():
+            return  # 正在写入下一代
+        current = self._generation_dir(self._generation)
+        for directory in self.arena_dir.glob("gen_*"):
+            if directory != current:
+                shutil.rmtree(directory, ignore_errors=True)
+    
     def save(self, path: str | Path) -> None:
         """保存到磁盘
         
@@ -539,9 +870,13 @@ class VectorStore:
         path = Path(path)
         path.parent.mkdir(parents=True, exist_ok=True)
         
+        if self._arena is not None:
+            self._save_mmap(path)
+            return
+        
         # 保存索引
         if FAISS_AVAILABLE and self._index is not None:
-            faiss.write_index(self._index, str(path.with_suffix(".faiss")))
+            _load_faiss().write_index(self._index, str(path.with_suffix(".faiss")))
         
         # 保存元数据
         meta = {
@@ -567,6 +902,78 @@ class VectorStore:
         
         logger.info(f"[VectorStore] 已保存到 {path}，共 {self.size} 个向量")
     
+    def _save_mmap(self, path: Path) -> None:
+        """mmap 模式存档：向量已在向量区中，只写 ID 数组与头信息"""
+        self.wait_for_compaction()
+        with self._lock:
+            self._arena.flush()
+            row_ids = np.array([self._idx_to_id[i] for i in range(self._next_idx)], dtype=str)
+            np.save(str(path.with_suffix(".ids.npy")), row_ids)
+            if FAISS_AVAILABLE and self._index is not None and self._is_trained:
+                _load_faiss().write_index(self._index, str(path.with_suffix(".faiss")))
+            meta = {
+                "storage": "mmap",
+                "dimension": self.dimension,
+                "index_type": self.index_type,
+                "metric": self.metric,
+                "nlist": self.nlist,
+                "nprobe": self.nprobe,
+                "arena_dir": os.path.relpath(self.arena_dir, path.parent),
+                "generation": self._generation,
+                "segment_rows": self.segment_rows,
+                "rows": self._next_idx,
+                "metadata": self._metadata,
+                "deleted": list(self._deleted),
+                "is_trained": self._is_trained,
+                "compact_threshold": self.compact_threshold,
+            }
+            with open(path.with_suffix(".meta"), "wb") as f:
+                pickle.dump(meta, f)
+            self._cleanup_generations()
+        logger.info(f"[VectorStore] 已保存到 {path}（mmap），共 {self.size} 个向量")
+    
+    @classmethod
+    def _load_mmap(cls, path: Path, meta: dict) -> 'VectorStore':
+        """映射向量区并从 ID 数组恢复索引映射
+        
+        NumPy 后备路径下不读取向量数据；Faiss 可用时需要把索引读入内存。
+        """
+        store = cls(
+            dimension=meta["dimension"],
+            index_type=meta["index_type"],
+            metric=meta["metric"],
+            nlist=meta.get("nlist", 100),
+            nprobe=meta.get("nprobe", 10),
+            compact_threshold=meta.get("compact_threshold", 0.3),
+        )
+        store.storage = "mmap"
+        store.arena_dir = (path.parent / meta["arena_dir"]).resolve()
+        store.segment_rows = meta["segment_rows"]
+        store._generation = meta["generation"]
+        store._arena = VectorArena.open(
+            store._generation_dir(store._generation), store.dimension,
+            store.segment_rows, meta["rows"],
+        )
+        
+        row_ids = np.load(str(path.with_suffix(".ids.npy"))).tolist()
+        store._idx_to_id = dict(enumerate(row_ids))
+        store._id_to_idx = {id: idx for idx, id in enumerate(row_ids)}  # 覆盖写入时后出现的行生效
+        store._next_idx = len(row_ids)
+        store._metadata = meta["metadata"]
+        store._deleted = set(meta["deleted"])
+        store._is_trained = meta.get("is_trained", True)
+        
+        if FAISS_AVAILABLE:
+            faiss_path = path.with_suffix(".faiss")
+            if faiss_path.exists():
+                store._index = _load_faiss().read_index(str(faiss_path))
+            else:
+                store._reindex_from_arena()
+        store._cleanup_generations()
+        
+        logger.info(f"[VectorStore] 从 {path} 映射向量区，共 {store.size} 个向量")
+        return store
+    
     @classmethod
     def load(cls, path: str | Path) -> 'VectorStore':
         """从磁盘加载
@@ -583,6 +990,9 @@ class VectorStore:
         with open(path.with_suffix(".meta"), "rb") as f:
             meta = pickle.load(f)
         
+        if meta.get("storage") == "mmap":
+            return cls._load_mmap(path, meta)
+        
         # 创建实例
         store = cls(
             dimension=meta["dimension"],
@@ -603,6 +1013,7 @@ class VectorStore:
         # 加载索引
         faiss_path = path.with_suffix(".faiss")
         if FAISS_AVAILABLE and faiss_path.exists():
+            faiss = _load_faiss()
             store._index = faiss.read_index(str(faiss_path))
             
             # 【重要】对于 IVF 类型索引，确保 DirectMap 已初始化
@@ -628,7 +1039,9 @@ class VectorStore:
     def get_stats(self) -> dict[str, Any]:
         """获取统计信息"""
         memory_usage = 0
-        if FAISS_AVAILABLE and self._index is not None:
+        if self._arena is not None:
+            memory_usage = self._arena.nbytes
+        elif FAISS_AVAILABLE and self._index is not None:
             # 估算 Faiss 内存使用
             memory_usage = self._index.ntotal * self.dimension * 4  # float32
         elif self._vectors is not None:
@@ -645,6 +1058,10 @@ class VectorStore:
             "memory_bytes": memory_usage,
             "memory_mb": round(memory_usage / 1024 / 1024, 2),
             "backend": "faiss" if FAISS_AVAILABLE else "numpy",
+            "storage": self.storage,
+            "tombstone_ratio": round(self.tombstone_ratio, 4),
+            "generation": self._generation,
+            "compactions": self._compactions,
         }
 
 
@@ -656,12 +1073,16 @@ class MultiVectorStore:
     - events: 事件描述向量
     - pressures: 压力向量
     - concepts: 概念向量
+    
+    storage="mmap" 时新建的存储使用 base_dir/<name>.arena 作为向量区；
+    已有存档按其自身的存储模式加载。
     """
     
-    def __init__(self, base_dir: Path, dimension: int = 64):
+    def __init__(self, base_dir: Path, dimension: int = 64, storage: str = "memory"):
         self.base_dir = Path(base_dir)
         self.base_dir.mkdir(parents=True, exist_ok=True)
         self.dimension = dimension
+        self.storage = storage
         
         self._stores: dict[str, VectorStore] = {}
     
@@ -685,7 +1106,9 @@ class MultiVectorStore:
                 
                 self._stores[name] = VectorStore(
                     dimension=self.dimension,
-                    index_type=index_type
+                    index_type=index_type,
+                    storage=self.storage,
+                    arena_dir=self.base_dir / f"{name}.arena" if self.storage == "mmap" else None,
                 )
             else:
                 return None
@@ -20,6 +20,16 @@ if TYPE_CHECKING:
     pass
 
 
+# 六边形邻居偏移 (dx, dy)，按列奇偶区分（与 PlateMotionEngine._get_neighbors 一致）
+HEX_EVEN_OFFSETS: tuple[tuple[int, int], ...] = ((-1, -1), (0, -1), (-1, 0), (1, 0), (-1, 1), (0, 1))
+HEX_ODD_OFFSETS: tuple[tuple[int, int], ...] = ((0, -1), (1, -1), (-1, 0), (1, 0), (0, 1), (1, 1))
+
+# 边界类型编码 → 各项系数（下标即 BoundaryType.value）
+_BOUNDARY_STRESS = np.array([0.0, 0.3, 0.8, 0.9, 0.5], dtype=np.float32)
+_BOUNDARY_VOLCANIC_BOOST = np.array([0.0, 0.2, 0.1, 0.5, 0.0], dtype=np.float32)
+_BOUNDARY_QUAKE_BOOST = np.array([0.0, 0.15, 0.3, 0.4, 0.25], dtype=np.float32)
+
+
 class TectonicMatrixEngine:
     """板块构造矩阵引擎
     
@@ -50,8 +60,122 @@ class TectonicMatrixEngine:
         self._tile_coords: np.ndarray | None = None
         self._tile_elevations: np.ndarray | None = None
         
-        # 邻接矩阵（稀疏表示）
-        self._neighbor_indices: dict[int, list[int]] = {}
+        # 邻居索引 (6, n_tiles)，越界为 -1；只与地图尺寸有关，首次使用时构建
+        self._neighbor_matrix: np.ndarray | None = None
+    
+    # ==================== 六边形网格 ====================
+    
+    @property
+    def neighbor_matrix(self) -> np.ndarray:
+        """每个地块六个邻居的地块ID (6, n_tiles)，南北越界为 -1，东西环绕"""
+        if self._neighbor_matrix is None:
+            flat = np.arange(self.n_tiles, dtype=np.int64).reshape(self.height, self.width)
+            odd = (np.arange(self.width) & 1).astype(bool)
+            layers = []
+            for (edx, edy), (odx, ody) in zip(HEX_EVEN_OFFSETS, HEX_ODD_OFFSETS):
+                layers.append(np.where(odd, self._shift(flat, odx, ody), self._shift(flat, edx, edy)))
+            self._neighbor_matrix = np.stack(layers).reshape(6, self.n_tiles)
+        return self._neighbor_matrix
+    
+    @staticmethod
+    def _shift(grid: np.ndarray, dx: int, dy: int) -> np.ndarray:
+        """out[y, x] = grid[y + dy, (x + dx) % W]，越界填 -1"""
+        out = np.roll(grid, -dx, axis=1) if dx else grid
+        if dy:
+            shifted = np.full_like(out, -1)
+            if dy > 0:
+                shifted[:-dy] = out[dy:]
+            else:
+                shifted[-dy:] = out[:dy]
+            out = shifted
+        return out
+    
+    def classify_plate_pairs(self, plates: Sequence[Plate]) -> np.ndarray:
+        """板块两两之间的边界类型编码表 (n_plates, n_plates)
+        
+        规则同 PlateMotionEngine._classify_boundary：相对速度与中心连线
+        （X 轴环绕）的点积 > 0.01 为汇聚（含洋壳则俯冲，否则碰撞），
+        < -0.01 为张裂，其余为转换。
+        """
+        vx = np.array([p.velocity_x for p in plates], dtype=np.float64)
+        vy = np.array([p.velocity_y for p in plates], dtype=np.float64)
+        cx = np.array([p.rotation_center_x for p in plates], dtype=np.float64)
+        cy = np.array([p.rotation_center_y for p in plates], dtype=np.float64)
+        oceanic = np.array([p.plate_type == PlateType.OCEANIC for p in plates])
+        continental = np.array([p.plate_type == PlateType.CONTINENTAL for p in plates])
+        
+        dx = cx[None, :] - cx[:, None]
+        wrap = np.abs(dx) > self.width / 2
+        dx = np.where(wrap, np.where(dx > 0, dx - self.width, dx + self.width), dx)
+        dy = cy[None, :] - cy[:, None]
+        dot = (vx[:, None] - vx[None, :]) * dx + (vy[:, None] - vy[None, :]) * dy
+        
+        subduction = (
+            (oceanic[:, None] & continental[None, :])
+            | (continental[:, None] & oceanic[None, :])
+            | (oceanic[:, None] & oceanic[None, :])
+        )
+        converging = np.where(subduction, BoundaryType.SUBDUCTION.value, BoundaryType.CONVERGENT.value)
+        return np.where(
+            dot > 0.01,
+            converging,
+            np.where(dot < -0.01, BoundaryType.DIVERGENT.value, BoundaryType.TRANSFORM.value),
+        ).astype(np.int32)
+    
+    def detect_boundaries(
+        self,
+        plate_ids: np.ndarray,
+        pair_types: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """向量化边界检测
+        
+        Args:
+            plate_ids: (n_tiles,) 每个地块的板块ID，缺失地块为 -1
+            pair_types: classify_plate_pairs() 的编码表
+            
+        Returns:
+            (boundary_type (n_tiles,), plate_adjacency (n_plates, n_plates))
+            地块边界类型取其所有异板块邻居中编码最大者
+        """
+        n_plates = pair_types.shape[0]
+        nbrs = self.neighbor_matrix
+        neighbor_plates = np.where(nbrs >= 0, plate_ids[np.maximum(nbrs, 0)], -1)
+        own = np.broadcast_to(plate_ids, neighbor_plates.shape)
+        crossing = (neighbor_plates >= 0) & (own >= 0) & (neighbor_plates != own)
+        
+        codes = np.zeros(neighbor_plates.shape, dtype=np.int32)
+        codes[crossing] = pair_types[own[crossing], neighbor_plates[crossing]]
+        boundary_type = codes.max(axis=0)
+        
+        adjacency = np.zeros((n_plates, n_plates), dtype=np.int32)
+        a, b = own[crossing], neighbor_plates[crossing]
+        adjacency[a, b] = pair_types[a, b]
+        adjacency[b, a] = pair_types[b, a]
+        return boundary_type, adjacency
+    
+    def distance_to_boundary(self, sources: np.ndarray, valid: np.ndarray | None = None) -> np.ndarray:
+        """多源 BFS：每个地块到最近边界地块的步数，不可达为 -1
+        
+        每层只展开当前前沿的邻居，总代价 O(n_tiles)。
+        """
+        nbrs = self.neighbor_matrix
+        valid = np.ones(self.n_tiles, dtype=bool) if valid is None else valid
+        dist = np.full(self.n_tiles, -1, dtype=np.int32)
+        frontier = np.flatnonzero(sources & valid)
+        dist[frontier] = 0
+        slot = np.empty(self.n_tiles, dtype=np.int64)
+        step = 0
+        while frontier.size:
+            step += 1
+            candidates = nbrs[:, frontier].ravel()
+            candidates = candidates[candidates >= 0]
+            candidates = candidates[(dist[candidates] < 0) & valid[candidates]]
+            # 去重（无需排序）：同一地块只保留最后一次出现
+            order = np.arange(candidates.size)
+            slot[candidates] = order
+            frontier = candidates[slot[candidates] == order]
+            dist[frontier] = step
+        return dist
     
     def build(
         self,
@@ -64,76 +188,51 @@ class TectonicMatrixEngine:
         n_plates = len(plates)
         
         # === 1. 板块归属矩阵 ===
-        self._plate_assignment = np.array(
-            [t.plate_id for t in tiles], dtype=np.int32
+        self._plate_assignment = np.fromiter(
+            (t.plate_id for t in tiles), dtype=np.int32, count=n_tiles
         )
         
         # === 2. 地块坐标和高程 ===
         self._tile_coords = np.array(
             [[t.x, t.y] for t in tiles], dtype=np.float32
+        ).reshape(n_tiles, 2)
+        self._tile_elevations = np.fromiter(
+            (t.elevation for t in tiles), dtype=np.float32, count=n_tiles
         )
-        self._tile_elevations = np.array(
-            [t.elevation for t in tiles], dtype=np.float32
-        )
         
-        # === 3. 构建邻接关系 ===
-        self._build_neighbor_indices(tiles)
-        
-        # === 4. 边界检测 ===
-        self._boundary_type = np.zeros(n_tiles, dtype=np.int32)
-        self._plate_adjacency = np.zeros((n_plates, n_plates), dtype=np.int32)
-        
-        for tile in tiles:
-            neighbors = self._neighbor_indices.get(tile.id, [])
-            for neighbor_id in neighbors:
-                if neighbor_id < n_tiles:
-                    neighbor_plate = self._plate_assignment[neighbor_id]
-                    if neighbor_plate != tile.plate_id:
-                        # 边界地块
-                        bt = tiles[tile.id].boundary_type.value if tiles[tile.id].boundary_type else 0
-                        self._boundary_type[tile.id] = max(self._boundary_type[tile.id], bt)
-                        
-                        self._plate_adjacency[tile.plate_id, neighbor_plate] = bt
-                        self._plate_adjacency[neighbor_plate, tile.plate_id] = bt
-        
-        # === 5. 边界距离 ===
-        self._distance_to_boundary = np.array(
-            [t.distance_to_boundary for t in tiles], dtype=np.int32
+        # === 3. 边界检测（与 PlateMotionEngine 共用的向量化实现）===
+        if n_tiles == self.n_tiles:
+            tile_codes = np.fromiter(
+                (t.boundary_type.value if t.boundary_type else 0 for t in tiles),
+                dtype=np.int32, count=n_tiles,
+            )
+            _, self._plate_adjacency = self.detect_boundaries(
+                self._plate_assignment, self.classify_plate_pairs(plates)
+            )
+            nbrs = self.neighbor_matrix
+            neighbor_plates = np.where(nbrs >= 0, self._plate_assignment[np.maximum(nbrs, 0)], -1)
+            on_boundary = ((neighbor_plates >= 0) & (neighbor_plates != self._plate_assignment)).any(axis=0)
+            self._boundary_type = np.where(on_boundary, tile_codes, 0).astype(np.int32)
+        else:
+            self._boundary_type = np.zeros(n_tiles, dtype=np.int32)
+            self._plate_adjacency = np.zeros((n_plates, n_plates), dtype=np.int32)
+        
+        # === 4. 边界距离 ===
+        self._distance_to_boundary = np.fromiter(
+            (t.distance_to_boundary for t in tiles), dtype=np.int32, count=n_tiles
         )
         
-        # === 6. 地质活动矩阵 ===
-        self._volcanic_potential = np.array(
-            [t.volcanic_potential for t in tiles], dtype=np.float32
+        # === 5. 地质活动矩阵 ===
+        self._volcanic_potential = np.fromiter(
+            (t.volcanic_potential for t in tiles), dtype=np.float32, count=n_tiles
         )
-        self._earthquake_risk = np.array(
-            [t.earthquake_risk for t in tiles], dtype=np.float32
+        self._earthquake_risk = np.fromiter(
+            (t.earthquake_risk for t in tiles), dtype=np.float32, count=n_tiles
         )
-        self._tectonic_activity = np.array(
-            [t.tectonic_activity for t in tiles], dtype=np.float32
+        self._tectonic_activity = np.fromiter(
+            (t.tectonic_activity for t in tiles), dtype=np.float32, count=n_tiles
         )
     
-    def _build_neighbor_indices(self, tiles: list[SimpleTile]) -> None:
-        """构建邻接索引"""
-        for tile in tiles:
-            neighbors = self._get_neighbor_tile_ids(tile.x, tile.y)
-            self._neighbor_indices[tile.id] = neighbors
-    
-    def _get_neighbor_tile_ids(self, x: int, y: int) -> list[int]:
-        """获取邻居地块ID"""
-        if x & 1:
-            offsets = [(0, -1), (1, -1), (-1, 0), (1, 0), (0, 1), (1, 1)]
-        else:
-            offsets = [(-1, -1), (0, -1), (-1, 0), (1, 0), (-1, 1), (0, 1)]
-        
-        neighbors = []
-        for dx, dy in offsets:
-            nx = (x + dx) % self.width
-            ny = y + dy
-            if 0 <= ny < self.height:
-                neighbors.append(ny * self.width + nx)
-        
-        return neighbors
-    
     def compute_boundary_mask(self) -> np.ndarray:
         """获取边界地块掩码"""
         if self._boundary_type is None:
@@ -145,18 +244,17 @@ class TectonicMatrixEngine:
         if self._tile_coords is None or self._plate_assignment is None:
             return np.zeros((n_plates, 2))
         
-        centroids = np.zeros((n_plates, 2), dtype=np.float32)
-        counts = np.zeros(n_plates, dtype=np.int32)
-        
-        for i, plate_id in enumerate(self._plate_assignment):
-            centroids[plate_id] += self._tile_coords[i]
-            counts[plate_id] += 1
+        plate_ids = self._plate_assignment
+        centroids = np.stack([
+            np.bincount(plate_ids, weights=self._tile_coords[:, 0], minlength=n_plates),
+            np.bincount(plate_ids, weights=self._tile_coords[:, 1], minlength=n_plates),
+        ], axis=1)[:n_plates]
         
         # 避免除零
-        counts = np.maximum(counts, 1)
+        counts = np.maximum(np.bincount(plate_ids, minlength=n_plates)[:n_plates], 1)
         centroids /= counts[:, np.newaxis]
         
-        return centroids
+        return centroids.astype(np.float32)
     
     def compute_elevation_stats_by_plate(self, n_plates: int) -> dict[int, dict[str, float]]:
         """计算每个板块的海拔统计"""
@@ -193,32 +291,14 @@ class TectonicMatrixEngine:
         if self._boundary_type is None or self._distance_to_boundary is None:
             return np.zeros(self.n_tiles)
         
-        stress = np.zeros(self.n_tiles, dtype=np.float32)
-        
-        # 边界地块基础应力
-        boundary_stress = {
-            0: 0.0,   # internal
-            1: 0.3,   # divergent
-            2: 0.8,   # convergent
-            3: 0.9,   # subduction
-            4: 0.5,   # transform
-        }
+        # 边界地块基础应力（按边界类型编码查表）
+        base_stress = _BOUNDARY_STRESS[np.clip(self._boundary_type, 0, len(_BOUNDARY_STRESS) - 1)]
         
-        for i in range(self.n_tiles):
-            bt = self._boundary_type[i]
-            dist = self._distance_to_boundary[i]
-            
-            base_stress = boundary_stress.get(bt, 0.0)
-            
-            # 距离衰减
-            if dist > 0:
-                distance_factor = 1.0 / (1 + dist * 0.5)
-            else:
-                distance_factor = 1.0
-            
-            stress[i] = base_stress * distance_factor
+        # 距离衰减
+        dist = self._distance_to_boundary.astype(np.float32)
+        distance_factor = np.where(dist > 0, 1.0 / (1 + dist * 0.5), 1.0)
         
-        return stress
+        return (base_stress * distance_factor).astype(np.float32)
     
     def compute_volcanic_probability_matrix(
         self,
@@ -236,20 +316,9 @@ class TectonicMatrixEngine:
         if self._volcanic_potential is None or self._boundary_type is None:
             return np.zeros(self.n_tiles)
         
-        probability = self._volcanic_potential.copy()
-        
         # 边界类型加成
-        boundary_boost = {
-            0: 0.0,
-            1: 0.2,   # divergent
-            2: 0.1,   # convergent
-            3: 0.5,   # subduction
-            4: 0.0,   # transform
-        }
-        
-        for i in range(self.n_tiles):
-            bt = self._boundary_type[i]
-            probability[i] += boundary_boost.get(bt, 0.0)
+        codes = np.clip(self._boundary_type, 0, len(_BOUNDARY_VOLCANIC_BOOST) - 1)
+        probability = self._volcanic_potential + _BOUNDARY_VOLCANIC_BOOST[codes]
         
         # 压力加成
         probability *= pressure_boost
@@ -272,20 +341,9 @@ class TectonicMatrixEngine:
         if self._earthquake_risk is None or self._boundary_type is None:
             return np.zeros(self.n_tiles)
         
-        probability = self._earthquake_risk.copy()
-        
         # 边界类型是主要因素
-        boundary_boost = {
-            0: 0.0,
-            1: 0.15,  # divergent
-            2: 0.3,   # convergent
-            3: 0.4,   # subduction
-            4: 0.25,  # transform
-        }
-        
-        for i in range(self.n_tiles):
-            bt = self._boundary_type[i]
-            probability[i] += boundary_boost.get(bt, 0.0)
+        codes = np.clip(self._boundary_type, 0, len(_BOUNDARY_QUAKE_BOOST) - 1)
+        probability = self._earthquake_risk + _BOUNDARY_QUAKE_BOOST[codes]
         
         # 压力加成
         probability *= pressure_boost
@@ -356,14 +414,8 @@ class TectonicMatrixEngine:
         if self._plate_assignment is None or self._boundary_type is None:
             return np.zeros(n_plates)
         
-        boundary_length = np.zeros(n_plates, dtype=np.int32)
-        
-        for i in range(self.n_tiles):
-            if self._boundary_type[i] > 0:
-                plate_id = self._plate_assignment[i]
-                boundary_length[plate_id] += 1
-        
-        return boundary_length.astype(np.float32)
+        on_boundary = self._plate_assignment[self._boundary_type > 0]
+        return np.bincount(on_boundary, minlength=n_plates)[:n_plates].astype(np.float32)
     
     # ==================== 辅助方法 ====================
     
@@ -12,6 +12,7 @@ from typing import Sequence
 import numpy as np
 
 from .config import TECTONIC_CONFIG, BOUNDARY_TYPE_CODES
+from .matrix_engine import TectonicMatrixEngine
 from .models import (
     Plate, PlateType, BoundaryType, MotionPhase,
     SimpleTile, TerrainChange, TectonicEvent
@@ -28,9 +29,11 @@ class PlateMotionEngine:
     4. 生成地质事件（地震、火山等）
     """
     
-    def __init__(self, width: int, height: int):
+    def __init__(self, width: int, height: int, matrix_engine: TectonicMatrixEngine | None = None):
         self.width = width
         self.height = height
+        # 边界检测/距离计算复用矩阵引擎的邻居索引与向量化实现
+        self.matrix_engine = matrix_engine or TectonicMatrixEngine(width, height)
         self.config = TECTONIC_CONFIG["motion"]
         self.terrain_config = TECTONIC_CONFIG["terrain"]
         self.event_config = TECTONIC_CONFIG["events"]
@@ -195,57 +198,39 @@ class PlateMotionEngine:
                 "boundary_tiles": list[int],
             }
         """
-        n_plates = len(plates)
-        tile_boundaries: dict[int, BoundaryType] = {}
-        plate_adjacency = np.zeros((n_plates, n_plates), dtype=np.int32)
-        boundary_tiles: list[int] = []
+        n_tiles = self.width * self.height
+        plate_ids = np.full(n_tiles, -1, dtype=np.int64)
+        tile_ids = np.fromiter((t.id for t in tiles), dtype=np.int64, count=len(tiles))
+        in_grid = (tile_ids >= 0) & (tile_ids < n_tiles)
+        plate_ids[tile_ids[in_grid]] = np.fromiter(
+            (t.plate_id for t in tiles), dtype=np.int64, count=len(tiles)
+        )[in_grid]
         
-        tile_map = {t.id: t for t in tiles}
+        # 板块两两分类一次，地块按异板块邻居查表
+        pair_types = self.matrix_engine.classify_plate_pairs(plates)
+        boundary_codes, plate_adjacency = self.matrix_engine.detect_boundaries(plate_ids, pair_types)
         
-        for tile in tiles:
-            x, y = tile.x, tile.y
-            my_plate_id = tile.plate_id
-            
-            neighbors = self._get_neighbors(x, y)
-            is_boundary = False
-            neighbor_plates = set()
-            
-            for nx, ny in neighbors:
-                if 0 <= ny < self.height:
-                    neighbor_tile_id = ny * self.width + nx
-                    neighbor_tile = tile_map.get(neighbor_tile_id)
-                    if neighbor_tile and neighbor_tile.plate_id != my_plate_id:
-                        neighbor_plates.add(neighbor_tile.plate_id)
-                        is_boundary = True
-            
-            if is_boundary:
-                boundary_tiles.append(tile.id)
-                
-                # 确定边界类型
-                my_plate = plates[my_plate_id]
-                for neighbor_plate_id in neighbor_plates:
-                    neighbor_plate = plates[neighbor_plate_id]
-                    boundary_type = self._classify_boundary(my_plate, neighbor_plate)
-                    
-                    # 更新地块边界类型（取最高优先级）
-                    current = tile_boundaries.get(tile.id, BoundaryType.INTERNAL)
-                    if boundary_type.value > current.value:
-                        tile_boundaries[tile.id] = boundary_type
-                    
-                    # 更新板块邻接矩阵
-                    plate_adjacency[my_plate_id, neighbor_plate_id] = boundary_type.value
-                    plate_adjacency[neighbor_plate_id, my_plate_id] = boundary_type.value
+        # 到边界的距离（多源 BFS）
+        distances = self._compute_boundary_distances(boundary_codes > 0)
         
-        # 更新地块对象
-        for tile in tiles:
-            if tile.id in tile_boundaries:
-                tile.boundary_type = tile_boundaries[tile.id]
-                tile.distance_to_boundary = 0
+        tile_boundaries: dict[int, BoundaryType] = {}
+        boundary_tiles: list[int] = []
+        codes = np.zeros(len(tiles), dtype=np.int32)
+        dists = np.full(len(tiles), -1, dtype=np.int32)
+        codes[in_grid] = boundary_codes[tile_ids[in_grid]]
+        dists[in_grid] = distances[tile_ids[in_grid]]
+        
+        # 更新地块对象（不可达的地块保留原距离）
+        for tile, code, dist in zip(tiles, codes.tolist(), dists.tolist()):
+            if code:
+                bt = BoundaryType(code)
+                tile_boundaries[tile.id] = bt
+                boundary_tiles.append(tile.id)
+                tile.boundary_type = bt
             else:
                 tile.boundary_type = BoundaryType.INTERNAL
-        
-        # 计算到边界的距离
-        self._compute_boundary_distances(tiles, boundary_tiles)
+            if dist >= 0:
+                tile.distance_to_boundary = dist
         
         return {
             "tile_boundaries": tile_boundaries,
@@ -287,39 +272,14 @@ class PlateMotionEngine:
             # 平行移动：转换
             return BoundaryType.TRANSFORM
     
-    def _compute_boundary_distances(
-        self, 
-        tiles: list[SimpleTile], 
-        boundary_tiles: list[int]
-    ) -> None:
-        """计算每个地块到最近边界的距离"""
-        if not boundary_tiles:
-            return
-        
-        tile_map = {t.id: t for t in tiles}
-        boundary_set = set(boundary_tiles)
-        
-        # BFS 计算距离
-        from collections import deque
-        
-        visited = set(boundary_tiles)
-        queue = deque([(tid, 0) for tid in boundary_tiles])
+    def _compute_boundary_distances(self, boundary_mask: np.ndarray) -> np.ndarray:
+        """每个地块（按地块ID）到最近边界的距离，不可达为 -1
         
-        while queue:
-            tile_id, dist = queue.popleft()
-            tile = tile_map.get(tile_id)
-            if not tile:
-                continue
-            
-            tile.distance_to_boundary = dist
-            
-            neighbors = self._get_neighbors(tile.x, tile.y)
-            for nx, ny in neighbors:
-                if 0 <= ny < self.height:
-                    neighbor_id = ny * self.width + nx
-                    if neighbor_id not in visited:
-                        visited.add(neighbor_id)
-                        queue.append((neighbor_id, dist + 1))
+        多源 BFS 按层展开前沿，与逐地块 deque BFS 结果相同。
+        """
+        if not boundary_mask.any():
+            return np.full(boundary_mask.shape, -1, dtype=np.int32)
+        return self.matrix_engine.distance_to_boundary(boundary_mask)
     
     def _compute_terrain_changes(
         self,
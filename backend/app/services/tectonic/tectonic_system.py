@@ -58,9 +58,9 @@ class TectonicSystem:
         
         # 子系统
         self.generator = PlateGenerator(width, height)
-        self.motion_engine = PlateMotionEngine(width, height)
-        self.feature_distributor = GeologicalFeatureDistributor(width, height)
         self.matrix_engine = TectonicMatrixEngine(width, height)
+        self.motion_engine = PlateMotionEngine(width, height, self.matrix_engine)
+        self.feature_distributor = GeologicalFeatureDistributor(width, height)
         self.species_tracker = PlateSpeciesTracker(width, height)
         self.mantle_engine = MantleDynamicsEngine(width, height)
         
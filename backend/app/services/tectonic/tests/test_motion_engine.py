@@ -198,6 +198,50 @@ class TestBoundaryClassification:
         assert boundary == BoundaryType.CONVERGENT
 
 
+class TestVectorizedBoundaries:
+    """向量化边界检测与逐地块遍历的参照实现一致"""
+    
+    def _reference(self, engine, plates, tiles):
+        from collections import deque
+        
+        tile_map = {t.id: t for t in tiles}
+        codes, adjacency = {}, np.zeros((len(plates), len(plates)), dtype=np.int32)
+        for tile in tiles:
+            for nx, ny in engine._get_neighbors(tile.x, tile.y):
+                neighbor = tile_map.get(ny * engine.width + nx)
+                if neighbor and neighbor.plate_id != tile.plate_id:
+                    bt = engine._classify_boundary(plates[tile.plate_id], plates[neighbor.plate_id])
+                    codes[tile.id] = max(codes.get(tile.id, 0), bt.value)
+                    adjacency[tile.plate_id, neighbor.plate_id] = bt.value
+                    adjacency[neighbor.plate_id, tile.plate_id] = bt.value
+        
+        dist = {tid: 0 for tid in codes}
+        queue = deque(codes)
+        while queue:
+            tid = queue.popleft()
+            tile = tile_map[tid]
+            for nx, ny in engine._get_neighbors(tile.x, tile.y):
+                nid = ny * engine.width + nx
+                if nid in tile_map and nid not in dist:
+                    dist[nid] = dist[tid] + 1
+                    queue.append(nid)
+        return codes, adjacency, dist
+    
+    @pytest.mark.parametrize("seed", [1, 7, 42])
+    def test_matches_reference(self, seed):
+        width, height = 48, 16
+        plates, plate_map, tiles = PlateGenerator(width, height).generate(seed=seed)
+        engine = PlateMotionEngine(width, height)
+        codes, adjacency, dist = self._reference(engine, plates, tiles)
+        
+        info = engine._detect_boundaries(plates, plate_map, tiles)
+        
+        assert {tid: bt.value for tid, bt in info["tile_boundaries"].items()} == codes
+        assert info["boundary_tiles"] == [t.id for t in tiles if t.id in codes]
+        np.testing.assert_array_equal(info["plate_adjacency"], adjacency)
+        assert {t.id: t.distance_to_boundary for t in tiles} == dist
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
 
@@ -10,9 +10,12 @@ Simulation Package - 模拟引擎核心模块
 - stage_config: 阶段配置和注册表
 - plugin_stages: 插件阶段示例
 - regression_test: 回归测试框架
+- benchmark: 流水线性能基准（合成世界，无 LLM）
+- profiling: 阶段级内存剖析与采样折叠栈
 - snapshot: 快照与回滚系统
 - logging_config: 日志配置与标签化
 - cli: 命令行接口
+- batch: 多世界并行批量模拟（参数扫描）
 - species: 死亡率引擎
 - tile_based_mortality: 地块级死亡率引擎
 - environment: 环境系统
@@ -0,0 +1,521 @@
+#!/usr/bin/env python3
+"""
+Batch Runner - 多世界并行批量模拟
+
+用于平衡性调参：在多个工作进程中并行运行大量相互独立的世界。
+
+设计要点：
+- 每个任务通过 `python -m app.simulation.cli` 在独立子进程中运行，
+  拥有独立的 SQLite 数据库文件（或内存库）、数据目录、张量状态和随机种子
+- 数据库隔离通过子进程环境变量 DATABASE_URL / DATA_DIR 等实现，
+  core/database.py 中的全局引擎因此天然指向该任务自己的库
+- 参数扫描来自 YAML 网格，网格值沿用 parse_param_overrides / ModeParameters 的语义
+- 每完成一个任务就把 SimulationResult 以 JSON Lines 形式流式写出
+- 全部完成后按参数组合汇总统计量（均值/标准差/最小/最大/成功率）
+
+网格文件示例（sweep.yaml）：
+
+    mode: standard
+    turns: 20
+    seeds: [1, 2, 3, 4]          # 或 runs: 8（自动生成种子）
+    params:                      # 固定参数覆盖
+      max_species_count: 200
+    grid:                        # 笛卡尔积扫描
+      pressure_scale: [0.8, 1.0, 1.2]
+      max_speciations_per_turn: [3, 5]
+
+用法：
+    python -m app.simulation.batch sweep.yaml --workers 16 --output results/sweep1
+    python -m app.simulation.batch sweep.yaml --in-memory
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import logging
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# 确保项目路径在 sys.path 中
+project_root = Path(__file__).parent.parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+
+logger = logging.getLogger(__name__)
+
+# 子进程工作目录（app 包所在目录）
+BACKEND_ROOT = Path(__file__).resolve().parent.parent.parent
+
+
+# 参与汇总统计的 SimulationResult 数值字段
+SUMMARY_FIELDS = [
+    "turns_completed",
+    "total_duration_s",
+    "final_species_count",
+    "extinct_species_count",
+    "new_species_count",
+    "total_migrations",
+    "total_speciations",
+    "final_temperature",
+    "final_sea_level",
+    "avg_turn_duration_ms",
+]
+
+
+# ============================================================================
+# 任务定义与网格展开
+# ============================================================================
+
+@dataclass
+class BatchJob:
+    """单个批量任务（一个独立世界）"""
+    job_id: int
+    mode: str
+    turns: int
+    seed: int
+    param_overrides: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class SweepGrid:
+    """参数扫描网格
+
+    fixed_params 对所有任务生效，grid 中每个键的取值列表做笛卡尔积，
+    每个组合再乘以 seeds 得到最终任务列表。
+    """
+    mode: str = "standard"
+    turns: int = 10
+    seeds: List[int] = field(default_factory=lambda: [0])
+    fixed_params: Dict[str, Any] = field(default_factory=dict)
+    grid: Dict[str, List[Any]] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SweepGrid":
+        """从字典构建（兼容 YAML 结构）"""
+        from .cli import parse_param_overrides
+        from .stage_config import AVAILABLE_MODES
+
+        mode = data.get("mode", "standard")
+        if mode not in AVAILABLE_MODES:
+            raise ValueError(f"未知模式: {mode}。可用模式: {', '.join(AVAILABLE_MODES)}")
+
+        seeds = data.get("seeds")
+        if seeds is None:
+            runs = int(data.get("runs", 1))
+            base_seed = int(data.get("base_seed", 1))
+            seeds = [base_seed + i for i in range(runs)]
+        elif isinstance(seeds, int):
+            seeds = [seeds]
+
+        fixed = data.get("params") or {}
+        if isinstance(fixed, list):
+            # 兼容 CLI 风格的 ["key=value", ...]
+            fixed = parse_param_overrides([str(p) for p in fixed])
+
+        grid: Dict[str, List[Any]] = {}
+        for key, values in (data.get("grid") or {}).items():
+            if not isinstance(values, list):
+                values = [values]
+            grid[str(key)] = [_coerce_value(v) for v in values]
+
+        return cls(
+            mode=mode,
+            turns=int(data.get("turns", 10)),
+            seeds=[int(s) for s in seeds],
+            fixed_params={str(k): _coerce_value(v) for k, v in fixed.items()},
+            grid=grid,
+        )
+
+    @classmethod
+    def from_yaml(cls, path: str | Path) -> "SweepGrid":
+        """从 YAML 文件加载"""
+        import yaml
+
+        with open(path, "r", encoding="utf-8") as f:
+            data = yaml.safe_load(f) or {}
+        return cls.from_dict(data)
+
+    def iter_param_sets(self) -> Iterable[Dict[str, Any]]:
+        """遍历所有参数组合（固定参数 + 网格组合）"""
+        if not self.grid:
+            yield dict(self.fixed_params)
+            return
+
+        keys = sorted(self.grid.keys())
+        for combo in itertools.product(*(self.grid[k] for k in keys)):
+            params = dict(self.fixed_params)
+            params.update(dict(zip(keys, combo)))
+            yield params
+
+    def expand(self) -> List[BatchJob]:
+        """展开为任务列表"""
+        jobs: List[BatchJob] = []
+        for params in self.iter_param_sets():
+            for seed in self.seeds:
+                jobs.append(BatchJob(
+                    job_id=len(jobs),
+                    mode=self.mode,
+                    turns=self.turns,
+                    seed=seed if seed else random.randint(1, 999999),
+                    param_overrides=dict(params),
+                ))
+        return jobs
+
+
+def _coerce_value(value: Any) -> Any:
+    """将 YAML 中的字符串值按 CLI 规则转换"""
+    if isinstance(value, str):
+        from .cli import parse_param_value
+        return parse_param_value(value)
+    return value
+
+
+# ============================================================================
+# 工作进程
+# ============================================================================
+
+def isolated_environment(job_dir: Path, in_memory: bool) -> Dict[str, str]:
+    """构造任务子进程的环境变量（独立数据库与数据目录）
+
+    core/database.py 在导入时根据 DATABASE_URL 创建全局引擎，
+    因此隔离必须在子进程启动前通过环境变量完成。
+    """
+    env = dict(os.environ)
+    if in_memory:
+        env["DATABASE_URL"] = "sqlite:///:memory:"
+    else:
+        env["DATABASE_URL"] = f"sqlite:///{(job_dir / 'world.db').as_posix()}"
+
+    env["DATA_DIR"] = str(job_dir)
+    env["CACHE_DIR"] = str(job_dir / "cache")
+    env["SAVES_DIR"] = str(job_dir / "saves")
+    env["REPORTS_DIR"] = str(job_dir / "reports")
+    env["EXPORTS_DIR"] = str(job_dir / "exports")
+    env["LOG_DIR"] = str(job_dir / "logs")
+    env["LOG_TO_FILE"] = "false"
+    env["PYTHONIOENCODING"] = "utf-8"
+    return env
+
+
+def build_job_command(job: BatchJob, result_dir: Path) -> List[str]:
+    """构造运行单个世界的 CLI 命令"""
+    cmd = [
+        sys.executable, "-m", "app.simulation.cli",
+        "--mode", job.mode,
+        "--turns", str(job.turns),
+        "--seed", str(job.seed),
+        "--output", str(result_dir),
+        "--quiet",
+    ]
+    for key, value in sorted(job.param_overrides.items()):
+        cmd.append(f"--param={key}={value}")
+    return cmd
+
+
+def run_batch_job(
+    job: BatchJob,
+    work_dir: str | Path,
+    in_memory: bool = False,
+    timeout: float | None = None,
+) -> Dict[str, Any]:
+    """在独立子进程中运行单个任务，返回可 JSON 序列化的结果"""
+    job_dir = Path(work_dir) / f"job_{job.job_id:05d}"
+    result_dir = job_dir / "result"
+    job_dir.mkdir(parents=True, exist_ok=True)
+
+    started = time.perf_counter()
+    payload: Dict[str, Any] | None = None
+    errors: List[str] = []
+
+    try:
+        proc = subprocess.run(
+            build_job_command(job, result_dir),
+            cwd=str(BACKEND_ROOT),
+            env=isolated_environment(job_dir, in_memory),
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            timeout=timeout,
+        )
+        (job_dir / "worker.log").write_text(proc.stdout + proc.stderr, encoding="utf-8")
+
+        result_files = sorted(result_dir.glob("result_*.json"))
+        if result_files:
+            with open(result_files[-1], "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        else:
+            tail = (proc.stderr or proc.stdout).strip().splitlines()[-3:]
+            errors.append(f"工作进程退出码 {proc.returncode}: {' | '.join(tail)}")
+    except subprocess.TimeoutExpired:
+        errors.append(f"工作进程超时 ({timeout}s)")
+    except Exception as e:
+        errors.append(f"工作进程启动失败: {e}")
+
+    if payload is None:
+        payload = {
+            "success": False,
+            "mode": job.mode,
+            "turns_completed": 0,
+            "total_duration_s": time.perf_counter() - started,
+            "random_seed": job.seed,
+            "errors": errors,
+        }
+
+    payload["job_id"] = job.job_id
+    payload["param_overrides"] = job.param_overrides
+    payload["wall_time_s"] = time.perf_counter() - started
+    return payload
+
+
+# ============================================================================
+# 汇总统计
+# ============================================================================
+
+def _describe(values: List[float]) -> Dict[str, float]:
+    """计算均值/标准差/最小/最大"""
+    if not values:
+        return {"mean": 0.0, "std": 0.0, "min": 0.0, "max": 0.0}
+    mean = sum(values) / len(values)
+    var = sum((v - mean) ** 2 for v in values) / len(values)
+    return {
+        "mean": mean,
+        "std": math.sqrt(var),
+        "min": min(values),
+        "max": max(values),
+    }
+
+
+def summarize_results(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """按参数组合汇总批量结果
+
+    Returns:
+        每个参数组合一条记录：运行数、成功率、各数值字段统计
+    """
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for r in results:
+        key = json.dumps(r.get("param_overrides", {}), sort_keys=True, ensure_ascii=False)
+        groups.setdefault(key, []).append(r)
+
+    summary = []
+    for key, items in groups.items():
+        ok = [r for r in items if r.get("success")]
+        stats = {}
+        for name in SUMMARY_FIELDS:
+            values = [float(r[name]) for r in ok if isinstance(r.get(name), (int, float))]
+            stats[name] = _describe(values)
+        summary.append({
+            "params": json.loads(key),
+            "runs": len(items),
+            "succeeded": len(ok),
+            "success_rate": len(ok) / len(items) if items else 0.0,
+            "seeds": sorted(r.get("random_seed", 0) for r in items),
+            "stats": stats,
+        })
+
+    summary.sort(key=lambda s: json.dumps(s["params"], sort_keys=True))
+    return summary
+
+
+def format_summary_table(summary: List[Dict[str, Any]], metric: str = "final_species_count") -> str:
+    """格式化汇总表（单个指标）"""
+    lines = [
+        f"{'参数组合':<48} {'成功':>7} {metric + ' (mean±std)':>28}",
+        "-" * 86,
+    ]
+    for row in summary:
+        params = ", ".join(f"{k}={v}" for k, v in sorted(row["params"].items())) or "(默认)"
+        s = row["stats"].get(metric, {})
+        lines.append(
+            f"{params[:48]:<48} {row['succeeded']:>3}/{row['runs']:<3} "
+            f"{s.get('mean', 0.0):>18.2f} ± {s.get('std', 0.0):<7.2f}"
+        )
+    return "\n".join(lines)
+
+
+# ============================================================================
+# 批量调度
+# ============================================================================
+
+class BatchRunner:
+    """批量模拟调度器
+
+    每个世界运行在独立的 Python 子进程中（独立数据库、服务容器与 Taichi 运行时），
+    调度线程只负责等待子进程结束并收集结果，因此 workers 个线程即可占满 workers 个核心。
+    """
+
+    def __init__(
+        self,
+        jobs: List[BatchJob],
+        output_dir: str | Path,
+        workers: int | None = None,
+        in_memory: bool = False,
+        job_timeout: float | None = None,
+    ):
+        self.jobs = jobs
+        self.output_dir = Path(output_dir)
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.in_memory = in_memory
+        self.job_timeout = job_timeout
+        self.results: List[Dict[str, Any]] = []
+
+    @property
+    def results_path(self) -> Path:
+        return self.output_dir / "results.jsonl"
+
+    @property
+    def summary_path(self) -> Path:
+        return self.output_dir / "summary.json"
+
+    def run(
+        self,
+        on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> List[Dict[str, Any]]:
+        """运行所有任务，逐个流式写出结果
+
+        Args:
+            on_result: 每完成一个任务时的回调
+
+        Returns:
+            汇总统计列表
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        work_dir = self.output_dir / "worlds"
+
+        logger.info(f"[Batch] 启动 {len(self.jobs)} 个任务，工作进程数={self.workers}")
+        started = time.perf_counter()
+
+        with open(self.results_path, "w", encoding="utf-8") as stream, ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix="batch-worker",
+        ) as pool:
+            futures = {
+                pool.submit(run_batch_job, job, work_dir, self.in_memory, self.job_timeout): job
+                for job in self.jobs
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                job = futures[future]
+                payload = future.result()
+
+                self.results.append(payload)
+                stream.write(json.dumps(payload, ensure_ascii=False) + "\n")
+                stream.flush()
+
+                if on_result:
+                    on_result(payload)
+                logger.info(
+                    f"[Batch] 进度 {done}/{len(self.jobs)}: job={job.job_id} "
+                    f"seed={job.seed} {'✅' if payload.get('success') else '❌'}"
+                )
+
+        summary = summarize_results(self.results)
+        with open(self.summary_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "generated_at": datetime.now().isoformat(),
+                "jobs": len(self.jobs),
+                "workers": self.workers,
+                "wall_time_s": time.perf_counter() - started,
+                "groups": summary,
+            }, f, indent=2, ensure_ascii=False)
+
+        logger.info(f"[Batch] 完成，结果: {self.results_path}，汇总: {self.summary_path}")
+        return summary
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def create_parser() -> argparse.ArgumentParser:
+    """创建参数解析器"""
+    parser = argparse.ArgumentParser(
+        prog="simulation-batch",
+        description="多世界并行批量模拟（参数扫描）",
+    )
+    parser.add_argument("grid", type=str, help="参数网格 YAML 文件路径")
+    parser.add_argument(
+        "-w", "--workers",
+        type=int,
+        default=0,
+        help="工作进程数 (0=CPU 核数)",
+    )
+    parser.add_argument(
+        "-o", "--output",
+        type=str,
+        default=None,
+        help="输出目录 (default: data/batch/<时间戳>)",
+    )
+    parser.add_argument(
+        "--in-memory",
+        action="store_true",
+        help="使用内存数据库（不落盘世界文件）",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=None,
+        help="单个任务超时（秒）",
+    )
+    parser.add_argument(
+        "--metric",
+        type=str,
+        default="final_species_count",
+        help="汇总表展示的指标",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="仅展开网格并打印任务列表",
+    )
+    return parser
+
+
+def main() -> int:
+    """主入口"""
+    from .cli import setup_logging
+
+    parser = create_parser()
+    args = parser.parse_args()
+    setup_logging(1)
+
+    grid = SweepGrid.from_yaml(args.grid)
+    jobs = grid.expand()
+
+    if args.dry_run:
+        for job in jobs:
+            print(json.dumps(job.to_dict(), ensure_ascii=False))
+        return 0
+
+    output_dir = args.output or str(
+        project_root / "data" / "batch" / datetime.now().strftime("%Y%m%d_%H%M%S")
+    )
+    runner = BatchRunner(
+        jobs,
+        output_dir=output_dir,
+        workers=args.workers or None,
+        in_memory=args.in_memory,
+        job_timeout=args.timeout,
+    )
+    summary = runner.run()
+    print(format_summary_table(summary, args.metric))
+
+    return 0 if all(r.get("success") for r in runner.results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,618 @@
+#!/usr/bin/env python3
+"""
+Pipeline Benchmark - 流水线性能基准
+
+与 regression_test.py（正确性）互补，提供可复现的性能基准：
+- 不依赖 LLM：在隔离数据库中生成指定规模的合成世界
+  （物种数 S、地图尺寸 W×H、栖息地密度）
+- 按 stage_config.yaml 中的模式（minimal/standard/full）运行 K 回合
+- 记录每个阶段的耗时、进程峰值 RSS、tracemalloc 分配峰值与净增
+- 结果追加到 JSON Lines 历史文件（附带 git 提交号），可在提交之间对比
+- 多个物种规模（如 S = 100…5000）自动生成扩展曲线与对数斜率
+
+每个 (规模, 模式) 组合在独立子进程中运行（复用 batch.isolated_environment），
+保证数据库、服务容器与 Taichi 运行时互不干扰，RSS 数据也不会相互污染。
+
+用法：
+    python -m app.simulation.benchmark --species 100,500,1000 --modes minimal,standard --turns 3
+    python -m app.simulation.benchmark --species 100,250,500,1000,2500,5000 --modes minimal
+    python -m app.simulation.benchmark --compare -2 -1       # 对比最近两次记录
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .profiling import current_rss_mb, peak_rss_mb
+
+# 确保项目路径在 sys.path 中
+project_root = Path(__file__).parent.parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+
+logger = logging.getLogger(__name__)
+
+BACKEND_ROOT = Path(__file__).resolve().parent.parent.parent
+DEFAULT_HISTORY_PATH = project_root / "data" / "benchmarks" / "history.jsonl"
+
+# 合成物种的营养级分布（生产者占多数，金字塔结构）
+TROPHIC_DISTRIBUTION = [(1.0, 0.45), (2.0, 0.30), (3.0, 0.17), (4.0, 0.08)]
+
+TRAIT_NAMES = [
+    "耐寒性", "耐热性", "耐旱性", "耐盐性", "光照需求",
+    "运动能力", "繁殖速度", "社会性", "攻击性", "防御性",
+]
+
+
+# ============================================================================
+# 数据结构
+# ============================================================================
+
+@dataclass
+class BenchmarkScale:
+    """合成世界规模"""
+    species_count: int = 100
+    map_width: int = 128
+    map_height: int = 40
+    habitat_density: float = 0.05  # 每个物种占据同类地块的比例
+
+    @property
+    def label(self) -> str:
+        return f"S{self.species_count}_{self.map_width}x{self.map_height}_d{self.habitat_density:g}"
+
+
+@dataclass
+class StageSample:
+    """单个阶段在单个回合中的采样"""
+    stage: str
+    turn: int
+    duration_ms: float
+    success: bool = True
+    rss_mb: float = 0.0
+    peak_rss_mb: float = 0.0
+    alloc_peak_kb: float = 0.0
+    alloc_net_kb: float = 0.0
+
+
+@dataclass
+class BenchmarkCase:
+    """单个 (规模, 模式) 组合的基准结果"""
+    scale: BenchmarkScale
+    mode: str
+    turns: int
+    seed: int
+    success: bool = True
+    setup_s: float = 0.0
+    turn_ms: List[float] = field(default_factory=list)
+    peak_rss_mb: float = 0.0
+    stages: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    errors: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BenchmarkCase":
+        data = dict(data)
+        data["scale"] = BenchmarkScale(**data.get("scale", {}))
+        return cls(**data)
+
+
+# ============================================================================
+# 内存采样
+# ============================================================================
+
+class StageProfiler:
+    """通过 Pipeline 前后回调采集每阶段内存数据
+
+    耗时由 PipelineMetrics 提供，这里只补充内存维度。
+    tracemalloc 会拖慢执行，可通过 trace_alloc=False 关闭以获得纯耗时数据。
+    """
+
+    def __init__(self, trace_alloc: bool = True):
+        self.trace_alloc = trace_alloc
+        self.samples: List[StageSample] = []
+        self._pending: Dict[str, tuple[float, int]] = {}
+        self._turn = 0
+
+    def attach(self, pipeline) -> None:
+        pipeline.add_before_stage_callback(self._before)
+        pipeline.add_after_stage_callback(self._after)
+        if self.trace_alloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def detach(self) -> None:
+        if self.trace_alloc and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def start_turn(self, turn: int) -> None:
+        self._turn = turn
+
+    def _before(self, stage, ctx) -> None:
+        traced = 0
+        if self.trace_alloc:
+            tracemalloc.reset_peak()
+            traced = tracemalloc.get_traced_memory()[0]
+        self._pending[stage.name] = (time.perf_counter(), traced)
+
+    def _after(self, stage, ctx, result) -> None:
+        started, traced_before = self._pending.pop(stage.name, (time.perf_counter(), 0))
+        sample = StageSample(
+            stage=stage.name,
+            turn=self._turn,
+            duration_ms=(time.perf_counter() - started) * 1000,
+            success=bool(getattr(result, "success", True)),
+            rss_mb=current_rss_mb(),
+            peak_rss_mb=peak_rss_mb(),
+        )
+        if self.trace_alloc:
+            current, peak = tracemalloc.get_traced_memory()
+            sample.alloc_peak_kb = max(0, peak - traced_before) / 1024
+            sample.alloc_net_kb = (current - traced_before) / 1024
+        self.samples.append(sample)
+
+
+def aggregate_samples(samples: List[StageSample]) -> Dict[str, Dict[str, float]]:
+    """按阶段聚合采样：平均/最大耗时、内存峰值"""
+    grouped: Dict[str, List[StageSample]] = {}
+    for s in samples:
+        grouped.setdefault(s.stage, []).append(s)
+
+    stats: Dict[str, Dict[str, float]] = {}
+    for name, items in grouped.items():
+        durations = [s.duration_ms for s in items]
+        stats[name] = {
+            "mean_ms": sum(durations) / len(durations),
+            "max_ms": max(durations),
+            "min_ms": min(durations),
+            "calls": len(items),
+            "failures": sum(1 for s in items if not s.success),
+            "max_rss_mb": max(s.rss_mb for s in items),
+            "alloc_peak_kb": max(s.alloc_peak_kb for s in items),
+            "alloc_net_kb": sum(s.alloc_net_kb for s in items) / len(items),
+        }
+    return stats
+
+
+# ============================================================================
+# 合成世界
+# ============================================================================
+
+def generate_synthetic_world(scale: BenchmarkScale, seed: int) -> Dict[str, int]:
+    """在当前数据库中生成合成世界（地图由 MapStateManager 生成，物种/栖息地随机生成）
+
+    必须在隔离数据库的进程中调用。
+
+    Returns:
+        生成统计：地块数、物种数、栖息地记录数
+    """
+    from ..core.database import session_scope
+    from ..models.species import Species
+    from ..repositories.environment_repository import environment_repository
+
+    rng = random.Random(seed)
+    tiles = environment_repository.list_tiles()
+    water = [t.id for t in tiles if t.elevation < 0]
+    land = [t.id for t in tiles if t.elevation >= 0]
+
+    species_rows: List[Species] = []
+    codes_by_level: Dict[float, List[str]] = {}
+    levels = [lvl for lvl, _ in TROPHIC_DISTRIBUTION]
+    weights = [w for _, w in TROPHIC_DISTRIBUTION]
+
+    for i in range(scale.species_count):
+        trophic = rng.choices(levels, weights)[0]
+        code = f"B{i + 1}"
+        habitat_type = "marine" if (water and (not land or rng.random() < 0.5)) else "terrestrial"
+        lower = [c for lvl, cs in codes_by_level.items() if lvl < trophic for c in cs]
+        prey = rng.sample(lower, min(len(lower), rng.randint(1, 4))) if lower else []
+
+        species_rows.append(Species(
+            lineage_code=code,
+            latin_name=f"Benchmarkus synthetica {i + 1}",
+            common_name=f"合成物种{i + 1}",
+            description="基准测试合成物种",
+            morphology_stats={
+                "population": float(rng.randint(10_000, 5_000_000)),
+                "body_length_cm": rng.uniform(0.01, 200.0),
+                "body_weight_g": rng.uniform(0.001, 50_000.0),
+                "generation_time_days": rng.uniform(1.0, 3650.0),
+                "metabolic_rate": rng.uniform(0.5, 5.0),
+            },
+            abstract_traits={name: round(rng.uniform(1.0, 10.0), 2) for name in TRAIT_NAMES},
+            hidden_traits={
+                "gene_diversity": rng.uniform(0.3, 0.9),
+                "environment_sensitivity": rng.uniform(0.2, 0.8),
+                "evolution_potential": rng.uniform(0.3, 0.9),
+            },
+            ecological_vector=[rng.uniform(-1.0, 1.0) for _ in range(8)],
+            trophic_level=trophic,
+            habitat_type=habitat_type,
+            diet_type="autotroph" if trophic < 2.0 else ("herbivore" if trophic < 3.0 else "carnivore"),
+            prey_species=prey,
+            prey_preferences={p: round(1.0 / len(prey), 3) for p in prey},
+            genus_code=f"G{i // 5 + 1}",
+        ))
+        codes_by_level.setdefault(trophic, []).append(code)
+
+    with session_scope() as session:
+        session.add_all(species_rows)
+        session.flush()
+        id_pairs = [(sp.id, sp.habitat_type, sp.morphology_stats["population"]) for sp in species_rows]
+
+    habitats: List[Dict[str, Any]] = []
+    for species_id, habitat_type, population in id_pairs:
+        pool = water if habitat_type == "marine" else land
+        if not pool:
+            continue
+        k = max(1, int(len(pool) * scale.habitat_density))
+        chosen = rng.sample(pool, min(k, len(pool)))
+        per_tile = max(1, int(population / len(chosen)))
+        for tile_id in chosen:
+            habitats.append({
+                "tile_id": tile_id,
+                "species_id": species_id,
+                "population": per_tile,
+                "suitability": rng.uniform(0.3, 1.0),
+                "turn_index": 0,
+            })
+    environment_repository.write_habitats_bulk(habitats)
+
+    return {"tiles": len(tiles), "species": len(species_rows), "habitats": len(habitats)}
+
+
+# ============================================================================
+# 单个基准用例（在隔离子进程中执行）
+# ============================================================================
+
+async def run_benchmark_case(
+    scale: BenchmarkScale,
+    mode: str,
+    turns: int,
+    seed: int = 42,
+    trace_alloc: bool = True,
+) -> BenchmarkCase:
+    """生成合成世界并按指定模式运行 K 回合"""
+    from ..core.container import ServiceContainer
+    from ..core.database import init_db
+    from ..schemas.requests import TurnCommand
+
+    case = BenchmarkCase(scale=scale, mode=mode, turns=turns, seed=seed)
+    random.seed(seed)
+    try:
+        import numpy as np
+        np.random.seed(seed)
+    except ImportError:
+        pass
+
+    profiler = StageProfiler(trace_alloc=trace_alloc)
+    try:
+        setup_start = time.perf_counter()
+        init_db()
+        container = ServiceContainer()
+        container.map_manager.ensure_initialized(map_seed=seed)
+        world = generate_synthetic_world(scale, seed)
+        container.initialize()
+        engine = container.simulation_engine
+        engine.set_mode(mode)
+        profiler.attach(engine._pipeline)
+        case.setup_s = time.perf_counter() - setup_start
+        logger.info(f"[Benchmark] 合成世界就绪: {world}，耗时 {case.setup_s:.2f}s")
+
+        for turn in range(turns):
+            profiler.start_turn(turn)
+            turn_start = time.perf_counter()
+            await engine.run_turns_async(TurnCommand(pressures=[], rounds=1))
+            case.turn_ms.append((time.perf_counter() - turn_start) * 1000)
+    except Exception as e:
+        case.success = False
+        case.errors.append(f"{type(e).__name__}: {e}")
+        logger.error(f"[Benchmark] 用例失败: {e}", exc_info=True)
+    finally:
+        profiler.detach()
+
+    case.stages = aggregate_samples(profiler.samples)
+    case.peak_rss_mb = peak_rss_mb()
+    return case
+
+
+def _run_case_subprocess(
+    scale: BenchmarkScale,
+    mode: str,
+    turns: int,
+    seed: int,
+    work_dir: Path,
+    trace_alloc: bool,
+    timeout: float | None,
+) -> BenchmarkCase:
+    """在隔离子进程中运行单个用例"""
+    from .batch import isolated_environment
+
+    case_dir = work_dir / f"{scale.label}_{mode}"
+    case_dir.mkdir(parents=True, exist_ok=True)
+    out_file = case_dir / "case.json"
+
+    env = isolated_environment(case_dir, in_memory=False)
+    env["MAP_WIDTH"] = str(scale.map_width)
+    env["MAP_HEIGHT"] = str(scale.map_height)
+    env["ENABLE_TURN_REPORT_LLM"] = "false"
+    env["LOG_TO_CONSOLE"] = "false"
+    env.pop("AI_BASE_URL", None)
+    env.pop("AI_API_KEY", None)
+
+    cmd = [
+        sys.executable, "-m", "app.simulation.benchmark", "--worker",
+        "--species", str(scale.species_count),
+        "--map-size", f"{scale.map_width}x{scale.map_height}",
+        "--density", str(scale.habitat_density),
+        "--modes", mode,
+        "--turns", str(turns),
+        "--seed", str(seed),
+        "--worker-output", str(out_file),
+    ]
+    if not trace_alloc:
+        cmd.append("--no-tracemalloc")
+
+    try:
+        proc = subprocess.run(
+            cmd, cwd=str(BACKEND_ROOT), env=env, capture_output=True,
+            text=True, encoding="utf-8", errors="replace", timeout=timeout,
+        )
+        (case_dir / "worker.log").write_text(proc.stdout + proc.stderr, encoding="utf-8")
+        if out_file.exists():
+            return BenchmarkCase.from_dict(json.loads(out_file.read_text(encoding="utf-8")))
+        tail = (proc.stderr or proc.stdout).strip().splitlines()[-3:]
+        error = f"子进程退出码 {proc.returncode}: {' | '.join(tail)}"
+    except subprocess.TimeoutExpired:
+        error = f"子进程超时 ({timeout}s)"
+
+    return BenchmarkCase(scale=scale, mode=mode, turns=turns, seed=seed, success=False, errors=[error])
+
+
+# ============================================================================
+# 历史记录与对比
+# ============================================================================
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=str(BACKEND_ROOT),
+            capture_output=True, text=True, timeout=10,
+        ).stdout.strip()
+    except Exception:
+        return ""
+
+
+def append_history(entry: Dict[str, Any], path: str | Path = DEFAULT_HISTORY_PATH) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def load_history(path: str | Path = DEFAULT_HISTORY_PATH) -> List[Dict[str, Any]]:
+    path = Path(path)
+    if not path.exists():
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _select_entry(history: List[Dict[str, Any]], ref: str) -> Dict[str, Any]:
+    """按下标（支持负数）或 git 提交号前缀选择历史记录"""
+    try:
+        return history[int(ref)]
+    except (ValueError, IndexError):
+        for entry in reversed(history):
+            if entry.get("git_rev", "").startswith(ref):
+                return entry
+    raise KeyError(f"历史记录中找不到: {ref}")
+
+
+def compare_entries(base: Dict[str, Any], head: Dict[str, Any], threshold: float = 0.10) -> List[Dict[str, Any]]:
+    """对比两次基准记录中同一 (规模, 模式, 阶段) 的平均耗时
+
+    Returns:
+        每项包含 base/head 耗时、相对变化与是否超出阈值（回归）
+    """
+    def index(entry):
+        out = {}
+        for raw in entry.get("cases", []):
+            case = BenchmarkCase.from_dict(raw)
+            for stage, stats in case.stages.items():
+                out[(case.scale.label, case.mode, stage)] = stats
+        return out
+
+    base_idx, head_idx = index(base), index(head)
+    rows = []
+    for key in sorted(set(base_idx) & set(head_idx)):
+        b = base_idx[key]["mean_ms"]
+        h = head_idx[key]["mean_ms"]
+        change = (h - b) / b if b > 0 else 0.0
+        rows.append({
+            "scale": key[0], "mode": key[1], "stage": key[2],
+            "base_ms": b, "head_ms": h, "change": change,
+            "regression": change > threshold and (h - b) > 1.0,
+        })
+    rows.sort(key=lambda r: r["change"], reverse=True)
+    return rows
+
+
+def scaling_curves(cases: List[BenchmarkCase]) -> Dict[str, Dict[str, Any]]:
+    """按 (模式, 阶段) 汇总物种数 → 平均耗时的扩展曲线
+
+    exponent 为 log(耗时) 对 log(S) 的最小二乘斜率，≈1 表示线性，≈2 表示平方。
+    """
+    curves: Dict[str, Dict[str, Any]] = {}
+    for case in cases:
+        if not case.success:
+            continue
+        for stage, stats in case.stages.items():
+            key = f"{case.mode}/{stage}"
+            curve = curves.setdefault(key, {"points": []})
+            curve["points"].append((case.scale.species_count, stats["mean_ms"]))
+
+    for curve in curves.values():
+        pts = sorted(p for p in curve["points"] if p[0] > 0 and p[1] > 0)
+        curve["points"] = pts
+        curve["exponent"] = None
+        if len(pts) >= 2:
+            xs = [math.log(p[0]) for p in pts]
+            ys = [math.log(p[1]) for p in pts]
+            mx, my = sum(xs) / len(xs), sum(ys) / len(ys)
+            denom = sum((x - mx) ** 2 for x in xs)
+            if denom > 0:
+                curve["exponent"] = sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / denom
+    return curves
+
+
+def format_case_table(case: BenchmarkCase, top: int = 15) -> str:
+    """格式化单个用例的阶段表（按平均耗时排序）"""
+    lines = [
+        f"[{case.scale.label} | {case.mode}] 回合均值 "
+        f"{(sum(case.turn_ms) / len(case.turn_ms)) if case.turn_ms else 0:.1f}ms, "
+        f"峰值 RSS {case.peak_rss_mb:.0f}MB" + ("" if case.success else f"  ❌ {case.errors}"),
+        f"  {'阶段':<30} {'均值ms':>10} {'最大ms':>10} {'RSS MB':>9} {'分配峰值KB':>12}",
+    ]
+    ranked = sorted(case.stages.items(), key=lambda kv: kv[1]["mean_ms"], reverse=True)
+    for name, s in ranked[:top]:
+        lines.append(
+            f"  {name[:30]:<30} {s['mean_ms']:>10.1f} {s['max_ms']:>10.1f} "
+            f"{s['max_rss_mb']:>9.0f} {s['alloc_peak_kb']:>12.0f}"
+        )
+    return "\n".join(lines)
+
+
+def format_scaling_table(curves: Dict[str, Dict[str, Any]], top: int = 15) -> str:
+    """格式化扩展曲线（按最大规模下耗时排序）"""
+    ranked = sorted(
+        curves.items(),
+        key=lambda kv: kv[1]["points"][-1][1] if kv[1]["points"] else 0,
+        reverse=True,
+    )
+    lines = ["扩展曲线（物种数 → 平均耗时 ms，exponent = log-log 斜率）:"]
+    for key, curve in ranked[:top]:
+        pts = ", ".join(f"{s}:{ms:.1f}" for s, ms in curve["points"])
+        exp = f"{curve['exponent']:.2f}" if curve["exponent"] is not None else "-"
+        lines.append(f"  {key[:40]:<40} exp={exp:>5}  {pts}")
+    return "\n".join(lines)
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def _parse_int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="simulation-benchmark",
+        description="流水线阶段性能基准（合成世界，无 LLM）",
+    )
+    parser.add_argument("--species", type=str, default="100", help="物种规模列表，如 100,500,1000")
+    parser.add_argument("--map-size", type=str, default="128x40", help="地图尺寸 WxH")
+    parser.add_argument("--density", type=float, default=0.05, help="栖息地密度 (0-1)")
+    parser.add_argument("--modes", type=str, default="minimal,standard", help="模式列表")
+    parser.add_argument("-t", "--turns", type=int, default=3, help="每个用例的回合数 K")
+    parser.add_argument("-s", "--seed", type=int, default=42, help="随机种子")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="关闭分配追踪（纯耗时）")
+    parser.add_argument("--timeout", type=float, default=None, help="单个用例超时（秒）")
+    parser.add_argument("--history", type=str, default=str(DEFAULT_HISTORY_PATH), help="历史文件路径")
+    parser.add_argument("--work-dir", type=str, default=None, help="合成世界工作目录")
+    parser.add_argument("--label", type=str, default="", help="本次记录的备注")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "HEAD"), default=None,
+                        help="对比两次历史记录（下标或 git 提交号前缀）")
+    parser.add_argument("--threshold", type=float, default=0.10, help="回归判定阈值（相对变化）")
+    # 内部：子进程模式
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--worker-output", type=str, default=None, help=argparse.SUPPRESS)
+    return parser
+
+
+def main() -> int:
+    from .cli import setup_logging
+
+    args = create_parser().parse_args()
+    setup_logging(0 if args.worker else 1)
+
+    width, height = (int(v) for v in args.map_size.lower().split("x"))
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+
+    if args.worker:
+        import asyncio
+        scale = BenchmarkScale(_parse_int_list(args.species)[0], width, height, args.density)
+        case = asyncio.run(run_benchmark_case(
+            scale, modes[0], args.turns, args.seed, trace_alloc=not args.no_tracemalloc,
+        ))
+        Path(args.worker_output).write_text(json.dumps(case.to_dict(), ensure_ascii=False), encoding="utf-8")
+        return 0 if case.success else 1
+
+    if args.compare:
+        history = load_history(args.history)
+        base, head = (_select_entry(history, ref) for ref in args.compare)
+        rows = compare_entries(base, head, args.threshold)
+        print(f"基准对比: {base.get('git_rev') or '?'} → {head.get('git_rev') or '?'}")
+        for r in rows:
+            flag = "⚠️ " if r["regression"] else "   "
+            print(f"{flag}{r['scale']:<28} {r['mode']:<9} {r['stage'][:28]:<28} "
+                  f"{r['base_ms']:>9.1f} → {r['head_ms']:>9.1f} ms ({r['change']:+.1%})")
+        return 1 if any(r["regression"] for r in rows) else 0
+
+    from .stage_config import AVAILABLE_MODES
+    unknown = [m for m in modes if m not in AVAILABLE_MODES]
+    if unknown:
+        print(f"未知模式: {', '.join(unknown)}。可用模式: {', '.join(AVAILABLE_MODES)}")
+        return 1
+
+    work_dir = Path(args.work_dir or (project_root / "data" / "benchmarks" / "worlds"))
+    cases: List[BenchmarkCase] = []
+    for species_count in _parse_int_list(args.species):
+        scale = BenchmarkScale(species_count, width, height, args.density)
+        for mode in modes:
+            logger.info(f"[Benchmark] 运行 {scale.label} / {mode} × {args.turns} 回合")
+            case = _run_case_subprocess(
+                scale, mode, args.turns, args.seed, work_dir,
+                trace_alloc=not args.no_tracemalloc, timeout=args.timeout,
+            )
+            cases.append(case)
+            print(format_case_table(case))
+            print()
+
+    curves = scaling_curves(cases)
+    if len(_parse_int_list(args.species)) > 1:
+        print(format_scaling_table(curves))
+
+    entry = {
+        "timestamp": datetime.now().isoformat(),
+        "git_rev": _git_revision(),
+        "label": args.label,
+        "host": {"platform": platform.platform(), "python": platform.python_version(), "cpus": os.cpu_count()},
+        "turns": args.turns,
+        "trace_alloc": not args.no_tracemalloc,
+        "cases": [c.to_dict() for c in cases],
+        "scaling": {k: {"points": v["points"], "exponent": v["exponent"]} for k, v in curves.items()},
+    }
+    append_history(entry, args.history)
+    print(f"\n结果已追加到: {args.history}")
+    return 0 if all(c.success for c in cases) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,6 +8,8 @@ Simulation CLI - 命令行接口
     python -m app.simulation.cli --mode standard --turns 10
     python -m app.simulation.cli --mode debug --turns 5 --seed 42
     python -m app.simulation.cli --config scenario.yaml --output results/
+
+批量参数扫描请使用 app.simulation.batch（多进程并行运行独立世界）。
 """
 
 from __future__ import annotations
@@ -157,6 +159,7 @@ async def run_simulation(
     scenario_file: str | None = None,
     output_dir: str | None = None,
     param_overrides: Dict[str, Any] | None = None,
+    engine: Any | None = None,
 ) -> SimulationResult:
     """运行模拟
     
@@ -168,6 +171,7 @@ async def run_simulation(
         scenario_file: 场景文件路径（预留）
         output_dir: 输出目录
         param_overrides: 参数覆盖
+        engine: 已组装的 SimulationEngine（为 None 时通过 ServiceContainer 创建）
     
     Returns:
         模拟结果
@@ -193,6 +197,11 @@ async def run_simulation(
     if seed == 0:
         seed = random.randint(1, 999999)
     random.seed(seed)
+    try:
+        import numpy as np
+        np.random.seed(seed % (2**32))
+    except ImportError:
+        pass
     
     # 加载模式配置和参数
     stages, params = load_mode_with_parameters(
@@ -220,14 +229,19 @@ async def run_simulation(
     final_sea = 0.0
     
     try:
-        # 尝试导入引擎
-        from .engine import SimulationEngine
         from ..schemas.requests import TurnCommand
         from ..repositories.species_repository import species_repository
         from ..repositories.environment_repository import environment_repository
         
-        # 创建引擎
-        engine = SimulationEngine()
+        # 创建引擎（未注入时通过服务容器组装，与 API 进程一致）
+        if engine is None:
+            from ..core.container import ServiceContainer
+            from ..core.database import init_db
+            init_db()
+            container = ServiceContainer()
+            container.initialize()
+            engine = container.simulation_engine
+        engine.set_mode(mode)
         
         # 获取初始物种数
         try:
@@ -459,6 +473,24 @@ def create_parser() -> argparse.ArgumentParser:
     return parser
 
 
+def parse_param_value(value: str) -> Any:
+    """解析单个参数值（数字 / 布尔 / 字符串）"""
+    value = value.strip()
+    
+    # 尝试解析为数字
+    try:
+        if "." in value:
+            return float(value)
+        return int(value)
+    except ValueError:
+        # 布尔值
+        if value.lower() in ("true", "yes", "1"):
+            return True
+        if value.lower() in ("false", "no", "0"):
+            return False
+        return value
+
+
 def parse_param_overrides(param_list: List[str]) -> Dict[str, Any]:
     """解析参数覆盖列表"""
     overrides = {}
@@ -466,23 +498,7 @@ def parse_param_overrides(param_list: List[str]) -> Dict[str, Any]:
         if "=" not in param_str:
             continue
         key, value = param_str.split("=", 1)
-        key = key.strip()
-        value = value.strip()
-        
-        # 尝试解析为数字
-        try:
-            if "." in value:
-                overrides[key] = float(value)
-            else:
-                overrides[key] = int(value)
-        except ValueError:
-            # 布尔值
-            if value.lower() in ("true", "yes", "1"):
-                overrides[key] = True
-            elif value.lower() in ("false", "no", "0"):
-                overrides[key] = False
-            else:
-                overrides[key] = value
+        overrides[key.strip()] = parse_param_value(value)
     
     return overrides
 
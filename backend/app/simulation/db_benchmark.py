@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+DB Benchmark - SQLite 写入吞吐基准
+
+对比两种数据库配置在回合写回负载下的表现（临时库文件，不触碰游戏数据库）：
+- baseline：默认 PRAGMA（DELETE 日志 + synchronous=FULL），逐对象 session.merge / add
+- tuned：core.database 的 PRAGMA（WAL、mmap、cache_size…），bulk_save 批量写入
+
+负载（每轮）：
+- 更新全部地块（W×H 个 MapTile）
+- 插入一回合的栖息地记录（物种数 × 每物种地块数）
+- 更新全部物种（S 个 Species，含 JSON 字段）
+
+写入期间另一个线程持续查询地块数，记录读取延迟（模拟 API 轮询）。
+
+--writeback 对比回合末物种写回：逐物种 upsert（merge + flush + refresh）与
+SpeciesUnitOfWork（登记后一次 executemany UPDATE，只写变化的行和字段）。
+
+用法：
+    python -m app.simulation.db_benchmark
+    python -m app.simulation.db_benchmark --species 2000 --map-size 128x40 --rounds 3 --json
+    python -m app.simulation.db_benchmark --writeback 100,500,2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+# 确保项目路径在 sys.path 中
+project_root = Path(__file__).parent.parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+
+# ============================================================================
+# 数据结构
+# ============================================================================
+
+@dataclass
+class WorkloadResult:
+    """一种配置下的基准结果"""
+    config: str
+    rows: Dict[str, int] = field(default_factory=dict)
+    seconds: Dict[str, float] = field(default_factory=dict)
+    read_latency_ms: Dict[str, float] = field(default_factory=dict)
+
+    def rows_per_second(self, workload: str) -> float:
+        return self.rows[workload] / max(self.seconds[workload], 1e-9)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["rows_per_second"] = {k: round(self.rows_per_second(k), 1) for k in self.rows}
+        return data
+
+
+# ============================================================================
+# 合成数据
+# ============================================================================
+
+def _make_tiles(width: int, height: int, rng: random.Random):
+    from ..models.environment import MapTile
+
+    return [
+        MapTile(
+            x=x, y=y, q=x, r=y - x // 2,
+            biome="草原", cover="草地",
+            elevation=rng.uniform(-4000, 3000),
+            temperature=rng.uniform(-20, 35),
+            humidity=rng.random(),
+            resources=rng.uniform(0, 500),
+        )
+        for y in range(height) for x in range(width)
+    ]
+
+
+def _make_species(count: int, rng: random.Random):
+    from ..models.species import Species
+
+    return [
+        Species(
+            lineage_code=f"D{i + 1}",
+            latin_name=f"Benchmarkus db {i + 1}",
+            common_name=f"基准物种{i + 1}",
+            description="数据库基准合成物种",
+            morphology_stats={"population": float(rng.randint(10_000, 5_000_000))},
+            abstract_traits={"耐寒性": rng.uniform(1, 10), "耐热性": rng.uniform(1, 10)},
+            hidden_traits={"gene_diversity": rng.random()},
+            ecological_vector=[rng.uniform(-1, 1) for _ in range(8)],
+        )
+        for i in range(count)
+    ]
+
+
+# ============================================================================
+# 写入方式
+# ============================================================================
+
+def _write_baseline(session, objects, update: bool) -> None:
+    for obj in objects:
+        if update:
+            session.merge(obj)
+        else:
+            session.add(obj)
+
+
+def _write_bulk(session, objects, update: bool) -> None:
+    from ..core.database import bulk_save
+
+    bulk_save(session, objects)
+
+
+# ============================================================================
+# 基准
+# ============================================================================
+
+def _reader_loop(engine, stop: threading.Event, latencies: List[float]) -> None:
+    from sqlalchemy import text
+
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT count(*) FROM map_tiles")).scalar()
+        except Exception:
+            pass  # 库被锁（baseline 下可能超时），仍记录等待时间
+        latencies.append((time.perf_counter() - start) * 1000)
+        time.sleep(0.002)
+
+
+def run_config(
+    name: str,
+    db_file: Path,
+    width: int,
+    height: int,
+    species_count: int,
+    tiles_per_species: int,
+    rounds: int,
+    seed: int,
+) -> WorkloadResult:
+    """在 db_file 上以指定配置运行全部负载"""
+    from sqlmodel import Session, SQLModel, create_engine
+
+    from ..core.config import get_settings
+    from ..core.database import configure_sqlite_engine, sqlite_pragmas
+    from ..models import environment, genus, history, species  # noqa: F401
+    from ..models.environment import HabitatPopulation
+
+    tuned = name == "tuned"
+    url = f"sqlite:///{db_file.as_posix()}"
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    reader = create_engine(url, connect_args={"check_same_thread": False})
+    if tuned:
+        settings = get_settings()
+        configure_sqlite_engine(engine, sqlite_pragmas(settings))
+        configure_sqlite_engine(reader, sqlite_pragmas(settings, read_only=True))
+    SQLModel.metadata.create_all(engine)
+    write: Callable = _write_bulk if tuned else _write_baseline
+
+    rng = random.Random(seed)
+    tiles = _make_tiles(width, height, rng)
+    species_rows = _make_species(species_count, rng)
+    with Session(engine, expire_on_commit=False) as session:
+        session.add_all(tiles + species_rows)
+        session.commit()
+    tile_ids = [t.id for t in tiles]
+
+    result = WorkloadResult(config=name)
+    latencies: List[float] = []
+    stop = threading.Event()
+    reader_thread = threading.Thread(target=_reader_loop, args=(reader, stop, latencies), daemon=True)
+    reader_thread.start()
+
+    def timed(workload: str, objects: list, update: bool) -> None:
+        start = time.perf_counter()
+        with Session(engine, expire_on_commit=False) as session:
+            write(session, objects, update)
+            session.commit()
+        result.seconds[workload] = result.seconds.get(workload, 0.0) + time.perf_counter() - start
+        result.rows[workload] = result.rows.get(workload, 0) + len(objects)
+
+    try:
+        for turn in range(1, rounds + 1):
+            for tile in tiles:
+                tile.temperature += rng.uniform(-0.5, 0.5)
+            timed("tiles_update", tiles, update=True)
+
+            habitats = [
+                HabitatPopulation(
+                    tile_id=tile_id, species_id=sp.id, population=rng.randint(1, 100_000),
+                    suitability=rng.random(), turn_index=turn,
+                )
+                for sp in species_rows
+                for tile_id in rng.sample(tile_ids, min(tiles_per_species, len(tile_ids)))
+            ]
+            timed("habitats_insert", habitats, update=False)
+
+            for sp in species_rows:
+                sp.morphology_stats = {**sp.morphology_stats, "population": float(rng.randint(10_000, 5_000_000))}
+            timed("species_update", species_rows, update=True)
+    finally:
+        stop.set()
+        reader_thread.join()
+        engine.dispose()
+        reader.dispose()
+
+    if latencies:
+        ordered = sorted(latencies)
+        result.read_latency_ms = {
+            "p50": round(statistics.median(ordered), 3),
+            "p99": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))], 3),
+            "max": round(ordered[-1], 3),
+            "samples": len(ordered),
+        }
+    return result
+
+
+def run_species_writeback(
+    db_file: Path,
+    species_count: int,
+    rounds: int = 3,
+    changed_fraction: float = 0.6,
+    seed: int = 42,
+) -> Dict[str, Any]:
+    """回合末物种写回：逐物种 upsert vs 写回单元（每轮所有物种都 upsert 一次，部分物种有变化）"""
+    from sqlmodel import Session, SQLModel, create_engine
+
+    from ..core.config import get_settings
+    from ..core.database import configure_sqlite_engine, sqlite_pragmas
+    from ..models import environment, genus, history, species  # noqa: F401
+    from ..repositories.species_repository import SpeciesUnitOfWork
+
+    engine = create_engine(f"sqlite:///{db_file.as_posix()}", connect_args={"check_same_thread": False})
+    configure_sqlite_engine(engine, sqlite_pragmas(get_settings()))
+    SQLModel.metadata.create_all(engine)
+
+    @contextmanager
+    def session_factory():
+        session = Session(engine, expire_on_commit=False)
+        try:
+            yield session
+            session.commit()
+        finally:
+            session.close()
+
+    rng = random.Random(seed)
+    species_rows = _make_species(species_count, rng)
+    with session_factory() as session:
+        session.add_all(species_rows)
+
+    def mutate() -> None:
+        for sp in rng.sample(species_rows, int(len(species_rows) * changed_fraction)):
+            sp.morphology_stats = {**sp.morphology_stats, "population": float(rng.randint(10_000, 5_000_000))}
+            sp.status = "alive" if rng.random() > 0.05 else "extinct"
+
+    def legacy() -> None:
+        for sp in species_rows:
+            with session_factory() as session:
+                merged = session.merge(sp)
+                session.flush()
+                session.refresh(merged)
+
+    def unit_of_work() -> None:
+        uow = SpeciesUnitOfWork(session_factory)
+        for sp in species_rows:
+            uow.register(sp)
+        uow.flush()
+
+    timings: Dict[str, List[float]] = {"legacy": [], "unit_of_work": []}
+    try:
+        for _ in range(rounds):
+            for name, write in (("legacy", legacy), ("unit_of_work", unit_of_work)):
+                mutate()
+                start = time.perf_counter()
+                write()
+                timings[name].append((time.perf_counter() - start) * 1000)
+    finally:
+        engine.dispose()
+
+    legacy_ms = statistics.median(timings["legacy"])
+    uow_ms = statistics.median(timings["unit_of_work"])
+    return {
+        "species": species_count,
+        "legacy_ms": round(legacy_ms, 2),
+        "unit_of_work_ms": round(uow_ms, 2),
+        "speedup": round(legacy_ms / max(uow_ms, 1e-9), 1),
+    }
+
+
+def format_writeback(rows: List[Dict[str, Any]]) -> str:
+    lines = [f"{'物种数':>8}{'逐物种 upsert':>16}{'写回单元':>12}{'加速':>8}", "-" * 46]
+    for row in rows:
+        lines.append(f"{row['species']:>8}{row['legacy_ms']:>14.1f}ms{row['unit_of_work_ms']:>10.1f}ms"
+                     f"{row['speedup']:>7.1f}x")
+    return "\n".join(lines)
+
+
+def format_results(results: List[WorkloadResult]) -> str:
+    base, *others = results
+    lines = [f"{'负载':<18}" + "".join(f"{r.config:>16}" for r in results) + f"{'加速':>10}"]
+    lines.append("-" * len(lines[0]))
+    for workload in base.rows:
+        rates = [r.rows_per_second(workload) for r in results]
+        speedup = rates[-1] / max(rates[0], 1e-9)
+        lines.append(f"{workload:<18}" + "".join(f"{rate:>12.0f} 行/秒" for rate in rates) + f"{speedup:>9.1f}x")
+    for r in results:
+        lat = r.read_latency_ms
+        if lat:
+            lines.append(f"[{r.config}] 写入期间读取延迟 p50={lat['p50']:.2f}ms p99={lat['p99']:.2f}ms "
+                         f"max={lat['max']:.2f}ms ({lat['samples']} 次)")
+    return "\n".join(lines)
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="db-benchmark",
+        description="SQLite 写入吞吐基准（默认配置 + 逐对象写入 vs 调优 PRAGMA + 批量写入）",
+    )
+    parser.add_argument("--species", type=int, default=500, help="物种数")
+    parser.add_argument("--map-size", type=str, default="128x40", help="地图尺寸 WxH")
+    parser.add_argument("--tiles-per-species", type=int, default=20, help="每个物种每回合的栖息地数")
+    parser.add_argument("-r", "--rounds", type=int, default=3, help="回合数")
+    parser.add_argument("-s", "--seed", type=int, default=42, help="随机种子")
+    parser.add_argument("--writeback", type=str, default=None,
+                        help="只运行物种写回对比，物种规模列表如 100,500,2000")
+    parser.add_argument("--json", action="store_true", help="输出 JSON")
+    return parser
+
+
+def main() -> int:
+    args = create_parser().parse_args()
+    width, height = (int(v) for v in args.map_size.lower().split("x"))
+
+    if args.writeback:
+        with tempfile.TemporaryDirectory(prefix="clade-db-bench-") as tmp:
+            rows = [
+                run_species_writeback(Path(tmp) / f"writeback_{n}.db", n, args.rounds, seed=args.seed)
+                for n in (int(v) for v in args.writeback.split(",") if v.strip())
+            ]
+        print(json.dumps(rows, ensure_ascii=False, indent=2) if args.json else format_writeback(rows))
+        return 0
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="clade-db-bench-") as tmp:
+        for name in ("baseline", "tuned"):
+            results.append(run_config(
+                name, Path(tmp) / f"{name}.db", width, height,
+                args.species, args.tiles_per_species, args.rounds, args.seed,
+            ))
+
+    if args.json:
+        print(json.dumps([r.to_dict() for r in results], ensure_ascii=False, indent=2))
+    else:
+        print(format_results(results))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
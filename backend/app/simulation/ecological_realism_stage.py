@@ -8,6 +8,7 @@
 3. 应用环境波动修正承载力
 4. 更新互利共生网络
 5. 追踪环境变化用于适应滞后计算
+6. 以矩阵形式计算物种间交互：垂直生态位竞争 (S×S)、捕食边上的空间捕食效率
 
 【执行时机】
 在死亡率计算阶段（MortalityStage）之前执行，
@@ -19,6 +20,9 @@ import logging
 from dataclasses import dataclass, field
 from typing import TYPE_CHECKING
 
+import numpy as np
+from scipy import sparse
+
 from .stages import BaseStage, StageDependency, StageOrder
 
 if TYPE_CHECKING:
@@ -46,11 +50,15 @@ class EcologicalRealismResults:
     # 环境波动修正
     env_modifiers: dict[str, float] = field(default_factory=dict)
     
-    # 垂直生态位竞争修正
-    vertical_competition_modifiers: dict[tuple[str, str], float] = field(default_factory=dict)
+    # 物种下标（交互矩阵的行列顺序）
+    species_index: list[str] = field(default_factory=list)
+    
+    # 垂直生态位竞争修正 (S, S)
+    vertical_competition: np.ndarray | None = None
     
-    # 空间捕食效率
-    spatial_predation_efficiency: dict[tuple[str, str], float] = field(default_factory=dict)
+    # 空间捕食效率：捕食边 (E, 2) [捕食者, 猎物] 与对应效率 (E,)
+    predation_edges: np.ndarray | None = None
+    predation_efficiency: np.ndarray | None = None
     
     # 同化效率
     assimilation_efficiencies: dict[str, float] = field(default_factory=dict)
@@ -155,43 +163,33 @@ class EcologicalRealismStage(BaseStage):
                 species, alive_species
             )
         
-        # 4. 计算物种对之间的交互修正
-        species_tiles = self._get_species_tiles(ctx)
+        # 4. 物种对之间的交互修正（矩阵形式）
+        index = [sp.lineage_code for sp in alive_species]
+        position = {code: i for i, code in enumerate(index)}
+        results.species_index = index
         
-        for i, sp_a in enumerate(alive_species):
-            for sp_b in alive_species[i+1:]:
-                # 垂直生态位竞争
-                overlap = eco_service.calculate_vertical_niche_overlap(sp_a, sp_b)
-                results.vertical_competition_modifiers[(sp_a.lineage_code, sp_b.lineage_code)] = overlap
-                
-                # 空间捕食效率（如果存在捕食关系）
-                if sp_b.lineage_code in (sp_a.prey_species or []):
-                    tiles_a = species_tiles.get(sp_a.lineage_code, set())
-                    tiles_b = species_tiles.get(sp_b.lineage_code, set())
-                    efficiency = eco_service.calculate_spatial_predation_efficiency(
-                        sp_a, sp_b, tiles_a, tiles_b
-                    )
-                    results.spatial_predation_efficiency[(sp_a.lineage_code, sp_b.lineage_code)] = efficiency
-                
-                if sp_a.lineage_code in (sp_b.prey_species or []):
-                    tiles_a = species_tiles.get(sp_a.lineage_code, set())
-                    tiles_b = species_tiles.get(sp_b.lineage_code, set())
-                    efficiency = eco_service.calculate_spatial_predation_efficiency(
-                        sp_b, sp_a, tiles_b, tiles_a
-                    )
-                    results.spatial_predation_efficiency[(sp_b.lineage_code, sp_a.lineage_code)] = efficiency
+        # 垂直生态位：由各物种主要活动层查表得到 (S, S)
+        results.vertical_competition = eco_service.vertical_competition_matrix(alive_species)
+        
+        # 空间捕食：捕食边列表 + 物种×地块关联矩阵
+        edges = self._predation_edges(alive_species, position)
+        incidence = self._species_tile_incidence(ctx, alive_species)
+        results.predation_edges = edges
+        results.predation_efficiency = eco_service.calculate_spatial_predation_matrix(
+            alive_species, edges[:, 0], edges[:, 1], incidence
+        )
         
         # 5. 将结果存入 Context 的 plugin_data
         ctx.plugin_data["ecological_realism"] = {
             "allee_results": {k: v.__dict__ for k, v in results.allee_results.items()},
             "disease_results": {k: v.__dict__ for k, v in results.disease_results.items()},
             "env_modifiers": results.env_modifiers,
-            "vertical_competition_modifiers": {
-                f"{k[0]}_{k[1]}": v for k, v in results.vertical_competition_modifiers.items()
-            },
-            "spatial_predation_efficiency": {
-                f"{k[0]}_{k[1]}": v for k, v in results.spatial_predation_efficiency.items()
-            },
+            "species_index": results.species_index,
+            "species_position": position,
+            "vertical_competition": results.vertical_competition,
+            "predation_edges": results.predation_edges,
+            "predation_keys": _edge_keys(results.predation_edges, len(index)),
+            "predation_efficiency": results.predation_efficiency,
             "assimilation_efficiencies": results.assimilation_efficiencies,
             "adaptation_penalties": results.adaptation_penalties,
             "mutualism_links": [
@@ -334,33 +332,51 @@ class EcologicalRealismStage(BaseStage):
         latitude = abs(avg_y - half_height) / half_height
         return min(1.0, max(0.0, latitude))
     
-    def _get_species_tiles(
+    def _predation_edges(
+        self,
+        alive_species,
+        position: dict[str, int],
+    ) -> np.ndarray:
+        """捕食边 (E, 2) int32 [捕食者下标, 猎物下标]，按 (捕食者, 猎物) 排序"""
+        edges = sorted({
+            (i, position[prey_code])
+            for i, species in enumerate(alive_species)
+            for prey_code in (species.prey_species or [])
+            if prey_code in position and position[prey_code] != i
+        })
+        return np.array(edges, dtype=np.int32).reshape(-1, 2)
+    
+    def _species_tile_incidence(
         self,
         ctx: 'SimulationContext',
-    ) -> dict[str, set[int]]:
-        """获取物种到地块的映射"""
-        species_tiles: dict[str, set[int]] = {}
-        
-        if not ctx.all_habitats:
-            return species_tiles
-        
-        species_id_to_code = {
-            sp.id: sp.lineage_code
-            for sp in ctx.all_species
-            if sp.id
-        }
-        
-        for habitat in ctx.all_habitats:
-            code = species_id_to_code.get(habitat.species_id)
-            if code:
-                if code not in species_tiles:
-                    species_tiles[code] = set()
-                species_tiles[code].add(habitat.tile_id)
-        
-        return species_tiles
+        alive_species,
+    ) -> sparse.csr_matrix:
+        """物种×地块 0/1 关联矩阵 (S, T)，列为出现过的地块"""
+        row_of_id = {sp.id: i for i, sp in enumerate(alive_species) if sp.id}
+        rows, tiles = [], []
+        for habitat in ctx.all_habitats or []:
+            row = row_of_id.get(habitat.species_id)
+            if row is not None:
+                rows.append(row)
+                tiles.append(habitat.tile_id)
+        tile_ids, cols = np.unique(np.asarray(tiles, dtype=np.int64), return_inverse=True)
+        incidence = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (np.asarray(rows, dtype=np.int64), cols)),
+            shape=(len(alive_species), len(tile_ids)),
+        )
+        # 同一物种在同一地块的多条栖息记录只计一次
+        incidence.data[:] = 1.0
+        return incidence
     
 
 
+def _edge_keys(edges: np.ndarray | None, species_count: int) -> np.ndarray:
+    """捕食边的有序查找键 predator * S + prey（边已按此顺序排列）"""
+    if edges is None or len(edges) == 0:
+        return np.zeros(0, dtype=np.int64)
+    return edges[:, 0].astype(np.int64) * species_count + edges[:, 1]
+
+
 def apply_ecological_realism_to_mortality(
     ctx: 'SimulationContext',
     base_mortality: float,
@@ -465,17 +481,12 @@ def get_vertical_niche_competition(
     if not eco_data:
         return 1.0  # 默认完全竞争
     
-    vertical_mods = eco_data.get("vertical_competition_modifiers", {})
-    
-    key = f"{species_a_code}_{species_b_code}"
-    if key in vertical_mods:
-        return vertical_mods[key]
-    
-    key_rev = f"{species_b_code}_{species_a_code}"
-    if key_rev in vertical_mods:
-        return vertical_mods[key_rev]
-    
-    return 1.0
+    matrix = eco_data.get("vertical_competition")
+    position = eco_data.get("species_position", {})
+    i, j = position.get(species_a_code), position.get(species_b_code)
+    if matrix is None or i is None or j is None or i == j:
+        return 1.0
+    return float(matrix[i, j])
 
 
 def get_spatial_predation_efficiency(
@@ -497,9 +508,16 @@ def get_spatial_predation_efficiency(
     if not eco_data:
         return 1.0  # 默认完全效率
     
-    spatial_mods = eco_data.get("spatial_predation_efficiency", {})
-    key = f"{predator_code}_{prey_code}"
-    return spatial_mods.get(key, 1.0)
+    keys = eco_data.get("predation_keys")
+    position = eco_data.get("species_position", {})
+    i, j = position.get(predator_code), position.get(prey_code)
+    if keys is None or i is None or j is None or len(keys) == 0:
+        return 1.0
+    key = i * len(eco_data["species_index"]) + j
+    slot = int(np.searchsorted(keys, key))
+    if slot < len(keys) and keys[slot] == key:
+        return float(eco_data["predation_efficiency"][slot])
+    return 1.0
 
 
 def get_assimilation_efficiency(
@@ -22,8 +22,6 @@ import logging
 import sys
 from typing import TYPE_CHECKING
 
-import taichi as ti
-
 if sys.stdout and hasattr(sys.stdout, "reconfigure"):
     try:
         sys.stdout.reconfigure(encoding="utf-8", errors="ignore")
@@ -49,6 +47,9 @@ if TYPE_CHECKING:
 from ..services.analytics.critical_analyzer import CriticalAnalyzer
 from ..services.analytics.exporter import ExportService
 from ..services.system.embedding import EmbeddingService
+from ..services.system.metrics_exporter import record_turn
+from ..core.response_cache import bump_world_version
+from ..core.startup import get_startup_timeline
 from ..services.analytics.focus_processor import FocusBatchProcessor
 from ..services.geo.map_evolution import MapEvolutionService
 from ..services.geo.map_manager import MapStateManager
@@ -67,6 +68,7 @@ from ..services.analytics.embedding_integration import EmbeddingIntegrationServi
 from ..services.tectonic import TectonicIntegration, create_tectonic_integration
 from ..services.species.gene_diversity import GeneDiversityService
 from ..tensor.config import TensorConfig
+from ..tensor.state import TensorStateManager
 from pathlib import Path
 
 
@@ -119,12 +121,8 @@ class SimulationEngine:
         # Config injection (must be provided by caller, no internal container access)
         configs: dict | None = None,
     ) -> None:
-        # 强制 GPU Taichi 初始化（使用统一初始化函数）
-        from ..tensor.taichi_hybrid_kernels import _ensure_taichi_init
-        try:
-            _ensure_taichi_init()
-        except Exception as e:
-            raise RuntimeError("Taichi GPU 初始化失败，要求GPU/驱动/taichi-gpu安装") from e
+        # Taichi 不在此初始化：首个张量阶段通过 tensor.taichi_runtime.load_kernels()
+        # 延迟初始化，应用启动时由 lifespan 在主线程空闲时预热内核
         
         # === 注入的服务 ===
         self.environment = environment
@@ -181,6 +179,14 @@ class SimulationEngine:
         self.turn_counter = 0
         self.watchlist: set[str] = set()
         self._event_callback = None
+        # 跨回合持久化的张量状态（TensorStateInitStage 增量更新）
+        self.tensor_state_manager = TensorStateManager()
+        # 阶段剖析选项（None 表示跟随模式参数 enable_profiling）
+        self._profiling_options: dict = {
+            "memory": None,
+            "top_allocators": 5,
+            "profile_turn": None,
+        }
         
         # === 功能开关 ===
         self._use_tile_based_mortality = True
@@ -240,6 +246,7 @@ class SimulationEngine:
                 stage_timeout=stage_timeout,
                 debug_mode=(mode == "debug"),
             )
+            self._apply_profiling_options(config, mode)
             
             self._pipeline = Pipeline(stages, config)
             self._pipeline_mode = mode
@@ -252,6 +259,65 @@ class SimulationEngine:
             self._pipeline_mode = None
             raise RuntimeError(f"Pipeline 初始化失败: {e}") from e
     
+    def _apply_profiling_options(self, config, mode: str | None) -> None:
+        """将剖析选项写入 PipelineConfig"""
+        from .stage_config import ModeParameters
+        
+        memory = self._profiling_options["memory"]
+        if memory is None:
+            memory = ModeParameters.for_mode(mode or "standard").enable_profiling
+        config.profile_memory = bool(memory)
+        config.memory_top_allocators = int(self._profiling_options["top_allocators"])
+        config.profile_turn = self._profiling_options["profile_turn"]
+        
+        output_dir = self.configs.get("profile_output_dir")
+        if not output_dir:
+            from ..core.config import get_settings
+            output_dir = str(Path(get_settings().data_dir) / "profiles")
+        config.profile_output_dir = output_dir
+    
+    def configure_profiling(
+        self,
+        memory: bool | None = None,
+        top_allocators: int | None = None,
+        profile_turn: int | None = None,
+        clear_profile_turn: bool = False,
+    ) -> dict:
+        """运行时调整阶段剖析选项（立即作用于当前流水线）
+        
+        Args:
+            memory: 是否开启逐阶段内存剖析（None 保持不变）
+            top_allocators: 每阶段记录的分配热点数
+            profile_turn: 对指定回合做采样剖析
+            clear_profile_turn: 取消已设置的采样回合
+        
+        Returns:
+            当前生效的剖析选项
+        """
+        if memory is not None:
+            self._profiling_options["memory"] = memory
+        if top_allocators is not None:
+            self._profiling_options["top_allocators"] = max(0, top_allocators)
+        if profile_turn is not None:
+            self._profiling_options["profile_turn"] = profile_turn
+        elif clear_profile_turn:
+            self._profiling_options["profile_turn"] = None
+        
+        pipeline = getattr(self, "_pipeline", None)
+        if pipeline is not None:
+            self._apply_profiling_options(pipeline.config, getattr(self, "_pipeline_mode", None))
+        
+        return self.get_profiling_options()
+    
+    def get_profiling_options(self) -> dict:
+        """获取当前剖析选项"""
+        options = dict(self._profiling_options)
+        pipeline = getattr(self, "_pipeline", None)
+        if pipeline is not None:
+            options["memory_effective"] = pipeline.config.profile_memory
+            options["profile_output_dir"] = pipeline.config.profile_output_dir
+        return options
+    
     def set_mode(self, mode: str) -> None:
         """切换运行模式"""
         from .stage_config import AVAILABLE_MODES
@@ -295,11 +361,17 @@ class SimulationEngine:
         logger.info(f"[Pipeline] 执行回合 {self.turn_counter}")
         self._emit_event("turn_start", f"📅 开始回合 {self.turn_counter}", "系统")
         
-        # 执行流水线
-        result: PipelineResult = await self._pipeline.execute(ctx, self)
+        # 执行流水线（回合内对已有物种的 upsert 在回合结束时一次性写回）
+        # Taichi：回合期间暂停后台预热、推迟会重置运行时的离线缓存落盘
+        from ..repositories.species_repository import species_repository
+        from ..tensor.taichi_runtime import get_taichi_runtime
+        with species_repository.unit_of_work(), get_taichi_runtime().turn_scope():
+            result: PipelineResult = await self._pipeline.execute(ctx, self)
         
         # 保存性能指标
         self._last_pipeline_metrics = result.metrics
+        record_turn(result.metrics, ctx)
+        get_startup_timeline().mark("first_turn")
         
         # 处理结果
         if not result.success:
@@ -309,6 +381,8 @@ class SimulationEngine:
         
         # 增加回合计数器（无论成功失败都要推进）
         self.turn_counter += 1
+        # 世界状态已更新：只读接口的响应缓存失效并后台预热
+        bump_world_version(f"turn {self.turn_counter}")
         
         return ctx.report
     
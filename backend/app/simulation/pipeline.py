@@ -142,9 +142,11 @@ class StageMetrics:
     custom_metrics: dict[str, Any] = field(default_factory=dict)
     # Context 变化摘要
     context_changes: dict[str, str] = field(default_factory=dict)
+    # 内存剖析（仅在 PipelineConfig.profile_memory 开启时填充）
+    memory: dict[str, Any] = field(default_factory=dict)
     
     def to_dict(self) -> dict:
-        return {
+        data = {
             "stage": self.stage_name,
             "duration_ms": round(self.duration_ms, 2),
             "success": self.success,
@@ -156,6 +158,9 @@ class StageMetrics:
             "ai_adjustments": self.ai_adjustments,
             "custom": self.custom_metrics,
         }
+        if self.memory:
+            data["memory"] = self.memory
+        return data
 
 
 @dataclass
@@ -164,6 +169,9 @@ class PipelineMetrics:
     total_duration_ms: float = 0.0
     stage_metrics: list[StageMetrics] = field(default_factory=list)
     failed_stages: list[str] = field(default_factory=list)
+    turn_index: int | None = None
+    # 采样剖析输出（折叠栈文件路径），仅在 profile_turn 命中时设置
+    profile_path: str | None = None
     
     def get_performance_table(self) -> str:
         """生成性能表格（按耗时排序）"""
@@ -207,14 +215,52 @@ class PipelineMetrics:
         )
         return [(m.stage_name, m.duration_ms) for m in sorted_metrics[:n]]
     
+    def get_memory_table(self) -> str:
+        """生成内存表格（按 RSS 增量排序），未开启内存剖析时返回提示"""
+        profiled = [m for m in self.stage_metrics if m.memory]
+        if not profiled:
+            return "Memory profiling disabled"
+        
+        sorted_metrics = sorted(
+            profiled,
+            key=lambda m: m.memory.get("rss_delta_mb", 0.0),
+            reverse=True
+        )
+        
+        lines = [
+            "│ {:^38} │ {:^10} │ {:^12} │ {:^12} │ {:^6} │".format(
+                "Stage", "RSS Δ MB", "Traced KB", "NumPy KB", "GC ms"
+            ),
+        ]
+        for m in sorted_metrics:
+            mem = m.memory
+            lines.append(
+                "│ {:38} │ {:>10.2f} │ {:>12.1f} │ {:>12.1f} │ {:>6.1f} │".format(
+                    m.stage_name[:38],
+                    mem.get("rss_delta_mb", 0.0),
+                    mem.get("traced_peak_kb", 0.0),
+                    mem.get("context_numpy_total_kb", 0.0),
+                    mem.get("gc_pause_ms", 0.0),
+                )
+            )
+        return "\n".join(lines)
+    
     def to_dict(self) -> dict:
-        return {
+        data = {
             "total_duration_ms": round(self.total_duration_ms, 2),
             "stage_count": len(self.stage_metrics),
             "failed_count": len(self.failed_stages),
             "stages": [m.to_dict() for m in self.stage_metrics],
             "failed_stages": self.failed_stages,
         }
+        if self.turn_index is not None:
+            data["turn_index"] = self.turn_index
+        if any(m.memory for m in self.stage_metrics):
+            data["memory_profiled"] = True
+            data["peak_rss_mb"] = max(m.memory.get("peak_rss_mb", 0.0) for m in self.stage_metrics if m.memory)
+        if self.profile_path:
+            data["profile_path"] = self.profile_path
+        return data
 
 
 @dataclass
@@ -237,6 +283,16 @@ class PipelineConfig:
     stop_stage: str | None = None
     # 只执行单个阶段
     only_stage: str | None = None
+    # 逐阶段内存剖析（RSS/tracemalloc/NumPy/GC，开销较大，默认关闭）
+    profile_memory: bool = False
+    # 每阶段记录的新增分配热点行数（0 表示不做 tracemalloc 快照对比）
+    memory_top_allocators: int = 5
+    # 对指定回合做采样剖析并输出折叠栈（None 表示不采样）
+    profile_turn: int | None = None
+    # 折叠栈输出目录
+    profile_output_dir: str | None = None
+    # 采样间隔（毫秒）
+    profile_interval_ms: float = 5.0
 
 
 @dataclass
@@ -412,94 +468,129 @@ class Pipeline:
         # 使用过滤后的阶段列表
         stages_to_execute = self._effective_stages
         
+        # 可选：逐阶段内存剖析 / 指定回合采样剖析
+        memory_profiler = None
+        if self.config.profile_memory:
+            from .profiling import StageMemoryProfiler
+            memory_profiler = StageMemoryProfiler(top_allocators=self.config.memory_top_allocators)
+            memory_profiler.start()
+        
+        sampler = None
+        if self.config.profile_turn is not None and ctx.turn_index == self.config.profile_turn:
+            from .profiling import SamplingProfiler
+            sampler = SamplingProfiler(interval_ms=self.config.profile_interval_ms)
+            sampler.start()
+        
         if self.config.debug_mode:
             logger.info(f"[Pipeline] 将执行 {len(stages_to_execute)} 个阶段")
             for s in stages_to_execute:
                 logger.info(f"  [{s.order:3d}] {s.name}")
         
-        for stage in stages_to_execute:
-            logger.info(f"[Pipeline] -> 开始阶段: {stage.name} (order={stage.order})")
-            # 执行前回调
-            for callback in self._before_stage_callbacks:
-                try:
-                    callback(stage, ctx)
-                except Exception as e:
-                    logger.warning(f"[Pipeline] 前置回调失败: {e}")
-            
-            # 发送阶段开始事件
-            if self.config.emit_stage_events:
-                ctx.emit_event("pipeline_stage_start", f"开始: {stage.name}", "流水线")
-            
-            # 捕获阶段前的状态（用于计算变化量）
-            pre_migration = ctx.migration_count
-            pre_extinctions = len([r for r in ctx.combined_results if r.species.status == "extinct"]) if ctx.combined_results else 0
-            
-            # 在 debug 模式下捕获完整的 context 状态
-            pre_context_state = capture_context_state(ctx) if self.config.debug_mode else {}
-            
-            # 执行阶段
-            stage_start = time.perf_counter()
-            result = await self._execute_stage(stage, ctx, engine)
-            stage_duration = (time.perf_counter() - stage_start) * 1000
-            
-            result.duration_ms = stage_duration
-            stage_results.append(result)
-            
-            # 计算 context 变化
-            context_changes = {}
-            if self.config.debug_mode:
-                post_context_state = capture_context_state(ctx)
-                context_changes = compute_context_diff(pre_context_state, post_context_state)
-                if context_changes:
-                    logger.debug(f"[Pipeline] [{stage.name}] Context 变化:")
-                    logger.debug(format_context_diff(context_changes))
-            
-            # 构建阶段监控指标
-            metrics = StageMetrics(
-                stage_name=stage.name,
-                duration_ms=stage_duration,
-                success=result.success,
-                error_message=str(result.error) if result.error else "",
-                species_count=len(ctx.species_batch) if ctx.species_batch else 0,
-                migration_count=ctx.migration_count - pre_migration,
-                extinction_count=len([r for r in ctx.combined_results if r.species.status == "extinct"]) - pre_extinctions if ctx.combined_results else 0,
-                speciation_count=len(ctx.branching_events) if ctx.branching_events else 0,
-                ai_adjustments=len(ctx.ai_status_evals) if ctx.ai_status_evals else 0,
-                context_changes=context_changes,
-            )
-            stage_metrics.append(metrics)
-            
-            if not result.success:
-                failed_stages.append(stage.name)
-                overall_success = False
+        try:
+            for stage in stages_to_execute:
+                logger.info(f"[Pipeline] -> 开始阶段: {stage.name} (order={stage.order})")
+                # 执行前回调
+                for callback in self._before_stage_callbacks:
+                    try:
+                        callback(stage, ctx)
+                    except Exception as e:
+                        logger.warning(f"[Pipeline] 前置回调失败: {e}")
                 
-                if not self.config.continue_on_error:
-                    logger.error(f"[Pipeline] 阶段 '{stage.name}' 失败，终止流水线")
-                    break
-            
-            # 记录时间
-            if self.config.log_timing:
-                status_icon = "✅" if result.success else "❌"
-                logger.info(f"[Pipeline] <- {status_icon} {stage.name}: {stage_duration:.1f}ms")
-            
-            # 发送阶段结束事件
-            if self.config.emit_stage_events:
-                status = "✅" if result.success else "❌"
-                ctx.emit_event(
-                    "pipeline_stage_end",
-                    f"{status} {stage.name}: {stage_duration:.1f}ms",
-                    "流水线"
+                # 发送阶段开始事件
+                if self.config.emit_stage_events:
+                    ctx.emit_event("pipeline_stage_start", f"开始: {stage.name}", "流水线")
+                
+                # 捕获阶段前的状态（用于计算变化量）
+                pre_migration = ctx.migration_count
+                pre_extinctions = len([r for r in ctx.combined_results if r.species.status == "extinct"]) if ctx.combined_results else 0
+                
+                # 在 debug 模式下捕获完整的 context 状态
+                pre_context_state = capture_context_state(ctx) if self.config.debug_mode else {}
+                
+                if memory_profiler:
+                    memory_profiler.before_stage()
+                if sampler:
+                    sampler.set_label(stage.name)
+                
+                # 执行阶段
+                stage_start = time.perf_counter()
+                result = await self._execute_stage(stage, ctx, engine)
+                stage_duration = (time.perf_counter() - stage_start) * 1000
+                
+                stage_memory = memory_profiler.after_stage(ctx) if memory_profiler else {}
+                
+                result.duration_ms = stage_duration
+                stage_results.append(result)
+                
+                # 计算 context 变化
+                context_changes = {}
+                if self.config.debug_mode:
+                    post_context_state = capture_context_state(ctx)
+                    context_changes = compute_context_diff(pre_context_state, post_context_state)
+                    if context_changes:
+                        logger.debug(f"[Pipeline] [{stage.name}] Context 变化:")
+                        logger.debug(format_context_diff(context_changes))
+                
+                # 构建阶段监控指标
+                metrics = StageMetrics(
+                    stage_name=stage.name,
+                    duration_ms=stage_duration,
+                    success=result.success,
+                    error_message=str(result.error) if result.error else "",
+                    species_count=len(ctx.species_batch) if ctx.species_batch else 0,
+                    migration_count=ctx.migration_count - pre_migration,
+                    extinction_count=len([r for r in ctx.combined_results if r.species.status == "extinct"]) - pre_extinctions if ctx.combined_results else 0,
+                    speciation_count=len(ctx.branching_events) if ctx.branching_events else 0,
+                    ai_adjustments=len(ctx.ai_status_evals) if ctx.ai_status_evals else 0,
+                    context_changes=context_changes,
+                    memory=stage_memory,
                 )
-            
-            # 执行后回调
-            for callback in self._after_stage_callbacks:
-                try:
-                    callback(stage, ctx, result)
-                except Exception as e:
-                    logger.warning(f"[Pipeline] 后置回调失败: {e}")
+                stage_metrics.append(metrics)
+                
+                if not result.success:
+                    failed_stages.append(stage.name)
+                    overall_success = False
+                    
+                    if not self.config.continue_on_error:
+                        logger.error(f"[Pipeline] 阶段 '{stage.name}' 失败，终止流水线")
+                        break
+                
+                # 记录时间
+                if self.config.log_timing:
+                    status_icon = "✅" if result.success else "❌"
+                    logger.info(f"[Pipeline] <- {status_icon} {stage.name}: {stage_duration:.1f}ms")
+                
+                # 发送阶段结束事件
+                if self.config.emit_stage_events:
+                    status = "✅" if result.success else "❌"
+                    ctx.emit_event(
+                        "pipeline_stage_end",
+                        f"{status} {stage.name}: {stage_duration:.1f}ms",
+                        "流水线"
+                    )
+                
+                # 执行后回调
+                for callback in self._after_stage_callbacks:
+                    try:
+                        callback(stage, ctx, result)
+                    except Exception as e:
+                        logger.warning(f"[Pipeline] 后置回调失败: {e}")
+        finally:
+            # 阶段异常或任务取消时也要关闭 tracemalloc 与采样线程
+            if memory_profiler:
+                memory_profiler.stop()
+            if sampler:
+                sampler.stop()
         
         total_duration = (time.perf_counter() - start_time) * 1000
         
+        profile_path = None
+        if sampler:
+            from pathlib import Path
+            output_dir = Path(self.config.profile_output_dir or "data/profiles")
+            profile_path = str(sampler.dump(output_dir / f"turn_{ctx.turn_index:05d}.folded"))
+            logger.info(f"[Pipeline] 回合 {ctx.turn_index} 采样剖析已保存: {profile_path} ({sampler.samples} 次采样)")
+        
         # 【张量监控】如果 TensorMetricsStage 未执行，手动结束回合收集
         # 确保即使张量阶段被跳过，监控数据也能正确记录
         if tensor_collector:
@@ -516,6 +607,8 @@ class Pipeline:
             total_duration_ms=total_duration,
             stage_metrics=stage_metrics,
             failed_stages=failed_stages,
+            turn_index=ctx.turn_index,
+            profile_path=profile_path,
         )
         
         return PipelineResult(
@@ -0,0 +1,296 @@
+"""
+Stage Profiling - 阶段级内存与采样剖析
+
+为 Pipeline 提供可选（默认关闭）的逐阶段诊断：
+- RSS 变化与进程峰值 RSS
+- tracemalloc 峰值与净分配，以及阶段内新增分配最多的代码行（Top N）
+- SimulationContext 各字段持有的 NumPy 数组字节数（含 tensor_state 等嵌套对象）
+- GC 暂停次数与耗时（按代统计）
+- 指定回合的采样剖析，输出 flamegraph.pl / speedscope 可直接读取的折叠栈
+
+开启方式：PipelineConfig.profile_memory / profile_turn，
+或运行时调用 SimulationEngine.configure_profiling()。
+"""
+
+from __future__ import annotations
+
+import gc
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from dataclasses import fields, is_dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .context import SimulationContext
+
+
+# ============================================================================
+# 进程内存
+# ============================================================================
+
+def current_rss_mb() -> float:
+    """当前进程常驻内存（MB），不可用时返回 0"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return 0.0
+
+
+def peak_rss_mb() -> float:
+    """进程峰值常驻内存（MB）"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux 单位为 KB，macOS 为字节
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        return current_rss_mb()
+
+
+# ============================================================================
+# NumPy 数组占用
+# ============================================================================
+
+def numpy_bytes(obj: Any, depth: int = 3, _seen: set[int] | None = None) -> int:
+    """递归统计对象持有的 NumPy 数组字节数
+
+    遍历 dict/list/tuple/set、dataclass 字段与普通对象的 __dict__，
+    深度受限且按 id 去重（视图与共享数组只计一次）。
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        return 0
+
+    seen = _seen if _seen is not None else set()
+    if obj is None or id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, np.ndarray):
+        # 视图不单独持有内存
+        return int(obj.nbytes) if obj.base is None else 0
+    if depth <= 0 or isinstance(obj, (str, bytes, int, float, bool)):
+        return 0
+
+    if isinstance(obj, dict):
+        children = obj.values()
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        # 大型列表（如物种对象列表）只抽查首个元素的类型
+        if len(obj) > 256 and not isinstance(next(iter(obj)), np.ndarray):
+            return 0
+        children = obj
+    elif is_dataclass(obj):
+        children = (getattr(obj, f.name, None) for f in fields(obj))
+    elif hasattr(obj, "__dict__"):
+        children = vars(obj).values()
+    else:
+        return 0
+
+    return sum(numpy_bytes(child, depth - 1, seen) for child in children)
+
+
+def context_array_bytes(ctx: "SimulationContext") -> dict[str, int]:
+    """统计 SimulationContext 每个字段持有的 NumPy 字节数（仅返回非零字段）"""
+    result: dict[str, int] = {}
+    seen: set[int] = set()
+    names = [f.name for f in fields(ctx)] if is_dataclass(ctx) else list(vars(ctx))
+    for name in names:
+        if name in ("event_callback", "command", "ui_config"):
+            continue
+        size = numpy_bytes(getattr(ctx, name, None), _seen=seen)
+        if size:
+            result[name] = size
+    return result
+
+
+# ============================================================================
+# GC 暂停统计
+# ============================================================================
+
+class GCPauseTracker:
+    """通过 gc.callbacks 统计垃圾回收次数与暂停耗时"""
+
+    def __init__(self) -> None:
+        self.collections = [0, 0, 0]
+        self.pause_ms = [0.0, 0.0, 0.0]
+        self._started_at: float | None = None
+        self._installed = False
+
+    def install(self) -> None:
+        if not self._installed:
+            gc.callbacks.append(self._callback)
+            self._installed = True
+
+    def uninstall(self) -> None:
+        if self._installed:
+            try:
+                gc.callbacks.remove(self._callback)
+            except ValueError:
+                pass
+            self._installed = False
+
+    def _callback(self, phase: str, info: dict) -> None:
+        if phase == "start":
+            self._started_at = time.perf_counter()
+        elif phase == "stop" and self._started_at is not None:
+            gen = min(int(info.get("generation", 0)), 2)
+            self.collections[gen] += 1
+            self.pause_ms[gen] += (time.perf_counter() - self._started_at) * 1000
+            self._started_at = None
+
+    def snapshot(self) -> tuple[list[int], list[float]]:
+        return list(self.collections), list(self.pause_ms)
+
+
+# ============================================================================
+# 逐阶段内存剖析
+# ============================================================================
+
+class StageMemoryProfiler:
+    """逐阶段内存剖析器（由 Pipeline 在 profile_memory 开启时创建）
+
+    before_stage / after_stage 必须成对调用；after_stage 返回的字典
+    直接写入 StageMetrics.memory。
+    """
+
+    def __init__(self, top_allocators: int = 5, trace_frames: int = 1) -> None:
+        self.top_allocators = top_allocators
+        self.trace_frames = trace_frames
+        self.gc_tracker = GCPauseTracker()
+        self._owns_tracemalloc = False
+        self._before: dict[str, Any] = {}
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.trace_frames)
+            self._owns_tracemalloc = True
+        self.gc_tracker.install()
+
+    def stop(self) -> None:
+        self.gc_tracker.uninstall()
+        if self._owns_tracemalloc and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._owns_tracemalloc = False
+
+    def before_stage(self) -> None:
+        tracemalloc.reset_peak()
+        self._before = {
+            "rss_mb": current_rss_mb(),
+            "traced": tracemalloc.get_traced_memory()[0],
+            "gc": self.gc_tracker.snapshot(),
+            "snapshot": tracemalloc.take_snapshot() if self.top_allocators > 0 else None,
+        }
+
+    def after_stage(self, ctx: "SimulationContext | None" = None) -> dict[str, Any]:
+        current, peak = tracemalloc.get_traced_memory()
+        rss_after = current_rss_mb()
+        gc_counts, gc_pause = self.gc_tracker.snapshot()
+        before_counts, before_pause = self._before.get("gc", ([0, 0, 0], [0.0, 0.0, 0.0]))
+        traced_before = self._before.get("traced", 0)
+
+        result: dict[str, Any] = {
+            "rss_mb": round(rss_after, 2),
+            "rss_delta_mb": round(rss_after - self._before.get("rss_mb", rss_after), 2),
+            "peak_rss_mb": round(peak_rss_mb(), 2),
+            "traced_peak_kb": round(max(0, peak - traced_before) / 1024, 1),
+            "traced_net_kb": round((current - traced_before) / 1024, 1),
+            "gc_collections": [a - b for a, b in zip(gc_counts, before_counts)],
+            "gc_pause_ms": round(sum(gc_pause) - sum(before_pause), 3),
+        }
+
+        before_snapshot = self._before.get("snapshot")
+        if before_snapshot is not None:
+            after_snapshot = tracemalloc.take_snapshot()
+            stats = after_snapshot.compare_to(before_snapshot, "lineno")
+            grown = [stat for stat in stats if stat.size_diff > 0]
+            grown.sort(key=lambda stat: stat.size_diff, reverse=True)
+            result["top_allocators"] = [
+                {
+                    "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                    "size_kb": round(stat.size_diff / 1024, 1),
+                    "count": stat.count_diff,
+                }
+                for stat in grown[: self.top_allocators]
+            ]
+
+        if ctx is not None:
+            arrays = context_array_bytes(ctx)
+            result["context_numpy_kb"] = {k: round(v / 1024, 1) for k, v in arrays.items()}
+            result["context_numpy_total_kb"] = round(sum(arrays.values()) / 1024, 1)
+
+        self._before = {}
+        return result
+
+
+# ============================================================================
+# 采样剖析（折叠栈输出）
+# ============================================================================
+
+class SamplingProfiler:
+    """周期性采样所有线程调用栈，输出折叠栈格式（flamegraph.pl / speedscope）
+
+    采样线程只读取 sys._current_frames()，不会干扰 Taichi 对主线程的要求。
+    每条栈以当前阶段名作为根帧，便于在火焰图中按阶段分组。
+    """
+
+    def __init__(self, interval_ms: float = 5.0, max_depth: int = 64) -> None:
+        self.interval = max(interval_ms, 0.5) / 1000
+        self.max_depth = max_depth
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self._label = "pipeline"
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def set_label(self, label: str) -> None:
+        self._label = label.replace(";", ",").replace(" ", "_")
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stage-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            if len(names) != len(frames):
+                names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in frames.items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                if not stack:
+                    continue
+                thread_name = names.get(thread_id, str(thread_id)).replace(";", ",").replace(" ", "_")
+                key = ";".join([self._label, thread_name] + [s.replace(";", ",") for s in reversed(stack)])
+                self.stacks[key] += 1
+            self.samples += 1
+
+    def to_folded(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+    def dump(self, path: str | Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.to_folded() + "\n", encoding="utf-8")
+        return path
@@ -2806,7 +2806,7 @@ class SavePopulationSnapshotStage(BaseStage):
         # 使用 PopulationSnapshotService 保存快照
         all_species_final = species_repository.list_species()
         snapshot_service = PopulationSnapshotService(species_repository)
-        snapshot_service.save_snapshots(all_species_final, ctx.turn_index)
+        snapshot_service.save_snapshots(all_species_final, ctx.turn_index, getattr(ctx, "tensor_state", None))
 
 
 class EmbeddingStage(BaseStage):
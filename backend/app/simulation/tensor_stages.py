@@ -131,7 +131,8 @@ class TensorStateInitStage(BaseStage):
         )
     
     async def execute(self, ctx: SimulationContext, engine: SimulationEngine) -> None:
-        import numpy as np
+        from ..tensor.state import TensorStateManager
+        
         species_batch = getattr(ctx, "species_batch", []) or []
         if not species_batch:
             logger.warning("[张量状态构建] 无物种，跳过")
@@ -153,126 +154,36 @@ class TensorStateInitStage(BaseStage):
         else:
             H, W = 40, 128  # 默认尺寸
         
-        S = len(species_batch)
-        
-        # 构建环境张量 (7, H, W): [temp, humidity, altitude, resource, land, sea, coast]
-        env = np.zeros((7, H, W), dtype=np.float32)
-        tile_id_grid = np.full((H, W), -1, dtype=np.int32)
-        if all_tiles:
-            def _classify_biome(biome: str) -> tuple[float, float, float]:
-                b = (biome or "land").lower()
-                sea_keywords = ("ocean", "sea", "deep_ocean", "marsh", "lagoon", "bay", "海", "海洋", "深海", "浅海", "大洋")
-                freshwater_keywords = ("lake", "river", "freshwater", "wetland", "bog", "pond", "湖", "河", "淡水", "湿地")
-                coast_keywords = ("coast", "coastal", "shore", "beach", "岸", "海岸", "沿海")
-
-                is_sea = any(k in b for k in sea_keywords) or any(k in b for k in freshwater_keywords)
-                is_coast = any(k in b for k in coast_keywords)
-
-                # 沿岸区域视作陆地+海岸，但保持海洋为0以限制纯水生上岸
-                is_land = not is_sea or is_coast or ("land" in b)
-                return (
-                    1.0 if is_land else 0.0,
-                    1.0 if is_sea else 0.0,
-                    1.0 if is_coast else 0.0,
-                )
-
-            for tile in all_tiles:
-                # MapTile 使用 x, y 坐标（y 对应行，x 对应列）
-                r, c = tile.y, tile.x
-                if 0 <= r < H and 0 <= c < W:
-                    env[0, r, c] = getattr(tile, 'temperature', 20.0) / 50.0  # 归一化
-                    env[1, r, c] = getattr(tile, 'humidity', 0.5)
-                    env[2, r, c] = getattr(tile, 'elevation', 0.0) / 1000.0  # 使用 elevation
-                    env[3, r, c] = getattr(tile, 'resources', 100.0) / 100.0  # 使用 resources
-                    tile_id_grid[r, c] = tile.id
-                    # 地形类型（扩展中英文关键词）
-                    biome = getattr(tile, 'biome', 'land')
-                    land_flag, sea_flag, coast_flag = _classify_biome(biome)
-                    env[4, r, c] = land_flag
-                    env[5, r, c] = sea_flag
-                    env[6, r, c] = coast_flag
-        else:
-            # 默认环境：温带陆地
-            env[0, :, :] = 0.4  # 温度
-            env[1, :, :] = 0.5  # 湿度
-            env[3, :, :] = 0.8  # 资源
-            env[4, :, :] = 1.0  # 陆地
-        
-        # 构建种群张量 (S, H, W)
-        pop = np.zeros((S, H, W), dtype=np.float32)
-        species_map = {}
-        
-        # 构建 tile_id -> (y, x) 映射
-        tile_coords = {tile.id: (tile.y, tile.x) for tile in all_tiles} if all_tiles else {}
-        
-        for idx, sp in enumerate(species_batch):
-            species_map[sp.lineage_code] = idx
-            # 分配种群到地图（从 morphology_stats 获取）
-            total_pop = sp.morphology_stats.get("population", 0)
-            if total_pop > 0:
-                # 获取物种栖息地分布
-                habitats = getattr(sp, 'habitats', []) or []
-                if habitats and tile_coords:
-                    # 按栖息地分配
-                    pop_per_habitat = total_pop / len(habitats)
-                    for hab in habitats:
-                        tile_id = getattr(hab, 'tile_id', None)
-                        if tile_id is not None and tile_id in tile_coords:
-                            r, c = tile_coords[tile_id]
-                            if 0 <= r < H and 0 <= c < W:
-                                pop[idx, r, c] += pop_per_habitat
-                else:
-                    # 【v2.1修复】没有栖息地信息时，只分布到有限的起始地块
-                    # 参考 config.py: terrestrial_top_k = 4, marine_top_k = 3
-                    # 不再均匀分布到所有陆地，而是选择少量高资源地块
-                    habitat_type = (getattr(sp, 'habitat_type', 'terrestrial') or 'terrestrial').lower()
-                    
-                    # 根据栖息地类型选择合适的地块
-                    if habitat_type in ('marine', 'deep_sea', 'freshwater'):
-                        mask = env[5] > 0.5  # 海洋
-                    else:
-                        mask = env[4] > 0.5  # 陆地
-                    
-                    if mask.sum() > 0:
-                        # 按资源排序，只选择前 4 个最高资源的地块
-                        resources = env[3] * mask  # 资源 × 栖息地掩码
-                        flat_resources = resources.flatten()
-                        top_k = min(4, int(mask.sum()))  # 最多 4 个地块
-                        top_indices = np.argpartition(flat_resources, -top_k)[-top_k:]
-                        top_indices = top_indices[flat_resources[top_indices] > 0]
-                        
-                        if len(top_indices) > 0:
-                            pop_per_tile = total_pop / len(top_indices)
-                            for flat_idx in top_indices:
-                                r, c = flat_idx // W, flat_idx % W
-                                pop[idx, r, c] = pop_per_tile
-                        else:
-                            # 实在没有合适地块，放到地图中心
-                            pop[idx, H // 2, W // 2] = total_pop
-                    else:
-                        # 没有合适栖息地类型，放到地图中心
-                        pop[idx, H // 2, W // 2] = total_pop
-        
-        # 构建物种参数 (S, F)
-        species_params = np.zeros((S, 4), dtype=np.float32)
-        for idx, sp in enumerate(species_batch):
-            species_params[idx, 0] = getattr(sp, 'temp_optimal', 20.0)
-            species_params[idx, 1] = getattr(sp, 'temp_tolerance', 15.0)
-            species_params[idx, 2] = getattr(sp, 'mobility', 1.0)
-            species_params[idx, 3] = getattr(sp, 'reproduction_rate', 0.1)
-        
-        from ..tensor.state import TensorState
-        tensor_state = TensorState(
-            env=env,
-            pop=pop,
-            species_params=species_params,
-            masks={"tile_ids": tile_id_grid},
-            species_map=species_map,
-        )
+        # 【增量】引擎持有跨回合的张量状态；没有时退化为单回合构建
+        manager = getattr(engine, "tensor_state_manager", None)
+        if not isinstance(manager, TensorStateManager):
+            manager = TensorStateManager()
+        
+        from ..repositories.environment_repository import tile_changes
         
+        tensor_state = manager.build(
+            species_batch,
+            all_tiles,
+            (H, W),
+            turn_index=getattr(ctx, "turn_index", None),
+            tile_log=tile_changes,
+        )
         ctx.tensor_state = tensor_state
-        total_pop = pop.sum()
-        logger.info(f"[张量状态构建] 已构建张量状态：物种数={S}, 维度={H}x{W}, 总种群={total_pop:.0f}")
+        
+        stats = manager.last_build_stats
+        if stats["env_rebuilt"]:
+            env_desc = "重建"
+        elif stats["env_patched"]:
+            env_desc = f"增量更新{stats['env_patched']}块"
+        else:
+            env_desc = "复用"
+        logger.info(
+            f"[张量状态构建] 物种数={len(species_batch)}, 维度={H}x{W}, "
+            f"总种群={tensor_state.pop.sum():.0f}, "
+            f"环境{env_desc}, "
+            f"继承={stats['carried']}(缩放{stats['rescaled']}), "
+            f"父系继承={stats['inherited']}, 新播种={stats['seeded']}, 移除={stats['removed']}"
+        )
 
 
 # ============================================================================
@@ -318,6 +229,7 @@ class TensorEcologyStage(BaseStage):
             extract_species_prefs,
             extract_species_traits,
             extract_trophic_levels,
+            get_species_frame,
         )
         from ..services.species.habitat_manager import habitat_manager
         
@@ -346,11 +258,13 @@ class TensorEcologyStage(BaseStage):
         # 创建物种索引映射
         species_batch = getattr(ctx, "species_batch", []) or []
         
-        # 提取物种参数
-        species_params = extract_species_params(species_batch, species_map)
-        species_prefs = extract_species_prefs(species_batch, species_map)
-        species_traits = extract_species_traits(species_batch, species_map)
-        trophic_levels = extract_trophic_levels(species_batch, species_map)
+        # 提取物种参数（同步一次列式存储，四个矩阵都从同一份列切片）
+        frame = get_species_frame()
+        frame.sync(species_batch)
+        species_params = extract_species_params(species_batch, species_map, frame)
+        species_prefs = extract_species_prefs(species_batch, species_map, frame)
+        species_traits = extract_species_traits(species_batch, species_map, frame)
+        trophic_levels = extract_trophic_levels(species_batch, species_map, frame)
         
         # 获取压力叠加层
         pressure_overlay = None
@@ -0,0 +1,86 @@
+"""
+Batch Runner Tests - 批量模拟测试
+
+测试参数网格展开、子进程命令构造与结果汇总（不实际启动模拟）。
+"""
+
+import pytest
+
+from ..batch import (
+    BatchJob,
+    SweepGrid,
+    build_job_command,
+    format_summary_table,
+    summarize_results,
+)
+
+
+class TestSweepGrid:
+    """参数网格测试"""
+
+    def test_cartesian_product_times_seeds(self):
+        grid = SweepGrid.from_dict({
+            "mode": "minimal",
+            "turns": 3,
+            "seeds": [1, 2],
+            "params": {"max_species_count": 50},
+            "grid": {"pressure_scale": [0.8, 1.2], "max_speciations_per_turn": [1, 2, 3]},
+        })
+        jobs = grid.expand()
+
+        assert len(jobs) == 2 * 3 * 2
+        assert [j.job_id for j in jobs] == list(range(len(jobs)))
+        assert all(j.param_overrides["max_species_count"] == 50 for j in jobs)
+        combos = {(j.param_overrides["pressure_scale"], j.param_overrides["max_speciations_per_turn"]) for j in jobs}
+        assert len(combos) == 6
+
+    def test_runs_generate_sequential_seeds(self):
+        grid = SweepGrid.from_dict({"runs": 4, "base_seed": 10})
+        assert grid.seeds == [10, 11, 12, 13]
+        assert len(grid.expand()) == 4
+
+    def test_string_values_follow_cli_parsing(self):
+        grid = SweepGrid.from_dict({
+            "params": ["auto_snapshot=false"],
+            "grid": {"pressure_scale": ["1.5"], "label": ["abc"]},
+        })
+        job = grid.expand()[0]
+        assert job.param_overrides["auto_snapshot"] is False
+        assert job.param_overrides["pressure_scale"] == 1.5
+        assert job.param_overrides["label"] == "abc"
+
+    def test_unknown_mode_rejected(self):
+        with pytest.raises(ValueError):
+            SweepGrid.from_dict({"mode": "turbo"})
+
+
+class TestBatchHelpers:
+    """命令构造与汇总测试"""
+
+    def test_build_job_command(self, tmp_path):
+        job = BatchJob(job_id=0, mode="minimal", turns=5, seed=42,
+                       param_overrides={"pressure_scale": 1.2})
+        cmd = build_job_command(job, tmp_path)
+
+        assert cmd[1:3] == ["-m", "app.simulation.cli"]
+        assert "--seed" in cmd and cmd[cmd.index("--seed") + 1] == "42"
+        assert "--param=pressure_scale=1.2" in cmd
+
+    def test_summarize_groups_by_params(self):
+        results = [
+            {"success": True, "param_overrides": {"a": 1}, "random_seed": 1, "final_species_count": 10},
+            {"success": True, "param_overrides": {"a": 1}, "random_seed": 2, "final_species_count": 20},
+            {"success": False, "param_overrides": {"a": 2}, "random_seed": 1, "errors": ["x"]},
+        ]
+        summary = summarize_results(results)
+
+        assert len(summary) == 2
+        group_a1 = next(s for s in summary if s["params"] == {"a": 1})
+        assert group_a1["runs"] == 2
+        assert group_a1["success_rate"] == 1.0
+        assert group_a1["stats"]["final_species_count"]["mean"] == 15.0
+        assert group_a1["stats"]["final_species_count"]["std"] == 5.0
+
+        group_a2 = next(s for s in summary if s["params"] == {"a": 2})
+        assert group_a2["succeeded"] == 0
+        assert "a=1" in format_summary_table(summary)
@@ -0,0 +1,91 @@
+"""
+Benchmark Tests - 性能基准框架测试
+
+测试采样聚合、扩展曲线拟合与历史对比，以及在隔离子进程中跑通一个极小合成世界的冒烟用例。
+"""
+
+import pytest
+
+from ..benchmark import (
+    BenchmarkCase,
+    BenchmarkScale,
+    StageSample,
+    _run_case_subprocess,
+    aggregate_samples,
+    compare_entries,
+    scaling_curves,
+)
+
+
+def _case(species_count: int, stage_ms: dict, mode: str = "minimal") -> BenchmarkCase:
+    return BenchmarkCase(
+        scale=BenchmarkScale(species_count=species_count),
+        mode=mode,
+        turns=1,
+        seed=1,
+        stages={name: {"mean_ms": ms, "max_ms": ms} for name, ms in stage_ms.items()},
+    )
+
+
+class TestBenchmarkAggregation:
+    """采样聚合与曲线测试"""
+
+    def test_aggregate_samples(self):
+        samples = [
+            StageSample(stage="A", turn=0, duration_ms=10.0, rss_mb=100, alloc_peak_kb=5),
+            StageSample(stage="A", turn=1, duration_ms=30.0, rss_mb=120, alloc_peak_kb=8, success=False),
+            StageSample(stage="B", turn=0, duration_ms=1.0),
+        ]
+        stats = aggregate_samples(samples)
+
+        assert stats["A"]["mean_ms"] == 20.0
+        assert stats["A"]["max_ms"] == 30.0
+        assert stats["A"]["calls"] == 2
+        assert stats["A"]["failures"] == 1
+        assert stats["A"]["max_rss_mb"] == 120
+        assert stats["A"]["alloc_peak_kb"] == 8
+        assert stats["B"]["calls"] == 1
+
+    def test_scaling_exponent(self):
+        cases = [_case(s, {"线性": s * 0.1, "平方": s * s * 0.001}) for s in (100, 1000, 5000)]
+        curves = scaling_curves(cases)
+
+        assert curves["minimal/线性"]["exponent"] == pytest.approx(1.0)
+        assert curves["minimal/平方"]["exponent"] == pytest.approx(2.0)
+        assert [p[0] for p in curves["minimal/线性"]["points"]] == [100, 1000, 5000]
+
+    def test_case_roundtrip(self):
+        case = _case(500, {"A": 1.5})
+        restored = BenchmarkCase.from_dict(case.to_dict())
+        assert restored.scale.species_count == 500
+        assert restored.stages == case.stages
+
+
+class TestBenchmarkCompare:
+    """历史对比测试"""
+
+    def test_compare_flags_regression(self):
+        base = {"cases": [_case(100, {"A": 100.0, "B": 50.0}).to_dict()]}
+        head = {"cases": [_case(100, {"A": 150.0, "B": 49.0}).to_dict()]}
+        rows = compare_entries(base, head, threshold=0.10)
+
+        by_stage = {r["stage"]: r for r in rows}
+        assert by_stage["A"]["regression"] is True
+        assert by_stage["A"]["change"] == pytest.approx(0.5)
+        assert by_stage["B"]["regression"] is False
+        assert rows[0]["stage"] == "A"
+
+
+class TestBenchmarkSmoke:
+    """合成世界冒烟测试"""
+
+    def test_tiny_world_runs_one_turn(self, tmp_path):
+        scale = BenchmarkScale(species_count=6, map_width=12, map_height=8, habitat_density=0.2)
+        case = _run_case_subprocess(
+            scale, "minimal", turns=1, seed=7, work_dir=tmp_path,
+            trace_alloc=False, timeout=600,
+        )
+
+        assert case.success, case.errors
+        assert len(case.turn_ms) == 1
+        assert case.stages
@@ -0,0 +1,176 @@
+"""
+DB Benchmark Tests - 数据库调优与批量写入测试
+
+验证 PRAGMA 生效、只读连接拒绝写入、bulk_save 的插入/更新/主键回填、
+物种写回单元只写变化的行，以及基准脚本在小规模下可以跑通。
+"""
+
+import random
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event, text
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from ...core.config import get_settings
+from ...core.database import bulk_save, configure_sqlite_engine, sqlite_pragmas
+from ...models import environment, genus, history, species  # noqa: F401
+from ...models.environment import HabitatPopulation, MapTile
+from ...models.species import Species
+from ...repositories.species_repository import SpeciesUnitOfWork
+from ..db_benchmark import _make_species, run_config, run_species_writeback
+
+
+@pytest.fixture
+def db_file(tmp_path):
+    return tmp_path / "world.db"
+
+
+def _engine(db_file, read_only: bool = False):
+    engine = create_engine(f"sqlite:///{db_file.as_posix()}", connect_args={"check_same_thread": False})
+    return configure_sqlite_engine(engine, sqlite_pragmas(get_settings(), read_only=read_only))
+
+
+def _tile(**kwargs) -> MapTile:
+    values = {"y": 0, "biome": "草原", "cover": "草地", "elevation": 0.0, "temperature": 15.0, "humidity": 0.5, "resources": 100.0}
+    return MapTile(**{**values, **kwargs})
+
+
+class TestSqliteTuning:
+    """PRAGMA 与只读连接"""
+
+    def test_pragmas_applied(self, db_file):
+        engine = _engine(db_file)
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+            assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+            assert conn.exec_driver_sql("PRAGMA temp_store").scalar() == 2  # MEMORY
+
+    def test_read_only_engine_rejects_writes(self, db_file):
+        SQLModel.metadata.create_all(_engine(db_file))
+        reader = _engine(db_file, read_only=True)
+        with reader.connect() as conn:
+            assert conn.execute(text("SELECT count(*) FROM map_tiles")).scalar() == 0
+            with pytest.raises(Exception):
+                conn.execute(text("INSERT INTO map_tiles (x, y, q, r, biome, cover) VALUES (0, 0, 0, 0, 'a', 'b')"))
+
+
+class TestBulkSave:
+    """批量写入"""
+
+    def test_insert_backfills_ids_and_update_upserts(self, db_file):
+        engine = _engine(db_file)
+        SQLModel.metadata.create_all(engine)
+        tiles = [_tile(x=i, elevation=float(i)) for i in range(5)]
+
+        with Session(engine) as session:
+            assert bulk_save(session, tiles) == 5
+            session.commit()
+        assert [t.id for t in tiles] == [1, 2, 3, 4, 5]
+
+        tiles[2].elevation = 999.0
+        tiles.append(_tile(id=10, x=9, biome="海洋"))  # 主键不存在：插入
+        with Session(engine) as session:
+            bulk_save(session, tiles)
+            session.commit()
+            rows = {t.id: t for t in session.exec(select(MapTile))}
+        assert sorted(rows) == [1, 2, 3, 4, 5, 10]
+        assert rows[3].elevation == 999.0
+        assert rows[10].biome == "海洋"
+
+    def test_empty_input(self, db_file):
+        engine = _engine(db_file)
+        with Session(engine) as session:
+            assert bulk_save(session, []) == 0
+            assert bulk_save(session, iter([])) == 0
+
+    def test_habitat_rows_round_trip(self, db_file):
+        engine = _engine(db_file)
+        SQLModel.metadata.create_all(engine)
+        habitats = [HabitatPopulation(tile_id=1, species_id=s, population=s * 10, suitability=0.5) for s in range(3)]
+        with Session(engine) as session:
+            bulk_save(session, habitats)
+            session.commit()
+            stored = session.exec(select(HabitatPopulation).order_by(HabitatPopulation.id)).all()
+        assert [h.population for h in stored] == [0, 10, 20]
+
+
+class TestSpeciesUnitOfWork:
+    """回合写回单元"""
+
+    def setup_method(self):
+        self.statements = []
+
+    def _factory(self, engine):
+        statements = self.statements
+
+        @contextmanager
+        def session_factory():
+            session = Session(engine, expire_on_commit=False)
+            try:
+                yield session
+                session.commit()
+            finally:
+                session.close()
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement.split()[0], executemany))
+
+        return session_factory
+
+    def test_flush_writes_only_changed_rows(self, db_file):
+        engine = _engine(db_file)
+        SQLModel.metadata.create_all(engine)
+        factory = self._factory(engine)
+        species_rows = _make_species(6, random.Random(0))
+        with factory() as session:
+            session.add_all(species_rows)
+
+        uow = SpeciesUnitOfWork(factory)
+        species_rows[1].status = "extinct"
+        species_rows[4].morphology_stats = {"population": 1.0}
+        for sp in species_rows:
+            uow.register(sp)
+        self.statements.clear()
+        stats = uow.flush()
+
+        assert stats["registered"] == 6 and stats["updated"] == 2 and stats["inserted"] == 0
+        assert stats["columns"] == ["morphology_stats", "status"]
+        assert [s for s in self.statements if s[0] == "UPDATE"] == [("UPDATE", True)]  # 一条 executemany
+        with factory() as session:
+            stored = {sp.id: sp for sp in session.exec(select(Species))}
+        assert stored[species_rows[1].id].status == "extinct"
+        assert stored[species_rows[4].id].morphology_stats == {"population": 1.0}
+        assert stored[species_rows[0].id].status == "alive"
+
+        # 已无登记对象：不访问数据库
+        self.statements.clear()
+        assert uow.flush()["registered"] == 0
+        assert self.statements == []
+
+    def test_missing_rows_are_reinserted(self, db_file):
+        engine = _engine(db_file)
+        SQLModel.metadata.create_all(engine)
+        factory = self._factory(engine)
+        sp = _make_species(1, random.Random(1))[0]
+        sp.id = 42
+        uow = SpeciesUnitOfWork(factory)
+        uow.register(sp)
+        assert uow.flush()["inserted"] == 1
+        with factory() as session:
+            assert session.get(Species, 42).lineage_code == sp.lineage_code
+
+
+def test_species_writeback_benchmark(tmp_path):
+    row = run_species_writeback(tmp_path / "wb.db", 20, rounds=1)
+    assert row["species"] == 20
+    assert row["legacy_ms"] > 0 and row["unit_of_work_ms"] > 0
+
+
+def test_benchmark_runs_both_configs(tmp_path):
+    for name in ("baseline", "tuned"):
+        result = run_config(name, tmp_path / f"{name}.db", 8, 4, species_count=5,
+                            tiles_per_species=3, rounds=1, seed=1)
+        assert result.rows == {"tiles_update": 32, "habitats_insert": 15, "species_update": 5}
+        assert all(result.rows_per_second(k) > 0 for k in result.rows)
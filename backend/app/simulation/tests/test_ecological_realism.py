@@ -119,6 +119,19 @@ class TestSemanticAnchorService:
         stats = anchor_service.get_stats()
         assert "anchor_count" in stats
         assert stats["anchor_count"] > 0
+    
+    def test_similarity_matrix_matches_scalar(self, anchor_service):
+        """测试相似度矩阵与逐个计算一致"""
+        species = [MockSpeciesForEcology(lineage_code=f"M{i}", common_name=f"物种{i}") for i in range(5)]
+        names = ["pollinator", "flowering_plant", "social_behavior", "no_such_anchor"]
+        
+        matrix = anchor_service.compute_similarity_matrix(species, names)
+        
+        assert matrix.shape == (5, 4)
+        assert (matrix[:, 3] == 0.0).all()  # 未知锚点与标量路径一致为 0
+        for i, sp in enumerate(species):
+            for j, name in enumerate(names):
+                assert matrix[i, j] == pytest.approx(anchor_service.compute_similarity(sp, name), abs=1e-5)
 
 
 # ============================================================================
@@ -357,6 +370,61 @@ class TestVerticalNiche:
         assert 0.0 <= overlap <= 1.0
 
 
+class TestInteractionMatrices:
+    """物种对交互矩阵与逐对标量计算的一致性测试"""
+    
+    @pytest.fixture
+    def eco_service(self):
+        from ...services.ecology.ecological_realism import EcologicalRealismService
+        from ...services.ecology.semantic_anchors import SemanticAnchorService
+        
+        anchor_service = SemanticAnchorService(MockEmbeddingService())
+        anchor_service.initialize()
+        return EcologicalRealismService(anchor_service)
+    
+    @pytest.fixture
+    def species_list(self):
+        return [
+            MockSpeciesForEcology(id=1, lineage_code="A1", common_name="林冠鸟", trophic_level=3.0),
+            MockSpeciesForEcology(id=2, lineage_code="B1", common_name="地面鼠", trophic_level=2.0),
+            MockSpeciesForEcology(id=3, lineage_code="C1", common_name="底栖蟹", habitat_type="marine"),
+            MockSpeciesForEcology(id=4, lineage_code="D1", common_name="藻类", trophic_level=1.0),
+        ]
+    
+    def test_vertical_matrix_matches_scalar(self, eco_service, species_list):
+        """垂直竞争矩阵逐对等于 calculate_vertical_niche_overlap"""
+        matrix = eco_service.vertical_competition_matrix(species_list)
+        
+        assert matrix.shape == (4, 4)
+        for i, a in enumerate(species_list):
+            for j, b in enumerate(species_list):
+                if i != j:
+                    expected = eco_service.calculate_vertical_niche_overlap(a, b)
+                    assert matrix[i, j] == pytest.approx(expected, abs=1e-6)
+    
+    def test_spatial_predation_matrix_matches_scalar(self, eco_service, species_list):
+        """空间捕食效率逐边等于 calculate_spatial_predation_efficiency"""
+        from scipy import sparse
+        
+        # 部分重叠、完全重叠、无重叠与无地块的捕食者各一
+        tiles = [{0, 1, 2}, {1, 2, 3, 4}, {5}, set()]
+        rows = [i for i, ts in enumerate(tiles) for _ in ts]
+        cols = [t for ts in tiles for t in sorted(ts)]
+        incidence = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(4, 6))
+        predators = np.array([0, 0, 1, 2, 3])
+        prey = np.array([1, 2, 0, 1, 1])
+        
+        efficiency = eco_service.calculate_spatial_predation_matrix(species_list, predators, prey, incidence)
+        
+        assert efficiency.shape == (5,)
+        for e, (i, j) in enumerate(zip(predators, prey)):
+            expected = eco_service.calculate_spatial_predation_efficiency(
+                species_list[i], species_list[j], tiles[i], tiles[j]
+            )
+            assert efficiency[e] == pytest.approx(expected, abs=1e-5)
+        assert efficiency.max() > 0.0
+
+
 # ============================================================================
 # Mutualism Network Tests
 # ============================================================================
@@ -402,6 +470,38 @@ class TestMutualismNetwork:
         # 可能发现共生关系，取决于 embedding 相似度
         assert isinstance(links, list)
     
+    def test_discover_mutualism_matches_pairwise_scan(self, eco_service):
+        """测试矩阵化发现与逐对标量扫描结果一致"""
+        from ...services.ecology.ecological_realism import MUTUALISM_PAIRS
+        
+        eco_service._config.mutualism_threshold = 0.5
+        anchors = eco_service._anchors
+        species = [
+            MockSpeciesForEcology(lineage_code=f"S{i:02d}", common_name=f"物种{i}")
+            for i in (7, 3, 11, 0, 5, 9, 1, 8)
+        ]
+        
+        links = eco_service.discover_mutualism_links(species, turn_index=1)
+        
+        thr = 0.5
+        expected = []
+        for sp_a in species:
+            for sp_b in species:
+                if sp_a.lineage_code >= sp_b.lineage_code:
+                    continue
+                for anchor_a, anchor_b, rel_type in MUTUALISM_PAIRS:
+                    fwd = (anchors.compute_similarity(sp_a, anchor_a), anchors.compute_similarity(sp_b, anchor_b))
+                    rev = (anchors.compute_similarity(sp_a, anchor_b), anchors.compute_similarity(sp_b, anchor_a))
+                    if min(fwd) > thr:
+                        expected.append((sp_a.lineage_code, sp_b.lineage_code, rel_type, sum(fwd) / 2))
+                    elif min(rev) > thr:
+                        expected.append((sp_a.lineage_code, sp_b.lineage_code, rel_type, sum(rev) / 2))
+        
+        assert expected, "测试数据应产生至少一个共生关系"
+        assert [(l.species_a, l.species_b, l.relationship_type) for l in links] == [e[:3] for e in expected]
+        for link, e in zip(links, expected):
+            assert link.strength == pytest.approx(e[3], abs=1e-5)
+    
     def test_mutualism_benefit(self, eco_service):
         """测试互利共生收益"""
         species = MockSpeciesForEcology()
@@ -541,6 +641,42 @@ class TestEcologicalRealismStage:
         assert "disease_results" in eco_data
         assert "env_modifiers" in eco_data
     
+    async def test_stage_interaction_matrices(self, stage, mock_context, mock_engine):
+        """测试交互矩阵与逐对标量计算一致"""
+        from ..ecological_realism_stage import (
+            get_spatial_predation_efficiency,
+            get_vertical_niche_competition,
+        )
+        
+        eco_service = mock_engine.ecological_realism_service
+        eco_service._config.min_overlap_for_predation = 0.0
+        sp1, sp2, sp3 = mock_context.species_batch
+        sp2.prey_species = ["SP001", "GONE"]
+        sp3.prey_species = ["SP001", "SP002"]
+        mock_context.all_habitats.append(MagicMock(species_id=sp3.id, tile_id=4, suitability=0.5))
+        
+        await stage.execute(mock_context, mock_engine)
+        eco_data = mock_context.plugin_data["ecological_realism"]
+        
+        assert eco_data["species_index"] == ["SP001", "SP002", "SP003"]
+        assert eco_data["vertical_competition"].shape == (3, 3)
+        assert eco_data["predation_edges"].tolist() == [[1, 0], [2, 0], [2, 1]]
+        
+        tiles = {1: {0, 1}, 2: {0, 1}, 3: {0, 1, 4}}
+        for a in mock_context.species_batch:
+            for b in mock_context.species_batch:
+                if a is b:
+                    continue
+                expected = eco_service.calculate_vertical_niche_overlap(a, b)
+                assert get_vertical_niche_competition(mock_context, a.lineage_code, b.lineage_code) == pytest.approx(expected)
+                if a.prey_species and b.lineage_code in a.prey_species:
+                    expected = eco_service.calculate_spatial_predation_efficiency(a, b, tiles[a.id], tiles[b.id])
+                    actual = get_spatial_predation_efficiency(mock_context, a.lineage_code, b.lineage_code)
+                    assert actual == pytest.approx(expected, abs=1e-5)
+        
+        # 非捕食关系保持默认效率
+        assert get_spatial_predation_efficiency(mock_context, "SP001", "SP003") == 1.0
+    
     async def test_stage_handles_missing_service(self, stage, mock_context):
         """测试服务不可用时的处理"""
         engine = MagicMock()
@@ -579,8 +715,12 @@ class TestHelperFunctions:
             "env_modifiers": {"SP001": 0.9},
             "adaptation_penalties": {"SP001": 0.05},
             "mutualism_benefits": {"SP001": 0.1},
-            "vertical_competition_modifiers": {"SP001_SP002": 0.7},
-            "spatial_predation_efficiency": {"SP001_SP002": 0.8},
+            "species_index": ["SP001", "SP002"],
+            "species_position": {"SP001": 0, "SP002": 1},
+            "vertical_competition": np.array([[1.0, 0.7], [0.7, 1.0]], dtype=np.float32),
+            "predation_edges": np.array([[0, 1]]),
+            "predation_keys": np.array([1], dtype=np.int64),
+            "predation_efficiency": np.array([0.8], dtype=np.float32),
             "assimilation_efficiencies": {"SP001": 0.15},
         }
         
@@ -625,7 +765,9 @@ class TestHelperFunctions:
             "SP002"
         )
         
-        assert competition == 0.7
+        assert competition == pytest.approx(0.7)
+        assert get_vertical_niche_competition(mock_context_with_eco_data, "SP002", "SP001") == pytest.approx(0.7)
+        assert get_vertical_niche_competition(mock_context_with_eco_data, "SP001", "UNKNOWN") == 1.0
     
     def test_get_spatial_predation_efficiency(self, mock_context_with_eco_data):
         """测试空间捕食效率"""
@@ -637,7 +779,10 @@ class TestHelperFunctions:
             "SP002"
         )
         
-        assert efficiency == 0.8
+        assert efficiency == pytest.approx(0.8)
+        # 非捕食边与未知物种保持默认效率
+        assert get_spatial_predation_efficiency(mock_context_with_eco_data, "SP002", "SP001") == 1.0
+        assert get_spatial_predation_efficiency(mock_context_with_eco_data, "UNKNOWN", "SP002") == 1.0
     
     def test_get_assimilation_efficiency(self, mock_context_with_eco_data):
         """测试同化效率"""
@@ -0,0 +1,128 @@
+"""
+Profiling Tests - 阶段内存剖析测试
+
+测试 NumPy 占用统计、逐阶段内存指标与折叠栈输出。
+"""
+
+import asyncio
+import threading
+import time
+import tracemalloc
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from ..context import SimulationContext
+from ..pipeline import Pipeline, PipelineConfig
+from ..profiling import (
+    SamplingProfiler,
+    StageMemoryProfiler,
+    context_array_bytes,
+    numpy_bytes,
+)
+from ..stages import BaseStage, StageOrder
+
+
+class AllocatingStage(BaseStage):
+    """在上下文中分配数组的测试阶段"""
+
+    def __init__(self):
+        super().__init__(StageOrder.INIT.value + 1, "分配阶段")
+
+    async def execute(self, ctx, engine):
+        ctx.plugin_data["grid"] = np.zeros((64, 64), dtype=np.float64)
+
+
+class CancelledStage(BaseStage):
+    """模拟回合被取消的测试阶段"""
+
+    def __init__(self):
+        super().__init__(StageOrder.INIT.value + 2, "取消阶段")
+
+    async def execute(self, ctx, engine):
+        raise asyncio.CancelledError()
+
+
+class TestNumpyAccounting:
+    """NumPy 占用统计测试"""
+
+    def test_views_and_shared_arrays_counted_once(self):
+        arr = np.zeros(1000, dtype=np.float32)
+        data = {"a": arr, "b": [arr, arr[10:]], "c": {"nested": arr}}
+        assert numpy_bytes(data) == arr.nbytes
+
+    def test_context_array_bytes(self):
+        ctx = SimulationContext(turn_index=0)
+        ctx.plugin_data["grid"] = np.ones((10, 10), dtype=np.float64)
+        assert context_array_bytes(ctx) == {"plugin_data": 800}
+
+
+class TestStageMemoryProfiler:
+    """逐阶段内存剖析测试"""
+
+    def test_before_after_reports_metrics(self):
+        profiler = StageMemoryProfiler(top_allocators=3)
+        profiler.start()
+        try:
+            profiler.before_stage()
+            payload = [bytearray(4096) for _ in range(50)]
+            result = profiler.after_stage(SimulationContext(turn_index=0))
+        finally:
+            profiler.stop()
+
+        assert payload
+        assert result["traced_peak_kb"] >= 150
+        assert len(result["gc_collections"]) == 3
+        assert 0 < len(result["top_allocators"]) <= 3
+        assert result["context_numpy_total_kb"] == 0
+
+    @pytest.mark.asyncio
+    async def test_pipeline_records_stage_memory(self):
+        ctx = SimulationContext(turn_index=0)
+        ctx.command = MagicMock(pressures=[], rounds=1)
+        engine = MagicMock()
+        engine._use_embedding_integration = False
+
+        config = PipelineConfig(validate_dependencies=False, profile_memory=True)
+        result = await Pipeline([AllocatingStage()], config).execute(ctx, engine)
+
+        stage = result.metrics.stage_metrics[0]
+        assert stage.memory["context_numpy_kb"]["plugin_data"] == 32.0
+        assert result.metrics.to_dict()["memory_profiled"] is True
+        assert result.metrics.get_memory_table()
+
+    @pytest.mark.asyncio
+    async def test_profilers_stopped_when_turn_cancelled(self):
+        ctx = SimulationContext(turn_index=3)
+        ctx.command = MagicMock(pressures=[], rounds=1)
+        engine = MagicMock()
+        engine._use_embedding_integration = False
+
+        config = PipelineConfig(
+            validate_dependencies=False, profile_memory=True, profile_turn=3, profile_interval_ms=1,
+        )
+        with pytest.raises(asyncio.CancelledError):
+            await Pipeline([AllocatingStage(), CancelledStage()], config).execute(ctx, engine)
+
+        assert not tracemalloc.is_tracing()
+        assert not any(t.name == "stage-sampler" for t in threading.enumerate())
+
+
+class TestSamplingProfiler:
+    """采样剖析测试"""
+
+    def test_folded_stacks_rooted_at_stage(self):
+        profiler = SamplingProfiler(interval_ms=1)
+        profiler.set_label("测试 阶段")
+        profiler.start()
+        deadline = time.perf_counter() + 0.05
+        while time.perf_counter() < deadline:
+            sum(range(1000))
+        profiler.stop()
+
+        assert profiler.samples > 0
+        line = profiler.to_folded().splitlines()[0]
+        stack, count = line.rsplit(" ", 1)
+        assert stack.startswith("测试_阶段;")
+        assert int(count) > 0
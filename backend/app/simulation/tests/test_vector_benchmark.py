@@ -0,0 +1,156 @@
+"""
+Vector Benchmark Tests - 内存映射向量区测试
+
+在 NumPy 后备路径（关闭 Faiss）上验证 mmap 存储的增量写入、覆盖产生墓碑后的压缩、
+后台压缩期间的并发写入、存档/加载往返，以及基准脚本在小规模下可以跑通。
+"""
+
+import numpy as np
+import pytest
+
+from ...services.system import vector_store
+from ...services.system.vector_store import VectorStore
+from ..vector_benchmark import run_benchmark
+
+
+@pytest.fixture(params=[False, True], ids=["numpy", "faiss"])
+def faiss_enabled(request, monkeypatch):
+    if request.param and not vector_store.FAISS_AVAILABLE:
+        pytest.skip("faiss 未安装")
+    monkeypatch.setattr(vector_store, "FAISS_AVAILABLE", request.param)
+    return request.param
+
+
+def _vectors(n, dim=8, seed=0):
+    return np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+
+
+def _store(tmp_path, **kwargs):
+    kwargs.setdefault("segment_rows", 16)
+    kwargs.setdefault("compact_min_rows", 8)
+    kwargs.setdefault("background_compact", False)
+    return VectorStore(dimension=8, storage="mmap", arena_dir=tmp_path / "arena", **kwargs)
+
+
+def _unit(v):
+    return v / np.linalg.norm(v)
+
+
+class TestMmapStore:
+    """mmap 存储模式"""
+
+    def test_requires_arena_dir(self):
+        with pytest.raises(ValueError):
+            VectorStore(dimension=8, storage="mmap")
+        with pytest.raises(ValueError):
+            VectorStore(dimension=8, storage="disk")
+
+    def test_incremental_add_and_search(self, tmp_path, faiss_enabled):
+        store = _store(tmp_path)
+        data = _vectors(40)
+        for i in range(0, 40, 7):  # 批次跨越段边界
+            store.add_batch([f"s{j}" for j in range(i, min(i + 7, 40))], data[i:i + 7])
+
+        assert store.size == store.total_size == 40
+        assert np.allclose(store.get("s33"), _unit(data[33]), atol=1e-5)
+        results = store.search(data[21], top_k=3)
+        assert results[0].id == "s21"
+        assert results[0].score == pytest.approx(1.0, abs=1e-4)
+
+    def test_overwrite_compacts_and_keeps_results(self, tmp_path, faiss_enabled):
+        store = _store(tmp_path, compact_threshold=0.3)
+        data = _vectors(20)
+        ids = [f"s{i}" for i in range(20)]
+        store.add_batch(ids, data)
+
+        fresh = _vectors(10, seed=1)
+        store.add_batch(ids[:5], fresh[:5])
+        assert store.total_size == 25 and store.size == 20  # 覆盖的旧行成为墓碑
+        store.add_batch(ids[5:10], fresh[5:10])  # 10/30 > 0.3，触发压缩
+
+        stats = store.get_stats()
+        assert stats["compactions"] == 1 and stats["generation"] == 1
+        assert store.total_size == store.size == 20
+        assert np.allclose(store.get("s7"), _unit(fresh[7]), atol=1e-5)
+        assert store.search(fresh[3], top_k=1)[0].id == "s3"
+        assert store.search(data[15], top_k=1)[0].id == "s15"
+
+        assert store.remove("s15")
+        assert store.get("s15") is None
+        assert all(r.id != "s15" for r in store.search(data[15], top_k=20))
+
+    def test_save_load_roundtrip(self, tmp_path, faiss_enabled):
+        store = _store(tmp_path)
+        data = _vectors(30)
+        ids = [f"s{i}" for i in range(30)]
+        store.add_batch(ids, data, [{"i": i} for i in range(30)])
+        store.remove("s4")
+        store.compact()
+        store.add_batch(["s29"], _vectors(1, seed=2))
+        store.save(tmp_path / "store")
+
+        # 旧一代向量区在存档写出新头信息后清理
+        assert [p.name for p in (tmp_path / "arena").iterdir()] == ["gen_0001"]
+
+        loaded = VectorStore.load(tmp_path / "store")
+        assert loaded.storage == "mmap"
+        assert loaded.size == 29 and not loaded.contains("s4")
+        assert loaded._metadata["s10"] == {"i": 10}
+        for sid in ("s0", "s17", "s29"):
+            assert np.allclose(loaded.get(sid), store.get(sid), atol=1e-6)
+        assert loaded.search(data[17], top_k=1)[0].id == "s17"
+
+        loaded.add_batch(["new"], _vectors(1, seed=3))
+        assert loaded.contains("new") and loaded.size == 30
+
+    def test_background_compaction_merges_concurrent_writes(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(vector_store, "FAISS_AVAILABLE", False)
+        store = _store(tmp_path, compact_threshold=0.9)
+        data = _vectors(64)
+        store.add_batch([f"s{i}" for i in range(64)], data)
+        store.remove_batch([f"s{i}" for i in range(0, 64, 2)])
+
+        # 在复制阶段插入写入：切换时合并追加与删除
+        real_take = vector_store.VectorArena.take
+
+        def take_and_write(arena, indices):
+            out = real_take(arena, indices)
+            if not store.contains("late"):
+                store.add_batch(["late", "s1"], _vectors(2, seed=5))
+                store.remove("s3")
+            return out
+
+        monkeypatch.setattr(vector_store.VectorArena, "take", take_and_write)
+        assert store.compact(background=True)
+        store.wait_for_compaction(timeout=10)
+
+        assert store.get_stats()["generation"] == 1
+        assert not store.contains("s3") and store.contains("late")
+        assert store.size == 32 - 1 + 1
+        late, s1 = _vectors(2, seed=5)
+        assert store.search(late, top_k=1)[0].id == "late"
+        assert store.search(s1, top_k=1)[0].id == "s1"
+        assert store.search(data[63], top_k=1)[0].id == "s63"
+
+    def test_save_switch_keeps_storage_mode(self, tmp_path):
+        from ...services.system.embedding import EmbeddingService
+
+        service = EmbeddingService(cache_dir=tmp_path / "cache", vector_storage="mmap")
+        service.switch_to_save_context(tmp_path / "save")
+        store = service._vector_stores.get_store("events")
+        assert store.storage == "mmap"
+        assert store.arena_dir == tmp_path / "save" / "vectors" / "indexes" / "events.arena"
+
+
+def test_benchmark_small_run():
+    faiss_before = vector_store.FAISS_AVAILABLE
+    results = run_benchmark(vectors=600, dimension=16, batch=50, queries=20, churn=0.5)
+
+    assert [r.storage for r in results] == ["memory", "mmap"]
+    for r in results:
+        assert set(r.seconds) == {"add", "search", "churn", "save", "load"}
+        assert r.recall == 1.0
+        assert r.stats["size"] == 600
+    # 后备路径下 mmap 模式在覆盖后完成压缩
+    assert results[1].stats["compactions"] >= 1
+    assert vector_store.FAISS_AVAILABLE == faiss_before
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Vector Benchmark - VectorStore 存储模式基准
+
+在 Faiss 不可用的后备路径（NumPy 暴力搜索）上对比两种存储模式（临时目录，不触碰游戏数据）：
+- memory：向量常驻内存，每批追加重新拼接整个矩阵，存档为单个 .npy
+- mmap：向量追加到分段内存映射向量区，墓碑超过阈值时在后台压缩，
+        存档只写 ID 数组与头信息，加载时直接映射向量文件
+
+负载：
+- add：按批增量写入 N 个向量（模拟每回合新增物种/事件的嵌入）
+- search：Q 次 top-k 查询的延迟分布
+- churn：按批覆盖已有 ID（产生墓碑），mmap 模式会触发压缩
+- save / load：存档与重新加载耗时
+
+用法：
+    python -m app.simulation.vector_benchmark
+    python -m app.simulation.vector_benchmark --vectors 50000 --dimension 64 --batch 500 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+import numpy as np
+
+# 确保项目路径在 sys.path 中
+project_root = Path(__file__).parent.parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+
+# ============================================================================
+# 数据结构
+# ============================================================================
+
+@dataclass
+class StorageResult:
+    """一种存储模式下的基准结果"""
+    storage: str
+    seconds: Dict[str, float] = field(default_factory=dict)
+    search_latency_ms: Dict[str, float] = field(default_factory=dict)
+    stats: Dict[str, Any] = field(default_factory=dict)
+    recall: float = 1.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@contextmanager
+def numpy_fallback() -> Iterator[None]:
+    """临时关闭 Faiss，强制 VectorStore 走 NumPy 后备路径"""
+    from ..services.system import vector_store
+
+    previous = vector_store.FAISS_AVAILABLE
+    vector_store.FAISS_AVAILABLE = False
+    try:
+        yield
+    finally:
+        vector_store.FAISS_AVAILABLE = previous
+
+
+# ============================================================================
+# 负载
+# ============================================================================
+
+def _latency(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "p50": statistics.median(ordered),
+        "p99": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+        "max": ordered[-1],
+        "samples": len(ordered),
+    }
+
+
+def run_storage(
+    storage: str,
+    workdir: Path,
+    vectors: int,
+    dimension: int,
+    batch: int,
+    queries: int,
+    churn: float,
+    top_k: int = 10,
+    seed: int = 42,
+) -> StorageResult:
+    """在一种存储模式下依次运行 add / search / churn / save / load"""
+    from ..services.system.vector_store import VectorStore
+
+    rng = np.random.default_rng(seed)
+    data = rng.standard_normal((vectors, dimension)).astype(np.float32)
+    ids = [f"v{i}" for i in range(vectors)]
+    query_vecs = rng.standard_normal((queries, dimension)).astype(np.float32)
+    result = StorageResult(storage=storage)
+
+    store = VectorStore(
+        dimension=dimension,
+        storage=storage,
+        arena_dir=workdir / f"{storage}.arena" if storage == "mmap" else None,
+    )
+
+    start = time.perf_counter()
+    for i in range(0, vectors, batch):
+        store.add_batch(ids[i:i + batch], data[i:i + batch])
+    result.seconds["add"] = time.perf_counter() - start
+
+    samples = []
+    for q in query_vecs:
+        t0 = time.perf_counter()
+        store.search(q, top_k=top_k)
+        samples.append((time.perf_counter() - t0) * 1000)
+    result.seconds["search"] = sum(samples) / 1000
+    result.search_latency_ms = _latency(samples)
+
+    # 覆盖一部分 ID：旧行变为墓碑，mmap 模式超过阈值后压缩
+    churn_count = int(vectors * churn)
+    churn_idx = rng.choice(vectors, size=churn_count, replace=False)
+    data[churn_idx] = rng.standard_normal((churn_count, dimension)).astype(np.float32)
+    start = time.perf_counter()
+    for i in range(0, churn_count, batch):
+        chunk = churn_idx[i:i + batch]
+        store.add_batch([ids[j] for j in chunk], data[chunk])
+    store.wait_for_compaction()
+    result.seconds["churn"] = time.perf_counter() - start
+
+    path = workdir / f"{storage}_store"
+    start = time.perf_counter()
+    store.save(path)
+    result.seconds["save"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    loaded = VectorStore.load(path)
+    result.seconds["load"] = time.perf_counter() - start
+
+    # 重新加载后的结果与暴力计算一致
+    normed = data / np.maximum(np.linalg.norm(data, axis=1, keepdims=True), 1e-12)
+    hits = 0
+    checked = query_vecs[: min(queries, 20)]
+    for q in checked:
+        q = q / max(np.linalg.norm(q), 1e-12)
+        expected = {ids[j] for j in np.argsort(-(normed @ q))[:top_k]}
+        hits += len(expected & {r.id for r in loaded.search(q, top_k=top_k)})
+    result.recall = hits / max(len(checked) * top_k, 1)
+
+    stats = store.get_stats()
+    result.stats = {
+        key: stats[key]
+        for key in ("size", "total_size", "tombstone_ratio", "generation", "compactions", "memory_mb")
+        if key in stats
+    }
+    return result
+
+
+def run_benchmark(
+    vectors: int = 20000,
+    dimension: int = 64,
+    batch: int = 200,
+    queries: int = 200,
+    churn: float = 0.5,
+    seed: int = 42,
+) -> List[StorageResult]:
+    """在 NumPy 后备路径上依次运行 memory 与 mmap 两种存储模式"""
+    results = []
+    with numpy_fallback(), tempfile.TemporaryDirectory(prefix="clade-vector-bench-") as tmp:
+        for storage in ("memory", "mmap"):
+            results.append(run_storage(
+                storage, Path(tmp), vectors, dimension, batch, queries, churn, seed=seed,
+            ))
+    return results
+
+
+def format_results(results: List[StorageResult]) -> str:
+    base, *_ = results
+    lines = [f"{'负载':<10}" + "".join(f"{r.storage:>12}" for r in results) + f"{'加速':>10}"]
+    lines.append("-" * len(lines[0]))
+    for workload in base.seconds:
+        values = [r.seconds[workload] * 1000 for r in results]
+        speedup = values[0] / max(values[-1], 1e-9)
+        lines.append(f"{workload:<10}" + "".join(f"{v:>10.1f}ms" for v in values) + f"{speedup:>9.1f}x")
+    for r in results:
+        lat = r.search_latency_ms
+        lines.append(f"[{r.storage}] 查询延迟 p50={lat['p50']:.2f}ms p99={lat['p99']:.2f}ms "
+                     f"max={lat['max']:.2f}ms，召回 {r.recall:.0%}，{r.stats}")
+    return "\n".join(lines)
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="vector-benchmark",
+        description="VectorStore 基准（NumPy 后备路径：内存存储 vs 内存映射向量区）",
+    )
+    parser.add_argument("--vectors", type=int, default=20000, help="向量数")
+    parser.add_argument("--dimension", type=int, default=64, help="向量维度")
+    parser.add_argument("--batch", type=int, default=200, help="每批写入的向量数")
+    parser.add_argument("--queries", type=int, default=200, help="查询次数")
+    parser.add_argument("--churn", type=float, default=0.5, help="被覆盖的向量比例")
+    parser.add_argument("-s", "--seed", type=int, default=42, help="随机种子")
+    parser.add_argument("--json", action="store_true", help="输出 JSON")
+    return parser
+
+
+def main() -> int:
+    args = create_parser().parse_args()
+    results = run_benchmark(
+        vectors=args.vectors, dimension=args.dimension, batch=args.batch,
+        queries=args.queries, churn=args.churn, seed=args.seed,
+    )
+    if args.json:
+        print(json.dumps([r.to_dict() for r in results], ensure_ascii=False, indent=2))
+    else:
+        print(format_results(results))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,7 @@ Tensor utilities and state containers.
 
 张量计算系统的核心模块，提供：
 - TensorState: 统一的张量状态容器
+- TensorStateManager: 跨回合增量更新的张量状态
 - SpeciationMonitor: 张量分化信号检测器
 - SpeciationTrigger: 分化触发信号数据结构
 - TradeoffCalculator: 自动代价计算器
@@ -10,6 +11,8 @@ Tensor utilities and state containers.
 - TensorMetrics: 性能监控指标
 - TensorMetricsCollector: 指标收集器
 - HybridCompute: NumPy + Taichi 混合计算引擎
+- DeviceBufferPool: Taichi 设备常驻缓冲池（内核间免拷贝串联）
+- SpeciesFrame: 物种列式存储（特质/种群/食性按列切片）
 - PressureToTensorBridge: 压力→张量桥接器
 - MultiFactorMortality: 多因子死亡率计算器
 - TensorMigrationEngine: GPU 加速的张量迁徙引擎
@@ -38,11 +41,12 @@ from .metrics import (
     reset_global_collector,
 )
 from .speciation_monitor import SpeciationMonitor, SpeciationTrigger
-from .state import TensorState
+from .state import TensorState, TensorStateManager
 from .tradeoff import TradeoffCalculator
 
 # 混合计算引擎（NumPy + Taichi）
 from .hybrid import HybridCompute, get_compute, reset_compute
+from .device_buffers import DeviceBufferPool
 
 # 压力-张量桥接
 from .pressure_bridge import (
@@ -75,6 +79,9 @@ from .hybridization_tensor import (
     reset_hybridization_tensor_compute,
 )
 
+# 物种列式存储
+from .species_frame import SpeciesFrame, get_species_frame
+
 # 统一张量生态计算引擎（整合死亡率、扩散、迁徙）
 from .ecology import (
     TensorEcologyEngine,
@@ -110,6 +117,7 @@ from .suitability import (
 __all__ = [
     # 核心数据结构
     "TensorState",
+    "TensorStateManager",
     "TensorConfig",
     "TensorBalanceConfig",
     "TradeoffConfig",
@@ -127,6 +135,7 @@ __all__ = [
     "HybridCompute",
     "get_compute",
     "reset_compute",
+    "DeviceBufferPool",
     # 压力-张量桥接
     "PressureChannel",
     "PressureTensorOverlay",
@@ -149,6 +158,9 @@ __all__ = [
     "HybridCandidate",
     "get_hybridization_tensor_compute",
     "reset_hybridization_tensor_compute",
+    # 物种列式存储
+    "SpeciesFrame",
+    "get_species_frame",
     # 统一张量生态计算引擎
     "TensorEcologyEngine",
     "EcologyConfig",
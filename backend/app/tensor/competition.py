@@ -7,7 +7,8 @@
 2. 竞争矩阵：Taichi GPU并行，O(S²) 全并行
 3. 亲缘矩阵：预处理后GPU并行计算
 
-内核定义在 taichi_hybrid_kernels.py 中（需要在Taichi初始化后定义）
+内核定义在 taichi_hybrid_kernels.py 中，首次计算时通过 taichi_runtime 延迟加载
+（导入本模块不会初始化 Taichi）
 """
 
 from __future__ import annotations
@@ -19,10 +20,18 @@ from typing import TYPE_CHECKING, Sequence
 
 import numpy as np
 
-# 导入Taichi内核（GPU-only 模式）
-import taichi as ti
-from . import taichi_hybrid_kernels as _kernels
-TAICHI_AVAILABLE = True  # GPU-only: 如果导入失败会直接抛出错误
+# Taichi 内核（GPU-only 模式，首次计算时加载）
+_kernels = None
+TAICHI_AVAILABLE = True  # GPU-only: 如果加载失败会直接抛出错误
+
+
+def _load_kernels():
+    """加载 Taichi 内核并确保运行时已初始化"""
+    global _kernels
+    if _kernels is None:
+        from .taichi_runtime import load_kernels
+        _kernels = load_kernels()
+    return _kernels
 
 if TYPE_CHECKING:
     from ..models.species import Species
@@ -90,6 +99,8 @@ class TensorCompetitionCalculator:
         if not TAICHI_AVAILABLE:
             raise RuntimeError("[GPU-only] Taichi GPU 不可用，请检查 GPU 驱动")
         
+        kernels = _load_kernels()
+        
         # ========== 1. 提取物种数据 ==========
         data = self._extract_species_data(species_list)
         
@@ -111,7 +122,7 @@ class TensorCompetitionCalculator:
         )
         
         # 同步GPU
-        ti.sync()
+        kernels.ti.sync()
         
         logger.info(
             f"[张量竞争-GPU] n={n}, fitness: [{fitness.min():.2f}, {fitness.max():.2f}], "
@@ -0,0 +1,203 @@
+"""
+Taichi 设备常驻缓冲池
+
+内核参数均为 ti.types.ndarray()，传入 NumPy 数组时 GPU 后端每次调用都会
+做一次 host→device→host 往返拷贝。本模块为生态计算提供持久化的 ti.ndarray：
+
+- 按名称缓存设备缓冲，形状不变时跨回合复用（物种数只在分化/灭绝时变化）
+- 内核之间直接传递设备缓冲，只在需要 NumPy 后处理时才下载
+- 同一张量（如宜居度）在一次计算中只上传一次，被多个内核共享
+- 上传可附带版本号：缓冲中已是同一版本的数据时跳过上传（物种特质、距离权重等）
+
+CPU 后端（x64/arm64）上 NumPy 数组按指针直接传给内核，本身没有拷贝；
+此时缓冲池退化为“主机模式”：输入原样透传，输出每次新分配 NumPy 数组，
+保证返回值不与池内缓冲别名。
+
+注意：内核循环边界取自 ndarray.shape，因此缓冲按精确形状分配，
+不能像容器那样按容量预留多余行。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import Any, Hashable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 主机架构：外部数组零拷贝传入内核，无需设备常驻
+_HOST_ARCH_NAMES = frozenset({"x64", "arm64", "cpu"})
+
+
+def is_device_arch() -> bool:
+    """当前 Taichi 运行时是否为独立显存的 GPU 后端"""
+    try:
+        from taichi.lang import impl
+
+        arch = impl.current_cfg().arch
+    except Exception:
+        return False
+    return getattr(arch, "name", str(arch)) not in _HOST_ARCH_NAMES
+
+
+def is_device_buffer(value: Any) -> bool:
+    """是否为 Taichi ndarray（已在设备上）"""
+    try:
+        import taichi as ti
+    except ImportError:
+        return False
+    return isinstance(value, ti.Ndarray)
+
+
+def content_version(array: np.ndarray) -> str:
+    """按内容计算上传版本号（适合物种特质等小矩阵）"""
+    array = np.ascontiguousarray(array)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str((array.shape, array.dtype.str)).encode())
+    digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+@dataclass
+class BufferPoolStats:
+    """缓冲池统计"""
+    allocations: int = 0
+    reuses: int = 0
+    uploads: int = 0
+    skipped_uploads: int = 0
+    downloads: int = 0
+    upload_bytes: int = 0
+    download_bytes: int = 0
+
+    def to_dict(self) -> dict[str, int]:
+        return {
+            "allocations": self.allocations,
+            "reuses": self.reuses,
+            "uploads": self.uploads,
+            "skipped_uploads": self.skipped_uploads,
+            "downloads": self.downloads,
+            "upload_bytes": self.upload_bytes,
+            "download_bytes": self.download_bytes,
+        }
+
+
+class DeviceBufferPool:
+    """持久化 Taichi 设备缓冲池
+
+    Args:
+        device_resident: True 使用 ti.ndarray 常驻缓冲；False 为主机模式；
+            None 根据当前 Taichi 架构自动选择
+    """
+
+    def __init__(self, device_resident: bool | None = None):
+        self.device_resident = is_device_arch() if device_resident is None else device_resident
+        self._buffers: dict[str, Any] = {}
+        self._versions: dict[str, Hashable] = {}  # 缓冲名 -> 当前内容的上传版本
+        self._reset_registered = False
+        self.stats = BufferPoolStats()
+
+    # ------------------------------------------------------------------
+    # 分配
+    # ------------------------------------------------------------------
+
+    def scratch(
+        self,
+        name: str,
+        shape: tuple[int, ...],
+        dtype: Any = np.float32,
+        zero: bool = True,
+    ) -> Any:
+        """获取内核输出缓冲
+
+        设备模式下复用同名同形状的缓冲；主机模式下每次新分配。
+        """
+        shape = tuple(int(d) for d in shape)
+        if not self.device_resident:
+            self.stats.allocations += 1
+            return np.zeros(shape, dtype=dtype) if zero else np.empty(shape, dtype=dtype)
+
+        import taichi as ti
+
+        if not self._reset_registered:
+            # 分配 ndarray 前运行时必须已初始化（启动时延迟初始化）；
+            # 运行时重置（离线缓存落盘）后旧 ndarray 失效
+            from .taichi_runtime import get_taichi_runtime
+
+            runtime = get_taichi_runtime()
+            runtime.ensure_initialized()
+            runtime.add_reset_listener(self.clear)
+            self._reset_registered = True
+        ti_dtype = ti.i32 if np.dtype(dtype) == np.int32 else ti.f32
+        self._versions.pop(name, None)  # 缓冲将被内核或新上传覆盖
+        buf = self._buffers.get(name)
+        if buf is not None and tuple(buf.shape) == shape and buf.dtype == ti_dtype:
+            self.stats.reuses += 1
+        else:
+            buf = ti.ndarray(ti_dtype, shape=shape)
+            self._buffers[name] = buf
+            self.stats.allocations += 1
+            zero = False  # 新分配的 ndarray 已清零
+        if zero:
+            buf.fill(0)
+        return buf
+
+    def upload(
+        self, name: str, array: Any, dtype: Any = np.float32, version: Hashable | None = None
+    ) -> Any:
+        """把 NumPy 数组放到内核可用的位置
+
+        已是设备缓冲时原样返回；主机模式下只做必要的 dtype/连续性转换。
+        version 与缓冲中数据的版本相同时直接复用设备缓冲，不再上传。
+        """
+        if is_device_buffer(array):
+            return array
+        if not self.device_resident:
+            return np.ascontiguousarray(array, dtype=dtype)
+        if version is not None and name in self._buffers and self._versions.get(name) == version:
+            self.stats.skipped_uploads += 1
+            return self._buffers[name]
+        host = np.ascontiguousarray(array, dtype=dtype)
+        buf = self.scratch(name, host.shape, dtype=dtype, zero=False)
+        buf.from_numpy(host)
+        if version is not None:
+            self._versions[name] = version
+        self.stats.uploads += 1
+        self.stats.upload_bytes += host.nbytes
+        return buf
+
+    def to_host(self, value: Any) -> np.ndarray:
+        """取回 NumPy 数组（设备缓冲会被下载为新数组，不与池内缓冲别名）"""
+        if not is_device_buffer(value):
+            return value
+        host = value.to_numpy()
+        self.stats.downloads += 1
+        self.stats.download_bytes += host.nbytes
+        return host
+
+    # ------------------------------------------------------------------
+    # 管理
+    # ------------------------------------------------------------------
+
+    @property
+    def resident_bytes(self) -> int:
+        total = 0
+        for buf in self._buffers.values():
+            total += int(np.prod(buf.shape)) * 4
+        return total
+
+    def clear(self) -> None:
+        """释放所有常驻缓冲（地图尺寸变化或新游戏时调用）"""
+        self._buffers.clear()
+        self._versions.clear()
+        self.stats = BufferPoolStats()
+
+    def describe(self) -> dict[str, Any]:
+        return {
+            "device_resident": self.device_resident,
+            "buffers": len(self._buffers),
+            "resident_bytes": self.resident_bytes,
+            **self.stats.to_dict(),
+        }
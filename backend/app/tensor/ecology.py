@@ -43,8 +43,11 @@ from typing import TYPE_CHECKING, Optional, Sequence
 
 import numpy as np
 
+from .device_buffers import DeviceBufferPool, content_version
+
 if TYPE_CHECKING:
     from ..models.species import Species
+    from .species_frame import SpeciesFrame
     from .state import TensorState
 
 logger = logging.getLogger(__name__)
@@ -62,8 +65,8 @@ def _load_ecology_kernels():
         return _taichi_available
     
     try:
-        from . import taichi_hybrid_kernels as kernels
-        _taichi_kernels = kernels
+        from .taichi_runtime import load_kernels
+        _taichi_kernels = load_kernels()
         _taichi_available = True
         logger.info("[TensorEcology] Taichi GPU 内核已加载")
         return True
@@ -155,6 +158,10 @@ class EcologyConfig:
     # 容量归一上限
     overcapacity_birth_clamp: float = 0.5   # 超容量时繁殖放大系数钳制
     overcapacity_threshold: float = 1.2     # 超容量触发阈值（容量的倍数）
+    
+    # === 设备缓冲 ===
+    # None=按 Taichi 架构自动选择（GPU 常驻，CPU 零拷贝透传）
+    device_resident_buffers: bool | None = None
 
 
 @dataclass
@@ -231,8 +238,17 @@ class TensorEcologyEngine:
         if not self._taichi_ready:
             raise RuntimeError("[GPU-only] Taichi GPU 初始化失败，无 NumPy fallback")
         
+        # 内核间传递的常驻缓冲（跨回合复用）
+        self._buffers = DeviceBufferPool(self.config.device_resident_buffers)
+        self._migration_calls = 0  # 距离权重的上传版本（每次迁徙计算一个新版本）
+        
         logger.info("[TensorEcology] 使用 Taichi GPU 加速")
     
+    @property
+    def buffers(self) -> DeviceBufferPool:
+        """设备缓冲池"""
+        return self._buffers
+    
     @property
     def backend(self) -> str:
         """当前计算后端 - GPU-only 模式始终为 taichi"""
@@ -291,9 +307,7 @@ class TensorEcologyEngine:
         if turn_years is None:
             turn_years = self.config.turn_years
         
-        # 同步 Taichi 运行时（确保与主线程编译的内核兼容）
         import taichi as ti
-        ti.sync()
         
         metrics = EcologyMetrics(
             species_count=S,
@@ -302,16 +316,16 @@ class TensorEcologyEngine:
             total_population_before=float(pop.sum()),
         )
         
-        # 确保数据类型
-        pop = pop.astype(np.float32)
-        env = env.astype(np.float32)
-        species_params = species_params.astype(np.float32)
-        species_prefs = species_prefs.astype(np.float32)
+        # 确保数据类型（已是 float32 时不复制）
+        pop = np.asarray(pop, dtype=np.float32)
+        env = np.asarray(env, dtype=np.float32)
+        species_params = np.asarray(species_params, dtype=np.float32)
+        species_prefs = np.asarray(species_prefs, dtype=np.float32)
         
         if trophic_levels is None:
             trophic_levels = np.ones(S, dtype=np.float32)
         else:
-            trophic_levels = trophic_levels.astype(np.float32)
+            trophic_levels = np.asarray(trophic_levels, dtype=np.float32)
         
         if cooldown_mask is None:
             cooldown_mask = np.ones(S, dtype=bool)
@@ -325,7 +339,7 @@ class TensorEcologyEngine:
         # 【新】处理特质矩阵
         use_trait_system = species_traits is not None
         if use_trait_system:
-            species_traits = species_traits.astype(np.float32)
+            species_traits = np.asarray(species_traits, dtype=np.float32)
         
         # 获取时代缩放因子
         era_scaling = self._get_era_scaling(turn_index)
@@ -418,36 +432,46 @@ class TensorEcologyEngine:
         elif species_params.shape[1] >= 4:
             growth_rates = np.clip(species_params[:, 3], 0.0, 5.0).astype(np.float32)
         
+        # 设备缓冲：宜居度、环境、物种参数在本次计算中只上传一次，被各内核共享
+        buffers = self._buffers
+        env_k = buffers.upload("env", self._pad_env(env))
+        
         # === 阶段1：宜居度计算（先于死亡率）===
         t0 = time.perf_counter()
         if use_trait_system:
+            traits_k = buffers.upload("species_traits", species_traits, version=content_version(species_traits))
             # 使用精确特质匹配
-            suitability = self._compute_trait_suitability_tensor(env, species_traits)
+            suitability = self._compute_trait_suitability_tensor(env_k, traits_k)
         else:
+            traits_k = None
             # 使用旧的简化匹配
-            suitability = self._compute_suitability_tensor(env, species_prefs)
+            suitability = self._compute_suitability_tensor(env_k, species_prefs)
         
         # === 阶段2：死亡率计算 ===
         # 【v3.1】使用独立的 mortality_scale（带上限）
+        pop_k = buffers.upload("pop", pop)
         if use_trait_system:
-            mortality_rates = self._compute_trait_mortality_tensor(
-                pop, env, species_traits, suitability, pressure_overlay, era_scaling, 
+            mortality_k = self._compute_trait_mortality_tensor(
+                pop_k, env_k, traits_k, suitability, pressure_overlay, era_scaling, 
                 mortality_scale  # 使用缓冲后的 mortality_scale
             )
         else:
-            mortality_rates = self._compute_mortality_tensor(
-                pop, env, species_params, species_prefs, 
+            mortality_k = self._compute_mortality_tensor(
+                pop_k, env_k, species_params, species_prefs, 
                 trophic_levels, pressure_overlay, era_scaling, 
                 mortality_scale  # 使用缓冲后的 mortality_scale
             )
+        # 内核已将有种群格子钳制在 [0.02, 0.95]，主机端钳制只影响空格子
+        mortality_rates = np.clip(buffers.to_host(mortality_k), 0.01, 0.95).astype(np.float32, copy=False)
         metrics.mortality_time_ms = (time.perf_counter() - t0) * 1000
         
-        # 应用死亡率
-        pop_after_death = self._apply_mortality_tensor(pop, mortality_rates)
+        # 应用死亡率（结果留在设备上，直接进入扩散）
+        pop_after_death = self._apply_mortality_tensor(pop_k, mortality_k)
         
-        # 计算死亡统计
-        death_counts = (pop - pop_after_death).sum(axis=(1, 2))
-        survivor_counts = pop_after_death.sum(axis=(1, 2))
+        # 计算死亡统计（与 kernel_apply_mortality 同式，避免下载中间结果）
+        survivors = pop * (1.0 - mortality_rates)
+        death_counts = (pop - survivors).sum(axis=(1, 2))
+        survivor_counts = survivors.sum(axis=(1, 2))
         metrics.avg_mortality_rate = float(mortality_rates[pop > 0].mean()) if (pop > 0).any() else 0.0
         
         # === 阶段3：扩散计算 ===
@@ -470,18 +494,23 @@ class TensorEcologyEngine:
             cfg.base_diffusion_rate * mean_diffusion_scale
         )
         
-        pop_after_dispersal = pop_after_death.copy()
+        # 多轮扩散在两块常驻缓冲间交替读写
+        pop_after_dispersal = pop_after_death
         for disp_iter in range(dispersal_iterations):
+            out_name = f"dispersal_{disp_iter % 2}"
             if use_trait_system:
                 pop_after_dispersal = self._compute_trait_dispersal_tensor(
-                    pop_after_dispersal, suitability, species_traits, env, 
-                    era_scaling, diffusion_scale, adjusted_diffusion_rate
+                    pop_after_dispersal, suitability, traits_k, env_k, 
+                    era_scaling, diffusion_scale, adjusted_diffusion_rate,
+                    out_name=out_name,
                 )
             else:
                 pop_after_dispersal = self._compute_dispersal_tensor(
                     pop_after_dispersal, suitability, era_scaling,
-                    diffusion_scale, adjusted_diffusion_rate
+                    diffusion_scale, adjusted_diffusion_rate,
+                    out_name=out_name,
                 )
+        pop_after_dispersal = buffers.to_host(pop_after_dispersal)
         
         if dispersal_iterations > 1:
             logger.debug(f"[TensorEcology] 扩散迭代 {dispersal_iterations} 次")
@@ -503,7 +532,8 @@ class TensorEcologyEngine:
             species_death_rates, trophic_levels, cooldown_mask, era_scaling,
             resource_pressure, growth_rates, species_mobility,
             mortality_rates, external_bonus, decline_streaks,
-            turn_index, migration_scale  # 【v3.1】使用缓冲后的 migration_scale
+            turn_index, migration_scale,  # 【v3.1】使用缓冲后的 migration_scale
+            env_kernel=env_k,
         )
         metrics.migration_time_ms = (time.perf_counter() - t0) * 1000
         metrics.migrating_species = len(migrated)
@@ -532,12 +562,13 @@ class TensorEcologyEngine:
         if use_trait_system:
             # 使用基于特质的竞争系统
             final_pop = self._compute_trait_competition_tensor(
-                pop_after_reproduction, suitability, species_traits, era_scaling
+                pop_after_reproduction, suitability, traits_k, era_scaling
             )
         else:
             final_pop = self._compute_competition_tensor(
                 pop_after_reproduction, suitability, era_scaling
             )
+        final_pop = buffers.to_host(final_pop)
         metrics.competition_time_ms = (time.perf_counter() - t0) * 1000
         
         # === 阶段7：净变化钳制 ===
@@ -581,27 +612,44 @@ class TensorEcologyEngine:
             metrics=metrics,
         )
     
+    def _pad_env(self, env):
+        """补齐环境张量到内核所需的 7 个通道（设备缓冲原样返回）"""
+        if not isinstance(env, np.ndarray):
+            return env
+        C, H, W = env.shape
+        if C >= 7:
+            return env
+        padded_env = np.zeros((7, H, W), dtype=np.float32)
+        padded_env[:C] = env
+        if C <= 4:
+            padded_env[4] = 1.0  # 默认陆地
+        return padded_env
+    
     # ========================================================================
     # 张量化死亡率计算
     # ========================================================================
     
     def _compute_mortality_tensor(
         self,
-        pop: np.ndarray,
-        env: np.ndarray,
+        pop,
+        env,
         species_params: np.ndarray,
         species_prefs: np.ndarray,
         trophic_levels: np.ndarray,
         pressure_overlay: np.ndarray | None,
         era_scaling: float,
         mortality_scale: np.ndarray | None = None,
-    ) -> np.ndarray:
+    ):
         """张量化多因子死亡率计算 - GPU 加速
         
         【v3.1】使用缓冲后的 mortality_scale（已带上限）
+        
+        Returns:
+            死亡率缓冲 (S, H, W)，内核已钳制到 [0.02, 0.95]
         """
         S, H, W = pop.shape
         cfg = self.config
+        buffers = self._buffers
         
         # 确保压力叠加层存在
         if pressure_overlay is None:
@@ -609,30 +657,18 @@ class TensorEcologyEngine:
         
         # 准备 mortality_scale（已在上层计算时带上限）
         if mortality_scale is None:
-            mortality_scale_arr = np.ones(S, dtype=np.float32)
-        else:
-            mortality_scale_arr = mortality_scale.astype(np.float32)
+            mortality_scale = np.ones(S, dtype=np.float32)
         
         # === Taichi GPU 计算 ===
-        result = np.zeros((S, H, W), dtype=np.float32)
-        
-        # 确保环境张量有足够的通道
-        C = env.shape[0]
-        if C < 7:
-            padded_env = np.zeros((7, H, W), dtype=np.float32)
-            padded_env[:C] = env
-            if C <= 4:
-                padded_env[4] = 1.0  # 默认陆地
-            env = padded_env
-        
+        result = buffers.scratch("mortality", (S, H, W))
         _taichi_kernels.kernel_multifactor_mortality_v2(
-            pop.astype(np.float32),
-            env.astype(np.float32),
-            species_prefs.astype(np.float32),
-            species_params.astype(np.float32),
-            trophic_levels.astype(np.float32),
-            pressure_overlay.astype(np.float32),
-            mortality_scale_arr,  # 【v3.1】使用缓冲后的 mortality_scale
+            buffers.upload("pop", pop),
+            buffers.upload("env", self._pad_env(env)),
+            buffers.upload("species_prefs", species_prefs),
+            buffers.upload("species_params", species_params),
+            buffers.upload("trophic_levels", trophic_levels),
+            buffers.upload("pressure_overlay", pressure_overlay),
+            buffers.upload("mortality_scale", mortality_scale),  # 【v3.1】使用缓冲后的 mortality_scale
             result,
             float(cfg.base_mortality),
             float(cfg.temp_mortality_weight),
@@ -641,21 +677,15 @@ class TensorEcologyEngine:
             float(cfg.capacity_multiplier),
             float(era_scaling),
         )
-        
-        total_mortality = result
-        
-        return np.clip(total_mortality, 0.01, 0.95).astype(np.float32)
+        return result
     
-    def _apply_mortality_tensor(
-        self,
-        pop: np.ndarray,
-        mortality: np.ndarray,
-    ) -> np.ndarray:
+    def _apply_mortality_tensor(self, pop, mortality):
         """应用死亡率 [Taichi GPU]"""
-        result = np.zeros_like(pop, dtype=np.float32)
+        buffers = self._buffers
+        result = buffers.scratch("pop_after_death", pop.shape)
         _taichi_kernels.kernel_apply_mortality(
-            pop.astype(np.float32),
-            mortality.astype(np.float32),
+            buffers.upload("pop", pop),
+            buffers.upload("mortality", mortality),
             result,
         )
         return result
@@ -664,77 +694,60 @@ class TensorEcologyEngine:
     # 张量化扩散计算
     # ========================================================================
     
-    def _compute_suitability_tensor(
-        self,
-        env: np.ndarray,
-        species_prefs: np.ndarray,
-    ) -> np.ndarray:
+    def _compute_suitability_tensor(self, env, species_prefs: np.ndarray):
         """计算适宜度矩阵 [Taichi GPU]"""
         S = species_prefs.shape[0]
-        C, H, W = env.shape
+        _, H, W = env.shape
+        buffers = self._buffers
         
-        # 确保环境张量有足够的通道
-        if C < 7:
-            padded_env = np.zeros((7, H, W), dtype=np.float32)
-            padded_env[:C] = env
-            if C <= 4:
-                padded_env[4] = 1.0  # 默认陆地
-            env = padded_env
-        
-        habitat_mask = np.ones((S, H, W), dtype=np.float32)
-        result = np.zeros((S, H, W), dtype=np.float32)
+        habitat_mask = buffers.scratch("habitat_mask", (S, H, W), zero=False)
+        habitat_mask.fill(1.0)
+        result = buffers.scratch("suitability", (S, H, W))
         _taichi_kernels.kernel_compute_suitability(
-            env.astype(np.float32),
-            species_prefs.astype(np.float32),
+            buffers.upload("env", self._pad_env(env)),
+            buffers.upload("species_prefs", species_prefs),
             habitat_mask,
             result,
         )
         return result
     
-    def _compute_trait_suitability_tensor(
-        self,
-        env: np.ndarray,
-        species_traits: np.ndarray,
-    ) -> np.ndarray:
+    def _compute_trait_suitability_tensor(self, env, species_traits):
         """计算基于特质的精确适宜度矩阵 [Taichi GPU]
         
         【新】使用完整特质矩阵进行精确环境-特质匹配
         """
         S = species_traits.shape[0]
-        C, H, W = env.shape
+        _, H, W = env.shape
+        buffers = self._buffers
         
-        # 确保环境张量有足够的通道
-        if C < 7:
-            padded_env = np.zeros((7, H, W), dtype=np.float32)
-            padded_env[:C] = env
-            if C <= 4:
-                padded_env[4] = 1.0  # 默认陆地
-            env = padded_env
-        
-        result = np.zeros((S, H, W), dtype=np.float32)
+        result = buffers.scratch("suitability", (S, H, W))
         _taichi_kernels.kernel_compute_trait_suitability(
-            env.astype(np.float32),
-            species_traits.astype(np.float32),
+            buffers.upload("env", self._pad_env(env)),
+            buffers.upload("species_traits", species_traits, version=content_version(species_traits)),
             result,
         )
         return result
     
     def _compute_trait_mortality_tensor(
         self,
-        pop: np.ndarray,
-        env: np.ndarray,
-        species_traits: np.ndarray,
-        suitability: np.ndarray,
+        pop,
+        env,
+        species_traits,
+        suitability,
         pressure_overlay: np.ndarray | None,
         era_scaling: float,
         mortality_scale: np.ndarray | None = None,
-    ) -> np.ndarray:
+    ):
         """基于特质的精确死亡率计算 [Taichi GPU]
         
         【v3.1】使用缓冲后的 mortality_scale（已带上限）
+        
+        Returns:
+            死亡率缓冲 (S, H, W)，有种群格子已钳制到 [0.02, 0.95]
         """
         S, H, W = pop.shape
         cfg = self.config
+        buffers = self._buffers
         
         # 确保压力叠加层存在
         if pressure_overlay is None:
@@ -742,50 +755,42 @@ class TensorEcologyEngine:
         
         # 准备 mortality_scale
         if mortality_scale is None:
-            mortality_scale_arr = np.ones(S, dtype=np.float32)
-        else:
-            mortality_scale_arr = mortality_scale.astype(np.float32)
+            mortality_scale = np.ones(S, dtype=np.float32)
         
-        # 确保环境张量有足够的通道
-        C = env.shape[0]
-        if C < 7:
-            padded_env = np.zeros((7, H, W), dtype=np.float32)
-            padded_env[:C] = env
-            if C <= 4:
-                padded_env[4] = 1.0
-            env = padded_env
-        
-        result = np.zeros((S, H, W), dtype=np.float32)
+        result = buffers.scratch("mortality", (S, H, W))
         _taichi_kernels.kernel_trait_mortality_v2(
-            pop.astype(np.float32),
-            env.astype(np.float32),
-            species_traits.astype(np.float32),
-            suitability.astype(np.float32),
-            pressure_overlay.astype(np.float32),
-            mortality_scale_arr,  # 【v3.1】使用缓冲后的 mortality_scale
+            buffers.upload("pop", pop),
+            buffers.upload("env", self._pad_env(env)),
+            buffers.upload("species_traits", species_traits, version=content_version(species_traits)),
+            buffers.upload("suitability", suitability),
+            buffers.upload("pressure_overlay", pressure_overlay),
+            buffers.upload("mortality_scale", mortality_scale),  # 【v3.1】使用缓冲后的 mortality_scale
             result,
             float(cfg.base_mortality),
             float(era_scaling),
         )
-        
-        return np.clip(result, 0.01, 0.95).astype(np.float32)
+        return result
     
     def _compute_trait_dispersal_tensor(
         self,
-        pop: np.ndarray,
-        suitability: np.ndarray,
-        species_traits: np.ndarray,
-        env: np.ndarray,
+        pop,
+        suitability,
+        species_traits,
+        env,
         era_scaling: float,
         diffusion_scale: np.ndarray | None = None,
         override_diffusion_rate: float | None = None,
-    ) -> np.ndarray:
+        out_name: str = "dispersal_0",
+    ):
         """基于特质的扩散计算 [Taichi GPU]
         
         【v3.1】使用缓冲后的 diffusion_scale + 背景扩散 + 栖息地连通性检查
+        
+        out_name 指定输出缓冲名；多轮迭代时交替使用两个名字避免读写同一缓冲。
         """
         cfg = self.config
         S = pop.shape[0]
+        buffers = self._buffers
         
         # 时代缩放
         effective_scaling = max(1.0, era_scaling ** 0.5)
@@ -795,28 +800,17 @@ class TensorEcologyEngine:
         else:
             diffusion_rate = min(cfg.max_diffusion_rate, cfg.base_diffusion_rate * effective_scaling)
         
-        # 确保环境张量有足够的通道
-        C, H, W = env.shape
-        if C < 7:
-            padded_env = np.zeros((7, H, W), dtype=np.float32)
-            padded_env[:C] = env
-            if C <= 4:
-                padded_env[4] = 1.0  # 默认陆地
-            env = padded_env
-        
         # 准备 diffusion_scale（已在上层计算时带上限）
         if diffusion_scale is None:
-            diffusion_scale_arr = np.ones(S, dtype=np.float32)
-        else:
-            diffusion_scale_arr = diffusion_scale.astype(np.float32)
+            diffusion_scale = np.ones(S, dtype=np.float32)
         
-        result = np.zeros_like(pop, dtype=np.float32)
+        result = buffers.scratch(out_name, pop.shape)
         _taichi_kernels.kernel_trait_diffusion_v2(
-            pop.astype(np.float32),
-            suitability.astype(np.float32),
-            species_traits.astype(np.float32),
-            env.astype(np.float32),
-            diffusion_scale_arr,  # 【v3.1】使用缓冲后的 diffusion_scale
+            buffers.upload(f"{out_name}_in", pop),
+            buffers.upload("suitability", suitability),
+            buffers.upload("species_traits", species_traits, version=content_version(species_traits)),
+            buffers.upload("env", self._pad_env(env)),
+            buffers.upload("diffusion_scale", diffusion_scale),  # 【v3.1】使用缓冲后的 diffusion_scale
             result,
             float(diffusion_rate),
             float(cfg.background_diffusion_rate),
@@ -827,42 +821,46 @@ class TensorEcologyEngine:
     
     def _compute_trait_competition_tensor(
         self,
-        pop: np.ndarray,
-        suitability: np.ndarray,
-        species_traits: np.ndarray,
+        pop,
+        suitability,
+        species_traits,
         era_scaling: float,
-    ) -> np.ndarray:
+    ):
         """基于特质的竞争计算 [Taichi GPU]
         
         【新】使用局部适应度和生态位重叠决定竞争结果
         """
         S, H, W = pop.shape
+        buffers = self._buffers
         
         # 竞争强度（随时代调整）
         base_strength = 0.08
         if era_scaling > 1.5:
             base_strength *= max(0.6, 1.0 / (era_scaling ** 0.15))
         
+        pop_k = buffers.upload("competition_in", pop)
+        traits_k = buffers.upload("species_traits", species_traits, version=content_version(species_traits))
+        
         # 1. 计算局部适应度
-        local_fitness = np.zeros((S, H, W), dtype=np.float32)
+        local_fitness = buffers.scratch("local_fitness", (S, H, W))
         _taichi_kernels.kernel_compute_local_fitness(
-            suitability.astype(np.float32),
-            species_traits.astype(np.float32),
-            pop.astype(np.float32),
+            buffers.upload("suitability", suitability),
+            traits_k,
+            pop_k,
             local_fitness,
         )
         
         # 2. 计算生态位重叠矩阵
-        niche_overlap = np.zeros((S, S), dtype=np.float32)
+        niche_overlap = buffers.scratch("niche_overlap", (S, S))
         _taichi_kernels.kernel_compute_niche_overlap_matrix(
-            species_traits.astype(np.float32),
+            traits_k,
             niche_overlap,
         )
         
         # 3. 应用基于特质的竞争
-        result = np.zeros_like(pop, dtype=np.float32)
+        result = buffers.scratch("competition", (S, H, W))
         _taichi_kernels.kernel_apply_trait_competition(
-            pop.astype(np.float32),
+            pop_k,
             local_fitness,
             niche_overlap,
             result,
@@ -873,18 +871,20 @@ class TensorEcologyEngine:
     
     def _compute_dispersal_tensor(
         self,
-        pop: np.ndarray,
-        suitability: np.ndarray,
+        pop,
+        suitability,
         era_scaling: float,
         diffusion_scale: np.ndarray | None = None,
         override_diffusion_rate: float | None = None,
-    ) -> np.ndarray:
+        out_name: str = "dispersal_0",
+    ):
         """张量化扩散计算 [Taichi GPU]
         
         【v3.1】使用缓冲后的 diffusion_scale（已带上限）
         """
         cfg = self.config
         S = pop.shape[0]
+        buffers = self._buffers
         
         # 时代缩放：早期时代扩散更快
         effective_scaling = max(1.0, era_scaling ** 0.5)
@@ -899,15 +899,13 @@ class TensorEcologyEngine:
         
         # 准备 diffusion_scale（已在上层计算时带上限）
         if diffusion_scale is None:
-            diffusion_scale_arr = np.ones(S, dtype=np.float32)
-        else:
-            diffusion_scale_arr = diffusion_scale.astype(np.float32)
+            diffusion_scale = np.ones(S, dtype=np.float32)
         
-        result = np.zeros_like(pop, dtype=np.float32)
+        result = buffers.scratch(out_name, pop.shape)
         _taichi_kernels.kernel_advanced_diffusion_v2(
-            pop.astype(np.float32),
-            suitability.astype(np.float32),
-            diffusion_scale_arr,  # 【v3.1】使用缓冲后的 diffusion_scale
+            buffers.upload(f"{out_name}_in", pop),
+            buffers.upload("suitability", suitability),
+            buffers.upload("diffusion_scale", diffusion_scale),  # 【v3.1】使用缓冲后的 diffusion_scale
             result,
             float(diffusion_rate),
             float(background_rate),
@@ -939,6 +937,7 @@ class TensorEcologyEngine:
         decline_streaks: np.ndarray,
         turn_index: int = 0,
         migration_scale: np.ndarray | None = None,
+        env_kernel=None,
     ) -> tuple[np.ndarray, list[int]]:
         """张量化迁徙计算 v3.1 - 使用缓冲后的 migration_scale
         
@@ -948,11 +947,18 @@ class TensorEcologyEngine:
         - 栖息地掩码改为衰减式
         - 根据世代时间放大 max_distance
         
+        Args:
+            env_kernel: 已补齐 7 通道的环境缓冲（可选，避免重复上传）
+        
         Returns:
             (迁徙后种群, 已迁徙物种索引列表)
         """
         cfg = self.config
         S, H, W = pop.shape
+        buffers = self._buffers
+        if env_kernel is None:
+            env_kernel = buffers.upload("env", self._pad_env(env))
+        pop_k = buffers.upload("migration_pop", pop)
         
         # 【v3.0】计算全局拥挤度
         total_pop = pop.sum()
@@ -981,7 +987,7 @@ class TensorEcologyEngine:
         )
         
         # 1. 计算距离权重 (S, H, W)
-        distance_weights = self._compute_distance_weights_tensor(pop, max_distance)
+        distance_weights = self._compute_distance_weights_tensor(pop_k, max_distance)
         
         # 【v3.0】栖息地掩码改为衰减式而非硬屏蔽
         if env.shape[0] >= 6 and species_prefs.shape[1] >= 6:
@@ -1019,6 +1025,9 @@ class TensorEcologyEngine:
             )
         
         distance_weights = distance_weights.reshape(S, H, W)
+        # 分数与执行两个内核共用同一份距离权重，只上传一次
+        self._migration_calls += 1
+        distance_version = ("migration", self._migration_calls)
         
         # 2. 计算猎物密度（用于消费者）(S, H, W)
         prey_density = self._compute_prey_density_tensor(pop, trophic_levels)
@@ -1028,7 +1037,8 @@ class TensorEcologyEngine:
             pop, env, species_prefs, species_traits, suitability, distance_weights, death_rates, 
             prey_density, trophic_levels,
             resource_pressure, growth_rates, species_mobility,
-            mortality_rates, external_bonus, decline_streaks
+            mortality_rates, external_bonus, decline_streaks,
+            env_kernel=env_kernel, pop_kernel=pop_k, distance_version=distance_version,
         )
         
         # 4. 应用冷却期掩码
@@ -1073,7 +1083,7 @@ class TensorEcologyEngine:
             migration_rates = migration_rates * migration_scale.astype(np.float32)
         
         # 6. 执行迁徙 [Taichi GPU]
-        new_pop = np.zeros_like(pop, dtype=np.float32)
+        new_pop = buffers.scratch("migration", (S, H, W))
         
         # 【v3.0】动态 base_long_jump
         if turn_index < 30:
@@ -1102,30 +1112,20 @@ class TensorEcologyEngine:
             else:
                 traits_for_migration[:, 8] = 1.0  # 默认陆地
         else:
-            traits_for_migration = species_traits.astype(np.float32)
-        
-        # 确保环境张量有足够的通道
-        C = env.shape[0]
-        if C < 7:
-            padded_env = np.zeros((7, H, W), dtype=np.float32)
-            padded_env[:C] = env
-            if C <= 4:
-                padded_env[4] = 1.0  # 默认陆地
-            env_for_migration = padded_env
-        else:
-            env_for_migration = env.astype(np.float32)
+            traits_for_migration = species_traits
         
         _taichi_kernels.kernel_execute_migration(
-            pop.astype(np.float32),
-            migration_scores.astype(np.float32),
-            distance_weights.astype(np.float32),
-            traits_for_migration,
-            env_for_migration,
+            pop_k,
+            buffers.upload("migration_scores", migration_scores),
+            buffers.upload("distance_weights", distance_weights, version=distance_version),
+            buffers.upload("species_traits", traits_for_migration, version=content_version(traits_for_migration)),
+            env_kernel,
             new_pop,
-            migration_rates.astype(np.float32),
+            buffers.upload("migration_rates", migration_rates),
             float(current_score_threshold),  # 【v3.0】使用动态阈值
             float(base_long_jump),
         )
+        new_pop = buffers.to_host(new_pop)
         
         # 识别已迁徙的物种 - 向量化
         change_per_species = np.abs(new_pop - pop).sum(axis=(1, 2))
@@ -1141,14 +1141,14 @@ class TensorEcologyEngine:
         max_distance: float,
     ) -> np.ndarray:
         """计算距离权重 [Taichi GPU]"""
-        S, H, W = pop.shape
-        result = np.zeros((S, H, W), dtype=np.float32)
+        buffers = self._buffers
+        result = buffers.scratch("distance_weights", pop.shape)
         _taichi_kernels.kernel_compute_distance_weights(
-            pop.astype(np.float32),
+            buffers.upload("migration_pop", pop),
             result,
             float(max_distance),
         )
-        return result
+        return buffers.to_host(result)
     
     def _compute_prey_density_tensor(
         self,
@@ -1195,10 +1195,14 @@ class TensorEcologyEngine:
         mortality_rates: np.ndarray,
         external_bonus: np.ndarray | None,
         decline_streaks: np.ndarray,
+        env_kernel=None,
+        pop_kernel=None,
+        distance_version=None,
     ) -> np.ndarray:
         """计算迁徙分数 [Taichi GPU] - 【v3.0】加入栖息地类型约束"""
         cfg = self.config
         S, H, W = pop.shape
+        buffers = self._buffers
         
         # 确保距离权重维度正确 (S, H, W)
         distance_weights = distance_weights.reshape(S, H, W)
@@ -1214,31 +1218,25 @@ class TensorEcologyEngine:
             else:
                 traits_for_scores[:, 8] = 1.0
         else:
-            traits_for_scores = species_traits.astype(np.float32)
+            traits_for_scores = species_traits
         
         # 确保环境张量有足够的通道
-        C = env.shape[0]
-        if C < 7:
-            padded_env = np.zeros((7, H, W), dtype=np.float32)
-            padded_env[:C] = env
-            if C <= 4:
-                padded_env[4] = 1.0
-            env_for_scores = padded_env
-        else:
-            env_for_scores = env.astype(np.float32)
+        if env_kernel is None:
+            env_kernel = buffers.upload("env", self._pad_env(env))
+        pop_k = pop_kernel if pop_kernel is not None else buffers.upload("migration_pop", pop)
         
-        result = np.zeros_like(pop, dtype=np.float32)
+        result = buffers.scratch("migration_scores", (S, H, W))
         if hasattr(_taichi_kernels, "kernel_migration_decision_v2"):
             _taichi_kernels.kernel_migration_decision_v2(
-                pop.astype(np.float32),
-                suitability.astype(np.float32),
-                distance_weights.astype(np.float32),
-                death_rates.astype(np.float32),
-                resource_pressure.astype(np.float32),
-                prey_density.astype(np.float32),
-                trophic_levels.astype(np.float32),
-                traits_for_scores,
-                env_for_scores,
+                pop_k,
+                buffers.upload("suitability", suitability),
+                buffers.upload("distance_weights", distance_weights, version=distance_version),
+                buffers.upload("death_rates", death_rates),
+                buffers.upload("resource_pressure", resource_pressure),
+                buffers.upload("prey_density", prey_density),
+                buffers.upload("trophic_levels", trophic_levels),
+                buffers.upload("species_traits", traits_for_scores, version=content_version(traits_for_scores)),
+                env_kernel,
                 result,
                 float(cfg.pressure_threshold),
                 float(cfg.saturation_threshold),
@@ -1250,10 +1248,10 @@ class TensorEcologyEngine:
             )
         else:
             _taichi_kernels.kernel_migration_decision(
-                pop.astype(np.float32),
-                suitability.astype(np.float32),
-                distance_weights.astype(np.float32),
-                death_rates.astype(np.float32),
+                pop_k,
+                buffers.upload("suitability", suitability),
+                buffers.upload("distance_weights", distance_weights, version=distance_version),
+                buffers.upload("death_rates", death_rates),
                 result,
                 float(cfg.pressure_threshold),
                 float(cfg.saturation_threshold),
@@ -1262,9 +1260,10 @@ class TensorEcologyEngine:
             consumer_mask = (trophic_levels >= 2.0)[:, np.newaxis, np.newaxis]
             result = np.where(
                 consumer_mask,
-                result * 0.7 + prey_density * suitability * 0.3,
-                result
+                buffers.to_host(result) * 0.7 + prey_density * buffers.to_host(suitability) * 0.3,
+                buffers.to_host(result)
             )
+        result = buffers.to_host(result)
         
         # === 梯度/避难所/外部加成（CPU 后处理，保持轻量） ===
         if mortality_rates is not None:
@@ -1321,16 +1320,19 @@ class TensorEcologyEngine:
         self,
         pop: np.ndarray,
         env: np.ndarray,
-        suitability: np.ndarray,
+        suitability,
         era_scaling: float,
         birth_scale: np.ndarray | None = None,
-    ) -> np.ndarray:
+    ):
         """张量化繁殖计算 - 世代缩放
         
         【v3.1】使用缓冲后的 birth_scale + 容量归一 + 压力-繁殖反相扣
+        
+        无超容量格子时结果留在设备缓冲中，直接交给竞争阶段。
         """
         cfg = self.config
         S, H, W = pop.shape
+        buffers = self._buffers
         
         # 时代缩放
         effective_scaling = max(1.0, era_scaling ** 0.5)
@@ -1361,22 +1363,21 @@ class TensorEcologyEngine:
         
         # 准备 birth_scale（已在上层计算时带上限和压力折扣）
         if birth_scale is None:
-            birth_scale_arr = np.ones(S, dtype=np.float32)
-        else:
-            birth_scale_arr = birth_scale.astype(np.float32)
+            birth_scale = np.ones(S, dtype=np.float32)
         
-        result = np.zeros_like(pop, dtype=np.float32)
+        result = buffers.scratch("reproduction", (S, H, W))
         _taichi_kernels.kernel_reproduction_v2(
-            pop.astype(np.float32),
-            suitability.astype(np.float32),
-            capacity.astype(np.float32),
-            birth_scale_arr,  # 【v3.1】使用缓冲后的 birth_scale
+            buffers.upload("reproduction_in", pop),
+            buffers.upload("suitability", suitability),
+            buffers.upload("capacity", capacity),
+            buffers.upload("birth_scale", birth_scale),  # 【v3.1】使用缓冲后的 birth_scale
             float(birth_rate),
             result,
         )
         
         # 【v3.1】超容量格子的繁殖结果额外钳制
         if overcapacity_mask.any():
+            result = buffers.to_host(result)
             # 对超容量格子，限制净增长
             clamp_factor = np.where(
                 overcapacity_mask[np.newaxis, ...],
@@ -1395,20 +1396,22 @@ class TensorEcologyEngine:
     
     def _compute_competition_tensor(
         self,
-        pop: np.ndarray,
-        suitability: np.ndarray,
+        pop,
+        suitability,
         era_scaling: float,
-    ) -> np.ndarray:
+    ):
         """张量化种间竞争 [Taichi GPU]"""
+        buffers = self._buffers
+        
         # 竞争强度（随时间降低）
         base_strength = 0.05
         if era_scaling > 1.5:
             base_strength *= max(0.5, 1.0 / (era_scaling ** 0.2))
         
-        result = np.zeros_like(pop, dtype=np.float32)
+        result = buffers.scratch("competition", pop.shape)
         _taichi_kernels.kernel_competition(
-            pop.astype(np.float32),
-            suitability.astype(np.float32),
+            buffers.upload("competition_in", pop),
+            buffers.upload("suitability", suitability),
             result,
             float(base_strength),
         )
@@ -1451,6 +1454,7 @@ class TensorEcologyEngine:
         """清空缓存"""
         self._species_prefs_cache = None
         self._suitability_cache = None
+        self._buffers.clear()
 
 
 # ============================================================================
@@ -1477,18 +1481,42 @@ def reset_ecology_engine() -> None:
 
 
 # ============================================================================
-# 辅助函数：从 Species 对象提取参数
+# 辅助函数：从 Species 对象提取参数（基于 SpeciesFrame 列式切片）
 # ============================================================================
 
+_TOLERANCE_TRAITS = ("耐热性", "耐寒性", "耐旱性", "耐盐性")
+_FULL_TRAITS = ("耐热性", "耐寒性", "耐旱性", "耐盐性", "光照需求", "繁殖速度", "体型", "机动性")
+
+
+def _frame_rows(
+    species_list: list,
+    species_map: dict[str, int],
+    frame: "SpeciesFrame | None",
+) -> tuple["SpeciesFrame", np.ndarray, np.ndarray]:
+    """返回 (frame, 行号, 张量索引)，只包含 species_map 中有对应物种的条目
+
+    未传入 frame 时用 species_list 临时构建；传入时调用方负责先 sync。
+    """
+    from .species_frame import SpeciesFrame
+
+    if frame is None:
+        frame = SpeciesFrame.from_species(sp for sp in species_list if sp.lineage_code in species_map)
+    rows = frame.rows_for_map(species_map)
+    index = np.flatnonzero(rows >= 0)
+    return frame, rows[index], index
+
+
 def extract_species_params(
     species_list: list,
     species_map: dict[str, int],
+    frame: "SpeciesFrame | None" = None,
 ) -> np.ndarray:
     """从物种列表提取参数矩阵
     
     Args:
         species_list: Species 对象列表
         species_map: {lineage_code: tensor_index}
+        frame: 可选，已同步的 SpeciesFrame（不传则由 species_list 临时构建）
     
     Returns:
         物种参数矩阵 (S, 8)
@@ -1496,24 +1524,13 @@ def extract_species_params(
     """
     S = len(species_map)
     params = np.zeros((S, 8), dtype=np.float32)
+    frame, rows, idx = _frame_rows(species_list, species_map, frame)
     
-    for species in species_list:
-        lineage = species.lineage_code
-        if lineage not in species_map:
-            continue
-        
-        idx = species_map[lineage]
-        traits = species.abstract_traits or {}
-        morph = species.morphology_stats or {}
-        
-        params[idx, 0] = traits.get("耐热性", 5) / 10.0
-        params[idx, 1] = traits.get("耐寒性", 5) / 10.0
-        params[idx, 2] = traits.get("耐旱性", 5) / 10.0
-        params[idx, 3] = traits.get("耐盐性", 5) / 10.0
-        params[idx, 4] = morph.get("body_length_cm", 10.0)
-        params[idx, 5] = morph.get("generation_time_days", 30)
-        params[idx, 6] = getattr(species, 'trophic_level', 1.0) or 1.0
-        params[idx, 7] = morph.get("population", 0) or 0
+    params[idx, 0:4] = frame.traits(_TOLERANCE_TRAITS, rows) / 10.0
+    params[idx, 4] = frame.morphology("body_length_cm", rows, 10.0)
+    params[idx, 5] = frame.morphology("generation_time_days", rows, 30.0)
+    params[idx, 6] = frame.trophic_level[rows]
+    params[idx, 7] = frame.population(rows)
     
     return params
 
@@ -1521,12 +1538,14 @@ def extract_species_params(
 def extract_species_prefs(
     species_list: list,
     species_map: dict[str, int],
+    frame: "SpeciesFrame | None" = None,
 ) -> np.ndarray:
     """从物种列表提取偏好矩阵
     
     Args:
         species_list: Species 对象列表
         species_map: {lineage_code: tensor_index}
+        frame: 可选，已同步的 SpeciesFrame
     
     Returns:
         物种偏好矩阵 (S, 7)
@@ -1534,40 +1553,21 @@ def extract_species_prefs(
     """
     S = len(species_map)
     prefs = np.zeros((S, 7), dtype=np.float32)
-    
-    for species in species_list:
-        lineage = species.lineage_code
-        if lineage not in species_map:
-            continue
-        
-        idx = species_map[lineage]
-        traits = species.abstract_traits or {}
-        habitat_type = (getattr(species, 'habitat_type', 'terrestrial') or 'terrestrial').lower()
-        trophic = getattr(species, 'trophic_level', 1.0) or 1.0
-        
-        # 温度偏好 [-1, 1]
-        heat_pref = traits.get("耐热性", 5) / 10.0
-        cold_pref = traits.get("耐寒性", 5) / 10.0
-        prefs[idx, 0] = heat_pref - cold_pref
-        
-        # 湿度偏好 [0, 1]
-        drought_pref = traits.get("耐旱性", 5) / 10.0
-        prefs[idx, 1] = 1.0 - drought_pref
-        
-        # 海拔偏好（中性）
-        prefs[idx, 2] = 0.0
-        
-        # 资源需求
-        prefs[idx, 3] = min(1.0, trophic / 3.0)
-        
-        # 栖息地类型
-        is_aquatic = habitat_type in ('marine', 'deep_sea', 'freshwater', 'hydrothermal')
-        is_terrestrial = habitat_type in ('terrestrial', 'aerial')
-        is_coastal = habitat_type in ('coastal', 'amphibious')
-        
-        prefs[idx, 4] = 1.0 if is_terrestrial else 0.0
-        prefs[idx, 5] = 1.0 if is_aquatic else 0.0
-        prefs[idx, 6] = 1.0 if is_coastal else 0.0
+    frame, rows, idx = _frame_rows(species_list, species_map, frame)
+    
+    tolerance = frame.traits(_TOLERANCE_TRAITS[:3], rows) / 10.0
+    is_terrestrial, is_aquatic, is_coastal = frame.habitat_flags(rows)
+    
+    # 温度偏好 [-1, 1]、湿度偏好 [0, 1]、海拔偏好（中性）
+    prefs[idx, 0] = tolerance[:, 0] - tolerance[:, 1]
+    prefs[idx, 1] = 1.0 - tolerance[:, 2]
+    prefs[idx, 2] = 0.0
+    # 资源需求
+    prefs[idx, 3] = np.minimum(1.0, frame.trophic_level[rows] / 3.0)
+    # 栖息地类型
+    prefs[idx, 4] = is_terrestrial
+    prefs[idx, 5] = is_aquatic
+    prefs[idx, 6] = is_coastal
     
     return prefs
 
@@ -1575,12 +1575,14 @@ def extract_species_prefs(
 def extract_species_traits(
     species_list: list,
     species_map: dict[str, int],
+    frame: "SpeciesFrame | None" = None,
 ) -> np.ndarray:
     """从物种列表提取完整特质矩阵（用于精确宜居度计算）
     
     Args:
         species_list: Species 对象列表
         species_map: {lineage_code: tensor_index}
+        frame: 可选，已同步的 SpeciesFrame
     
     Returns:
         物种特质矩阵 (S, 14)
@@ -1601,50 +1603,25 @@ def extract_species_traits(
     """
     S = len(species_map)
     traits = np.zeros((S, 14), dtype=np.float32)
+    frame, rows, idx = _frame_rows(species_list, species_map, frame)
+    
+    # 环境耐受特质 (0-4) + 生命史特质 (5-7)
+    traits[idx, 0:8] = frame.traits(_FULL_TRAITS, rows)
+    
+    # 栖息地偏好 (8-10)
+    is_terrestrial, is_aquatic, is_coastal = frame.habitat_flags(rows)
+    traits[idx, 8] = np.where(is_terrestrial, 1.0, np.where(is_coastal, 0.3, 0.0))
+    traits[idx, 9] = np.where(is_aquatic, 1.0, np.where(is_coastal, 0.3, 0.0))
+    traits[idx, 10] = is_coastal
     
-    for species in species_list:
-        lineage = species.lineage_code
-        if lineage not in species_map:
-            continue
-        
-        idx = species_map[lineage]
-        abs_traits = species.abstract_traits or {}
-        morph = species.morphology_stats or {}
-        habitat_type = (getattr(species, 'habitat_type', 'terrestrial') or 'terrestrial').lower()
-        
-        # 环境耐受特质 (0-4)
-        traits[idx, 0] = float(abs_traits.get("耐热性", 5))
-        traits[idx, 1] = float(abs_traits.get("耐寒性", 5))
-        traits[idx, 2] = float(abs_traits.get("耐旱性", 5))
-        traits[idx, 3] = float(abs_traits.get("耐盐性", 5))
-        traits[idx, 4] = float(abs_traits.get("光照需求", 5))
-        
-        # 生命史特质 (5-7)
-        traits[idx, 5] = float(abs_traits.get("繁殖速度", 5))
-        traits[idx, 6] = float(abs_traits.get("体型", 5))
-        traits[idx, 7] = float(abs_traits.get("机动性", 5))
-        
-        # 栖息地偏好 (8-10)
-        is_aquatic = habitat_type in ('marine', 'deep_sea', 'freshwater', 'hydrothermal')
-        is_terrestrial = habitat_type in ('terrestrial', 'aerial')
-        is_coastal = habitat_type in ('coastal', 'amphibious')
-        
-        traits[idx, 8] = 1.0 if is_terrestrial else (0.3 if is_coastal else 0.0)
-        traits[idx, 9] = 1.0 if is_aquatic else (0.3 if is_coastal else 0.0)
-        traits[idx, 10] = 1.0 if is_coastal else 0.0
-        
-        # 营养级 (11)
-        traits[idx, 11] = float(getattr(species, 'trophic_level', 1.0) or 1.0)
-        
-        # 年龄 (12)
-        traits[idx, 12] = float(morph.get("age_turns", 0) or 0)
-        
-        # 专化度 (13) - 由环境特质的方差计算
-        env_traits = traits[idx, 0:5]
-        mean_trait = env_traits.mean()
-        variance = ((env_traits - mean_trait) ** 2).mean()
-        # 方差越大 = 越专化（某些特质高，某些低）
-        traits[idx, 13] = min(1.0, 1.0 - np.exp(-variance / 8.0))
+    # 营养级 (11)、年龄 (12)
+    traits[idx, 11] = frame.trophic_level[rows]
+    traits[idx, 12] = frame.morphology("age_turns", rows, 0.0)
+    
+    # 专化度 (13) - 由环境特质的方差计算（方差越大 = 越专化）
+    env_traits = traits[idx, 0:5]
+    variance = ((env_traits - env_traits.mean(axis=1, keepdims=True)) ** 2).mean(axis=1)
+    traits[idx, 13] = np.minimum(1.0, 1.0 - np.exp(-variance / 8.0))
     
     return traits
 
@@ -1652,16 +1629,11 @@ def extract_species_traits(
 def extract_trophic_levels(
     species_list: list,
     species_map: dict[str, int],
+    frame: "SpeciesFrame | None" = None,
 ) -> np.ndarray:
     """从物种列表提取营养级数组"""
     S = len(species_map)
     trophic = np.ones(S, dtype=np.float32)
-    
-    for species in species_list:
-        lineage = species.lineage_code
-        if lineage not in species_map:
-            continue
-        idx = species_map[lineage]
-        trophic[idx] = getattr(species, 'trophic_level', 1.0) or 1.0
-    
+    frame, rows, idx = _frame_rows(species_list, species_map, frame)
+    trophic[idx] = frame.trophic_level[rows]
     return trophic
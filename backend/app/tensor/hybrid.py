@@ -41,8 +41,15 @@ from dataclasses import dataclass, field
 
 import numpy as np
 
+from .device_buffers import DeviceBufferPool, content_version
+
 logger = logging.getLogger(__name__)
 
+
+def _as_f32(array: np.ndarray) -> np.ndarray:
+    """转换为内核所需的 float32（已是 float32 时不复制）"""
+    return np.asarray(array, dtype=np.float32)
+
 # ============================================================================
 # Taichi 内核（延迟导入）
 # ============================================================================
@@ -59,8 +66,8 @@ def _load_taichi_kernels():
         return _taichi_available
     
     try:
-        from . import taichi_hybrid_kernels as kernels
-        _taichi_kernels = kernels
+        from .taichi_runtime import load_kernels
+        _taichi_kernels = load_kernels()
         _taichi_available = True
         logger.info("[HybridCompute] Taichi GPU 内核已加载")
         return True
@@ -110,6 +117,7 @@ class HybridCompute:
     
     arch: str = "auto"
     _taichi_ready: bool = field(default=False, repr=False)
+    _buffers: DeviceBufferPool | None = field(default=None, repr=False)
     
     def __post_init__(self):
         """初始化 Taichi - GPU-only 模式"""
@@ -117,6 +125,9 @@ class HybridCompute:
         
         if not self._taichi_ready:
             raise RuntimeError("[GPU-only] Taichi GPU 初始化失败，无 NumPy fallback")
+        
+        # 多内核串联（batch_migration）使用的常驻缓冲
+        self._buffers = DeviceBufferPool()
     
     @property
     def backend(self) -> str:
@@ -151,9 +162,9 @@ class HybridCompute:
         """
         result = np.zeros_like(pop, dtype=np.float32)
         _taichi_kernels.kernel_mortality(
-            pop.astype(np.float32),
-            env.astype(np.float32),
-            params.astype(np.float32),
+            _as_f32(pop),
+            _as_f32(env),
+            _as_f32(params),
             result,
             temp_idx, temp_opt, temp_tol,
         )
@@ -175,7 +186,7 @@ class HybridCompute:
         """
         new_pop = np.zeros_like(pop, dtype=np.float32)
         _taichi_kernels.kernel_diffusion(
-            pop.astype(np.float32),
+            _as_f32(pop),
             new_pop,
             rate,
         )
@@ -189,8 +200,8 @@ class HybridCompute:
         """应用死亡率 [Taichi GPU]"""
         result = np.zeros_like(pop, dtype=np.float32)
         _taichi_kernels.kernel_apply_mortality(
-            pop.astype(np.float32),
-            mortality.astype(np.float32),
+            _as_f32(pop),
+            _as_f32(mortality),
             result,
         )
         return result
@@ -215,9 +226,9 @@ class HybridCompute:
         """
         result = np.zeros_like(pop, dtype=np.float32)
         _taichi_kernels.kernel_reproduction(
-            pop.astype(np.float32),
-            fitness.astype(np.float32),
-            capacity.astype(np.float32),
+            _as_f32(pop),
+            _as_f32(fitness),
+            _as_f32(capacity),
             birth_rate,
             result,
         )
@@ -241,8 +252,8 @@ class HybridCompute:
         """
         result = np.zeros_like(pop, dtype=np.float32)
         _taichi_kernels.kernel_competition(
-            pop.astype(np.float32),
-            fitness.astype(np.float32),
+            _as_f32(pop),
+            _as_f32(fitness),
             result,
             strength,
         )
@@ -363,9 +374,9 @@ class HybridCompute:
         
         result = np.zeros((S, H, W), dtype=np.float32)
         _taichi_kernels.kernel_compute_suitability(
-            env.astype(np.float32),
-            species_prefs.astype(np.float32),
-            habitat_mask.astype(np.float32),
+            _as_f32(env),
+            _as_f32(species_prefs),
+            _as_f32(habitat_mask),
             result,
         )
         return result
@@ -389,8 +400,8 @@ class HybridCompute:
         """
         new_pop = np.zeros_like(pop, dtype=np.float32)
         _taichi_kernels.kernel_advanced_diffusion(
-            pop.astype(np.float32),
-            suitability.astype(np.float32),
+            _as_f32(pop),
+            _as_f32(suitability),
             new_pop,
             float(rate),
         )
@@ -423,25 +434,42 @@ class HybridCompute:
             迁徙后的种群张量 (S, H, W)
         """
         S, H, W = pop.shape
+        buffers = self._buffers
         
-        # 1. 计算适宜度
-        suitability = self.compute_suitability(env, species_prefs)
+        # 1. 计算适宜度（结果留在设备缓冲中，供后续内核共享）
+        C = env.shape[0]
+        if C < 7:
+            padded_env = np.zeros((7, H, W), dtype=np.float32)
+            padded_env[:C] = env
+            if C <= 4:
+                padded_env[4] = 1.0
+            env = padded_env
+        habitat_mask = buffers.scratch("habitat_mask", (S, H, W), zero=False)
+        habitat_mask.fill(1.0)
+        suitability = buffers.scratch("suitability", (S, H, W))
+        _taichi_kernels.kernel_compute_suitability(
+            buffers.upload("env", env),
+            buffers.upload("species_prefs", species_prefs),
+            habitat_mask,
+            suitability,
+        )
         
         # 2. 计算距离权重
-        distance_weights = np.zeros((S, H, W), dtype=np.float32)
+        pop_k = buffers.upload("pop", pop)
+        distance_weights = buffers.scratch("distance_weights", (S, H, W))
         _taichi_kernels.kernel_compute_distance_weights(
-            pop.astype(np.float32),
+            pop_k,
             distance_weights,
             float(max_distance),
         )
         
         # 3. 计算迁徙分数
-        migration_scores = np.zeros((S, H, W), dtype=np.float32)
+        migration_scores = buffers.scratch("migration_scores", (S, H, W))
         _taichi_kernels.kernel_migration_decision(
-            pop.astype(np.float32),
+            pop_k,
             suitability,
             distance_weights,
-            death_rates.astype(np.float32),
+            buffers.upload("death_rates", death_rates),
             migration_scores,
             float(pressure_threshold),
             0.6,  # saturation_threshold
@@ -455,21 +483,37 @@ class HybridCompute:
             migration_rates
         )
         
-        new_pop = np.zeros((S, H, W), dtype=np.float32)
+        # 迁徙内核需要特质矩阵做栖息地连通性检查：由偏好构造默认值
+        traits = np.zeros((S, 14), dtype=np.float32)
+        traits[:, 7] = 5.0  # 默认机动性
+        if species_prefs.shape[1] >= 7:
+            traits[:, 8:11] = species_prefs[:, 4:7]
+        else:
+            traits[:, 8] = 1.0  # 默认陆地
+        
+        migrated = buffers.scratch("migrated", (S, H, W))
         _taichi_kernels.kernel_execute_migration(
-            pop.astype(np.float32),
+            pop_k,
             migration_scores,
             distance_weights,
-            new_pop,
-            migration_rates,
+            buffers.upload("species_traits", traits, version=content_version(traits)),
+            buffers.upload("env", env),
+            migrated,
+            buffers.upload("migration_rates", migration_rates),
             0.08,  # score_threshold
             0.01,  # long_jump_prob
         )
         
-        # 5. 带引导的扩散
-        new_pop = self.guided_diffusion(new_pop, suitability, rate=0.1)
+        # 5. 带引导的扩散（只在最后下载一次）
+        new_pop = buffers.scratch("diffused", (S, H, W))
+        _taichi_kernels.kernel_advanced_diffusion(
+            migrated,
+            suitability,
+            new_pop,
+            0.1,
+        )
         
-        return new_pop
+        return buffers.to_host(new_pop)
 
 
 # ============================================================================
@@ -0,0 +1,333 @@
+"""
+SpeciesFrame - 物种列式存储（结构数组）
+
+张量阶段和各物种服务每回合都要把 Species 对象的 abstract_traits、
+morphology_stats、prey_species 等 JSON 字段逐个展开成 NumPy 向量，
+同一批物种往往被多个 extract_* 函数重复遍历。
+
+SpeciesFrame 把这些字段按列保存为类型化数组：
+- 每个谱系代码分配一个稳定的行号（物种移除后行号不复用）
+- 特质 / 形态字段：float 列，列随出现的字段名动态增加，缺失值为 NaN，
+  读取时按调用方给的默认值填充
+- 营养级、种群、存活标记、数据库 ID：一维数组
+- 栖息地类型 / 食性：uint8 编码 + 词表
+- 捕食关系：按需组装为 (predator_row, prey_row, weight) 边表或稠密子矩阵
+
+sync() 是唯一逐对象读取属性的地方；之后的切片全部是数组操作。
+全局实例由 SpeciesCacheManager 在 update/remove/clear 时同步维护，
+使用前对当前批次再 sync 一次即可拿到回合内的原地修改（如种群变化）。
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import threading
+from typing import TYPE_CHECKING, Any, Iterable, Mapping, Sequence
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from ..models.species import Species
+
+logger = logging.getLogger(__name__)
+
+AQUATIC_HABITATS = frozenset({"marine", "deep_sea", "freshwater", "hydrothermal"})
+TERRESTRIAL_HABITATS = frozenset({"terrestrial", "aerial"})
+COASTAL_HABITATS = frozenset({"coastal", "amphibious"})
+
+_INITIAL_CAPACITY = 64
+
+
+def _as_float(value: Any) -> float:
+    """JSON 字段值 → float（None/非数值为 NaN）"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+class _Vocabulary:
+    """字符串 → uint8 编码"""
+
+    def __init__(self) -> None:
+        self.names: list[str] = []
+        self._codes: dict[str, int] = {}
+
+    def encode(self, name: str) -> int:
+        code = self._codes.get(name)
+        if code is None:
+            if len(self.names) >= 255:
+                raise ValueError("词表已满（最多 255 项）")
+            code = len(self.names)
+            self.names.append(name)
+            self._codes[name] = code
+        return code
+
+    def lookup(self, predicate) -> np.ndarray:
+        """按编码索引的布尔表"""
+        return np.array([bool(predicate(name)) for name in self.names], dtype=bool)
+
+
+class _FloatColumns:
+    """动态列的 (N, K) float 矩阵，缺失值为 NaN"""
+
+    def __init__(self, dtype) -> None:
+        self.dtype = dtype
+        self.index: dict[str, int] = {}
+        self.values = np.full((_INITIAL_CAPACITY, 0), np.nan, dtype=dtype)
+
+    def column(self, name: str) -> int:
+        col = self.index.get(name)
+        if col is None:
+            col = len(self.index)
+            self.index[name] = col
+            extra = np.full((self.values.shape[0], 1), np.nan, dtype=self.dtype)
+            self.values = np.concatenate([self.values, extra], axis=1)
+        return col
+
+    def grow(self, capacity: int) -> None:
+        extra = np.full((capacity - self.values.shape[0], self.values.shape[1]), np.nan, dtype=self.dtype)
+        self.values = np.concatenate([self.values, extra], axis=0)
+
+    def write(self, row: int, data: Mapping[str, Any]) -> None:
+        self.values[row] = np.nan
+        for name, value in data.items():
+            col = self.column(name)  # 可能重新分配 values，须先于下标取值
+            self.values[row, col] = _as_float(value)
+
+    def get(self, names: Sequence[str], rows: np.ndarray, default: float) -> np.ndarray:
+        out = np.full((len(rows), len(names)), default, dtype=self.dtype)
+        for j, name in enumerate(names):
+            col = self.index.get(name)
+            if col is None:
+                continue
+            values = self.values[rows, col]
+            out[:, j] = np.where(np.isnan(values), default, values)
+        return out
+
+
+class SpeciesFrame:
+    """物种列式存储（线程安全）"""
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._row_of: dict[str, int] = {}
+        self.codes: list[str] = []
+        self._traits = _FloatColumns(np.float32)
+        self._morph = _FloatColumns(np.float64)
+        self._habitat_vocab = _Vocabulary()
+        self._diet_vocab = _Vocabulary()
+        self._prey: list[dict[str, float]] = []
+        self.trophic_level = np.ones(_INITIAL_CAPACITY, dtype=np.float32)
+        self.habitat_code = np.zeros(_INITIAL_CAPACITY, dtype=np.uint8)
+        self.diet_code = np.zeros(_INITIAL_CAPACITY, dtype=np.uint8)
+        self.alive = np.zeros(_INITIAL_CAPACITY, dtype=bool)
+        self.present = np.zeros(_INITIAL_CAPACITY, dtype=bool)  # 已移除的行为 False
+        self.species_id = np.full(_INITIAL_CAPACITY, -1, dtype=np.int64)
+        self.version = 0
+
+    @classmethod
+    def from_species(cls, species_list: Iterable["Species"]) -> "SpeciesFrame":
+        frame = cls()
+        frame.sync(species_list)
+        return frame
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __contains__(self, lineage_code: str) -> bool:
+        row = self._row_of.get(lineage_code)
+        return row is not None and bool(self.present[row])
+
+    # ---------- 写入 ----------
+
+    def _ensure_capacity(self, size: int) -> None:
+        capacity = self.trophic_level.shape[0]
+        if size <= capacity:
+            return
+        new_capacity = max(size, capacity * 2)
+        pad = new_capacity - capacity
+        self.trophic_level = np.concatenate([self.trophic_level, np.ones(pad, dtype=np.float32)])
+        self.habitat_code = np.concatenate([self.habitat_code, np.zeros(pad, dtype=np.uint8)])
+        self.diet_code = np.concatenate([self.diet_code, np.zeros(pad, dtype=np.uint8)])
+        self.alive = np.concatenate([self.alive, np.zeros(pad, dtype=bool)])
+        self.present = np.concatenate([self.present, np.zeros(pad, dtype=bool)])
+        self.species_id = np.concatenate([self.species_id, np.full(pad, -1, dtype=np.int64)])
+        self._traits.grow(new_capacity)
+        self._morph.grow(new_capacity)
+
+    def sync(self, species_list: Iterable["Species"]) -> int:
+        """写入/覆盖物种行（新谱系追加行），返回写入行数"""
+        written = 0
+        with self._lock:
+            for sp in species_list:
+                code = sp.lineage_code
+                row = self._row_of.get(code)
+                if row is None:
+                    row = len(self.codes)
+                    self._ensure_capacity(row + 1)
+                    self._row_of[code] = row
+                    self.codes.append(code)
+                    self._prey.append({})
+
+                self._traits.write(row, sp.abstract_traits or {})
+                self._morph.write(row, sp.morphology_stats or {})
+                self.trophic_level[row] = getattr(sp, "trophic_level", 1.0) or 1.0
+                habitat = (getattr(sp, "habitat_type", None) or "terrestrial").lower()
+                self.habitat_code[row] = self._habitat_vocab.encode(habitat)
+                self.diet_code[row] = self._diet_vocab.encode((getattr(sp, "diet_type", None) or "").lower())
+                self.alive[row] = getattr(sp, "status", "alive") == "alive"
+                self.present[row] = True
+                species_id = getattr(sp, "id", None)
+                self.species_id[row] = species_id if species_id is not None else -1
+
+                prey = list(getattr(sp, "prey_species", None) or [])
+                prefs = getattr(sp, "prey_preferences", None) or {}
+                self._prey[row] = {
+                    p: float(prefs.get(p, 1.0 / len(prey))) for p in prey
+                }
+                written += 1
+            if written:
+                self.version += 1
+        return written
+
+    def drop(self, lineage_code: str) -> bool:
+        """标记物种已移除（行号保留，不复用）"""
+        with self._lock:
+            row = self._row_of.get(lineage_code)
+            if row is None or not self.present[row]:
+                return False
+            self.present[row] = False
+            self.alive[row] = False
+            self.version += 1
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._reset()
+
+    # ---------- 行号 ----------
+
+    def row(self, lineage_code: str) -> int | None:
+        row = self._row_of.get(lineage_code)
+        return row if row is not None and self.present[row] else None
+
+    def rows(self, codes: Iterable[str]) -> np.ndarray:
+        """谱系代码 → 行号（不存在为 -1）"""
+        row_of = self._row_of
+        rows = np.fromiter((row_of.get(code, -1) for code in codes), dtype=np.int64)
+        if rows.size:
+            valid = rows >= 0
+            rows[valid & ~self.present[np.maximum(rows, 0)]] = -1
+        return rows
+
+    def rows_for_map(self, species_map: Mapping[str, int], size: int | None = None) -> np.ndarray:
+        """按张量索引排列的行号：result[species_map[code]] = row（无对应物种为 -1）"""
+        size = len(species_map) if size is None else size
+        result = np.full(size, -1, dtype=np.int64)
+        if not species_map:
+            return result
+        codes = list(species_map)
+        indices = np.fromiter((species_map[c] for c in codes), dtype=np.int64, count=len(codes))
+        keep = (indices >= 0) & (indices < size)
+        result[indices[keep]] = self.rows(codes)[keep]
+        return result
+
+    # ---------- 列读取（rows 须为有效行号，先用 rows()/rows_for_map() 过滤 -1） ----------
+
+    def traits(self, names: Sequence[str], rows: np.ndarray, default: float = 5.0) -> np.ndarray:
+        """特质子矩阵 (len(rows), len(names))，缺失特质取 default"""
+        return self._traits.get(names, np.asarray(rows), default)
+
+    def trait(self, name: str, rows: np.ndarray, default: float = 5.0) -> np.ndarray:
+        return self.traits([name], rows, default)[:, 0]
+
+    def morphology(self, name: str, rows: np.ndarray, default: float = 0.0) -> np.ndarray:
+        """形态字段列（float64，缺失取 default）"""
+        return self._morph.get([name], np.asarray(rows), default)[:, 0]
+
+    def population(self, rows: np.ndarray) -> np.ndarray:
+        return self.morphology("population", rows, 0.0)
+
+    def habitat_types(self, rows: np.ndarray) -> list[str]:
+        names = self._habitat_vocab.names
+        return [names[c] for c in self.habitat_code[np.asarray(rows)]]
+
+    def habitat_flags(self, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(陆地, 水生, 海岸) 布尔数组"""
+        vocab = self._habitat_vocab
+        codes = self.habitat_code[np.asarray(rows)]
+        if not vocab.names:
+            empty = np.zeros(len(codes), dtype=bool)
+            return empty, empty.copy(), empty.copy()
+        return (
+            vocab.lookup(lambda h: h in TERRESTRIAL_HABITATS)[codes],
+            vocab.lookup(lambda h: h in AQUATIC_HABITATS)[codes],
+            vocab.lookup(lambda h: h in COASTAL_HABITATS)[codes],
+        )
+
+    def diet_types(self, rows: np.ndarray) -> list[str]:
+        names = self._diet_vocab.names
+        return [names[c] for c in self.diet_code[np.asarray(rows)]]
+
+    def prey_edges(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """全部捕食关系 (predator_row, prey_row, weight)，猎物不在表中的边被忽略"""
+        with self._lock:
+            src: list[int] = []
+            dst: list[int] = []
+            weights: list[float] = []
+            for row, prey in enumerate(self._prey):
+                if not prey or not self.present[row]:
+                    continue
+                for code, weight in prey.items():
+                    prey_row = self._row_of.get(code)
+                    if prey_row is not None and self.present[prey_row]:
+                        src.append(row)
+                        dst.append(prey_row)
+                        weights.append(weight)
+        return (
+            np.asarray(src, dtype=np.int64),
+            np.asarray(dst, dtype=np.int64),
+            np.asarray(weights, dtype=np.float32),
+        )
+
+    def prey_matrix(self, rows: np.ndarray) -> np.ndarray:
+        """所选行之间的捕食权重矩阵 (k, k)：[i, j] = 第 i 个物种对第 j 个物种的偏好"""
+        rows = np.asarray(rows, dtype=np.int64)
+        matrix = np.zeros((len(rows), len(rows)), dtype=np.float32)
+        src, dst, weights = self.prey_edges()
+        if src.size == 0 or rows.size == 0:
+            return matrix
+        position = np.full(len(self.codes), -1, dtype=np.int64)
+        valid = rows >= 0
+        position[rows[valid]] = np.flatnonzero(valid)
+        i, j = position[src], position[dst]
+        keep = (i >= 0) & (j >= 0)
+        matrix[i[keep], j[keep]] = weights[keep]
+        return matrix
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        return {
+            "rows": len(self.codes),
+            "present": int(self.present[:len(self.codes)].sum()),
+            "alive": int(self.alive[:len(self.codes)].sum()),
+            "trait_columns": len(self._traits.index),
+            "morphology_columns": len(self._morph.index),
+            "version": self.version,
+        }
+
+
+_species_frame: SpeciesFrame | None = None
+
+
+def get_species_frame() -> SpeciesFrame:
+    """获取全局物种列式存储（与 SpeciesCacheManager 同步）"""
+    global _species_frame
+    if _species_frame is None:
+        _species_frame = SpeciesFrame()
+    return _species_frame
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import hashlib
 from dataclasses import dataclass, field
-from typing import Dict
+from functools import lru_cache
+from typing import Any, Dict, Sequence
 
 import numpy as np
 
@@ -40,10 +42,307 @@ class TensorState:
             raise ValueError("species_params must be 2D (S, F)")
 
 
+# ============================================================================
+# 跨回合持久化张量状态
+# ============================================================================
 
+# 环境张量通道: [temp, humidity, altitude, resource, land, sea, coast]
+ENV_CHANNELS = 7
 
+_SEA_KEYWORDS = ("ocean", "sea", "deep_ocean", "marsh", "lagoon", "bay", "海", "海洋", "深海", "浅海", "大洋")
+_FRESHWATER_KEYWORDS = ("lake", "river", "freshwater", "wetland", "bog", "pond", "湖", "河", "淡水", "湿地")
+_COAST_KEYWORDS = ("coast", "coastal", "shore", "beach", "岸", "海岸", "沿海")
 
 
+@lru_cache(maxsize=256)
+def classify_biome(biome: str | None) -> tuple[float, float, float]:
+    """生物群系 -> (land, sea, coast) 标记（按字符串缓存，避免逐地块关键词匹配）"""
+    b = (biome or "land").lower()
+    is_sea = any(k in b for k in _SEA_KEYWORDS) or any(k in b for k in _FRESHWATER_KEYWORDS)
+    is_coast = any(k in b for k in _COAST_KEYWORDS)
+    # 沿岸区域视作陆地+海岸，但保持海洋为0以限制纯水生上岸
+    is_land = not is_sea or is_coast or ("land" in b)
+    return (
+        1.0 if is_land else 0.0,
+        1.0 if is_sea else 0.0,
+        1.0 if is_coast else 0.0,
+    )
 
 
+class TensorStateManager:
+    """跨回合持久化的张量状态
 
+    由 SimulationEngine 持有，TensorStateInitStage 每回合调用 build()：
+    - env 按地图版本（地块写入日志）增量维护：无写入时直接复用，
+      只有少量地块写入时只重写这些格子；没有日志时退回地块内容指纹
+    - pop 按谱系编码逐行继承上一回合（含 TensorEcologyEngine 计算的空间分布），
+      新物种追加（优先继承父系分布），灭绝物种移除
+    - 若其他阶段改变了物种总种群（分化拆分、事件等），按比例缩放该行，保持空间形状
+    - 回合不连续（读档/回滚）或地图尺寸变化时整体重建
+    """
+
+    def __init__(self) -> None:
+        self.state: TensorState | None = None
+        self.map_version: str | None = None
+        self.last_turn_index: int | None = None
+        self.last_build_stats: dict[str, Any] = {}
+        self._tile_coords: dict[int, tuple[int, int]] = {}
+        self._tile_pos: dict[int, int] = {}  # 地块 id -> all_tiles 中的位置
+
+    def reset(self) -> None:
+        """丢弃持久化状态（新游戏/读档时调用）"""
+        self.state = None
+        self.map_version = None
+        self.last_turn_index = None
+        self._tile_coords = {}
+        self._tile_pos = {}
+
+    # ---------- 环境张量 ----------
+
+    @staticmethod
+    def _tile_columns(all_tiles: Sequence[Any]) -> dict[str, np.ndarray]:
+        n = len(all_tiles)
+        return {
+            "x": np.fromiter((t.x for t in all_tiles), dtype=np.int32, count=n),
+            "y": np.fromiter((t.y for t in all_tiles), dtype=np.int32, count=n),
+            "id": np.fromiter((t.id if t.id is not None else -1 for t in all_tiles), dtype=np.int32, count=n),
+            "temperature": np.fromiter((getattr(t, "temperature", 20.0) for t in all_tiles), dtype=np.float32, count=n),
+            "humidity": np.fromiter((getattr(t, "humidity", 0.5) for t in all_tiles), dtype=np.float32, count=n),
+            "elevation": np.fromiter((getattr(t, "elevation", 0.0) for t in all_tiles), dtype=np.float32, count=n),
+            "resources": np.fromiter((getattr(t, "resources", 100.0) for t in all_tiles), dtype=np.float32, count=n),
+            "biome": np.array([classify_biome(getattr(t, "biome", "land")) for t in all_tiles], dtype=np.float32).reshape(n, 3),
+        }
+
+    @staticmethod
+    def _fingerprint(shape: tuple[int, int], cols: dict[str, np.ndarray] | None) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(np.asarray(shape, dtype=np.int64).tobytes())
+        if cols is not None:
+            for key in ("x", "y", "id", "temperature", "humidity", "elevation", "resources", "biome"):
+                digest.update(cols[key].tobytes())
+        return digest.hexdigest()
+
+    def _build_env(
+        self, H: int, W: int, cols: dict[str, np.ndarray] | None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        env = np.zeros((ENV_CHANNELS, H, W), dtype=np.float32)
+        tile_id_grid = np.full((H, W), -1, dtype=np.int32)
+        self._tile_coords = {}
+        self._tile_pos = {}
+        if cols is None:
+            # 默认环境：温带陆地
+            env[0] = 0.4
+            env[1] = 0.5
+            env[3] = 0.8
+            env[4] = 1.0
+            return env, tile_id_grid
+
+        self._fill_env(env, tile_id_grid, cols)
+        ids = cols["id"].tolist()
+        self._tile_coords = dict(zip(ids, zip(cols["y"].tolist(), cols["x"].tolist())))
+        self._tile_pos = {tile_id: pos for pos, tile_id in enumerate(ids)}
+        return env, tile_id_grid
+
+    @staticmethod
+    def _fill_env(env: np.ndarray, tile_id_grid: np.ndarray, cols: dict[str, np.ndarray]) -> None:
+        _, H, W = env.shape
+        # MapTile 使用 x, y 坐标（y 对应行，x 对应列）
+        r, c = cols["y"], cols["x"]
+        inside = (r >= 0) & (r < H) & (c >= 0) & (c < W)
+        r, c = r[inside], c[inside]
+        env[0, r, c] = cols["temperature"][inside] / 50.0  # 归一化
+        env[1, r, c] = cols["humidity"][inside]
+        env[2, r, c] = cols["elevation"][inside] / 1000.0
+        env[3, r, c] = cols["resources"][inside] / 100.0
+        env[4:7, r, c] = cols["biome"][inside].T
+        tile_id_grid[r, c] = cols["id"][inside]
+
+    def _patch_env(
+        self, prev: TensorState, all_tiles: Sequence[Any], changed: set[int]
+    ) -> np.ndarray | None:
+        """只重写变化地块所在的格子；地块列表与上次全量构建对不上时返回 None"""
+        if len(all_tiles) != len(self._tile_pos):
+            return None
+        tiles = []
+        for tile_id in changed:
+            pos = self._tile_pos.get(tile_id)
+            if pos is None:
+                return None
+            tile = all_tiles[pos]
+            if tile.id != tile_id or self._tile_coords.get(tile_id) != (tile.y, tile.x):
+                return None
+            tiles.append(tile)
+        env = prev.env.copy()  # 不原地修改，下游按对象身份缓存的数据保持有效
+        self._fill_env(env, prev.masks["tile_ids"], self._tile_columns(tiles))
+        return env
+
+    # ---------- 种群张量 ----------
+
+    def _seed_population(self, sp: Any, total_pop: float, env: np.ndarray) -> np.ndarray:
+        """无历史分布时按栖息地（或少量高资源地块）初始化单个物种的种群"""
+        _, H, W = env.shape
+        row = np.zeros((H, W), dtype=np.float32)
+        if total_pop <= 0:
+            return row
+
+        habitats = getattr(sp, "habitats", []) or []
+        if habitats and self._tile_coords:
+            # 按栖息地分配
+            pop_per_habitat = total_pop / len(habitats)
+            for hab in habitats:
+                coords = self._tile_coords.get(getattr(hab, "tile_id", None))
+                if coords is not None and 0 <= coords[0] < H and 0 <= coords[1] < W:
+                    row[coords] += pop_per_habitat
+            return row
+
+        # 【v2.1修复】没有栖息地信息时，只分布到有限的起始地块
+        # 参考 config.py: terrestrial_top_k = 4, marine_top_k = 3
+        habitat_type = (getattr(sp, "habitat_type", "terrestrial") or "terrestrial").lower()
+        if habitat_type in ("marine", "deep_sea", "freshwater"):
+            mask = env[5] > 0.5  # 海洋
+        else:
+            mask = env[4] > 0.5  # 陆地
+
+        if mask.sum() > 0:
+            # 按资源排序，只选择前 4 个最高资源的地块
+            flat_resources = (env[3] * mask).ravel()
+            top_k = min(4, int(mask.sum()))
+            top_indices = np.argpartition(flat_resources, -top_k)[-top_k:]
+            top_indices = top_indices[flat_resources[top_indices] > 0]
+            if len(top_indices) > 0:
+                row.ravel()[top_indices] = total_pop / len(top_indices)
+                return row
+
+        # 没有合适地块，放到地图中心
+        row[H // 2, W // 2] = total_pop
+        return row
+
+    def build(
+        self,
+        species_batch: Sequence[Any],
+        all_tiles: Sequence[Any],
+        map_shape: tuple[int, int],
+        turn_index: int | None = None,
+        tile_log: Any = None,
+    ) -> TensorState:
+        """构建（或增量更新）本回合的张量状态
+
+        tile_log: 地块写入日志（EnvironmentRepository.tile_changes）。提供时按地图版本
+            只重写变化的地块，未变化时不遍历地块；未提供时退回按地块内容指纹判断。
+        """
+        H, W = map_shape
+        prev = self.state
+        contiguous = (
+            prev is not None
+            and turn_index is not None
+            and self.last_turn_index is not None
+            and turn_index == self.last_turn_index + 1
+            and prev.pop.shape[1:] == (H, W)
+        )
+
+        env = None
+        env_patched = 0
+        if tile_log is not None:
+            version: int | str = tile_log.version
+            changed = None
+            if prev is not None and prev.env.shape[1:] == (H, W) and isinstance(self.map_version, int):
+                changed = tile_log.changes_since(self.map_version)
+            if changed is not None and not changed:
+                env = prev.env
+            elif changed is not None and all_tiles:
+                env = self._patch_env(prev, all_tiles, changed)
+                env_patched = len(changed) if env is not None else 0
+            env_rebuilt = env is None
+            if env_rebuilt:
+                env, tile_id_grid = self._build_env(H, W, self._tile_columns(all_tiles) if all_tiles else None)
+            else:
+                tile_id_grid = prev.masks["tile_ids"]
+        else:
+            cols = self._tile_columns(all_tiles) if all_tiles else None
+            version = self._fingerprint((H, W), cols)
+            env_rebuilt = version != self.map_version or prev is None
+            if env_rebuilt:
+                env, tile_id_grid = self._build_env(H, W, cols)
+            else:
+                env, tile_id_grid = prev.env, prev.masks["tile_ids"]
+
+        S = len(species_batch)
+        species_map = {sp.lineage_code: idx for idx, sp in enumerate(species_batch)}
+        targets = np.fromiter(
+            (max(0.0, float(sp.morphology_stats.get("population", 0) or 0)) for sp in species_batch),
+            dtype=np.float64,
+            count=S,
+        )
+
+        pop = np.zeros((S, H, W), dtype=np.float32)
+        carried = rescaled = inherited = seeded = 0
+        old_map = prev.species_map if contiguous else {}
+        new_idx = [idx for idx, sp in enumerate(species_batch) if sp.lineage_code in old_map]
+        if new_idx:
+            # 一次性按行取出上一回合分布，并按当前总量缩放
+            old_idx = [old_map[species_batch[i].lineage_code] for i in new_idx]
+            rows = prev.pop[old_idx].astype(np.float32, copy=False)
+            sums = rows.sum(axis=(1, 2), dtype=np.float64)
+            want = targets[new_idx]
+            valid = sums > 0
+            scale = np.where(valid, want / np.where(valid, sums, 1.0), 0.0)
+            changed = valid & ~np.isclose(scale, 1.0, rtol=1e-6, atol=0.0)
+            rows = np.where(changed[:, None, None], rows * scale[:, None, None].astype(np.float32), rows)
+            pop[new_idx] = rows
+            carried = int(valid.sum())
+            rescaled = int(changed.sum())
+            # 上一回合分布为空但现在有种群的物种需要重新播种
+            missing = [i for i, ok in zip(new_idx, valid) if not ok]
+        else:
+            missing = []
+
+        carried_set = set(new_idx) - set(missing)
+        for idx, sp in enumerate(species_batch):
+            if idx in carried_set or targets[idx] <= 0:
+                continue
+            parent_idx = old_map.get(getattr(sp, "parent_code", None) or "")
+            if parent_idx is not None:
+                parent_row = prev.pop[parent_idx]
+                parent_sum = float(parent_row.sum())
+                if parent_sum > 0:
+                    # 子种继承父系空间分布
+                    pop[idx] = parent_row * np.float32(targets[idx] / parent_sum)
+                    inherited += 1
+                    continue
+            pop[idx] = self._seed_population(sp, targets[idx], env)
+            seeded += 1
+
+        # 构建物种参数 (S, F)
+        species_params = np.array(
+            [
+                (
+                    getattr(sp, "temp_optimal", 20.0),
+                    getattr(sp, "temp_tolerance", 15.0),
+                    getattr(sp, "mobility", 1.0),
+                    getattr(sp, "reproduction_rate", 0.1),
+                )
+                for sp in species_batch
+            ],
+            dtype=np.float32,
+        ).reshape(S, 4)
+
+        self.state = TensorState(
+            env=env,
+            pop=pop,
+            species_params=species_params,
+            masks={"tile_ids": tile_id_grid},
+            species_map=species_map,
+        )
+        self.map_version = version
+        self.last_turn_index = turn_index
+        self.last_build_stats = {
+            "env_rebuilt": env_rebuilt,
+            "env_patched": env_patched,
+            "incremental": contiguous,
+            "carried": carried,
+            "rescaled": rescaled,
+            "inherited": inherited,
+            "seeded": seeded,
+            "removed": len(set(old_map) - set(species_map)),
+        }
+        return self.state
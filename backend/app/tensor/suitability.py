@@ -27,9 +27,13 @@ if TYPE_CHECKING:
     from ..models.species import Species
     from ..models.environment import MapTile
     from ..models.config import SuitabilityConfig
+    from .species_frame import SpeciesFrame
 
 logger = logging.getLogger(__name__)
 
+# 宜居度计算使用的特质列（顺序与 Taichi 内核约定一致）
+_SUITABILITY_TRAITS = ("耐寒性", "耐热性", "耐旱性", "耐盐性", "光照需求")
+
 
 # ============================================================================
 # 配置和数据结构
@@ -115,7 +119,6 @@ class TensorSuitabilityCalculator:
         self._kernels = None
         
         # 缓存
-        self._species_traits_cache: dict[str, np.ndarray] = {}
         self._niche_similarity_cache: np.ndarray | None = None
         self._niche_similarity_codes: list[str] = []
         self._specialization_cache: dict[str, float] = {}
@@ -126,7 +129,8 @@ class TensorSuitabilityCalculator:
     
     def _init_taichi(self) -> None:
         """初始化 Taichi 内核 - GPU-only 模式"""
-        from . import taichi_hybrid_kernels as _kernels
+        from .taichi_runtime import load_kernels
+        _kernels = load_kernels()
         self._taichi_available = True
         self._kernels = _kernels
         logger.debug("[TensorSuitability] Taichi GPU 内核加载成功")
@@ -137,7 +141,6 @@ class TensorSuitabilityCalculator:
     
     def clear_cache(self) -> None:
         """清除缓存"""
-        self._species_traits_cache.clear()
         self._niche_similarity_cache = None
         self._niche_similarity_codes = []
         self._specialization_cache.clear()
@@ -270,9 +273,8 @@ class TensorSuitabilityCalculator:
         ], axis=1).astype(np.float32)
         
         # 3. 获取营养级
-        trophic_levels = np.array([
-            sp.trophic_level for sp in species_list
-        ], dtype=np.float32)
+        frame, rows = self._frame_rows(species_list)
+        trophic_levels = frame.trophic_level[rows].astype(np.float32)
         
         # 4. 计算生态位相似度矩阵
         t1 = time.perf_counter()
@@ -393,32 +395,24 @@ class TensorSuitabilityCalculator:
     # ========================================================================
     
     def _extract_species_traits(self, species_list: Sequence["Species"]) -> np.ndarray:
-        """提取物种特质矩阵"""
-        S = len(species_list)
-        traits = np.zeros((S, 5), dtype=np.float32)
-        
-        for i, sp in enumerate(species_list):
-            code = sp.lineage_code
-            
-            # 检查缓存
-            if code in self._species_traits_cache:
-                traits[i] = self._species_traits_cache[code]
-                continue
-            
-            # 提取特质
-            abs_traits = sp.abstract_traits or {}
-            sp_traits = np.array([
-                abs_traits.get("耐寒性", 5.0),
-                abs_traits.get("耐热性", 5.0),
-                abs_traits.get("耐旱性", 5.0),
-                abs_traits.get("耐盐性", 5.0),
-                abs_traits.get("光照需求", 5.0),
-            ], dtype=np.float32)
-            
-            traits[i] = sp_traits
-            self._species_traits_cache[code] = sp_traits
-        
-        return traits
+        """提取物种特质矩阵 (S, 5)：[耐寒性, 耐热性, 耐旱性, 耐盐性, 光照需求]
+
+        从全局 SpeciesFrame 切片；表中尚无的物种先补写入。
+        """
+        frame, rows = self._frame_rows(species_list)
+        return frame.traits(_SUITABILITY_TRAITS, rows)
+    
+    def _frame_rows(self, species_list: Sequence["Species"]) -> tuple["SpeciesFrame", np.ndarray]:
+        """物种列表 → (全局 SpeciesFrame, 行号)"""
+        from .species_frame import get_species_frame
+        
+        frame = get_species_frame()
+        rows = frame.rows(sp.lineage_code for sp in species_list)
+        missing = np.flatnonzero(rows < 0)
+        if missing.size:
+            frame.sync(species_list[i] for i in missing)
+            rows[missing] = frame.rows(species_list[i].lineage_code for i in missing)
+        return frame, rows
     
     def _compute_specialization(self, traits: np.ndarray, S: int) -> np.ndarray:
         """计算物种专化度 [GPU-only]"""
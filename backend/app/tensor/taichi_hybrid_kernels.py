@@ -9,6 +9,10 @@ Taichi 内核定义模块
 - Apple: Metal (macOS)
 
 如果 Taichi 不可用，则此模块的导入会失败。
+
+导入本模块只定义内核，不初始化 Taichi：
+- 运行时在首次通过 taichi_runtime.load_kernels() 取内核时初始化
+- 内核预热见文件末尾的 iter_warmup_calls()，由 TaichiRuntime 在后台工作线程中执行
 """
 
 import logging
@@ -43,12 +47,16 @@ def _ensure_taichi_init():
         ("opengl", ti.opengl, "OpenGL"),
     ]
     
+    from .taichi_runtime import offline_cache_dir
+    cache_path = str(offline_cache_dir())
+    
     for backend_name, backend_arch, backend_desc in backends:
         try:
             ti.init(
                 arch=backend_arch, 
                 default_fp=ti.f32, 
                 offline_cache=True,
+                offline_cache_file_path=cache_path,
                 # 对于 Vulkan，设置更宽松的内存限制
                 device_memory_fraction=0.7 if backend_name == "vulkan" else 0.8,
             )
@@ -75,7 +83,19 @@ def get_taichi_backend() -> str | None:
     """获取当前 Taichi 后端名称"""
     return _taichi_backend
 
-_ensure_taichi_init()
+
+def is_taichi_initialized() -> bool:
+    """Taichi 运行时是否已初始化（不触发初始化）"""
+    return _taichi_initialized and _taichi_backend is not None
+
+
+def _reinit_taichi() -> str | None:
+    """重置后重新初始化（用于把离线缓存落盘）"""
+    global _taichi_initialized, _taichi_backend
+    ti.reset()
+    _taichi_initialized = False
+    _taichi_backend = None
+    return _ensure_taichi_init()
 
 
 @ti.kernel
@@ -1928,117 +1948,6 @@ def kernel_trait_diffusion(
         new_pop[s, i, j] = current - total_outflow + inflow
 
 
-# ============================================================================
-# 预编译所有内核（在主线程中）
-# ============================================================================
-
-def _precompile_all_kernels():
-    """在模块加载时预编译所有 Taichi 内核
-    
-    Taichi 内核在首次调用时才会编译，如果首次调用发生在非主线程，
-    会触发 "Assertion failure: std::this_thread::get_id() == main_thread_id_" 错误。
-    
-    通过在模块加载时（主线程）用小数组调用所有内核，可以提前完成编译。
-    """
-    global _taichi_backend
-    
-    if _taichi_backend is None:
-        logger.warning("[Taichi] 跳过预编译：GPU 后端未初始化")
-        return
-    
-    import numpy as np
-    
-    # 使用最小的测试数组
-    S, H, W = 1, 2, 2
-    
-    try:
-        # 创建测试数组
-        pop = np.ones((S, H, W), dtype=np.float32)
-        env = np.ones((7, H, W), dtype=np.float32)
-        params = np.ones((S, 4), dtype=np.float32)
-        prefs = np.ones((S, 6), dtype=np.float32)
-        trophic = np.ones((S,), dtype=np.float32)
-        pressure = np.zeros((3, H, W), dtype=np.float32)
-        result_3d = np.zeros((S, H, W), dtype=np.float32)
-        suitability = np.ones((S, H, W), dtype=np.float32)
-        capacity = np.ones((H, W), dtype=np.float32)
-        habitat_mask = np.ones((S, H, W), dtype=np.float32)
-        death_rates = np.zeros((S,), dtype=np.float32)
-        migration_rates = np.ones((S,), dtype=np.float32)
-        distance_weights = np.ones((S, H, W), dtype=np.float32)
-        migration_scores = np.zeros((S, H, W), dtype=np.float32)
-        traits = np.ones((S, 14), dtype=np.float32)  # 【修复】提前定义 traits
-        scale_arr = np.ones((S,), dtype=np.float32)  # 【新增】缩放因子数组
-        
-        # 预编译各内核（小数组调用，仅触发编译）
-        kernel_mortality(pop, env, params, result_3d, 0, 20.0, 15.0)
-        kernel_apply_mortality(pop, result_3d, result_3d)
-        kernel_compute_suitability(env, prefs, habitat_mask, result_3d)
-        kernel_advanced_diffusion(pop, suitability, result_3d, 0.1)
-        kernel_reproduction(pop, suitability, capacity, 0.1, result_3d)
-        kernel_competition(pop, suitability, result_3d, 0.1)
-        kernel_compute_distance_weights(pop, result_3d, 3.0)
-        # kernel_migration_decision 需要 7 个参数
-        kernel_migration_decision(
-            pop, suitability, distance_weights, death_rates, 
-            migration_scores, 0.12, 0.8  # pressure_threshold, saturation_threshold
-        )
-        if 'kernel_migration_decision_v2' in globals():
-            kernel_migration_decision_v2(
-                pop, suitability, distance_weights, death_rates,
-                death_rates,  # resource_pressure 占位
-                suitability,  # prey_density 占位
-                trophic,
-                traits,  # 【新】species_traits
-                env,     # 【新】env
-                migration_scores,
-                0.12, 0.8, 0.9, 0.35, 0.3, 0.1, 2.0
-            )
-        kernel_execute_migration(
-            pop, migration_scores, distance_weights, 
-            traits,  # 【新】species_traits
-            env,     # 【新】env
-            result_3d, migration_rates, 0.25, 0.01
-        )
-        kernel_multifactor_mortality(
-            pop, env, prefs, params, trophic, pressure, result_3d,
-            0.05, 0.3, 0.2, 0.15, 1.0, 1.0
-        )
-        
-        # 【新】预编译特质系统内核
-        niche_overlap = np.zeros((S, S), dtype=np.float32)
-        local_fitness = np.ones((S, H, W), dtype=np.float32)
-        
-        kernel_compute_trait_suitability(env, traits, result_3d)
-        kernel_compute_local_fitness(suitability, traits, pop, local_fitness)
-        kernel_compute_niche_overlap_matrix(traits, niche_overlap)
-        kernel_apply_trait_competition(pop, local_fitness, niche_overlap, result_3d, 0.1)
-        kernel_trait_mortality(pop, env, traits, suitability, pressure, result_3d, 0.05, 1.0)
-        kernel_trait_diffusion(pop, suitability, traits, env, result_3d, 0.1)
-        
-        # 【v3.1】预编译 v2 内核（带缩放因子）
-        kernel_advanced_diffusion_v2(pop, suitability, scale_arr, result_3d, 0.1, 0.05, 15.0, 0.2)
-        kernel_trait_diffusion_v2(pop, suitability, traits, env, scale_arr, result_3d, 0.1, 0.05, 15.0, 0.2)
-        kernel_reproduction_v2(pop, suitability, capacity, scale_arr, 0.1, result_3d)
-        kernel_multifactor_mortality_v2(
-            pop, env, prefs, params, trophic, pressure, scale_arr, result_3d,
-            0.05, 0.3, 0.2, 0.15, 1.0, 1.0
-        )
-        kernel_trait_mortality_v2(pop, env, traits, suitability, pressure, scale_arr, result_3d, 0.05, 1.0)
-        
-        # 同步 Taichi 运行时
-        ti.sync()
-        
-        logger.info("[Taichi] 所有内核预编译完成（含特质系统和v2内核）")
-        
-    except Exception as e:
-        logger.warning(f"[Taichi] 内核预编译失败（将在首次使用时编译）: {e}")
-
-
-# 在模块加载时预编译
-_precompile_all_kernels()
-
-
 # ============================================================================
 # 竞争计算内核 - GPU 加速的亲缘竞争计算
 # ============================================================================
@@ -3386,3 +3295,128 @@ def kernel_trait_mortality_v2(
         result[s, i, j] = ti.max(0.02, ti.min(0.95, total_mortality))
 
 
+# ============================================================================
+# 内核预热
+# ============================================================================
+
+def iter_warmup_calls(as_ndarray: bool = False):
+    """逐个产出 (内核名, 调用函数)，用最小数组触发各内核编译
+    
+    Taichi 内核在首次调用时才会编译。根 SNode 树必须在初始化线程物化，否则会触发
+    "Assertion failure: std::this_thread::get_id() == main_thread_id_" 错误；
+    TaichiRuntime 初始化后先在主线程 ti.sync() 物化，之后这些调用可以在工作线程执行。
+    拆成单个调用便于逐个编译、在回合开始时暂停。
+    
+    Args:
+        as_ndarray: 使用 ti.ndarray 参数预热（GPU 上生态引擎传设备缓冲，
+            与 NumPy 参数是不同的内核实例）
+    
+    必须定义在所有内核之后（模块末尾）。
+    """
+    import numpy as np
+    
+    def _arr(shape, fill=0.0):
+        host = np.full(shape, fill, dtype=np.float32)
+        if not as_ndarray:
+            return host
+        buf = ti.ndarray(ti.f32, shape=shape)
+        buf.from_numpy(host)
+        return buf
+    
+    # 使用最小的测试数组
+    S, H, W = 1, 2, 2
+    
+    pop = _arr((S, H, W), 1.0)
+    env = _arr((7, H, W), 1.0)
+    params = _arr((S, 4), 1.0)
+    prefs = _arr((S, 6), 1.0)
+    trophic = _arr((S,), 1.0)
+    pressure = _arr((3, H, W))
+    result_3d = _arr((S, H, W))
+    suitability = _arr((S, H, W), 1.0)
+    capacity = _arr((H, W), 1.0)
+    habitat_mask = _arr((S, H, W), 1.0)
+    death_rates = _arr((S,))
+    migration_rates = _arr((S,), 1.0)
+    distance_weights = _arr((S, H, W), 1.0)
+    migration_scores = _arr((S, H, W))
+    traits = _arr((S, 14), 1.0)
+    scale_arr = _arr((S,), 1.0)
+    niche_overlap = _arr((S, S))
+    local_fitness = _arr((S, H, W), 1.0)
+    
+    calls = [
+        ("kernel_mortality", lambda: kernel_mortality(pop, env, params, result_3d, 0, 20.0, 15.0)),
+        ("kernel_apply_mortality", lambda: kernel_apply_mortality(pop, result_3d, result_3d)),
+        ("kernel_compute_suitability", lambda: kernel_compute_suitability(env, prefs, habitat_mask, result_3d)),
+        ("kernel_advanced_diffusion", lambda: kernel_advanced_diffusion(pop, suitability, result_3d, 0.1)),
+        ("kernel_reproduction", lambda: kernel_reproduction(pop, suitability, capacity, 0.1, result_3d)),
+        ("kernel_competition", lambda: kernel_competition(pop, suitability, result_3d, 0.1)),
+        ("kernel_compute_distance_weights", lambda: kernel_compute_distance_weights(pop, result_3d, 3.0)),
+        ("kernel_migration_decision", lambda: kernel_migration_decision(
+            pop, suitability, distance_weights, death_rates,
+            migration_scores, 0.12, 0.8,  # pressure_threshold, saturation_threshold
+        )),
+        ("kernel_migration_decision_v2", lambda: kernel_migration_decision_v2(
+            pop, suitability, distance_weights, death_rates,
+            death_rates,  # resource_pressure 占位
+            suitability,  # prey_density 占位
+            trophic, traits, env, migration_scores,
+            0.12, 0.8, 0.9, 0.35, 0.3, 0.1, 2.0,
+        )),
+        ("kernel_execute_migration", lambda: kernel_execute_migration(
+            pop, migration_scores, distance_weights, traits, env,
+            result_3d, migration_rates, 0.25, 0.01,
+        )),
+        ("kernel_multifactor_mortality", lambda: kernel_multifactor_mortality(
+            pop, env, prefs, params, trophic, pressure, result_3d,
+            0.05, 0.3, 0.2, 0.15, 1.0, 1.0,
+        )),
+        # 特质系统内核
+        ("kernel_compute_trait_suitability", lambda: kernel_compute_trait_suitability(env, traits, result_3d)),
+        ("kernel_compute_local_fitness", lambda: kernel_compute_local_fitness(suitability, traits, pop, local_fitness)),
+        ("kernel_compute_niche_overlap_matrix", lambda: kernel_compute_niche_overlap_matrix(traits, niche_overlap)),
+        ("kernel_apply_trait_competition", lambda: kernel_apply_trait_competition(
+            pop, local_fitness, niche_overlap, result_3d, 0.1,
+        )),
+        ("kernel_trait_mortality", lambda: kernel_trait_mortality(
+            pop, env, traits, suitability, pressure, result_3d, 0.05, 1.0,
+        )),
+        ("kernel_trait_diffusion", lambda: kernel_trait_diffusion(pop, suitability, traits, env, result_3d, 0.1)),
+        # 【v3.1】v2 内核（带缩放因子）
+        ("kernel_advanced_diffusion_v2", lambda: kernel_advanced_diffusion_v2(
+            pop, suitability, scale_arr, result_3d, 0.1, 0.05, 15.0, 0.2,
+        )),
+        ("kernel_trait_diffusion_v2", lambda: kernel_trait_diffusion_v2(
+            pop, suitability, traits, env, scale_arr, result_3d, 0.1, 0.05, 15.0, 0.2,
+        )),
+        ("kernel_reproduction_v2", lambda: kernel_reproduction_v2(
+            pop, suitability, capacity, scale_arr, 0.1, result_3d,
+        )),
+        ("kernel_multifactor_mortality_v2", lambda: kernel_multifactor_mortality_v2(
+            pop, env, prefs, params, trophic, pressure, scale_arr, result_3d,
+            0.05, 0.3, 0.2, 0.15, 1.0, 1.0,
+        )),
+        ("kernel_trait_mortality_v2", lambda: kernel_trait_mortality_v2(
+            pop, env, traits, suitability, pressure, scale_arr, result_3d, 0.05, 1.0,
+        )),
+    ]
+    yield from calls
+
+
+def _precompile_all_kernels() -> int:
+    """同步预编译所有内核，返回成功数量（需已初始化，且在主线程调用）"""
+    if _taichi_backend is None:
+        logger.warning("[Taichi] 跳过预编译：GPU 后端未初始化")
+        return 0
+    
+    compiled = 0
+    for name, call in iter_warmup_calls():
+        try:
+            call()
+            compiled += 1
+        except Exception as e:
+            logger.warning(f"[Taichi] 内核 {name} 预编译失败（将在首次使用时编译）: {e}")
+    ti.sync()
+    logger.info(f"[Taichi] 内核预编译完成: {compiled} 个")
+    return compiled
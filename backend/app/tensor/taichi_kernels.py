@@ -55,8 +55,8 @@ def init_taichi(arch: str = "auto") -> bool:
     
     try:
         # 使用统一的初始化函数
-        from .taichi_hybrid_kernels import _ensure_taichi_init
-        _ensure_taichi_init()
+        from .taichi_runtime import get_taichi_runtime
+        get_taichi_runtime().ensure_initialized()
         _taichi_initialized = True
         
         # 定义内核
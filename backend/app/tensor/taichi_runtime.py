@@ -0,0 +1,359 @@
+"""
+Taichi 运行时管理 - 延迟初始化、主线程空闲预热、离线缓存校验
+
+启动时不再初始化 Taichi（逐个探测 CUDA→Vulkan→Metal→OpenGL 并 JIT 编译
+全部内核会让 FastAPI 启动和 CLI 调用都付出数秒代价）：
+- load_kernels(): 首个张量阶段取内核时才初始化运行时
+- TaichiRuntime.warmup_async(): 在主线程初始化后，把逐个内核的编译放到
+  工作线程执行，事件循环不被编译阻塞；回合进行中暂停预热
+- 离线缓存写到 settings.taichi_cache_dir；冷缓存预热后主动落盘，
+  下次启动直接命中缓存；落盘会重置运行时，回合进行中推迟到回合结束
+
+Taichi 的根 SNode 树只能在初始化线程物化（首次内核启动时），因此初始化
+与一次 ti.sync() 在主线程完成，之后其余内核可以在其他线程编译。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from .device_buffers import is_device_arch
+
+logger = logging.getLogger(__name__)
+
+
+def offline_cache_dir() -> Path:
+    """Taichi 离线缓存目录"""
+    from ..core.config import get_settings
+
+    return Path(get_settings().taichi_cache_dir)
+
+
+def load_kernels():
+    """导入内核模块并确保 Taichi 已初始化（首次调用时完成初始化）"""
+    runtime = get_taichi_runtime()
+    runtime.ensure_initialized()
+    from . import taichi_hybrid_kernels as kernels
+
+    return kernels
+
+
+class TaichiRuntime:
+    """Taichi 运行时状态（进程级单例）"""
+
+    def __init__(self) -> None:
+        self.init_seconds: float | None = None
+        self.warmup_state = "idle"  # idle / running / done / failed / skipped
+        self.warmup_seconds: float | None = None
+        self.warmed_kernels: list[str] = []
+        self.failed_kernels: dict[str, str] = {}
+        self.cache_flushed = False
+        self._cache_before: dict[str, Any] | None = None
+        self._warmup_task: asyncio.Task | None = None
+        self._reset_listeners: list[weakref.ref] = []
+        self._lock = threading.Lock()
+        # 后台编译与回合互斥：编译线程每个内核持有 _kernel_lock，回合开始时等它释放
+        self._kernel_lock = threading.Lock()
+        self._turns_lock = threading.Lock()
+        self._active_turns = 0
+        self._flush_pending = False
+
+    # ------------------------------------------------------------------
+    # 初始化
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _loaded_kernels():
+        # 只查看已导入的模块，查询状态不应触发 taichi 导入
+        return sys.modules.get(f"{__package__}.taichi_hybrid_kernels")
+
+    @property
+    def initialized(self) -> bool:
+        kernels = self._loaded_kernels()
+        return kernels is not None and kernels.is_taichi_initialized()
+
+    @property
+    def backend(self) -> str | None:
+        kernels = self._loaded_kernels()
+        if kernels is None or not kernels.is_taichi_initialized():
+            return None
+        return kernels.get_taichi_backend()
+
+    def ensure_initialized(self) -> str | None:
+        """初始化 Taichi（幂等），返回后端名称"""
+        with self._lock:
+            from . import taichi_hybrid_kernels as kernels
+
+            if kernels.is_taichi_initialized():
+                return kernels.get_taichi_backend()
+
+            if self._cache_before is None:
+                self._cache_before = self.verify_offline_cache()
+            start = time.perf_counter()
+            backend = kernels._ensure_taichi_init()
+            self._materialize()
+            self.init_seconds = time.perf_counter() - start
+
+        from ..core.startup import get_startup_timeline
+
+        get_startup_timeline().mark("taichi_initialized")
+        logger.info(f"[Taichi] 延迟初始化完成: 后端={backend}, 耗时={self.init_seconds:.2f}s")
+        return backend
+
+    @staticmethod
+    def _materialize() -> None:
+        """在初始化线程物化根 SNode 树，之后内核可在其他线程编译"""
+        import taichi as ti
+
+        ti.sync()
+
+    def add_reset_listener(self, callback: Callable[[], None]) -> None:
+        """注册运行时重置回调（设备缓冲在重置后失效，需要释放）"""
+        if hasattr(callback, "__self__"):
+            ref: weakref.ref = weakref.WeakMethod(callback)
+        else:
+            ref = weakref.ref(callback)
+        self._reset_listeners.append(ref)
+
+    def _notify_reset(self) -> None:
+        alive = []
+        for ref in self._reset_listeners:
+            callback = ref()
+            if callback is None:
+                continue
+            alive.append(ref)
+            try:
+                callback()
+            except Exception as e:
+                logger.debug(f"[Taichi] 重置回调失败: {e}")
+        self._reset_listeners = alive
+
+    # ------------------------------------------------------------------
+    # 预热
+    # ------------------------------------------------------------------
+
+    def warmup(self) -> int:
+        """同步预热全部内核（必须在主线程调用），返回成功数量"""
+        if not self._begin_warmup():
+            return 0
+        from . import taichi_hybrid_kernels as kernels
+
+        start = time.perf_counter()
+        try:
+            self.ensure_initialized()
+            for name, call in kernels.iter_warmup_calls(as_ndarray=is_device_arch()):
+                self._run_warmup_call(name, call)
+            self._finish_warmup(start)
+        except Exception as e:
+            self._fail_warmup(e)
+        return len(self.warmed_kernels)
+
+    async def warmup_async(self) -> int:
+        """后台预热：初始化在事件循环线程完成，内核编译在工作线程中逐个执行
+
+        回合进行中暂停，回合结束后继续（回合自身用到的内核会在首次调用时编译）。
+        """
+        if not self._begin_warmup():
+            return 0
+        from . import taichi_hybrid_kernels as kernels
+
+        start = time.perf_counter()
+        try:
+            await asyncio.sleep(0)
+            self.ensure_initialized()
+            for name, call in kernels.iter_warmup_calls(as_ndarray=is_device_arch()):
+                while self.turn_active:
+                    await asyncio.sleep(0.2)
+                await asyncio.to_thread(self._run_warmup_call_locked, name, call)
+            self._finish_warmup(start)
+        except asyncio.CancelledError:
+            self.warmup_state = "idle"
+            raise
+        except Exception as e:
+            self._fail_warmup(e)
+        return len(self.warmed_kernels)
+
+    def schedule_warmup(self) -> asyncio.Task | None:
+        """在当前事件循环中后台预热（应用启动时调用）"""
+        if self._warmup_task is not None and not self._warmup_task.done():
+            return self._warmup_task
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+        self._warmup_task = loop.create_task(self.warmup_async(), name="taichi-warmup")
+        return self._warmup_task
+
+    async def cancel_warmup(self) -> None:
+        task = self._warmup_task
+        if task is None or task.done():
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    def _begin_warmup(self) -> bool:
+        if self.warmup_state in ("running", "done"):
+            return False
+        if threading.current_thread() is not threading.main_thread():
+            self.warmup_state = "skipped"
+            logger.warning("[Taichi] 预热跳过：Taichi 必须在主线程初始化")
+            return False
+        self.warmup_state = "running"
+        self.warmed_kernels = []
+        self.failed_kernels = {}
+        return True
+
+    def _run_warmup_call_locked(self, name: str, call: Callable[[], Any]) -> None:
+        with self._kernel_lock:
+            self._run_warmup_call(name, call)
+
+    def _run_warmup_call(self, name: str, call: Callable[[], Any]) -> None:
+        try:
+            call()
+            self.warmed_kernels.append(name)
+        except Exception as e:
+            self.failed_kernels[name] = str(e)
+            logger.warning(f"[Taichi] 内核 {name} 预热失败（将在首次使用时编译）: {e}")
+
+    def _finish_warmup(self, start: float) -> None:
+        import taichi as ti
+
+        ti.sync()
+        self.warmup_seconds = time.perf_counter() - start
+        self.warmup_state = "done"
+        cold = not (self._cache_before or {}).get("files")
+        if cold and self.warmed_kernels:
+            self.flush_offline_cache()
+
+        from ..core.startup import get_startup_timeline
+
+        get_startup_timeline().mark("taichi_warmed")
+        logger.info(
+            f"[Taichi] 内核预热完成: {len(self.warmed_kernels)} 个, "
+            f"失败 {len(self.failed_kernels)} 个, 耗时={self.warmup_seconds:.2f}s, "
+            f"离线缓存={'冷启动' if cold else '命中'}"
+        )
+
+    def _fail_warmup(self, error: Exception) -> None:
+        self.warmup_state = "failed"
+        self.failed_kernels["__init__"] = str(error)
+        logger.warning(f"[Taichi] 预热失败（将在首个回合时初始化）: {error}")
+
+    # ------------------------------------------------------------------
+    # 回合
+    # ------------------------------------------------------------------
+
+    @property
+    def turn_active(self) -> bool:
+        return self._active_turns > 0
+
+    @contextmanager
+    def turn_scope(self) -> Iterator[None]:
+        """标记回合进行中：暂停后台预热，离线缓存落盘推迟到回合结束"""
+        with self._turns_lock:
+            self._active_turns += 1
+        # 等待正在工作线程中编译的内核完成（最多一个内核的编译时间）
+        with self._kernel_lock:
+            pass
+        try:
+            yield
+        finally:
+            with self._turns_lock:
+                self._active_turns -= 1
+                flush = self._active_turns == 0 and self._flush_pending
+                if flush:
+                    self._flush_pending = False
+            if flush:
+                self.flush_offline_cache()
+
+    # ------------------------------------------------------------------
+    # 离线缓存
+    # ------------------------------------------------------------------
+
+    def flush_offline_cache(self) -> bool:
+        """把已编译内核写入离线缓存
+
+        Taichi 只在 ti.reset() 或进程正常退出时落盘；进程被强制结束时
+        缓存会丢失。这里重置后立即重新初始化，重置前通知设备缓冲释放。
+        重置会使回合正在使用的设备缓冲失效，因此回合进行中只登记，
+        由 turn_scope() 在回合结束时执行。
+        """
+        kernels = self._loaded_kernels()
+        if kernels is None or not kernels.is_taichi_initialized():
+            return False
+        with self._turns_lock:
+            if self._active_turns:
+                self._flush_pending = True
+                logger.info("[Taichi] 回合进行中，离线缓存落盘推迟到回合结束")
+                return False
+            with self._kernel_lock:
+                try:
+                    self._notify_reset()
+                    kernels._reinit_taichi()
+                    self._materialize()
+                except Exception as e:
+                    logger.warning(f"[Taichi] 离线缓存落盘失败: {e}")
+                    return False
+        self.cache_flushed = True
+        return True
+
+    def verify_offline_cache(self) -> dict[str, Any]:
+        """检查离线缓存目录：是否存在、可写、缓存文件数与大小"""
+        path = offline_cache_dir()
+        info: dict[str, Any] = {
+            "path": str(path),
+            "exists": path.is_dir(),
+            "writable": False,
+            "files": 0,
+            "bytes": 0,
+        }
+        try:
+            path.mkdir(parents=True, exist_ok=True)
+            probe = path / ".write_probe"
+            probe.write_bytes(b"")
+            probe.unlink()
+            info["writable"] = True
+        except OSError as e:
+            info["error"] = str(e)
+        if path.is_dir():
+            for entry in path.rglob("*"):
+                if entry.is_file() and entry.name != ".write_probe":
+                    info["files"] += 1
+                    info["bytes"] += entry.stat().st_size
+        return info
+
+    def status(self) -> dict[str, Any]:
+        return {
+            "initialized": self.initialized,
+            "backend": self.backend,
+            "init_seconds": self.init_seconds,
+            "warmup_state": self.warmup_state,
+            "warmup_seconds": self.warmup_seconds,
+            "warmed_kernels": len(self.warmed_kernels),
+            "failed_kernels": dict(self.failed_kernels),
+            "cache_flushed": self.cache_flushed,
+            "flush_pending": self._flush_pending,
+            "offline_cache": self.verify_offline_cache(),
+        }
+
+
+_runtime: TaichiRuntime | None = None
+
+
+def get_taichi_runtime() -> TaichiRuntime:
+    """获取全局 Taichi 运行时状态"""
+    global _runtime
+    if _runtime is None:
+        _runtime = TaichiRuntime()
+    return _runtime
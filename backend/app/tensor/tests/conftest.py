@@ -0,0 +1,18 @@
+"""
+张量测试公共夹具
+
+Taichi 离线缓存指向临时目录，测试不写入项目的 data/ 目录。
+"""
+
+import pytest
+
+from .. import taichi_runtime
+
+
+@pytest.fixture(autouse=True, scope="session")
+def _isolated_taichi_cache(tmp_path_factory):
+    cache_dir = tmp_path_factory.mktemp("taichi_cache")
+    original = taichi_runtime.offline_cache_dir
+    taichi_runtime.offline_cache_dir = lambda: cache_dir
+    yield cache_dir
+    taichi_runtime.offline_cache_dir = original
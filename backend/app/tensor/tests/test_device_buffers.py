@@ -0,0 +1,135 @@
+"""
+设备常驻缓冲测试
+
+验证缓冲复用、主机/设备两种模式的结果一致性（CPU 架构上同样可用 ti.ndarray）。
+"""
+
+import numpy as np
+import pytest
+
+from ..device_buffers import DeviceBufferPool, content_version, is_device_buffer
+from ..ecology import EcologyConfig, TensorEcologyEngine
+
+
+def _ecology_inputs(seed: int = 0):
+    rng = np.random.default_rng(seed)
+    S, H, W = 4, 10, 12
+    pop = (rng.random((S, H, W)) * 50 * (rng.random((S, H, W)) > 0.5)).astype(np.float32)
+    env = rng.random((7, H, W)).astype(np.float32)
+    env[4] = env[4] > 0.3
+    env[5] = 1.0 - env[4]
+    params = (rng.random((S, 6)) * 5).astype(np.float32)
+    prefs = rng.random((S, 7)).astype(np.float32)
+    traits = (rng.random((S, 14)) * 10).astype(np.float32)
+    return pop, env, params, prefs, traits
+
+
+class TestDeviceBufferPool:
+    """缓冲池基本行为"""
+
+    def test_scratch_reused_when_shape_unchanged(self):
+        pool = DeviceBufferPool(device_resident=True)
+        first = pool.scratch("pop", (2, 3, 3))
+        second = pool.scratch("pop", (2, 3, 3))
+        assert first is second
+        assert pool.stats.reuses == 1
+
+        # 物种数变化时重新分配
+        third = pool.scratch("pop", (3, 3, 3))
+        assert third is not first
+        assert tuple(third.shape) == (3, 3, 3)
+        assert pool.stats.allocations == 2
+
+    def test_upload_roundtrip_and_passthrough(self):
+        pool = DeviceBufferPool(device_resident=True)
+        data = np.arange(12, dtype=np.float64).reshape(3, 4)
+        buf = pool.upload("x", data)
+        assert is_device_buffer(buf)
+        assert pool.upload("y", buf) is buf  # 已在设备上不重复上传
+        np.testing.assert_array_equal(pool.to_host(buf), data.astype(np.float32))
+        assert pool.stats.uploads == 1
+        assert pool.stats.downloads == 1
+
+    def test_host_mode_is_zero_copy(self):
+        pool = DeviceBufferPool(device_resident=False)
+        data = np.ones((2, 2), dtype=np.float32)
+        assert pool.upload("x", data) is data
+        assert pool.to_host(data) is data
+
+
+class TestEcologyWithBuffers:
+    """process_ecology 在两种缓冲模式下结果一致"""
+
+    @pytest.mark.parametrize("use_traits", [False, True])
+    def test_device_and_host_modes_match(self, use_traits):
+        pop, env, params, prefs, traits = _ecology_inputs()
+        results = []
+        for resident in (False, True):
+            engine = TensorEcologyEngine(EcologyConfig(device_resident_buffers=resident))
+            results.append(engine.process_ecology(
+                pop, env, params, prefs,
+                turn_index=5,
+                species_traits=traits if use_traits else None,
+            ))
+
+        host, device = results
+        np.testing.assert_allclose(device.pop, host.pop, rtol=1e-6)
+        np.testing.assert_allclose(device.mortality_rates, host.mortality_rates, rtol=1e-6)
+        np.testing.assert_array_equal(device.death_counts, host.death_counts)
+
+    def test_buffers_persist_across_turns(self):
+        pop, env, params, prefs, traits = _ecology_inputs()
+        engine = TensorEcologyEngine(EcologyConfig(device_resident_buffers=True))
+
+        engine.process_ecology(pop, env, params, prefs, species_traits=traits)
+        allocations = engine.buffers.stats.allocations
+        engine.process_ecology(pop, env, params, prefs, species_traits=traits)
+
+        # 第二回合形状不变，不再分配新缓冲
+        assert engine.buffers.stats.allocations == allocations
+        assert engine.buffers.stats.reuses > 0
+
+
+class TestVersionedUpload:
+    """带版本号的上传"""
+
+    def test_same_version_skips_upload(self):
+        pool = DeviceBufferPool(device_resident=True)
+        traits = np.arange(28, dtype=np.float32).reshape(2, 14)
+        first = pool.upload("species_traits", traits, version=content_version(traits))
+        again = pool.upload("species_traits", traits.copy(), version=content_version(traits))
+        assert again is first
+        assert pool.stats.uploads == 1 and pool.stats.skipped_uploads == 1
+
+        # 内容变化 -> 新版本，重新上传
+        traits[0, 0] = -1.0
+        pool.upload("species_traits", traits, version=content_version(traits))
+        assert pool.stats.uploads == 2
+        np.testing.assert_array_equal(pool.to_host(pool._buffers["species_traits"]), traits)
+
+        # 同名缓冲被内核输出覆盖后版本失效
+        pool.scratch("species_traits", traits.shape)
+        pool.upload("species_traits", traits, version=content_version(traits))
+        assert pool.stats.uploads == 3
+
+    def test_unchanged_traits_and_distance_not_reuploaded(self):
+        pop, env, params, prefs, traits = _ecology_inputs()
+        engine = TensorEcologyEngine(EcologyConfig(device_resident_buffers=True))
+        engine.process_ecology(pop, env, params, prefs, species_traits=traits)
+
+        pool = engine.buffers
+        uploaded, skipped = [], []
+        real_upload = pool.upload
+
+        def spy(name, array, dtype=np.float32, version=None):
+            before = pool.stats.uploads
+            result = real_upload(name, array, dtype, version)
+            (uploaded if pool.stats.uploads > before else skipped).append(name)
+            return result
+
+        pool.upload = spy
+        engine.process_ecology(pop, env, params, prefs, species_traits=traits)
+
+        # 第二回合特质未变化，一次也不上传；距离权重只上传一次
+        assert "species_traits" not in uploaded and "species_traits" in skipped
+        assert uploaded.count("distance_weights") == 1 and "distance_weights" in skipped
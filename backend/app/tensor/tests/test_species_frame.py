@@ -0,0 +1,135 @@
+"""
+物种列式存储测试
+
+验证基于 SpeciesFrame 的 extract_* 与逐对象展开的结果一致，
+以及行号稳定性、同步覆盖与捕食矩阵。
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from ..ecology import (
+    extract_species_params,
+    extract_species_prefs,
+    extract_species_traits,
+    extract_trophic_levels,
+)
+from ..species_frame import SpeciesFrame
+
+HABITATS = ["terrestrial", "marine", "coastal", "Aerial", None, "amphibious", "freshwater"]
+
+
+def _species(n: int = 12, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    result = []
+    for i in range(n):
+        traits = {name: float(rng.integers(1, 11)) for name in ("耐热性", "耐寒性", "耐旱性", "光照需求", "体型")}
+        if i % 3:
+            traits["耐盐性"] = float(rng.integers(1, 11))
+        morph = {"population": float(rng.integers(0, 10_000)), "age_turns": i}
+        if i % 4:
+            morph["body_length_cm"] = float(rng.uniform(0.1, 200))
+        if i % 5 == 0:
+            morph["population"] = None
+        result.append(SimpleNamespace(
+            id=i + 1,
+            lineage_code=f"S{i}",
+            abstract_traits=traits,
+            morphology_stats=morph,
+            trophic_level=None if i == 3 else float(rng.uniform(1, 4)),
+            habitat_type=HABITATS[i % len(HABITATS)],
+            diet_type="carnivore" if i % 2 else "herbivore",
+            status="alive",
+            prey_species=[f"S{i - 1}"] if i % 2 else [],
+            prey_preferences={},
+        ))
+    return result
+
+
+def _legacy_traits(species_list, species_map):
+    """逐对象展开的参考实现"""
+    traits = np.zeros((len(species_map), 14), dtype=np.float32)
+    for sp in species_list:
+        if sp.lineage_code not in species_map:
+            continue
+        idx = species_map[sp.lineage_code]
+        t = sp.abstract_traits or {}
+        habitat = (sp.habitat_type or "terrestrial").lower()
+        names = ("耐热性", "耐寒性", "耐旱性", "耐盐性", "光照需求", "繁殖速度", "体型", "机动性")
+        traits[idx, 0:8] = [t.get(name, 5) for name in names]
+        aquatic = habitat in ("marine", "deep_sea", "freshwater", "hydrothermal")
+        terrestrial = habitat in ("terrestrial", "aerial")
+        coastal = habitat in ("coastal", "amphibious")
+        traits[idx, 8] = 1.0 if terrestrial else (0.3 if coastal else 0.0)
+        traits[idx, 9] = 1.0 if aquatic else (0.3 if coastal else 0.0)
+        traits[idx, 10] = 1.0 if coastal else 0.0
+        traits[idx, 11] = sp.trophic_level or 1.0
+        traits[idx, 12] = sp.morphology_stats.get("age_turns", 0)
+        env = traits[idx, 0:5]
+        traits[idx, 13] = min(1.0, 1.0 - np.exp(-((env - env.mean()) ** 2).mean() / 8.0))
+    return traits
+
+
+class TestExtractors:
+    """extract_* 与逐对象实现一致"""
+
+    def test_matches_legacy_with_and_without_frame(self):
+        species = _species()
+        # 张量索引与列表顺序无关，且包含一个不在列表中的谱系
+        species_map = {sp.lineage_code: i for i, sp in enumerate(reversed(species[2:]))}
+        species_map["GHOST"] = len(species_map)
+        frame = SpeciesFrame.from_species(species)
+
+        expected = _legacy_traits(species, species_map)
+        for f in (None, frame):
+            traits = extract_species_traits(species, species_map, f)
+            np.testing.assert_allclose(traits, expected, rtol=1e-6)
+
+            params = extract_species_params(species, species_map, f)
+            prefs = extract_species_prefs(species, species_map, f)
+            trophic = extract_trophic_levels(species, species_map, f)
+            assert trophic[species_map["GHOST"]] == 1.0
+            assert not params[species_map["GHOST"]].any()
+            for sp in species[2:]:
+                idx = species_map[sp.lineage_code]
+                morph = sp.morphology_stats
+                assert params[idx, 3] == np.float32(sp.abstract_traits.get("耐盐性", 5) / 10.0)
+                assert params[idx, 4] == np.float32(morph.get("body_length_cm", 10.0))
+                assert params[idx, 7] == (morph["population"] or 0)
+                assert prefs[idx, 3] == pytest.approx(min(1.0, (sp.trophic_level or 1.0) / 3.0), rel=1e-6)
+                assert trophic[idx] == np.float32(sp.trophic_level or 1.0)
+
+
+class TestSpeciesFrame:
+    """行号、同步与捕食关系"""
+
+    def test_rows_stable_across_drop_and_resync(self):
+        species = _species(5)
+        frame = SpeciesFrame.from_species(species)
+        assert frame.rows(["S2", "missing", "S0"]).tolist() == [2, -1, 0]
+
+        assert frame.drop("S2")
+        assert "S2" not in frame and frame.rows(["S2"]).tolist() == [-1]
+        assert frame.stats["present"] == 4
+
+        species[2].abstract_traits = {"耐热性": 9.0}
+        frame.sync([species[2]])
+        assert frame.row("S2") == 2  # 行号不复用、不变
+        assert frame.trait("耐热性", np.array([2]))[0] == 9.0
+        assert frame.trait("耐寒性", np.array([2]))[0] == 5.0  # 覆盖写入，旧值不残留
+
+    def test_prey_matrix(self):
+        species = _species(4)
+        species[3].prey_species = ["S1", "S2", "gone"]
+        species[3].prey_preferences = {"S1": 0.7}
+        frame = SpeciesFrame.from_species(species)
+
+        rows = frame.rows(["S3", "S2", "S1", "S0"])
+        matrix = frame.prey_matrix(rows)
+        assert matrix[0, 2] == np.float32(0.7)          # S3 → S1 使用偏好
+        assert matrix[0, 1] == np.float32(1.0 / 3.0)    # S3 → S2 均分
+        assert matrix[2, 3] == 1.0                      # S1 → S0
+        assert matrix.sum() == np.float32(0.7 + 1.0 / 3.0 + 1.0)
+        assert frame.diet_types(rows) == ["carnivore", "herbivore", "carnivore", "herbivore"]
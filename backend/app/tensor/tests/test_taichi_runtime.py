@@ -0,0 +1,120 @@
+"""
+Taichi 延迟初始化与预热测试
+
+验证：导入张量模块不会初始化/导入 Taichi、预热在工作线程中编译内核、
+回合进行中推迟离线缓存落盘、离线缓存目录可写、启动时间线只记录首次事件。
+"""
+
+import asyncio
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+from ...core.startup import StartupTimeline
+from ..taichi_runtime import TaichiRuntime, get_taichi_runtime
+
+BACKEND_DIR = Path(__file__).resolve().parents[3]
+
+
+class TestStartupTimeline:
+    """启动时间线"""
+
+    def test_only_first_mark_recorded(self):
+        timeline = StartupTimeline(process_start=0.0)
+        assert timeline.mark("first_request") is True
+        first = timeline.elapsed("first_request")
+        assert timeline.mark("first_request") is False
+        assert timeline.elapsed("first_request") == first
+
+    def test_report_contains_first_request_and_turn(self):
+        timeline = StartupTimeline()
+        timeline.mark("app_ready")
+        timeline.mark("first_turn")
+        report = timeline.report()
+        assert list(report["events"]) == ["app_ready", "first_turn"]
+        assert report["time_to_first_request"] is None
+        assert report["time_to_first_turn"] is not None
+
+
+class TestLazyImport:
+    """导入不触发 Taichi"""
+
+    def test_tensor_modules_do_not_import_taichi(self):
+        code = (
+            "import sys\n"
+            "import app.tensor.competition, app.tensor.ecology, app.tensor.hybrid\n"
+            "import app.simulation.engine\n"
+            "print('taichi' in sys.modules)\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            timeout=120,
+        )
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip().splitlines()[-1] == "False"
+
+    def test_status_does_not_initialize(self):
+        status = TaichiRuntime().status()
+        assert {"initialized", "warmup_state", "offline_cache"} <= set(status)
+        assert status["warmup_state"] == "idle"
+
+
+class TestWarmup:
+    """预热与离线缓存"""
+
+    def test_warmup_async_compiles_kernels(self, monkeypatch):
+        runtime = get_taichi_runtime()
+        if runtime.warmup_state == "done":
+            assert runtime.warmed_kernels
+            return
+
+        threads = set()
+        real_call = runtime._run_warmup_call
+
+        def record_thread(name, call):
+            threads.add(threading.current_thread())
+            real_call(name, call)
+
+        monkeypatch.setattr(runtime, "_run_warmup_call", record_thread)
+        warmed = asyncio.run(runtime.warmup_async())
+        # 编译不在事件循环线程中进行
+        assert threads and threading.main_thread() not in threads
+        assert runtime.warmup_state == "done"
+        assert warmed == len(runtime.warmed_kernels) > 0
+        assert not runtime.failed_kernels
+        assert runtime.initialized
+
+        # 已完成后重复调用不再编译
+        assert asyncio.run(runtime.warmup_async()) == 0
+
+    def test_offline_cache_dir_writable(self, _isolated_taichi_cache):
+        info = TaichiRuntime().verify_offline_cache()
+        assert info["path"] == str(_isolated_taichi_cache)
+        assert info["exists"]
+        assert info["writable"]
+
+    def test_flush_deferred_until_turn_ends(self, monkeypatch):
+        runtime = TaichiRuntime()
+        resets = []
+        fake = SimpleNamespace(
+            is_taichi_initialized=lambda: True,
+            get_taichi_backend=lambda: "cpu",
+            _reinit_taichi=lambda: resets.append(1),
+        )
+        monkeypatch.setattr(runtime, "_loaded_kernels", lambda: fake)
+        monkeypatch.setattr(runtime, "_materialize", lambda: None)
+
+        with runtime.turn_scope():
+            assert runtime.turn_active
+            assert runtime.flush_offline_cache() is False
+            assert runtime.status()["flush_pending"] and not resets
+
+        # 回合结束时执行推迟的落盘
+        assert resets == [1]
+        assert runtime.cache_flushed and not runtime.turn_active
+        assert runtime.flush_offline_cache() is True and resets == [1, 1]
@@ -164,3 +164,159 @@ class TestTensorConfig:
         
         assert config.divergence_threshold == 0.8
 
+
+
+class TestTensorStateManager:
+    """TensorStateManager 跨回合增量更新测试"""
+    
+    @staticmethod
+    def _tile(tile_id: int, x: int, y: int, biome: str = "grassland", resources: float = 100.0):
+        from types import SimpleNamespace
+        return SimpleNamespace(
+            id=tile_id, x=x, y=y, biome=biome, temperature=20.0,
+            humidity=0.5, elevation=100.0, resources=resources,
+        )
+    
+    @staticmethod
+    def _species(code: str, population: float, tile_ids=(), parent_code=None):
+        from types import SimpleNamespace
+        return SimpleNamespace(
+            lineage_code=code,
+            parent_code=parent_code,
+            morphology_stats={"population": population},
+            habitats=[SimpleNamespace(tile_id=t) for t in tile_ids],
+            habitat_type="terrestrial",
+        )
+    
+    @pytest.fixture
+    def tiles(self):
+        return [self._tile(y * 4 + x, x, y) for y in range(3) for x in range(4)]
+    
+    def test_env_matches_tiles(self, tiles):
+        """环境张量按地块坐标向量化构建"""
+        from ..state import TensorStateManager
+        
+        tiles[5].biome = "deep_ocean"
+        state = TensorStateManager().build([self._species("A", 100, [0])], tiles, (3, 4), turn_index=0)
+        
+        assert state.env.shape == (7, 3, 4)
+        assert state.env[0, 0, 0] == pytest.approx(0.4)
+        assert state.env[5, 1, 1] == 1.0 and state.env[4, 1, 1] == 0.0
+        assert state.masks["tile_ids"][2, 3] == 11
+    
+    def test_population_carried_and_rescaled(self, tiles):
+        """上一回合的空间分布逐行继承，总量变化时按比例缩放"""
+        from ..state import TensorStateManager
+        
+        manager = TensorStateManager()
+        sp = self._species("A", 100, [0, 1])
+        state = manager.build([sp], tiles, (3, 4), turn_index=0)
+        env_before = state.env
+        
+        # 模拟生态计算后的分布
+        state.pop = np.zeros_like(state.pop)
+        state.pop[0, 2, 3] = 30.0
+        state.pop[0, 0, 0] = 10.0
+        sp.morphology_stats["population"] = 80
+        
+        state = manager.build([sp], tiles, (3, 4), turn_index=1)
+        
+        assert state.env is env_before
+        assert manager.last_build_stats["env_rebuilt"] is False
+        assert manager.last_build_stats["rescaled"] == 1
+        assert state.pop[0, 2, 3] == pytest.approx(60.0)
+        assert state.pop[0, 0, 0] == pytest.approx(20.0)
+    
+    def test_species_added_removed_and_inherit_parent(self, tiles):
+        """灭绝物种移除，子种继承父系分布"""
+        from ..state import TensorStateManager
+        
+        manager = TensorStateManager()
+        parent = self._species("A", 100, [0])
+        doomed = self._species("B", 50, [1])
+        state = manager.build([parent, doomed], tiles, (3, 4), turn_index=0)
+        state.pop[0] = 0.0
+        state.pop[0, 1, 2] = 100.0
+        
+        child = self._species("A1", 40, [3], parent_code="A")
+        state = manager.build([parent, child], tiles, (3, 4), turn_index=1)
+        
+        assert state.species_map == {"A": 0, "A1": 1}
+        assert state.pop[1, 1, 2] == pytest.approx(40.0)
+        assert manager.last_build_stats["removed"] == 1
+        assert manager.last_build_stats["inherited"] == 1
+    
+    def test_map_change_or_turn_gap_rebuilds(self, tiles):
+        """地块变化重建环境；回合不连续（读档）时重新播种"""
+        from ..state import TensorStateManager
+        
+        manager = TensorStateManager()
+        sp = self._species("A", 100, [0])
+        state = manager.build([sp], tiles, (3, 4), turn_index=0)
+        state.pop[0] = 0.0
+        state.pop[0, 2, 2] = 100.0
+        
+        tiles[0].temperature = 40.0
+        state = manager.build([sp], tiles, (3, 4), turn_index=1)
+        assert manager.last_build_stats["env_rebuilt"] is True
+        assert state.pop[0, 2, 2] == pytest.approx(100.0)
+        
+        state = manager.build([sp], tiles, (3, 4), turn_index=7)
+        assert manager.last_build_stats["incremental"] is False
+        assert state.pop[0, 0, 0] == pytest.approx(100.0)
+    
+    def test_tile_log_patches_only_changed_tiles(self, tiles):
+        """提供地块写入日志时：无写入不遍历地块，少量写入只重写对应格子"""
+        from ...repositories.environment_repository import TileChangeLog
+        from ..state import TensorStateManager
+        
+        log = TileChangeLog()
+        log.invalidate()
+        manager = TensorStateManager()
+        sp = self._species("A", 100, [0])
+        state = manager.build([sp], tiles, (3, 4), turn_index=0, tile_log=log)
+        env_before = state.env
+        
+        class Untouchable(list):
+            def __iter__(self):
+                raise AssertionError("版本未变化时不应遍历地块")
+        
+        state = manager.build([sp], Untouchable(tiles), (3, 4), turn_index=1, tile_log=log)
+        assert state.env is env_before
+        
+        tiles[6].temperature = 40.0
+        tiles[6].biome = "deep_ocean"
+        log.record([6])
+        state = manager.build([sp], tiles, (3, 4), turn_index=2, tile_log=log)
+        assert manager.last_build_stats["env_rebuilt"] is False
+        assert manager.last_build_stats["env_patched"] == 1
+        assert state.env is not env_before
+        assert state.env[0, 1, 2] == pytest.approx(0.8)
+        assert state.env[5, 1, 2] == 1.0
+        np.testing.assert_array_equal(
+            state.env, TensorStateManager().build([sp], tiles, (3, 4)).env
+        )
+        
+        # 结构性变化（插入/清空地块）整体重建
+        log.invalidate()
+        manager.build([sp], tiles, (3, 4), turn_index=3, tile_log=log)
+        assert manager.last_build_stats["env_rebuilt"] is True
+    
+    def test_tile_change_log_history(self):
+        """日志截断或结构性变化时要求全量重建"""
+        from ...repositories.environment_repository import TileChangeLog
+        
+        log = TileChangeLog(history=2)
+        v0 = log.version
+        log.record([1, 2])
+        log.record([])  # 空写入不推进版本
+        v1 = log.version
+        log.record([3])
+        assert log.changes_since(v1) == {3}
+        assert log.changes_since(v0) == {1, 2, 3}
+        assert log.changes_since(log.version) == set()
+        log.record([4])
+        assert log.changes_since(v0) is None  # 历史已截断
+        log.invalidate()
+        assert log.changes_since(v1) is None
+        assert log.changes_since(None) is None
@@ -1,6 +1,6 @@
 import { useState, useCallback } from "react";
 import type { MapOverview, TurnReport, LineageTree, SpeciesDetail } from "@/services/api.types";
-import { fetchMapOverview, fetchLineageTree, fetchSpeciesDetail } from "@/services/api";
+import { applyViewModeColors, fetchMapOverview, fetchLineageTree, fetchSpeciesDetail, invalidateMapGeometry } from "@/services/api";
 import type { ViewMode } from "@/components/MapViewSelector";
 
 export function useGameState() {
@@ -15,6 +15,7 @@ export function useGameState() {
 
   const refreshMap = useCallback(async () => {
     try {
+      invalidateMapGeometry();
       const data = await fetchMapOverview(viewMode);
       setMapData(data);
       console.log(`[前端] 地图加载成功: ${data.tiles.length} 个地块, ${data.habitats.length} 个栖息地, 视图模式: ${viewMode}`);
@@ -30,22 +31,11 @@ export function useGameState() {
 
   const handleViewModeChange = useCallback((mode: ViewMode) => {
     setViewMode(mode);
-    if (mapData && mapData.tiles.length > 0 && mapData.tiles[0].colors) {
-      // 直接使用缓存的颜色数据
-      const updatedTiles = mapData.tiles.map(tile => ({
-        ...tile,
-        color: tile.colors?.[mode] || tile.color
-      }));
-      setMapData({
-        ...mapData,
-        tiles: updatedTiles
-      });
-    } else {
-      // 需要重新请求后端
-      fetchMapOverview(mode)
-        .then(setMapData)
-        .catch(console.error);
-    }
+    if (!mapData) return;
+    // 预计算颜色直接使用；否则只请求该视图的 color 图层（几何只获取一次）
+    applyViewModeColors(mapData, mode)
+      .then(setMapData)
+      .catch(console.error);
   }, [mapData]);
 
   const loadLineageTree = useCallback(async () => {
@@ -36,6 +36,8 @@ import type { ViewMode } from "@/components/MapViewSelector";
 // 使用模块化 API
 import {
   fetchMapOverview,
+  applyViewModeColors,
+  invalidateMapGeometry,
   fetchLineageTree,
   invalidateLineageCache,
   fetchUIConfig,
@@ -148,15 +150,35 @@ export function GameProvider({ children, viewMode, onViewModeChange }: GameProvi
   }, [freshSpeciesList, latestReport]);
 
   // ============ Actions ============
+  // 视图模式放在 ref 中：切换视图不改变 refreshMap，避免依赖它的副作用重新获取整张地图
+  const viewModeRef = useRef(viewMode);
+
   const refreshMap = useCallback(async () => {
     try {
-      const data = await fetchMapOverview(viewMode);
+      invalidateMapGeometry();
+      const data = await fetchMapOverview(viewModeRef.current);
       setMapData(data);
     } catch (err: unknown) {
       const message = err instanceof Error ? err.message : "未知错误";
       setError(`地图加载失败: ${message}`);
     }
-  }, [viewMode]);
+  }, []);
+
+  // 视图切换只更新地块颜色（预计算颜色或单个 color 图层）
+  useEffect(() => {
+    if (viewModeRef.current === viewMode) return;
+    viewModeRef.current = viewMode;
+    if (!mapData) return;
+    let cancelled = false;
+    applyViewModeColors(mapData, viewMode)
+      .then((data) => {
+        if (!cancelled) setMapData(data);
+      })
+      .catch(console.error);
+    return () => {
+      cancelled = true;
+    };
+  }, [viewMode, mapData]);
 
   const refreshSpeciesList = useCallback(async () => {
     try {
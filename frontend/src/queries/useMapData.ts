@@ -5,7 +5,7 @@
 import { useCallback, useRef } from "react";
 import { useGame } from "@/providers/GameProvider";
 import { useUI } from "@/providers/UIProvider";
-import { fetchMapOverview } from "@/services/api";
+import { applyViewModeColors, fetchMapOverview, invalidateMapGeometry } from "@/services/api";
 import type { CameraState } from "@/components/CanvasMapPanel";
 
 interface UseMapDataResult {
@@ -37,6 +37,7 @@ export function useMapData(): UseMapDataResult {
 
   const refreshMap = useCallback(async () => {
     try {
+      invalidateMapGeometry();
       const data = await fetchMapOverview(viewMode);
       setMapData(data);
       
@@ -60,21 +61,19 @@ export function useMapData(): UseMapDataResult {
       const snapshot = options?.preserveCamera ? captureCamera() : null;
       setViewMode(mode as ReturnType<typeof useUI>["viewMode"]);
 
-      // 如果有预计算颜色，直接使用；否则需要重新获取
-      if (mapData?.tiles[0]?.colors?.[mode as keyof typeof mapData.tiles[0]['colors']]) {
-        // 直接使用预计算颜色，无需重新请求
+      if (!mapData) {
         if (snapshot) {
           restoreCamera(snapshot);
         }
-      } else {
-        // 需要重新获取数据
-        fetchMapOverview(mode).then((data) => {
-          setMapData(data);
-          if (snapshot) {
-            restoreCamera(snapshot);
-          }
-        }).catch(console.error);
+        return;
       }
+      // 预计算颜色直接使用；否则只请求该视图的 color 图层（几何只获取一次）
+      applyViewModeColors(mapData, mode).then((data) => {
+        setMapData(data);
+        if (snapshot) {
+          restoreCamera(snapshot);
+        }
+      }).catch(console.error);
     },
     [mapData, viewMode, captureCamera, setViewMode, setMapData, restoreCamera]
   );
@@ -29,7 +29,14 @@ export {
   fetchHeightMap,
   fetchWaterMask,
   fetchErosionMap,
+  fetchMapGeometry,
+  fetchMapLayers,
+  decodeMapFrames,
+  getMapGeometry,
+  invalidateMapGeometry,
+  applyViewModeColors,
 } from "./map";
+export type { MapLayerFrame } from "./map";
 
 // 物种相关
 export {
@@ -47,8 +54,10 @@ export {
   addDormantGene,
   activateDormantGene,
   removeDormantGene,
+  // 种群时间序列
+  fetchPopulationSeries,
 } from "./species";
-export type { GenerateSpeciesAdvancedParams, AddDormantGeneParams } from "./species";
+export type { GenerateSpeciesAdvancedParams, AddDormantGeneParams, PopulationSeries } from "./species";
 
 // 配置相关
 export {
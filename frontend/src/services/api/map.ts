@@ -3,7 +3,7 @@
  */
 
 import { http } from "./base";
-import type { MapOverview } from "../api.types";
+import type { MapOverview, MapTileInfo } from "../api.types";
 
 /**
  * 获取地图概览
@@ -44,6 +44,165 @@ export async function fetchErosionMap(): Promise<Float32Array> {
   return new Float32Array(buffer);
 }
 
+// ============ 分层地图（二进制帧） ============
 
+/** 一个解码后的图层帧，数据为 (H, W[, 3]) 网格按行展开 */
+export interface MapLayerFrame {
+  name: string;
+  dtype: string;
+  shape: number[];
+  region: [number, number, number, number];
+  lod: number;
+  palette?: string[];
+  missing?: number;
+  scale?: number;
+  data: Uint8Array | Uint16Array | Int16Array | Int32Array | Float32Array;
+  [key: string]: unknown;
+}
+
+function float16ToFloat32(source: Uint16Array): Float32Array {
+  const out = new Float32Array(source.length);
+  for (let i = 0; i < source.length; i++) {
+    const h = source[i];
+    const sign = h & 0x8000 ? -1 : 1;
+    const exp = (h >> 10) & 0x1f;
+    const frac = h & 0x3ff;
+    if (exp === 0) out[i] = sign * 2 ** -14 * (frac / 1024);
+    else if (exp === 0x1f) out[i] = frac ? NaN : sign * Infinity;
+    else out[i] = sign * 2 ** (exp - 15) * (1 + frac / 1024);
+  }
+  return out;
+}
+
+/**
+ * 解析连续的二进制帧：u32 头部长度 + JSON 头部 + 数据（8 字节对齐）
+ * float16 图层转换为 Float32Array
+ */
+export function decodeMapFrames(buffer: ArrayBuffer): Record<string, MapLayerFrame> {
+  const frames: Record<string, MapLayerFrame> = {};
+  const view = new DataView(buffer);
+  const decoder = new TextDecoder();
+  let offset = 0;
+  while (offset < buffer.byteLength) {
+    const headerLength = view.getUint32(offset, true);
+    offset += 4;
+    const header = JSON.parse(decoder.decode(new Uint8Array(buffer, offset, headerLength)));
+    offset += headerLength;
+    const byteLength: number = header.byte_length;
+    let data: MapLayerFrame["data"];
+    switch (header.dtype) {
+      case "uint8":
+        data = new Uint8Array(buffer, offset, byteLength);
+        break;
+      case "uint16":
+        data = new Uint16Array(buffer, offset, byteLength / 2);
+        break;
+      case "int16":
+        data = new Int16Array(buffer, offset, byteLength / 2);
+        break;
+      case "int32":
+        data = new Int32Array(buffer, offset, byteLength / 4);
+        break;
+      case "float16":
+        data = float16ToFloat32(new Uint16Array(buffer, offset, byteLength / 2));
+        break;
+      default:
+        data = new Float32Array(buffer, offset, byteLength / 4);
+    }
+    frames[header.name] = { ...header, data };
+    offset += byteLength + ((8 - (byteLength % 8)) % 8);
+  }
+  return frames;
+}
+
+function layerQuery(region?: [number, number, number, number], lod = 1): string {
+  let query = `lod=${lod}`;
+  if (region) {
+    query += `&region=${region.join(",")}`;
+  }
+  return query;
+}
+
+/**
+ * 获取地图静态几何（tile_id / q / r 网格），地形不变时只需获取一次
+ */
+export async function fetchMapGeometry(
+  region?: [number, number, number, number],
+  lod = 1
+): Promise<Record<string, MapLayerFrame>> {
+  const buffer = await http.getBinary(`/api/map/geometry?${layerQuery(region, lod)}`);
+  return decodeMapFrames(buffer);
+}
+
+/**
+ * 获取地图图层，如 ["color:climate", "elevation", "species:A1"]
+ */
+export async function fetchMapLayers(
+  names: string[],
+  region?: [number, number, number, number],
+  lod = 1
+): Promise<Record<string, MapLayerFrame>> {
+  const path = `/api/map/layers?names=${encodeURIComponent(names.join(","))}&${layerQuery(region, lod)}`;
+  const buffer = await http.getBinary(path);
+  return decodeMapFrames(buffer);
+}
 
+// ============ 视图切换 ============
 
+/** 后端可按图层返回的颜色视图（suitability 由前端按物种着色） */
+const COLOR_LAYER_MODES = new Set(["terrain", "terrain_type", "elevation", "biodiversity", "climate"]);
+
+let geometryRequest: Promise<Record<string, MapLayerFrame>> | null = null;
+
+/**
+ * 获取并缓存地图几何；地图重新加载（回合推进、读档）后调用 invalidateMapGeometry
+ */
+export function getMapGeometry(): Promise<Record<string, MapLayerFrame>> {
+  if (!geometryRequest) {
+    geometryRequest = fetchMapGeometry().catch((err) => {
+      geometryRequest = null;
+      throw err;
+    });
+  }
+  return geometryRequest;
+}
+
+export function invalidateMapGeometry(): void {
+  geometryRequest = null;
+}
+
+function rgbHex(data: MapLayerFrame["data"], cell: number): string {
+  let hex = "#";
+  for (let c = 0; c < 3; c++) {
+    hex += data[cell * 3 + c].toString(16).padStart(2, "0");
+  }
+  return hex;
+}
+
+/**
+ * 切换视图模式时更新地块颜色：有预计算颜色直接使用，
+ * 否则只请求该视图的 color 图层（几何只获取一次），不再重新获取完整地图概览
+ */
+export async function applyViewModeColors(mapData: MapOverview, viewMode: string): Promise<MapOverview> {
+  const precomputed = (tile: MapTileInfo) => tile.colors?.[viewMode as keyof NonNullable<MapTileInfo["colors"]>];
+  if (mapData.tiles.length > 0 && mapData.tiles.every((tile) => precomputed(tile))) {
+    return { ...mapData, tiles: mapData.tiles.map((tile) => ({ ...tile, color: precomputed(tile) as string })) };
+  }
+  if (!COLOR_LAYER_MODES.has(viewMode)) {
+    return mapData;
+  }
+
+  const [geometry, layers] = await Promise.all([getMapGeometry(), fetchMapLayers([`color:${viewMode}`])]);
+  const tileIds = geometry.tile_id.data;
+  const colors = layers[`color:${viewMode}`].data;
+  const colorById = new Map<number, string>();
+  for (let cell = 0; cell < tileIds.length; cell++) {
+    if (tileIds[cell] >= 0) {
+      colorById.set(tileIds[cell], rgbHex(colors, cell));
+    }
+  }
+  return {
+    ...mapData,
+    tiles: mapData.tiles.map((tile) => ({ ...tile, color: colorById.get(tile.id) ?? tile.color })),
+  };
+}
@@ -3,6 +3,7 @@
  */
 
 import { http } from "./base";
+import { decodeMapFrames } from "./map";
 import type {
   SpeciesDetail,
   SpeciesListItem,
@@ -205,3 +206,34 @@ export async function removeDormantGene(
 
 
 
+
+// ============ 种群时间序列（二进制帧） ============
+
+/** 种群时间序列：series 为 (物种数, 回合数) 按行展开，缺测为 NaN */
+export interface PopulationSeries {
+  turns: Int32Array;
+  codes: string[];
+  field: string;
+  series: Float32Array;
+}
+
+/**
+ * 获取种群时间序列（codes 为空时返回全部物种）
+ */
+export async function fetchPopulationSeries(
+  codes: string[] = [],
+  field: "total" | "tiles" | "peak" = "total",
+  window = 200
+): Promise<PopulationSeries> {
+  let path = `/api/population/series?field=${field}&window=${window}`;
+  if (codes.length) {
+    path += `&codes=${encodeURIComponent(codes.join(","))}`;
+  }
+  const frames = decodeMapFrames(await http.getBinary(path));
+  return {
+    turns: frames.turns.data as Int32Array,
+    codes: frames.series.codes as string[],
+    field,
+    series: frames.series.data as Float32Array,
+  };
+}